@@ -369,6 +369,7 @@ class ChartOfAccountsService:
         account_id: UUID,
         debit: Decimal,
         credit: Decimal,
+        commit: bool = True,
     ) -> Account:
         """Update account balance from journal posting."""
         account = self.get_account_by_id(account_id)
@@ -383,7 +384,8 @@ class ChartOfAccountsService:
             # Liabilities, Equity, Revenue: Credits increase, Debits decrease
             account.current_balance += credit - debit
 
-        self.db.commit()
+        if commit:
+            self.db.commit()
         return account
 
     def recalculate_balance(self, account_id: UUID) -> Decimal:
@@ -8,6 +8,7 @@ from app.accounting.journal.models import (
     JournalLine,
     EntryTypeEnum,
     EntryStatusEnum,
+    JournalSequence,
 )
 
 from app.accounting.journal.schemas import (
@@ -26,6 +27,11 @@ from app.accounting.journal.schemas import (
     BatchPostResult,
 )
 
+from app.accounting.journal.numbering import (
+    EntryNumberAllocator,
+    get_entry_number_allocator,
+)
+
 from app.accounting.journal.service import (
     JournalEntryService,
     get_journal_entry_service,
@@ -44,6 +50,7 @@ __all__ = [
     'JournalLine',
     'EntryTypeEnum',
     'EntryStatusEnum',
+    'JournalSequence',
 
     # Schemas
     'JournalEntryCreate',
@@ -60,6 +67,10 @@ __all__ = [
     'BatchPostRequest',
     'BatchPostResult',
 
+    # Numbering
+    'EntryNumberAllocator',
+    'get_entry_number_allocator',
+
     # Service
     'JournalEntryService',
     'get_journal_entry_service',
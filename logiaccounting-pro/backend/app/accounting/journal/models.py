@@ -45,6 +45,11 @@ class EntryStatusEnum(str, Enum):
     VOIDED = "voided"          # Voided/cancelled
 
 
+# Statuses whose lines are in the ledger: a reversed entry stays in the
+# balances and is offset by its (posted) reversal
+LEDGER_STATUSES = (EntryStatusEnum.POSTED, EntryStatusEnum.REVERSED)
+
+
 class JournalEntry(Base):
     """Journal entry header."""
 
@@ -291,3 +296,17 @@ class JournalLine(Base):
             "project_id": str(self.project_id) if self.project_id else None,
             "is_reconciled": self.is_reconciled,
         }
+
+
+class JournalSequence(Base):
+    """Entry number counter per customer and year."""
+
+    __tablename__ = "journal_sequences"
+
+    customer_id = Column(UUID(as_uuid=True), ForeignKey("customers.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    next_value = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<JournalSequence {self.customer_id}:{self.year}={self.next_value}>"
@@ -0,0 +1,134 @@
+"""
+Journal Entry Numbering
+Per-customer, per-year entry number sequences with block reservation
+"""
+
+from datetime import date
+from typing import Dict, List, Tuple
+from uuid import UUID
+import logging
+import threading
+
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.accounting.journal.models import JournalEntry, JournalSequence
+
+logger = logging.getLogger(__name__)
+
+# Numbers taken from the counter row per round-trip; unused numbers of a
+# block are skipped when the process restarts, so sequences may have gaps
+DEFAULT_BLOCK_SIZE = 20
+
+
+def format_entry_number(year: int, value: int) -> str:
+    return f"JE-{year}-{value:05d}"
+
+
+class EntryNumberAllocator:
+    """
+    Hands out entry numbers from blocks reserved on the journal_sequences
+    counter row (locked with SELECT ... FOR UPDATE in its own short
+    transaction), so creating an entry no longer scans existing numbers and
+    concurrent creators never receive the same number.
+    """
+
+    # (customer_id, year) -> [next, end) of the block this process holds
+    _blocks: Dict[Tuple[str, int], List[int]] = {}
+    # One lock per sequence, held across the reservation round-trip so other
+    # customers and years never wait on it; _lock only guards _sequence_locks
+    _sequence_locks: Dict[Tuple[str, int], threading.Lock] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, db: Session, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.db = db
+        self.block_size = block_size
+
+    def next_number(self, customer_id: UUID, entry_date: date) -> str:
+        """Allocate the next entry number for the entry's year."""
+        year = entry_date.year
+        key = (str(customer_id), year)
+
+        with self._sequence_lock(key):
+            block = self._blocks.get(key)
+            if not block or block[0] >= block[1]:
+                start, end = self._reserve(customer_id, year, self.block_size)
+                block = self._blocks[key] = [start, end]
+            value = block[0]
+            block[0] += 1
+
+        return format_entry_number(year, value)
+
+    @classmethod
+    def _sequence_lock(cls, key: Tuple[str, int]) -> threading.Lock:
+        with cls._lock:
+            lock = cls._sequence_locks.get(key)
+            if lock is None:
+                lock = cls._sequence_locks[key] = threading.Lock()
+            return lock
+
+    def reserve_block(self, customer_id: UUID, year: int, count: int) -> List[str]:
+        """Reserve ``count`` consecutive numbers, e.g. for a bulk import."""
+        start, end = self._reserve(customer_id, year, count)
+        return [format_entry_number(year, value) for value in range(start, end)]
+
+    def _reserve(self, customer_id: UUID, year: int, count: int) -> Tuple[int, int]:
+        """Advance the counter row by ``count`` and return the [start, end) range."""
+        # A separate session commits the reservation independently of the
+        # caller's transaction, so a rollback there cannot hand the same
+        # range out twice
+        session = Session(bind=self.db.get_bind())
+        try:
+            for attempt in range(2):
+                sequence = session.query(JournalSequence).filter(
+                    and_(
+                        JournalSequence.customer_id == customer_id,
+                        JournalSequence.year == year,
+                    )
+                ).with_for_update().first()
+
+                if not sequence:
+                    sequence = JournalSequence(
+                        customer_id=customer_id,
+                        year=year,
+                        next_value=self._last_used(session, customer_id, year) + 1,
+                    )
+                    session.add(sequence)
+                    try:
+                        session.flush()
+                    except IntegrityError:
+                        # Another process created the row first; lock theirs
+                        session.rollback()
+                        continue
+
+                start = sequence.next_value
+                sequence.next_value = start + count
+                session.commit()
+                return start, start + count
+
+            raise RuntimeError(f"Could not reserve entry numbers for {customer_id}/{year}")
+        finally:
+            session.close()
+
+    def _last_used(self, session: Session, customer_id: UUID, year: int) -> int:
+        """Highest existing number for a year, to start a new counter after it."""
+        prefix = f"JE-{year}-"
+        latest = session.query(JournalEntry.entry_number).filter(
+            and_(
+                JournalEntry.customer_id == customer_id,
+                JournalEntry.entry_number.like(f"{prefix}%")
+            )
+        ).order_by(JournalEntry.entry_number.desc()).first()
+
+        if latest:
+            try:
+                return int(latest[0].split("-")[-1])
+            except ValueError:
+                pass
+        return 0
+
+
+def get_entry_number_allocator(db: Session) -> EntryNumberAllocator:
+    """Factory function."""
+    return EntryNumberAllocator(db)
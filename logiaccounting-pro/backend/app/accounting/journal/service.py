@@ -9,57 +9,46 @@ from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 import logging
 
-from sqlalchemy import select, and_, or_, func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, and_, or_, func, update, bindparam
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.utils.datetime_utils import utc_now
 
 from app.accounting.journal.models import (
-    JournalEntry, JournalLine, EntryTypeEnum, EntryStatusEnum
+    JournalEntry, JournalLine, EntryTypeEnum, EntryStatusEnum, LEDGER_STATUSES
 )
 from app.accounting.journal.schemas import (
     JournalEntryCreate, JournalEntryUpdate, JournalEntryFilter,
     EntryReversalRequest
 )
+from app.accounting.journal.numbering import EntryNumberAllocator
 from app.accounting.journal.validator import JournalEntryValidator
+from app.accounting.chart_of_accounts.models import Account
 from app.accounting.chart_of_accounts.service import ChartOfAccountsService
 
 logger = logging.getLogger(__name__)
 
+# Entries loaded, validated and committed together by batch_post
+BATCH_POST_CHUNK = 500
+
 
 class JournalEntryService:
     """Service for managing journal entries."""
 
     def __init__(self, db: Session):
+        from app.accounting.ledger.balance_calculator import BalanceCalculator
+
         self.db = db
         self.validator = JournalEntryValidator(db)
         self.coa_service = ChartOfAccountsService(db)
+        self.balances = BalanceCalculator(db)
+        self.numbering = EntryNumberAllocator(db)
 
     # ============== Entry Number Generation ==============
 
     def _generate_entry_number(self, customer_id: UUID, entry_date: date) -> str:
         """Generate unique entry number."""
-        year = entry_date.year
-        prefix = f"JE-{year}-"
-
-        # Get latest entry number for this year
-        latest = self.db.query(JournalEntry).filter(
-            and_(
-                JournalEntry.customer_id == customer_id,
-                JournalEntry.entry_number.like(f"{prefix}%")
-            )
-        ).order_by(JournalEntry.entry_number.desc()).first()
-
-        if latest:
-            try:
-                last_num = int(latest.entry_number.split("-")[-1])
-                new_num = last_num + 1
-            except ValueError:
-                new_num = 1
-        else:
-            new_num = 1
-
-        return f"{prefix}{new_num:05d}"
+        return self.numbering.next_number(customer_id, entry_date)
 
     # ============== CRUD Operations ==============
 
@@ -69,10 +58,17 @@ class JournalEntryService:
         data: JournalEntryCreate,
         created_by: UUID = None,
         auto_number: bool = True,
+        entry_number: str = None,
     ) -> JournalEntry:
-        """Create a new journal entry."""
+        """
+        Create a new journal entry.
+
+        Bulk imports can pass an ``entry_number`` taken from
+        ``self.numbering.reserve_block``.
+        """
         # Generate entry number
-        entry_number = self._generate_entry_number(customer_id, data.entry_date)
+        if not entry_number:
+            entry_number = self._generate_entry_number(customer_id, data.entry_date)
 
         # Determine fiscal period if not provided
         fiscal_period_id = data.fiscal_period_id
@@ -406,13 +402,15 @@ class JournalEntryService:
         if not self.validator.validate_for_posting(entry):
             raise ValueError(self.validator.get_errors())
 
-        # Update account balances
+        # Update account and period balances in the same transaction
         for line in entry.lines:
             self.coa_service.update_balance(
                 line.account_id,
                 line.debit_amount,
-                line.credit_amount
+                line.credit_amount,
+                commit=False,
             )
+        self.balances.apply_entry(entry)
 
         entry.status = EntryStatusEnum.POSTED
         entry.posted_by = posted_by
@@ -488,13 +486,18 @@ class JournalEntryService:
 
         self.db.add(reversal)
 
-        # Update original entry status
+        # Update original entry status; its lines stay in the period
+        # balances and are offset by the reversal's swapped lines
         original.status = EntryStatusEnum.REVERSED
 
-        self.db.commit()
+        self.db.flush()
 
-        # Post the reversal
-        self.post_entry(reversal.id, reversed_by)
+        # Post the reversal (commits the whole reversal)
+        try:
+            self.post_entry(reversal.id, reversed_by)
+        except Exception:
+            self.db.rollback()
+            raise
 
         logger.info(f"Created reversal entry: {reversal.entry_number}")
         return reversal
@@ -510,7 +513,8 @@ class JournalEntryService:
         if not entry:
             raise ValueError("Entry not found")
 
-        if entry.status == EntryStatusEnum.POSTED:
+        # Posted and reversed entries are in the period balances
+        if entry.status in LEDGER_STATUSES:
             raise ValueError("Posted entries cannot be voided. Use reversal instead.")
 
         entry.status = EntryStatusEnum.VOIDED
@@ -528,25 +532,118 @@ class JournalEntryService:
         self,
         entry_ids: List[UUID],
         posted_by: UUID,
+        chunk_size: int = BATCH_POST_CHUNK,
     ) -> Dict[str, Any]:
-        """Post multiple entries."""
+        """
+        Post multiple entries.
+
+        Entries are loaded, validated and posted in chunks: each chunk loads
+        its entries, lines, accounts and periods up front, validates in
+        memory, and applies aggregated account and period balance deltas in
+        one commit. Entries failing validation are reported individually; if
+        a chunk cannot be committed, every entry in it is reported failed.
+        """
         results = {
             "posted": [],
             "failed": [],
         }
 
-        for entry_id in entry_ids:
-            try:
-                entry = self.post_entry(entry_id, posted_by)
-                results["posted"].append(str(entry.id))
-            except Exception as e:
-                results["failed"].append({
-                    "id": str(entry_id),
-                    "error": str(e),
-                })
+        for start in range(0, len(entry_ids), chunk_size):
+            self._post_chunk(entry_ids[start:start + chunk_size], posted_by, results)
 
         return results
 
+    def _post_chunk(
+        self,
+        entry_ids: List[UUID],
+        posted_by: UUID,
+        results: Dict[str, Any],
+    ):
+        """Validate and post one chunk of entries in a single transaction."""
+        entries = {
+            str(entry.id): entry
+            for entry in self.db.query(JournalEntry).options(
+                selectinload(JournalEntry.lines)
+            ).filter(JournalEntry.id.in_(entry_ids)).with_for_update(of=JournalEntry)
+        }
+
+        accounts = self.validator.prefetch(
+            {line.account_id for entry in entries.values() for line in entry.lines},
+            {entry.fiscal_period_id for entry in entries.values() if entry.fiscal_period_id},
+        )
+
+        # Signed change per account, raw [debit, credit] per period and account
+        account_deltas: Dict[str, Decimal] = {}
+        period_deltas: Dict[UUID, Dict[UUID, List[Decimal]]] = {}
+        posted = []
+        posted_at = utc_now()
+
+        try:
+            for entry_id in entry_ids:
+                entry = entries.get(str(entry_id))
+                if not entry:
+                    results["failed"].append({"id": str(entry_id), "error": "Entry not found"})
+                    continue
+
+                if not self.validator.validate_for_posting(entry):
+                    results["failed"].append({
+                        "id": str(entry_id),
+                        "error": str(self.validator.get_errors()),
+                    })
+                    continue
+
+                for line in entry.lines:
+                    debit = line.debit_amount or Decimal("0")
+                    credit = line.credit_amount or Decimal("0")
+                    key = str(line.account_id)
+                    if accounts[key].account_type.normal_balance.value == "debit":
+                        change = debit - credit
+                    else:
+                        change = credit - debit
+                    account_deltas[key] = account_deltas.get(key, Decimal("0")) + change
+
+                    if entry.fiscal_period_id:
+                        delta = period_deltas.setdefault(entry.fiscal_period_id, {}).setdefault(
+                            line.account_id, [Decimal("0"), Decimal("0")]
+                        )
+                        delta[0] += debit
+                        delta[1] += credit
+
+                entry.status = EntryStatusEnum.POSTED
+                entry.posted_by = posted_by
+                entry.posted_at = posted_at
+                posted.append(entry)
+
+            # One executemany UPDATE for all touched accounts
+            changes = [
+                {"account_id": accounts[key].id, "change": change}
+                for key, change in account_deltas.items() if change
+            ]
+            if changes:
+                accounts_table = Account.__table__
+                self.db.execute(
+                    update(accounts_table).where(
+                        accounts_table.c.id == bindparam("account_id")
+                    ).values(
+                        current_balance=accounts_table.c.current_balance + bindparam("change")
+                    ),
+                    changes,
+                )
+            for period_id, deltas in period_deltas.items():
+                self.balances.apply_deltas(period_id, deltas)
+
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Batch post chunk failed: {e}")
+            results["failed"].extend({"id": str(entry.id), "error": str(e)} for entry in posted)
+            return
+        finally:
+            self.validator.clear_prefetch()
+
+        results["posted"].extend(str(entry.id) for entry in posted)
+        logger.info(f"Batch posted {len(posted)} entries")
+
     # ============== Helper Methods ==============
 
     def _find_fiscal_period(
@@ -9,7 +9,7 @@ from typing import List, Dict, Any, Optional
 from uuid import UUID
 import logging
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from app.accounting.chart_of_accounts.models import Account
 from app.accounting.journal.models import JournalEntry, JournalLine, EntryStatusEnum
@@ -41,6 +41,35 @@ class JournalEntryValidator:
         self.db = db
         self.errors: List[ValidationError] = []
         self.warnings: List[ValidationError] = []
+        # Lookups filled by prefetch() for bulk validation; None = query
+        self._accounts: Optional[Dict[str, Account]] = None
+        self._periods: Optional[Dict[str, FiscalPeriod]] = None
+
+    def prefetch(self, account_ids, period_ids) -> Dict[str, Account]:
+        """
+        Load accounts and periods for a batch of entries in two queries, so
+        validating each entry afterwards runs in memory.
+        """
+        accounts = self.db.query(Account).options(
+            joinedload(Account.account_type)
+        ).filter(Account.id.in_(list(account_ids))).all() if account_ids else []
+        periods = self.db.query(FiscalPeriod).filter(
+            FiscalPeriod.id.in_(list(period_ids))
+        ).all() if period_ids else []
+
+        self._accounts = {str(a.id): a for a in accounts}
+        self._periods = {str(p.id): p for p in periods}
+        return self._accounts
+
+    def clear_prefetch(self):
+        """Go back to querying accounts and periods per entry."""
+        self._accounts = None
+        self._periods = None
+
+    def _get_period(self, period_id) -> Optional[FiscalPeriod]:
+        if self._periods is not None:
+            return self._periods.get(str(period_id))
+        return self.db.query(FiscalPeriod).get(period_id)
 
     def validate(
         self,
@@ -85,13 +114,16 @@ class JournalEntryValidator:
 
     def _validate_accounts(self, lines: List[JournalLine]):
         """Validate all accounts exist and can receive postings."""
-        account_ids = [line.account_id for line in lines]
+        if self._accounts is not None:
+            account_map = self._accounts
+        else:
+            account_ids = [line.account_id for line in lines]
 
-        accounts = self.db.query(Account).filter(
-            Account.id.in_(account_ids)
-        ).all()
+            accounts = self.db.query(Account).filter(
+                Account.id.in_(account_ids)
+            ).all()
 
-        account_map = {str(a.id): a for a in accounts}
+            account_map = {str(a.id): a for a in accounts}
 
         for i, line in enumerate(lines):
             account = account_map.get(str(line.account_id))
@@ -173,7 +205,7 @@ class JournalEntryValidator:
             # Try to auto-assign period
             return
 
-        period = self.db.query(FiscalPeriod).get(entry.fiscal_period_id)
+        period = self._get_period(entry.fiscal_period_id)
 
         if not period:
             self.errors.append(ValidationError(
@@ -237,7 +269,7 @@ class JournalEntryValidator:
 
         # Period must be open
         if entry.fiscal_period_id:
-            period = self.db.query(FiscalPeriod).get(entry.fiscal_period_id)
+            period = self._get_period(entry.fiscal_period_id)
             if period and period.is_closed:
                 self.errors.append(ValidationError(
                     field="fiscal_period_id",
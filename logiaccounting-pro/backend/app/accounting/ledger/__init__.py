@@ -5,6 +5,8 @@ General ledger and balance operations
 
 from app.accounting.ledger.models import AccountBalance
 
+from app.accounting.ledger.aggregates import LedgerAggregates
+
 from app.accounting.ledger.general_ledger import (
     GeneralLedgerService,
     get_general_ledger_service,
@@ -25,6 +27,9 @@ __all__ = [
     # Models
     'AccountBalance',
 
+    # Aggregates
+    'LedgerAggregates',
+
     # General Ledger
     'GeneralLedgerService',
     'get_general_ledger_service',
@@ -0,0 +1,232 @@
+"""
+Ledger Aggregates
+Set-based debit/credit totals shared by the balance and statement services
+
+As-of-date totals are read from the AccountBalance snapshots of closed
+fiscal periods plus the journal lines of everything still open, so their
+cost follows open-period activity rather than the full ledger history.
+A closed period without any AccountBalance rows (closed before snapshots
+were written) is read from its journal lines instead.
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, case, exists, func, or_
+from sqlalchemy.orm import Session, joinedload
+
+from app.accounting.chart_of_accounts.models import Account
+from app.accounting.journal.models import (
+    JournalEntry, JournalLine, EntryStatusEnum, EntryTypeEnum, LEDGER_STATUSES,
+)
+from app.accounting.ledger.models import AccountBalance
+from app.accounting.periods.models import FiscalPeriod, FiscalYear
+
+ZERO = Decimal("0")
+
+# (debit, credit) per account id
+Totals = Dict[UUID, Tuple[Decimal, Decimal]]
+
+
+def signed_balance(account: Account, debit: Decimal, credit: Decimal, opening: bool = True) -> Decimal:
+    """Balance on the account's normal side, optionally from its opening balance."""
+    start = (account.opening_balance or ZERO) if opening else ZERO
+    if account.account_type.normal_balance.value == "debit":
+        return start + debit - credit
+    return start + credit - debit
+
+
+class LedgerAggregates:
+    """
+    Debit/credit totals for every account of a customer in one grouped query.
+
+    Results are memoized per instance, so create one per report: the balance
+    sheet's three sections, or the cash flow's working capital lines, then
+    share a single query per date range instead of one per account.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._accounts: Dict[UUID, List[Account]] = {}
+        self._totals: Dict[tuple, Totals] = {}
+        self._counts: Dict[tuple, Dict[UUID, int]] = {}
+
+    def accounts(self, customer_id: UUID) -> List[Account]:
+        """All accounts of a customer, with their types, ordered by code."""
+        if customer_id not in self._accounts:
+            self._accounts[customer_id] = self.db.query(Account).filter(
+                Account.customer_id == customer_id
+            ).options(joinedload(Account.account_type)).order_by(Account.code).all()
+        return self._accounts[customer_id]
+
+    def totals(
+        self,
+        customer_id: UUID,
+        start_date: date = None,
+        end_date: date = None,
+        period_id: UUID = None,
+        statuses: Iterable[EntryStatusEnum] = LEDGER_STATUSES,
+    ) -> Totals:
+        """Debit/credit totals per account for entries in the given range."""
+        statuses = tuple(statuses)
+        key = (customer_id, start_date, end_date, period_id, statuses)
+        if key in self._totals:
+            return self._totals[key]
+
+        if end_date and not start_date and not period_id and statuses == LEDGER_STATUSES:
+            self._totals[key] = self._as_of_totals(customer_id, end_date)
+        else:
+            query = self.db.query(
+                JournalLine.account_id,
+                func.coalesce(func.sum(JournalLine.debit_amount), 0),
+                func.coalesce(func.sum(JournalLine.credit_amount), 0),
+            ).join(JournalEntry).filter(
+                and_(*self._conditions(customer_id, start_date, end_date, period_id, statuses))
+            ).group_by(JournalLine.account_id)
+
+            self._totals[key] = {
+                account_id: (Decimal(str(debit)), Decimal(str(credit)))
+                for account_id, debit, credit in query
+            }
+        return self._totals[key]
+
+    def _as_of_totals(self, customer_id: UUID, as_of_date: date) -> Totals:
+        """Closed-period snapshots plus open-period lines up to a date."""
+        has_snapshot = exists().where(AccountBalance.period_id == FiscalPeriod.id)
+        snapshot = self.db.query(
+            AccountBalance.account_id,
+            func.coalesce(func.sum(AccountBalance.period_debit), 0),
+            func.coalesce(func.sum(AccountBalance.period_credit), 0),
+        ).join(
+            FiscalPeriod, AccountBalance.period_id == FiscalPeriod.id
+        ).join(FiscalYear).filter(
+            and_(
+                FiscalYear.customer_id == customer_id,
+                FiscalPeriod.is_closed == True,
+                FiscalPeriod.end_date <= as_of_date,
+            )
+        ).group_by(AccountBalance.account_id)
+
+        # Lines not covered by a snapshot above: no period, an open one, or
+        # a closed one that has no snapshot rows
+        delta = self.db.query(
+            JournalLine.account_id,
+            func.coalesce(func.sum(JournalLine.debit_amount), 0),
+            func.coalesce(func.sum(JournalLine.credit_amount), 0),
+        ).join(JournalEntry).outerjoin(
+            FiscalPeriod, JournalEntry.fiscal_period_id == FiscalPeriod.id
+        ).filter(
+            and_(
+                *self._conditions(customer_id, None, as_of_date, None, LEDGER_STATUSES),
+                or_(
+                    FiscalPeriod.id == None,
+                    FiscalPeriod.is_closed == False,
+                    FiscalPeriod.end_date > as_of_date,
+                    ~has_snapshot,
+                ),
+            )
+        ).group_by(JournalLine.account_id)
+
+        totals: Totals = {}
+        for account_id, debit, credit in (*snapshot, *delta):
+            prior_debit, prior_credit = totals.get(account_id, (ZERO, ZERO))
+            totals[account_id] = (
+                prior_debit + Decimal(str(debit)),
+                prior_credit + Decimal(str(credit)),
+            )
+        return totals
+
+    def line_counts(
+        self,
+        customer_id: UUID,
+        end_date: date = None,
+        period_id: UUID = None,
+    ) -> Dict[UUID, int]:
+        """Number of ledger journal lines per account, up to a date or within a period."""
+        key = (customer_id, end_date, period_id)
+        if key not in self._counts:
+            query = self.db.query(
+                JournalLine.account_id,
+                func.count(JournalLine.id),
+            ).join(JournalEntry).filter(
+                and_(*self._conditions(customer_id, None, end_date, period_id, LEDGER_STATUSES))
+            ).group_by(JournalLine.account_id)
+            self._counts[key] = dict(query)
+        return self._counts[key]
+
+    def adjustment_totals(
+        self,
+        customer_id: UUID,
+        period_id: UUID,
+    ) -> Dict[UUID, Tuple[Decimal, Decimal, Decimal, Decimal]]:
+        """(debit, credit, adjustment debit, adjustment credit) per account for a period."""
+        is_adjustment = JournalEntry.entry_type == EntryTypeEnum.ADJUSTMENT
+
+        def split(column, adjustment: bool):
+            return func.coalesce(func.sum(case(
+                (is_adjustment if adjustment else ~is_adjustment, column), else_=0
+            )), 0)
+
+        query = self.db.query(
+            JournalLine.account_id,
+            split(JournalLine.debit_amount, False),
+            split(JournalLine.credit_amount, False),
+            split(JournalLine.debit_amount, True),
+            split(JournalLine.credit_amount, True),
+        ).join(JournalEntry).filter(
+            and_(*self._conditions(customer_id, None, None, period_id, LEDGER_STATUSES))
+        ).group_by(JournalLine.account_id)
+
+        return {
+            row[0]: tuple(Decimal(str(value)) for value in row[1:])
+            for row in query
+        }
+
+    def balances(
+        self,
+        customer_id: UUID,
+        as_of_date: date,
+        statuses: Iterable[EntryStatusEnum] = LEDGER_STATUSES,
+    ) -> Dict[UUID, Decimal]:
+        """Normal-side balance of every account as of a date, opening balance included."""
+        totals = self.totals(customer_id, end_date=as_of_date, statuses=statuses)
+        return {
+            account.id: signed_balance(account, *totals.get(account.id, (ZERO, ZERO)))
+            for account in self.accounts(customer_id)
+        }
+
+    def activity(
+        self,
+        customer_id: UUID,
+        start_date: date,
+        end_date: date,
+    ) -> Dict[UUID, Decimal]:
+        """Normal-side activity of every account between two dates."""
+        totals = self.totals(customer_id, start_date=start_date, end_date=end_date)
+        return {
+            account.id: signed_balance(account, *totals.get(account.id, (ZERO, ZERO)), opening=False)
+            for account in self.accounts(customer_id)
+        }
+
+    @staticmethod
+    def _conditions(
+        customer_id: UUID,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        period_id: Optional[UUID],
+        statuses: Tuple[EntryStatusEnum, ...],
+    ) -> list:
+        conditions = [JournalEntry.customer_id == customer_id]
+        if len(statuses) == 1:
+            conditions.append(JournalEntry.status == statuses[0])
+        else:
+            conditions.append(JournalEntry.status.in_(statuses))
+        if start_date:
+            conditions.append(JournalEntry.entry_date >= start_date)
+        if end_date:
+            conditions.append(JournalEntry.entry_date <= end_date)
+        if period_id:
+            conditions.append(JournalEntry.fiscal_period_id == period_id)
+        return conditions
@@ -3,7 +3,7 @@ Balance Calculator
 Utility functions for balance calculations
 """
 
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
 from uuid import UUID
@@ -13,9 +13,10 @@ from sqlalchemy import and_, func
 from sqlalchemy.orm import Session
 
 from app.accounting.chart_of_accounts.models import Account, AccountTypeEnum
-from app.accounting.journal.models import JournalEntry, JournalLine, EntryStatusEnum
+from app.accounting.journal.models import JournalEntry, JournalLine, EntryStatusEnum, LEDGER_STATUSES
+from app.accounting.ledger.aggregates import LedgerAggregates
 from app.accounting.ledger.models import AccountBalance
-from app.accounting.periods.models import FiscalPeriod
+from app.accounting.periods.models import FiscalPeriod, FiscalYear
 
 logger = logging.getLogger(__name__)
 
@@ -47,10 +48,10 @@ class BalanceCalculator:
 
         if include_unposted:
             conditions.append(
-                JournalEntry.status.in_([EntryStatusEnum.POSTED, EntryStatusEnum.APPROVED])
+                JournalEntry.status.in_([*LEDGER_STATUSES, EntryStatusEnum.APPROVED])
             )
         else:
-            conditions.append(JournalEntry.status == EntryStatusEnum.POSTED)
+            conditions.append(JournalEntry.status.in_(LEDGER_STATUSES))
 
         result = self.db.query(
             func.coalesce(func.sum(JournalLine.debit_amount), 0),
@@ -71,25 +72,21 @@ class BalanceCalculator:
         customer_id: UUID,
         account_type: str,
         as_of_date: date = None,
+        aggregates: LedgerAggregates = None,
     ) -> Decimal:
         """Calculate total balance for an account type."""
-        from app.accounting.chart_of_accounts.models import AccountType
-
-        accounts = self.db.query(Account).join(AccountType).filter(
-            and_(
-                Account.customer_id == customer_id,
-                AccountType.name == account_type,
-                Account.is_active == True,
-                Account.is_header == False,
-            )
-        ).all()
-
-        total = Decimal("0")
-        for account in accounts:
-            balance = self.calculate_account_balance(account.id, as_of_date)
-            total += balance
-
-        return total
+        aggregates = aggregates or LedgerAggregates(self.db)
+        balances = aggregates.balances(customer_id, as_of_date or date.today())
+
+        return sum(
+            (
+                balances[account.id]
+                for account in aggregates.accounts(customer_id)
+                if account.account_type.name == account_type
+                and account.is_active and not account.is_header
+            ),
+            Decimal("0"),
+        )
 
     def calculate_net_income(
         self,
@@ -98,74 +95,35 @@ class BalanceCalculator:
         end_date: date,
     ) -> Decimal:
         """Calculate net income for a period."""
-        from app.accounting.chart_of_accounts.models import AccountType
+        aggregates = LedgerAggregates(self.db)
+        totals = aggregates.totals(customer_id, start_date=start_date, end_date=end_date)
 
         # Revenue - Expenses
-        revenue_accounts = self.db.query(Account).join(AccountType).filter(
-            and_(
-                Account.customer_id == customer_id,
-                AccountType.name == "revenue",
-                Account.is_active == True,
-            )
-        ).all()
-
-        expense_accounts = self.db.query(Account).join(AccountType).filter(
-            and_(
-                Account.customer_id == customer_id,
-                AccountType.name == "expense",
-                Account.is_active == True,
-            )
-        ).all()
-
         total_revenue = Decimal("0")
         total_expenses = Decimal("0")
 
-        for account in revenue_accounts:
-            activity = self._get_period_activity(account.id, start_date, end_date)
-            total_revenue += activity["credit"] - activity["debit"]
-
-        for account in expense_accounts:
-            activity = self._get_period_activity(account.id, start_date, end_date)
-            total_expenses += activity["debit"] - activity["credit"]
+        for account in aggregates.accounts(customer_id):
+            if not account.is_active or account.id not in totals:
+                continue
+            debit, credit = totals[account.id]
+            if account.account_type.name == "revenue":
+                total_revenue += credit - debit
+            elif account.account_type.name == "expense":
+                total_expenses += debit - credit
 
         return total_revenue - total_expenses
 
-    def _get_period_activity(
-        self,
-        account_id: UUID,
-        start_date: date,
-        end_date: date,
-    ) -> Dict[str, Decimal]:
-        """Get debit/credit activity for an account in a period."""
-        result = self.db.query(
-            func.coalesce(func.sum(JournalLine.debit_amount), 0),
-            func.coalesce(func.sum(JournalLine.credit_amount), 0),
-        ).join(JournalEntry).filter(
-            and_(
-                JournalLine.account_id == account_id,
-                JournalEntry.status == EntryStatusEnum.POSTED,
-                JournalEntry.entry_date >= start_date,
-                JournalEntry.entry_date <= end_date,
-            )
-        ).first()
-
-        return {
-            "debit": Decimal(str(result[0])),
-            "credit": Decimal(str(result[1])),
-        }
-
     def recalculate_all_balances(
         self,
         customer_id: UUID,
     ) -> int:
         """Recalculate all account balances from journal entries."""
-        accounts = self.db.query(Account).filter(
-            Account.customer_id == customer_id
-        ).all()
+        aggregates = LedgerAggregates(self.db)
+        balances = aggregates.balances(customer_id, date.today())
 
         updated = 0
-        for account in accounts:
-            new_balance = self.calculate_account_balance(account.id)
+        for account in aggregates.accounts(customer_id):
+            new_balance = balances[account.id]
             if account.current_balance != new_balance:
                 account.current_balance = new_balance
                 updated += 1
@@ -174,51 +132,144 @@ class BalanceCalculator:
         logger.info(f"Recalculated {updated} account balances")
         return updated
 
+    def apply_entry(self, entry: JournalEntry, sign: int = 1) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) an entry's lines in the AccountBalance
+        rows of its fiscal period. Does not commit; the caller's transaction
+        covers both the entry status change and the balances.
+        """
+        if not entry.fiscal_period_id:
+            return
+
+        deltas: Dict[UUID, List[Decimal]] = {}
+        for line in entry.lines:
+            delta = deltas.setdefault(line.account_id, [Decimal("0"), Decimal("0")])
+            delta[0] += line.debit_amount or Decimal("0")
+            delta[1] += line.credit_amount or Decimal("0")
+
+        self.apply_deltas(entry.fiscal_period_id, deltas, sign)
+
+    def apply_deltas(
+        self,
+        period_id: UUID,
+        deltas: Dict[UUID, List[Decimal]],
+        sign: int = 1,
+    ) -> None:
+        """
+        Add per-account [debit, credit] deltas to a period's balance rows.
+
+        Only period and closing columns move here; opening and YTD columns
+        are filled when the period is rebuilt at close.
+        """
+        if not deltas:
+            return
+
+        rows = {
+            balance.account_id: balance
+            for balance in self.db.query(AccountBalance).filter(
+                and_(
+                    AccountBalance.period_id == period_id,
+                    AccountBalance.account_id.in_(list(deltas)),
+                )
+            ).with_for_update()
+        }
+
+        for account_id, (debit, credit) in deltas.items():
+            balance = rows.get(account_id)
+            if not balance:
+                balance = AccountBalance(
+                    account_id=account_id,
+                    period_id=period_id,
+                    opening_debit=Decimal("0"),
+                    opening_credit=Decimal("0"),
+                    period_debit=Decimal("0"),
+                    period_credit=Decimal("0"),
+                    ytd_debit=Decimal("0"),
+                    ytd_credit=Decimal("0"),
+                )
+                self.db.add(balance)
+
+            balance.period_debit += sign * debit
+            balance.period_credit += sign * credit
+            balance.calculate_closing()
+
+        self.db.flush()
+
     def update_period_balances(
         self,
         customer_id: UUID,
         period_id: UUID,
+        commit: bool = True,
     ):
-        """Update account balances for a specific period."""
+        """
+        Rebuild a period's AccountBalance rows from its journal lines.
+
+        Run when a period closes, so the snapshot that as-of-date queries
+        read for it matches the ledger even for entries posted before
+        balances were maintained incrementally.
+        """
         period = self.db.query(FiscalPeriod).get(period_id)
         if not period:
             raise ValueError("Period not found")
 
-        accounts = self.db.query(Account).filter(
-            and_(
-                Account.customer_id == customer_id,
-                Account.is_active == True,
+        aggregates = LedgerAggregates(self.db)
+        totals = aggregates.totals(customer_id, period_id=period_id)
+        opening = aggregates.totals(customer_id, end_date=period.start_date - timedelta(days=1))
+        ytd = aggregates.totals(
+            customer_id, start_date=period.fiscal_year.start_date, end_date=period.end_date
+        )
+        existing = {
+            balance.account_id: balance
+            for balance in self.db.query(AccountBalance).filter(
+                AccountBalance.period_id == period_id
             )
-        ).all()
+        }
+        zero = (Decimal("0"), Decimal("0"))
 
-        for account in accounts:
-            # Get or create balance record
-            balance = self.db.query(AccountBalance).filter(
-                and_(
-                    AccountBalance.account_id == account.id,
-                    AccountBalance.period_id == period_id,
-                )
-            ).first()
+        for account in aggregates.accounts(customer_id):
+            if not account.is_active and account.id not in totals:
+                continue
 
+            # Get or create balance record
+            balance = existing.get(account.id)
             if not balance:
                 balance = AccountBalance(
                     account_id=account.id,
                     period_id=period_id,
+                    opening_debit=Decimal("0"),
+                    opening_credit=Decimal("0"),
                 )
                 self.db.add(balance)
 
-            # Calculate period activity
-            activity = self._get_period_activity(
-                account.id, period.start_date, period.end_date
-            )
-
-            balance.period_debit = activity["debit"]
-            balance.period_credit = activity["credit"]
+            balance.opening_debit, balance.opening_credit = opening.get(account.id, zero)
+            balance.period_debit, balance.period_credit = totals.get(account.id, zero)
+            balance.ytd_debit, balance.ytd_credit = ytd.get(account.id, zero)
             balance.calculate_closing()
 
-        self.db.commit()
+        if commit:
+            self.db.commit()
         logger.info(f"Updated period balances for period {period.name}")
 
+    def rebuild_closed_periods(self, customer_id: UUID) -> int:
+        """
+        Rebuild the AccountBalance rows of every closed period, oldest first.
+
+        Backfill for periods closed before their snapshot was written at
+        close, or whose rows drifted; returns the number of periods rebuilt.
+        """
+        periods = self.db.query(FiscalPeriod).join(FiscalYear).filter(
+            and_(
+                FiscalYear.customer_id == customer_id,
+                FiscalPeriod.is_closed == True,
+            )
+        ).order_by(FiscalPeriod.start_date).all()
+
+        # One commit per period: each opening balance reads the snapshots
+        # of the periods rebuilt before it
+        for period in periods:
+            self.update_period_balances(customer_id, period.id)
+        return len(periods)
+
     def get_balance_summary(
         self,
         customer_id: UUID,
@@ -235,9 +286,10 @@ class BalanceCalculator:
             "expenses": Decimal("0"),
         }
 
+        aggregates = LedgerAggregates(self.db)
         for acc_type in summary.keys():
             summary[acc_type] = self.calculate_type_totals(
-                customer_id, acc_type, as_of_date
+                customer_id, acc_type, as_of_date, aggregates
             )
 
         # Add calculated fields
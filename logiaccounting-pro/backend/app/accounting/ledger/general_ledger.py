@@ -4,7 +4,6 @@ Ledger queries and account activity
 """
 
 from datetime import datetime, date
-from decimal import Decimal
 from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 import logging
@@ -13,7 +12,8 @@ from sqlalchemy import and_, or_, func, case
 from sqlalchemy.orm import Session, joinedload
 
 from app.accounting.chart_of_accounts.models import Account, AccountTypeEnum
-from app.accounting.journal.models import JournalEntry, JournalLine, EntryStatusEnum
+from app.accounting.journal.models import JournalEntry, JournalLine, EntryStatusEnum, LEDGER_STATUSES
+from app.accounting.ledger.aggregates import LedgerAggregates, signed_balance, ZERO
 from app.accounting.ledger.models import AccountBalance
 from app.accounting.periods.models import FiscalPeriod
 
@@ -54,10 +54,10 @@ class GeneralLedgerService:
         # Status filter
         if include_unposted:
             query = query.filter(
-                JournalEntry.status.in_([EntryStatusEnum.POSTED, EntryStatusEnum.APPROVED])
+                JournalEntry.status.in_([*LEDGER_STATUSES, EntryStatusEnum.APPROVED])
             )
         else:
-            query = query.filter(JournalEntry.status == EntryStatusEnum.POSTED)
+            query = query.filter(JournalEntry.status.in_(LEDGER_STATUSES))
 
         # Date filters
         if start_date:
@@ -103,7 +103,7 @@ class GeneralLedgerService:
                 "debit": float(line.debit_amount),
                 "credit": float(line.credit_amount),
                 "balance": float(running_balance),
-                "is_posted": entry.status == EntryStatusEnum.POSTED,
+                "is_posted": entry.status in LEDGER_STATUSES,
             })
 
         # Calculate totals
@@ -147,27 +147,15 @@ class GeneralLedgerService:
 
         as_of_date = as_of_date or date.today()
 
-        # Sum posted transactions up to date
-        result = self.db.query(
-            func.coalesce(func.sum(JournalLine.debit_amount), 0).label("total_debit"),
-            func.coalesce(func.sum(JournalLine.credit_amount), 0).label("total_credit"),
-            func.count(JournalLine.id).label("transaction_count")
-        ).join(JournalEntry).filter(
-            and_(
-                JournalLine.account_id == account_id,
-                JournalEntry.status == EntryStatusEnum.POSTED,
-                JournalEntry.entry_date <= as_of_date
-            )
-        ).first()
-
-        total_debit = Decimal(str(result.total_debit))
-        total_credit = Decimal(str(result.total_credit))
-
-        # Calculate balance based on normal balance
-        if account.account_type.normal_balance.value == "debit":
-            balance = account.opening_balance + total_debit - total_credit
-        else:
-            balance = account.opening_balance + total_credit - total_debit
+        # Closed-period snapshots plus open-period activity up to the date
+        aggregates = LedgerAggregates(self.db)
+        total_debit, total_credit = aggregates.totals(
+            account.customer_id, end_date=as_of_date
+        ).get(account_id, (ZERO, ZERO))
+        transaction_count = aggregates.line_counts(
+            account.customer_id, end_date=as_of_date
+        ).get(account_id, 0)
+        balance = signed_balance(account, total_debit, total_credit)
 
         return {
             "account_id": str(account_id),
@@ -179,7 +167,7 @@ class GeneralLedgerService:
             "total_debit": float(total_debit),
             "total_credit": float(total_credit),
             "current_balance": float(balance),
-            "transaction_count": result.transaction_count,
+            "transaction_count": transaction_count,
         }
 
     def get_all_balances(
@@ -192,42 +180,20 @@ class GeneralLedgerService:
         """Get balances for all accounts."""
         as_of_date = as_of_date or date.today()
 
-        # Query accounts with aggregated balances
-        query = self.db.query(
-            Account,
-            func.coalesce(func.sum(JournalLine.debit_amount), 0).label("total_debit"),
-            func.coalesce(func.sum(JournalLine.credit_amount), 0).label("total_credit"),
-            func.count(JournalLine.id).label("transaction_count")
-        ).outerjoin(
-            JournalLine, JournalLine.account_id == Account.id
-        ).outerjoin(
-            JournalEntry,
-            and_(
-                JournalLine.entry_id == JournalEntry.id,
-                JournalEntry.status == EntryStatusEnum.POSTED,
-                JournalEntry.entry_date <= as_of_date
-            )
-        ).filter(
-            and_(
-                Account.customer_id == customer_id,
-                Account.is_active == True
-            )
-        ).group_by(Account.id)
-
-        if account_type:
-            query = query.join(Account.account_type).filter(
-                Account.account_type.has(name=account_type)
-            )
-
-        results = query.order_by(Account.code).all()
+        aggregates = LedgerAggregates(self.db)
+        totals = aggregates.totals(customer_id, end_date=as_of_date)
+        counts = aggregates.line_counts(customer_id, end_date=as_of_date)
 
         balances = []
-        for account, total_debit, total_credit, tx_count in results:
-            # Calculate balance
-            if account.account_type and account.account_type.normal_balance.value == "debit":
-                balance = account.opening_balance + Decimal(str(total_debit)) - Decimal(str(total_credit))
-            else:
-                balance = account.opening_balance + Decimal(str(total_credit)) - Decimal(str(total_debit))
+        for account in aggregates.accounts(customer_id):
+            if not account.is_active:
+                continue
+            if account_type and account.account_type.name != account_type:
+                continue
+
+            total_debit, total_credit = totals.get(account.id, (ZERO, ZERO))
+            tx_count = counts.get(account.id, 0)
+            balance = signed_balance(account, total_debit, total_credit)
 
             if with_activity_only and tx_count == 0 and balance == 0:
                 continue
@@ -260,31 +226,15 @@ class GeneralLedgerService:
         if not period:
             raise ValueError("Period not found")
 
-        # Get all activity in period
-        results = self.db.query(
-            Account,
-            func.coalesce(func.sum(JournalLine.debit_amount), 0).label("period_debit"),
-            func.coalesce(func.sum(JournalLine.credit_amount), 0).label("period_credit"),
-            func.count(JournalLine.id).label("transaction_count")
-        ).outerjoin(
-            JournalLine, JournalLine.account_id == Account.id
-        ).outerjoin(
-            JournalEntry,
-            and_(
-                JournalLine.entry_id == JournalEntry.id,
-                JournalEntry.status == EntryStatusEnum.POSTED,
-                JournalEntry.fiscal_period_id == period_id
-            )
-        ).filter(
-            and_(
-                Account.customer_id == customer_id,
-                Account.is_active == True
-            )
-        ).group_by(Account.id).order_by(Account.code).all()
+        aggregates = LedgerAggregates(self.db)
+        totals = aggregates.totals(customer_id, period_id=period_id)
+        counts = aggregates.line_counts(customer_id, period_id=period_id)
 
         activity = []
-        for account, period_debit, period_credit, tx_count in results:
-            if tx_count > 0:
+        for account in aggregates.accounts(customer_id):
+            tx_count = counts.get(account.id, 0)
+            if account.is_active and tx_count > 0:
+                period_debit, period_credit = totals[account.id]
                 activity.append({
                     "account_id": str(account.id),
                     "account_code": account.code,
@@ -328,7 +278,7 @@ class GeneralLedgerService:
         ).join(JournalEntry).filter(
             and_(
                 JournalLine.account_id.in_(ar_ids),
-                JournalEntry.status == EntryStatusEnum.POSTED
+                JournalEntry.status.in_(LEDGER_STATUSES)
             )
         )
 
@@ -382,7 +332,7 @@ class GeneralLedgerService:
         ).join(JournalEntry).filter(
             and_(
                 JournalLine.account_id.in_(ap_ids),
-                JournalEntry.status == EntryStatusEnum.POSTED
+                JournalEntry.status.in_(LEDGER_STATUSES)
             )
         )
 
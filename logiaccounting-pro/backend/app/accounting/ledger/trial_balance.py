@@ -9,11 +9,10 @@ from typing import List, Optional, Dict, Any
 from uuid import UUID
 import logging
 
-from sqlalchemy import and_, func, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 
-from app.accounting.chart_of_accounts.models import Account, AccountType
-from app.accounting.journal.models import JournalEntry, JournalLine, EntryStatusEnum
+from app.accounting.chart_of_accounts.models import Account
+from app.accounting.ledger.aggregates import LedgerAggregates
 from app.accounting.periods.models import FiscalPeriod
 
 logger = logging.getLogger(__name__)
@@ -41,52 +40,22 @@ class TrialBalanceService:
         """
         as_of_date = as_of_date or date.today()
 
-        # Build base query
-        query = self.db.query(
-            Account,
-            func.coalesce(func.sum(JournalLine.debit_amount), 0).label("total_debit"),
-            func.coalesce(func.sum(JournalLine.credit_amount), 0).label("total_credit"),
-        ).outerjoin(
-            JournalLine, JournalLine.account_id == Account.id
-        ).outerjoin(
-            JournalEntry,
-            and_(
-                JournalLine.entry_id == JournalEntry.id,
-                JournalEntry.status == EntryStatusEnum.POSTED,
-            )
-        ).filter(
-            and_(
-                Account.customer_id == customer_id,
-                Account.is_active == True,
-                Account.is_header == False,  # Exclude header accounts
-            )
-        )
+        aggregates = LedgerAggregates(self.db)
 
         # Apply date filter
         if period_id:
-            query = query.filter(JournalEntry.fiscal_period_id == period_id)
+            totals = aggregates.totals(customer_id, period_id=period_id)
         else:
-            query = query.filter(
-                or_(
-                    JournalEntry.entry_date == None,
-                    JournalEntry.entry_date <= as_of_date
-                )
-            )
-
-        # Group and order
-        results = query.options(
-            joinedload(Account.account_type)
-        ).group_by(Account.id).order_by(Account.code).all()
+            totals = aggregates.totals(customer_id, end_date=as_of_date)
 
         # Process results
         accounts = []
         total_debit = Decimal("0")
         total_credit = Decimal("0")
 
-        for account, sum_debit, sum_credit in results:
+        for account in self._posting_accounts(aggregates, customer_id):
             opening = account.opening_balance
-            period_debit = Decimal(str(sum_debit))
-            period_credit = Decimal(str(sum_credit))
+            period_debit, period_credit = totals.get(account.id, (Decimal("0"), Decimal("0")))
 
             # Calculate closing balance
             if account.account_type.normal_balance.value == "debit":
@@ -178,16 +147,9 @@ class TrialBalanceService:
         if not period:
             raise ValueError("Period not found")
 
-        # Get all accounts
-        accounts_query = self.db.query(Account).filter(
-            and_(
-                Account.customer_id == customer_id,
-                Account.is_active == True,
-                Account.is_header == False,
-            )
-        ).options(joinedload(Account.account_type)).order_by(Account.code)
-
-        accounts = accounts_query.all()
+        aggregates = LedgerAggregates(self.db)
+        period_totals = aggregates.adjustment_totals(customer_id, period_id)
+        no_activity = (Decimal("0"),) * 4
 
         results = []
         totals = {
@@ -199,37 +161,11 @@ class TrialBalanceService:
             "adjusted_credit": Decimal("0"),
         }
 
-        for account in accounts:
-            # Unadjusted: All entries except adjusting
-            unadjusted = self.db.query(
-                func.coalesce(func.sum(JournalLine.debit_amount), 0),
-                func.coalesce(func.sum(JournalLine.credit_amount), 0),
-            ).join(JournalEntry).filter(
-                and_(
-                    JournalLine.account_id == account.id,
-                    JournalEntry.status == EntryStatusEnum.POSTED,
-                    JournalEntry.fiscal_period_id == period_id,
-                    JournalEntry.entry_type != "adjustment"
-                )
-            ).first()
-
-            # Adjustments only
-            adjustments = self.db.query(
-                func.coalesce(func.sum(JournalLine.debit_amount), 0),
-                func.coalesce(func.sum(JournalLine.credit_amount), 0),
-            ).join(JournalEntry).filter(
-                and_(
-                    JournalLine.account_id == account.id,
-                    JournalEntry.status == EntryStatusEnum.POSTED,
-                    JournalEntry.fiscal_period_id == period_id,
-                    JournalEntry.entry_type == "adjustment"
-                )
-            ).first()
-
-            unadj_debit = Decimal(str(unadjusted[0]))
-            unadj_credit = Decimal(str(unadjusted[1]))
-            adj_debit = Decimal(str(adjustments[0]))
-            adj_credit = Decimal(str(adjustments[1]))
+        for account in self._posting_accounts(aggregates, customer_id):
+            # Unadjusted: all entries except adjusting; adjustments only
+            unadj_debit, unadj_credit, adj_debit, adj_credit = period_totals.get(
+                account.id, no_activity
+            )
 
             # Calculate balances
             opening = account.opening_balance
@@ -352,6 +288,13 @@ class TrialBalanceService:
             "accounts": comparative,
         }
 
+    def _posting_accounts(self, aggregates: LedgerAggregates, customer_id: UUID) -> List[Account]:
+        """Active, non-header accounts in code order."""
+        return [
+            a for a in aggregates.accounts(customer_id)
+            if a.is_active and not a.is_header
+        ]
+
 
 def get_trial_balance_service(db: Session) -> TrialBalanceService:
     """Factory function."""
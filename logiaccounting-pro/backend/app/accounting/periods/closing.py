@@ -3,21 +3,21 @@ Year-End Closing Service
 Close fiscal year and generate closing entries
 """
 
-from datetime import datetime, date
+from datetime import datetime
 from decimal import Decimal
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from uuid import UUID
 import logging
 
-from sqlalchemy import func, and_
 from sqlalchemy.orm import Session
 
 from app.utils.datetime_utils import utc_now
 
 from app.accounting.periods.models import FiscalYear, FiscalPeriod
 from app.accounting.chart_of_accounts.models import Account, AccountType
-from app.accounting.journal.models import JournalEntry, JournalLine, EntryTypeEnum, EntryStatusEnum
+from app.accounting.journal.models import JournalEntry, EntryTypeEnum
 from app.accounting.journal.schemas import JournalEntryCreate, JournalLineCreate
+from app.accounting.ledger.aggregates import LedgerAggregates, ZERO
 
 logger = logging.getLogger(__name__)
 
@@ -109,17 +109,20 @@ class YearEndClosingService:
         if not retained_earnings:
             raise ValueError("Retained Earnings account (3500) not found")
 
+        # One grouped query for the year's ledger activity of every account
+        totals = LedgerAggregates(self.db).totals(
+            customer_id,
+            start_date=fiscal_year.start_date,
+            end_date=fiscal_year.end_date,
+        )
+
         lines = []
         total_revenue = Decimal("0")
         total_expenses = Decimal("0")
 
         # Close revenue accounts (debit to close)
         for account in revenue_accounts:
-            balance = self._get_period_balance(
-                account.id,
-                fiscal_year.start_date,
-                fiscal_year.end_date
-            )
+            balance = self._get_period_balance(account, totals)
             if balance != 0:
                 lines.append({
                     "account_id": account.id,
@@ -131,11 +134,7 @@ class YearEndClosingService:
 
         # Close expense accounts (credit to close)
         for account in expense_accounts:
-            balance = self._get_period_balance(
-                account.id,
-                fiscal_year.start_date,
-                fiscal_year.end_date
-            )
+            balance = self._get_period_balance(account, totals)
             if balance != 0:
                 lines.append({
                     "account_id": account.id,
@@ -191,27 +190,11 @@ class YearEndClosingService:
 
     def _get_period_balance(
         self,
-        account_id: UUID,
-        start_date: date,
-        end_date: date,
+        account: Account,
+        totals: Dict[UUID, Tuple[Decimal, Decimal]],
     ) -> Decimal:
-        """Get account balance for a period."""
-        account = self.db.query(Account).get(account_id)
-
-        result = self.db.query(
-            func.coalesce(func.sum(JournalLine.debit_amount), 0).label("total_debit"),
-            func.coalesce(func.sum(JournalLine.credit_amount), 0).label("total_credit")
-        ).join(JournalEntry).filter(
-            and_(
-                JournalLine.account_id == account_id,
-                JournalEntry.status == EntryStatusEnum.POSTED,
-                JournalEntry.entry_date >= start_date,
-                JournalEntry.entry_date <= end_date
-            )
-        ).first()
-
-        total_debit = Decimal(str(result.total_debit))
-        total_credit = Decimal(str(result.total_credit))
+        """Get account balance for a period from its ledger totals."""
+        total_debit, total_credit = totals.get(account.id, (ZERO, ZERO))
 
         # For closing, we need the normal balance
         if account.account_type.normal_balance.value == "credit":
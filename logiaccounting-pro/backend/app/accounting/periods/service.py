@@ -150,6 +150,8 @@ class PeriodService:
         notes: str = None,
     ) -> FiscalPeriod:
         """Close a fiscal period."""
+        from app.accounting.ledger.balance_calculator import BalanceCalculator
+
         period = self.db.query(FiscalPeriod).get(period_id)
         if not period:
             raise ValueError("Period not found")
@@ -167,6 +169,12 @@ class PeriodService:
         if previous_periods:
             raise ValueError("Previous periods must be closed first")
 
+        # Freeze the period's balances; as-of-date queries read this
+        # snapshot instead of the period's journal lines once it is closed
+        BalanceCalculator(self.db).update_period_balances(
+            period.fiscal_year.customer_id, period.id, commit=False
+        )
+
         period.is_closed = True
         period.closed_at = utc_now()
         period.closed_by = closed_by
@@ -9,17 +9,67 @@ from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 import logging
 
+from bisect import bisect_left, bisect_right
+
 from sqlalchemy import and_, or_, func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, joinedload
 
 from app.utils.datetime_utils import utc_now
 
-from app.accounting.reconciliation.models import BankTransaction, BankAccount
+from app.accounting.reconciliation.models import BankTransaction, BankAccount, BankStatement
 from app.accounting.journal.models import JournalEntry, JournalLine, EntryStatusEnum
 
 logger = logging.getLogger(__name__)
 
 
+# Days between bank and entry dates still considered a candidate
+DATE_TOLERANCE = 7
+# Minimum confidence for an automatic match
+MIN_CONFIDENCE = 0.7
+# Relative amount difference still considered a candidate
+AMOUNT_TOLERANCE = Decimal("0.01")
+
+
+class CandidateIndex:
+    """
+    Unreconciled journal lines bucketed by side and entry date, each bucket
+    sorted by amount, so the candidates for a bank transaction are found by
+    bisecting its amount tolerance band in each day of its date window.
+    """
+
+    def __init__(self, lines: List[JournalLine]):
+        self._buckets: Dict[Tuple[str, date], Tuple[List[Decimal], List[JournalLine]]] = {}
+        for side, attr in (("debit", "debit_amount"), ("credit", "credit_amount")):
+            by_day: Dict[date, List[Tuple[Decimal, int]]] = {}
+            for i, line in enumerate(lines):
+                amount = getattr(line, attr)
+                if amount:
+                    by_day.setdefault(line.entry.entry_date, []).append((amount, i))
+            for day, keyed in by_day.items():
+                keyed.sort()
+                self._buckets[(side, day)] = (
+                    [amount for amount, _ in keyed],
+                    [lines[i] for _, i in keyed],
+                )
+
+    def candidates(self, transaction: BankTransaction) -> List[JournalLine]:
+        """Lines on the transaction's side within amount and date tolerance."""
+        side = "debit" if transaction.transaction_type == "debit" else "credit"
+
+        amount = transaction.amount
+        spread = max(abs(amount) * AMOUNT_TOLERANCE, Decimal("0.01"))
+        low, high = amount - spread, amount + spread
+        first_day = transaction.transaction_date - timedelta(days=DATE_TOLERANCE)
+
+        found = []
+        for offset in range(2 * DATE_TOLERANCE + 1):
+            bucket = self._buckets.get((side, first_day + timedelta(days=offset)))
+            if bucket:
+                amounts, lines = bucket
+                found.extend(lines[bisect_left(amounts, low):bisect_right(amounts, high)])
+        return found
+
+
 class TransactionMatcher:
     """Auto-match bank transactions to GL entries."""
 
@@ -31,24 +81,86 @@ class TransactionMatcher:
         statement_id: UUID,
     ) -> Dict[str, Any]:
         """Auto-match all unmatched transactions in a statement."""
+        statement = self.db.query(BankStatement).options(
+            joinedload(BankStatement.bank_account)
+        ).filter(BankStatement.id == statement_id).first()
+
         transactions = self.db.query(BankTransaction).filter(
             BankTransaction.statement_id == statement_id,
             BankTransaction.is_matched == False
         ).all()
 
-        matched = 0
-        for trans in transactions:
-            match = self._find_best_match(trans)
-            if match:
-                self._apply_match(trans, match)
-                matched += 1
+        matches = []
+        if statement and statement.bank_account and transactions:
+            lines = self._load_candidates(statement.bank_account.account_id, transactions)
+            matches = self.assign_matches(transactions, lines)
+
+            for trans, line, score in matches:
+                self._apply_match(trans, (line, score), commit=False)
+            self.db.commit()
 
         return {
             "total_transactions": len(transactions),
-            "matched": matched,
-            "unmatched": len(transactions) - matched,
+            "matched": len(matches),
+            "unmatched": len(transactions) - len(matches),
         }
 
+    def _load_candidates(
+        self,
+        account_id: UUID,
+        transactions: List[BankTransaction],
+    ) -> List[JournalLine]:
+        """Unreconciled posted lines on the bank's GL account for the whole statement window."""
+        dates = [t.transaction_date for t in transactions]
+
+        return self.db.query(JournalLine).join(JournalEntry).options(
+            contains_eager(JournalLine.entry)
+        ).filter(
+            and_(
+                JournalLine.account_id == account_id,
+                JournalEntry.status == EntryStatusEnum.POSTED,
+                JournalEntry.entry_date >= min(dates) - timedelta(days=DATE_TOLERANCE),
+                JournalEntry.entry_date <= max(dates) + timedelta(days=DATE_TOLERANCE),
+                JournalLine.is_reconciled == False
+            )
+        ).all()
+
+    def assign_matches(
+        self,
+        transactions: List[BankTransaction],
+        lines: List[JournalLine],
+    ) -> List[Tuple[BankTransaction, JournalLine, float]]:
+        """
+        One-to-one assignment of transactions to journal lines.
+
+        Every candidate pair scoring at least MIN_CONFIDENCE is ranked by
+        score (then by statement order) and accepted greedily while both its
+        transaction and its line are still free, so a line is never used
+        for two transactions.
+        """
+        index = CandidateIndex(lines)
+        position = {id(line): i for i, line in enumerate(lines)}
+
+        pairs = []
+        for order, trans in enumerate(transactions):
+            for line in index.candidates(trans):
+                score = self._calculate_match_score(trans, line)
+                if score >= MIN_CONFIDENCE:
+                    pairs.append((-score, order, position[id(line)]))
+        pairs.sort()
+
+        used_transactions = set()
+        used_lines = set()
+        matches = []
+        for neg_score, order, line_position in pairs:
+            if order in used_transactions or line_position in used_lines:
+                continue
+            used_transactions.add(order)
+            used_lines.add(line_position)
+            matches.append((transactions[order], lines[line_position], -neg_score))
+
+        return matches
+
     def _find_best_match(
         self,
         transaction: BankTransaction,
@@ -64,29 +176,14 @@ class TransactionMatcher:
         if not bank_account:
             return None
 
-        # Search for matching journal lines
-        date_range = 7  # Days tolerance
-
-        candidates = self.db.query(JournalLine).join(JournalEntry).filter(
-            and_(
-                JournalLine.account_id == bank_account.account_id,
-                JournalEntry.status == EntryStatusEnum.POSTED,
-                JournalEntry.entry_date >= transaction.transaction_date - timedelta(days=date_range),
-                JournalEntry.entry_date <= transaction.transaction_date + timedelta(days=date_range),
-                JournalLine.is_reconciled == False
-            )
-        ).all()
-
-        best_match = None
-        best_score = 0.0
-
-        for line in candidates:
-            score = self._calculate_match_score(transaction, line)
-            if score > best_score and score >= 0.7:  # Minimum confidence
-                best_score = score
-                best_match = (line, score)
+        matches = self.assign_matches(
+            [transaction], self._load_candidates(bank_account.account_id, [transaction])
+        )
+        if not matches:
+            return None
 
-        return best_match
+        _, line, score = matches[0]
+        return line, score
 
     def _calculate_match_score(
         self,
@@ -104,7 +201,7 @@ class TransactionMatcher:
             score += 0.5  # Exact match
         elif abs(trans_amount - line_amount) <= Decimal("0.01"):
             score += 0.45  # Within rounding
-        elif abs(trans_amount - line_amount) / trans_amount <= Decimal("0.01"):
+        elif abs(trans_amount - line_amount) <= abs(trans_amount) * AMOUNT_TOLERANCE:
             score += 0.3  # Within 1%
         else:
             return 0.0  # Amount mismatch, no point continuing
@@ -150,6 +247,7 @@ class TransactionMatcher:
         self,
         transaction: BankTransaction,
         match: Tuple[JournalLine, float],
+        commit: bool = True,
     ):
         """Apply a match between transaction and journal line."""
         line, confidence = match
@@ -165,7 +263,8 @@ class TransactionMatcher:
         line.reconciled_date = transaction.transaction_date
         line.bank_transaction_id = transaction.id
 
-        self.db.commit()
+        if commit:
+            self.db.commit()
 
     def manual_match(
         self,
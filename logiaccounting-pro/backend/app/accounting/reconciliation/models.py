@@ -64,8 +64,8 @@ class BankStatement(Base):
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
 
     # Relationships
-    bank_account = relationship("BankAccount", back_populates="statements")
-    transactions = relationship("BankTransaction", back_populates="statement")
+    bank_account = relationship("app.accounting.reconciliation.models.BankAccount", back_populates="statements")
+    transactions = relationship("app.accounting.reconciliation.models.BankTransaction", back_populates="statement")
 
 
 class BankTransaction(Base):
@@ -9,11 +9,10 @@ from typing import Dict, Any, List
 from uuid import UUID
 import logging
 
-from sqlalchemy import func, and_
 from sqlalchemy.orm import Session
 
-from app.accounting.chart_of_accounts.models import Account, AccountType, AccountTypeEnum
-from app.accounting.journal.models import JournalEntry, JournalLine, EntryStatusEnum
+from app.accounting.chart_of_accounts.models import Account
+from app.accounting.ledger.aggregates import LedgerAggregates
 
 logger = logging.getLogger(__name__)
 
@@ -33,28 +32,31 @@ class BalanceSheetGenerator:
     ) -> Dict[str, Any]:
         """Generate balance sheet."""
         as_of_date = as_of_date or date.today()
+        aggregates = LedgerAggregates(self.db)
 
         # Get all balance sheet accounts
-        accounts = self._get_balance_sheet_accounts(customer_id)
+        accounts = self._get_balance_sheet_accounts(aggregates, customer_id)
 
         # Calculate balances
-        assets = self._calculate_section(accounts, "asset", as_of_date)
-        liabilities = self._calculate_section(accounts, "liability", as_of_date)
-        equity = self._calculate_section(accounts, "equity", as_of_date)
+        balances = aggregates.balances(customer_id, as_of_date)
+        assets = self._calculate_section(accounts, "asset", balances)
+        liabilities = self._calculate_section(accounts, "liability", balances)
+        equity = self._calculate_section(accounts, "equity", balances)
 
         # Add current year earnings to equity
-        current_earnings = self._calculate_current_earnings(customer_id, as_of_date)
+        current_earnings = self._calculate_current_earnings(aggregates, customer_id, as_of_date)
         equity["current_year_earnings"] = float(current_earnings)
         equity["total"] += float(current_earnings)
 
         # Calculate comparative if requested
         comparative = None
         if comparative_date:
+            comparative_balances = aggregates.balances(customer_id, comparative_date)
             comparative = {
                 "as_of_date": comparative_date.isoformat(),
-                "assets": self._calculate_section(accounts, "asset", comparative_date),
-                "liabilities": self._calculate_section(accounts, "liability", comparative_date),
-                "equity": self._calculate_section(accounts, "equity", comparative_date),
+                "assets": self._calculate_section(accounts, "asset", comparative_balances),
+                "liabilities": self._calculate_section(accounts, "liability", comparative_balances),
+                "equity": self._calculate_section(accounts, "equity", comparative_balances),
             }
 
         total_assets = assets["total"]
@@ -74,19 +76,18 @@ class BalanceSheetGenerator:
             "comparative": comparative,
         }
 
-    def _get_balance_sheet_accounts(self, customer_id: UUID) -> List[Account]:
+    def _get_balance_sheet_accounts(self, aggregates: LedgerAggregates, customer_id: UUID) -> List[Account]:
         """Get all balance sheet accounts."""
-        return self.db.query(Account).join(AccountType).filter(
-            Account.customer_id == customer_id,
-            Account.is_active == True,
-            AccountType.report_type == "balance_sheet"
-        ).order_by(Account.code).all()
+        return [
+            a for a in aggregates.accounts(customer_id)
+            if a.is_active and a.account_type.report_type.value == "balance_sheet"
+        ]
 
     def _calculate_section(
         self,
         accounts: List[Account],
         section_type: str,
-        as_of_date: date,
+        balances: Dict[UUID, Decimal],
     ) -> Dict[str, Any]:
         """Calculate totals for a balance sheet section."""
         section_accounts = [a for a in accounts if a.account_type.name == section_type]
@@ -98,14 +99,14 @@ class BalanceSheetGenerator:
         root_accounts = [a for a in section_accounts if not a.parent_id or a.parent.account_type.name != section_type]
 
         for account in root_accounts:
-            balance = self._get_account_balance(account.id, as_of_date)
+            balance = balances[account.id]
 
             # Get children balances
             children = [a for a in section_accounts if a.parent_id == account.id]
             children_items = []
 
             for child in children:
-                child_balance = self._get_account_balance(child.id, as_of_date)
+                child_balance = balances[child.id]
                 if child_balance != 0 or not account.is_header:
                     children_items.append({
                         "id": str(child.id),
@@ -136,86 +137,28 @@ class BalanceSheetGenerator:
             "total": float(total),
         }
 
-    def _get_account_balance(self, account_id: UUID, as_of_date: date) -> Decimal:
-        """Get account balance as of date."""
-        account = self.db.query(Account).get(account_id)
-
-        result = self.db.query(
-            func.coalesce(func.sum(JournalLine.debit_amount), 0).label("total_debit"),
-            func.coalesce(func.sum(JournalLine.credit_amount), 0).label("total_credit")
-        ).join(JournalEntry).filter(
-            and_(
-                JournalLine.account_id == account_id,
-                JournalEntry.status == EntryStatusEnum.POSTED,
-                JournalEntry.entry_date <= as_of_date
-            )
-        ).first()
-
-        total_debit = Decimal(str(result.total_debit))
-        total_credit = Decimal(str(result.total_credit))
-
-        if account.account_type.normal_balance.value == "debit":
-            return account.opening_balance + total_debit - total_credit
-        else:
-            return account.opening_balance + total_credit - total_debit
-
-    def _calculate_current_earnings(self, customer_id: UUID, as_of_date: date) -> Decimal:
+    def _calculate_current_earnings(
+        self,
+        aggregates: LedgerAggregates,
+        customer_id: UUID,
+        as_of_date: date,
+    ) -> Decimal:
         """Calculate current year earnings (net income)."""
         # Get fiscal year start
         year_start = date(as_of_date.year, 1, 1)
+        activity = aggregates.activity(customer_id, year_start, as_of_date)
 
         # Revenue - Expenses
-        revenue_accounts = self.db.query(Account).join(AccountType).filter(
-            Account.customer_id == customer_id,
-            AccountType.name == "revenue"
-        ).all()
-
-        expense_accounts = self.db.query(Account).join(AccountType).filter(
-            Account.customer_id == customer_id,
-            AccountType.name == "expense"
-        ).all()
-
-        total_revenue = sum(
-            self._get_period_balance(a.id, year_start, as_of_date)
-            for a in revenue_accounts
-        )
-
-        total_expenses = sum(
-            self._get_period_balance(a.id, year_start, as_of_date)
-            for a in expense_accounts
-        )
+        total_revenue = Decimal("0")
+        total_expenses = Decimal("0")
+        for account in aggregates.accounts(customer_id):
+            if account.account_type.name == "revenue":
+                total_revenue += activity[account.id]
+            elif account.account_type.name == "expense":
+                total_expenses += activity[account.id]
 
         return total_revenue - total_expenses
 
-    def _get_period_balance(
-        self,
-        account_id: UUID,
-        start_date: date,
-        end_date: date,
-    ) -> Decimal:
-        """Get account activity for a period."""
-        account = self.db.query(Account).get(account_id)
-
-        result = self.db.query(
-            func.coalesce(func.sum(JournalLine.debit_amount), 0).label("total_debit"),
-            func.coalesce(func.sum(JournalLine.credit_amount), 0).label("total_credit")
-        ).join(JournalEntry).filter(
-            and_(
-                JournalLine.account_id == account_id,
-                JournalEntry.status == EntryStatusEnum.POSTED,
-                JournalEntry.entry_date >= start_date,
-                JournalEntry.entry_date <= end_date
-            )
-        ).first()
-
-        total_debit = Decimal(str(result.total_debit))
-        total_credit = Decimal(str(result.total_credit))
-
-        if account.account_type.normal_balance.value == "debit":
-            return total_debit - total_credit
-        else:
-            return total_credit - total_debit
-
 
 def get_balance_sheet_generator(db: Session) -> BalanceSheetGenerator:
     return BalanceSheetGenerator(db)
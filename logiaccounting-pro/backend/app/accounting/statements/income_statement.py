@@ -9,11 +9,10 @@ from typing import Dict, Any, List
 from uuid import UUID
 import logging
 
-from sqlalchemy import func, and_
 from sqlalchemy.orm import Session
 
-from app.accounting.chart_of_accounts.models import Account, AccountType
-from app.accounting.journal.models import JournalEntry, JournalLine, EntryStatusEnum
+from app.accounting.chart_of_accounts.models import Account
+from app.accounting.ledger.aggregates import LedgerAggregates
 
 logger = logging.getLogger(__name__)
 
@@ -34,15 +33,18 @@ class IncomeStatementGenerator:
         include_details: bool = True,
     ) -> Dict[str, Any]:
         """Generate income statement for a period."""
+        aggregates = LedgerAggregates(self.db)
+
         # Get income statement accounts
-        accounts = self._get_income_accounts(customer_id)
+        accounts = self._get_income_accounts(aggregates, customer_id)
 
         # Calculate sections
-        revenue = self._calculate_section(accounts, "revenue", start_date, end_date)
-        expenses = self._calculate_section(accounts, "expense", start_date, end_date)
+        activity = aggregates.activity(customer_id, start_date, end_date)
+        revenue = self._calculate_section(accounts, "revenue", activity)
+        expenses = self._calculate_section(accounts, "expense", activity)
 
         # Calculate gross profit (if COGS is separated)
-        cogs = self._get_cogs(accounts, start_date, end_date)
+        cogs = self._get_cogs(accounts, activity)
         gross_profit = revenue["total"] - cogs
 
         # Operating expenses (expenses minus COGS)
@@ -54,8 +56,9 @@ class IncomeStatementGenerator:
         # Comparative period
         comparative = None
         if comparative_start and comparative_end:
-            comp_revenue = self._calculate_section(accounts, "revenue", comparative_start, comparative_end)
-            comp_expenses = self._calculate_section(accounts, "expense", comparative_start, comparative_end)
+            comp_activity = aggregates.activity(customer_id, comparative_start, comparative_end)
+            comp_revenue = self._calculate_section(accounts, "revenue", comp_activity)
+            comp_expenses = self._calculate_section(accounts, "expense", comp_activity)
             comparative = {
                 "period": {
                     "start": comparative_start.isoformat(),
@@ -83,20 +86,18 @@ class IncomeStatementGenerator:
             "comparative": comparative,
         }
 
-    def _get_income_accounts(self, customer_id: UUID) -> List[Account]:
+    def _get_income_accounts(self, aggregates: LedgerAggregates, customer_id: UUID) -> List[Account]:
         """Get all income statement accounts."""
-        return self.db.query(Account).join(AccountType).filter(
-            Account.customer_id == customer_id,
-            Account.is_active == True,
-            AccountType.report_type == "income_statement"
-        ).order_by(Account.code).all()
+        return [
+            a for a in aggregates.accounts(customer_id)
+            if a.is_active and a.account_type.report_type.value == "income_statement"
+        ]
 
     def _calculate_section(
         self,
         accounts: List[Account],
         section_type: str,
-        start_date: date,
-        end_date: date,
+        activity: Dict[UUID, Decimal],
     ) -> Dict[str, Any]:
         """Calculate totals for an income statement section."""
         section_accounts = [a for a in accounts if a.account_type.name == section_type]
@@ -108,7 +109,7 @@ class IncomeStatementGenerator:
             if account.is_header:
                 continue
 
-            balance = self._get_period_activity(account.id, start_date, end_date)
+            balance = activity[account.id]
 
             if balance != 0:
                 items.append({
@@ -124,46 +125,15 @@ class IncomeStatementGenerator:
             "total": float(total),
         }
 
-    def _get_period_activity(
-        self,
-        account_id: UUID,
-        start_date: date,
-        end_date: date,
-    ) -> Decimal:
-        """Get account activity for a period."""
-        account = self.db.query(Account).get(account_id)
-
-        result = self.db.query(
-            func.coalesce(func.sum(JournalLine.debit_amount), 0).label("total_debit"),
-            func.coalesce(func.sum(JournalLine.credit_amount), 0).label("total_credit")
-        ).join(JournalEntry).filter(
-            and_(
-                JournalLine.account_id == account_id,
-                JournalEntry.status == EntryStatusEnum.POSTED,
-                JournalEntry.entry_date >= start_date,
-                JournalEntry.entry_date <= end_date
-            )
-        ).first()
-
-        total_debit = Decimal(str(result.total_debit))
-        total_credit = Decimal(str(result.total_credit))
-
-        # For income statement: revenue is credit normal, expense is debit normal
-        if account.account_type.normal_balance.value == "credit":
-            return total_credit - total_debit
-        else:
-            return total_debit - total_credit
-
     def _get_cogs(
         self,
         accounts: List[Account],
-        start_date: date,
-        end_date: date,
+        activity: Dict[UUID, Decimal],
     ) -> float:
         """Get cost of goods sold."""
         cogs_accounts = [a for a in accounts if a.code.startswith("51")]
         total = sum(
-            self._get_period_activity(a.id, start_date, end_date)
+            activity[a.id]
             for a in cogs_accounts if not a.is_header
         )
         return float(total)
@@ -18,6 +18,9 @@ import uuid
 from app.database import Base
 from app.utils.datetime_utils import utc_now
 
+if TYPE_CHECKING:
+    from app.banking.transactions.models import BankTransaction
+
 
 class AccountType(str, Enum):
     """Bank account types"""
@@ -120,6 +123,9 @@ class BankAccount(Base):
     balances: Mapped[List["BankAccountBalance"]] = relationship(
         "BankAccountBalance", back_populates="account", cascade="all, delete-orphan"
     )
+    transactions: Mapped[List["BankTransaction"]] = relationship(
+        "app.banking.transactions.models.BankTransaction", back_populates="account"
+    )
 
     __table_args__ = (
         UniqueConstraint("customer_id", "account_code", name="uq_bank_account_code"),
@@ -183,7 +189,7 @@ class BankAccountBalance(Base):
 
     # Relationships
     account: Mapped["BankAccount"] = relationship(
-        "BankAccount", back_populates="balances"
+        "app.banking.accounts.models.BankAccount", back_populates="balances"
     )
 
     __table_args__ = (
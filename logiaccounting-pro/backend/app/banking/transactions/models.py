@@ -131,7 +131,7 @@ class BankTransaction(Base):
     )
 
     # Relationships
-    account = relationship("BankAccount", back_populates="transactions")
+    account = relationship("app.banking.accounts.models.BankAccount", back_populates="transactions")
 
     __table_args__ = (
         Index("idx_bank_trans_account_date", "account_id", "transaction_date"),
@@ -201,7 +201,6 @@ class FixedAsset(Base):
     # ==================== Relationships ====================
     category: Mapped["AssetCategory"] = relationship("AssetCategory", back_populates="assets")
     depreciation_profile = relationship("DepreciationProfile")
-    responsible_person = relationship("User", foreign_keys=[responsible_person_id])
 
     attachments: Mapped[List["AssetAttachment"]] = relationship(
         "AssetAttachment",
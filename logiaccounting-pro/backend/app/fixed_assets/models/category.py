@@ -75,19 +75,19 @@ class AssetCategory(Base):
     # Accounting - GL account mapping
     asset_account_id: Mapped[Optional[UUID]] = mapped_column(
         PGUUID(as_uuid=True),
-        ForeignKey("chart_of_accounts.id")
+        ForeignKey("accounts.id")
     )
     accumulated_depreciation_account_id: Mapped[Optional[UUID]] = mapped_column(
         PGUUID(as_uuid=True),
-        ForeignKey("chart_of_accounts.id")
+        ForeignKey("accounts.id")
     )
     depreciation_expense_account_id: Mapped[Optional[UUID]] = mapped_column(
         PGUUID(as_uuid=True),
-        ForeignKey("chart_of_accounts.id")
+        ForeignKey("accounts.id")
     )
     gain_loss_disposal_account_id: Mapped[Optional[UUID]] = mapped_column(
         PGUUID(as_uuid=True),
-        ForeignKey("chart_of_accounts.id")
+        ForeignKey("accounts.id")
     )
 
     # Settings
@@ -107,10 +107,10 @@ class AssetCategory(Base):
     assets: Mapped[List["FixedAsset"]] = relationship("FixedAsset", back_populates="category")
 
     # Account relationships
-    asset_account = relationship("ChartOfAccounts", foreign_keys=[asset_account_id])
-    accumulated_depreciation_account = relationship("ChartOfAccounts", foreign_keys=[accumulated_depreciation_account_id])
-    depreciation_expense_account = relationship("ChartOfAccounts", foreign_keys=[depreciation_expense_account_id])
-    gain_loss_account = relationship("ChartOfAccounts", foreign_keys=[gain_loss_disposal_account_id])
+    asset_account = relationship("Account", foreign_keys=[asset_account_id])
+    accumulated_depreciation_account = relationship("Account", foreign_keys=[accumulated_depreciation_account_id])
+    depreciation_expense_account = relationship("Account", foreign_keys=[depreciation_expense_account_id])
+    gain_loss_account = relationship("Account", foreign_keys=[gain_loss_disposal_account_id])
 
     __table_args__ = (
         UniqueConstraint("customer_id", "code", name="uq_asset_category_code"),
@@ -154,11 +154,11 @@ class DepreciationProfile(Base):
     # Accounting
     depreciation_expense_account_id: Mapped[Optional[UUID]] = mapped_column(
         PGUUID(as_uuid=True),
-        ForeignKey("chart_of_accounts.id")
+        ForeignKey("accounts.id")
     )
     accumulated_depreciation_account_id: Mapped[Optional[UUID]] = mapped_column(
         PGUUID(as_uuid=True),
-        ForeignKey("chart_of_accounts.id")
+        ForeignKey("accounts.id")
     )
 
     # Posting
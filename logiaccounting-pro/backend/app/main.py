@@ -56,14 +56,14 @@ from app.ai.routes import (
     anomaly_router as ai_anomaly,
     usage_router as ai_usage,
 )
-from app.models.store import init_database
+from app.models.store import db, init_database
 from app.models.tenant_store import init_tenant_database
 from app.models.gateway_store import init_gateway_database
 from app.models.webhook_store import init_webhook_database
 from app.middleware.tenant_context import TenantMiddleware
 from app.middleware.gateway import RequestLoggerMiddleware, GatewayMiddleware
 from app.security.middleware.headers import SecurityHeadersMiddleware
-from app.security.middleware.rate_limit import RateLimitMiddleware, RateLimitRule
+from app.security.middleware.rate_limit import RateLimitMiddleware, RateLimitRule, create_rate_limit_backend
 from app.performance.monitoring.logging_config import setup_logging, LoggingMiddleware
 
 import logging
@@ -84,6 +84,9 @@ async def lifespan(app: FastAPI):
     logger.info("Database initialization complete")
     yield
     logger.info("Shutting down LogiAccounting Pro API")
+    if db.persistence is not None:
+        db.persistence.checkpoint()
+        db.persistence.close()
 
 
 app = FastAPI(
@@ -116,6 +119,7 @@ app.add_middleware(
     RateLimitMiddleware,
     default_limit=200,
     default_window=60,
+    backend=create_rate_limit_backend(),
     rules=[
         RateLimitRule(requests=10, window_seconds=60, path_prefix="/api/v1/auth/login", methods=["POST"]),
         RateLimitRule(requests=5, window_seconds=60, path_prefix="/api/v1/auth/register", methods=["POST"]),
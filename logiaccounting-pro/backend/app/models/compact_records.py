@@ -0,0 +1,80 @@
+"""
+Compact record storage for the in-memory stores
+
+Keeps fixed-schema records as ``__slots__`` rows instead of one dict per
+record. Rows are materialized into plain dicts on read, so stores using this
+backend expose the same dict-based API; writes must go back through the
+store (``update``/``set_fields``) since returned dicts are copies.
+"""
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+BASE_FIELDS = ("id", "created_at", "updated_at")
+
+
+def make_row_class(name: str, fields: Sequence[str]) -> type:
+    """Build a slotted row type; ``_extra`` holds keys outside the schema"""
+    return type(name, (), {"__slots__": (*fields, "_extra")})
+
+
+class CompactRecords(MutableMapping):
+    """id -> record mapping backed by slotted rows with interned enum values"""
+
+    def __init__(self, schema: Sequence[str], interned: Sequence[str] = (), name: str = "Row"):
+        self.fields = tuple(dict.fromkeys((*BASE_FIELDS, *schema)))
+        self._field_set = frozenset(self.fields)
+        self._interned = frozenset(interned)
+        self._row_cls = make_row_class(name, self.fields)
+        self._rows: Dict[str, Any] = {}
+
+    def _pack(self, record: Dict[str, Any]):
+        row = self._row_cls()
+        extra = None
+        for key, value in record.items():
+            if key in self._field_set:
+                if key in self._interned and type(value) is str:
+                    value = sys.intern(value)
+                setattr(row, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        row._extra = extra
+        return row
+
+    def _unpack(self, row) -> Dict[str, Any]:
+        record = {}
+        for field in self.fields:
+            try:
+                record[field] = getattr(row, field)
+            except AttributeError:
+                pass  # field absent from this record
+        if row._extra:
+            record.update(row._extra)
+        return record
+
+    def __getitem__(self, item_id: str) -> Dict[str, Any]:
+        return self._unpack(self._rows[item_id])
+
+    def get(self, item_id: str, default: Optional[Dict] = None) -> Optional[Dict]:
+        row = self._rows.get(item_id)
+        return default if row is None else self._unpack(row)
+
+    def __setitem__(self, item_id: str, record: Dict[str, Any]) -> None:
+        self._rows[item_id] = self._pack(record)
+
+    def __delitem__(self, item_id: str) -> None:
+        del self._rows[item_id]
+
+    def __contains__(self, item_id) -> bool:
+        return item_id in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def clear(self) -> None:
+        self._rows.clear()
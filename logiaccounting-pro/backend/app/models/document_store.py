@@ -19,20 +19,18 @@ import re
 class DocumentCategoryStore(BaseStore):
     """Hierarchical document category (folder) store"""
 
+    indexes = ("organization_id", "slug")
+
     def find_by_organization(self, org_id: str) -> List[Dict]:
-        return [c for c in self._data if c.get("organization_id") == org_id]
+        return self.find_all({"organization_id": org_id})
 
     def find_by_parent(self, org_id: str, parent_id: Optional[str]) -> List[Dict]:
-        return [c for c in self._data
-                if c.get("organization_id") == org_id and c.get("parent_id") == parent_id]
+        # find_all ignores None filters, and parent_id None means top level
+        return [c for c in self.find_by_organization(org_id) if c.get("parent_id") == parent_id]
 
     def find_by_slug(self, org_id: str, slug: str, parent_id: Optional[str] = None) -> Optional[Dict]:
-        for c in self._data:
-            if (c.get("organization_id") == org_id and
-                c.get("slug") == slug and
-                c.get("parent_id") == parent_id):
-                return c
-        return None
+        return next((c for c in self.find_all({"organization_id": org_id, "slug": slug})
+                     if c.get("parent_id") == parent_id), None)
 
     @staticmethod
     def generate_slug(name: str) -> str:
@@ -83,12 +81,13 @@ class DocumentCategoryStore(BaseStore):
 class DocumentTagStore(BaseStore):
     """Document tag store"""
 
+    indexes = ("organization_id", "slug")
+
     def find_by_organization(self, org_id: str) -> List[Dict]:
-        return [t for t in self._data if t.get("organization_id") == org_id]
+        return self.find_all({"organization_id": org_id})
 
     def find_by_slug(self, org_id: str, slug: str) -> Optional[Dict]:
-        return next((t for t in self._data
-                    if t.get("organization_id") == org_id and t.get("slug") == slug), None)
+        return next(iter(self.find_all({"organization_id": org_id, "slug": slug})), None)
 
     def create(self, data: Dict) -> Dict:
         if not data.get("slug"):
@@ -99,8 +98,10 @@ class DocumentTagStore(BaseStore):
 class EnhancedDocumentStore(BaseStore):
     """Enhanced document store with full Phase 13 features"""
 
+    indexes = ("organization_id", "file_hash")
+
     def find_by_organization(self, org_id: str, filters: Dict = None) -> List[Dict]:
-        results = [d for d in self._data if d.get("organization_id") == org_id]
+        results = self.find_all({"organization_id": org_id})
 
         if filters:
             if filters.get("category_id"):
@@ -135,49 +136,38 @@ class EnhancedDocumentStore(BaseStore):
         return results
 
     def find_by_hash(self, org_id: str, file_hash: str) -> Optional[Dict]:
-        return next((d for d in self._data
-                    if d.get("organization_id") == org_id and
-                    d.get("file_hash") == file_hash and
-                    d.get("status") != "deleted"), None)
+        return next((d for d in self.find_all({"organization_id": org_id, "file_hash": file_hash})
+                    if d.get("status") != "deleted"), None)
 
     @staticmethod
     def calculate_hash(file_content: bytes) -> str:
         return hashlib.sha256(file_content).hexdigest()
 
     def soft_delete(self, doc_id: str) -> Optional[Dict]:
-        doc = self.find_by_id(doc_id)
-        if doc:
-            doc["status"] = "deleted"
-            doc["deleted_at"] = utc_now().isoformat()
-            doc["updated_at"] = utc_now().isoformat()
-            return doc
-        return None
+        now = utc_now().isoformat()
+        return self.set_fields(doc_id, status="deleted", deleted_at=now, updated_at=now)
 
     def archive(self, doc_id: str) -> Optional[Dict]:
-        doc = self.find_by_id(doc_id)
-        if doc:
-            doc["status"] = "archived"
-            doc["archived_at"] = utc_now().isoformat()
-            doc["updated_at"] = utc_now().isoformat()
-            return doc
-        return None
+        now = utc_now().isoformat()
+        return self.set_fields(doc_id, status="archived", archived_at=now, updated_at=now)
 
     def restore(self, doc_id: str) -> Optional[Dict]:
-        doc = self.find_by_id(doc_id)
-        if doc:
-            doc["status"] = "active"
-            doc["deleted_at"] = None
-            doc["archived_at"] = None
-            doc["updated_at"] = utc_now().isoformat()
-            return doc
-        return None
+        return self.set_fields(
+            doc_id,
+            status="active",
+            deleted_at=None,
+            archived_at=None,
+            updated_at=utc_now().isoformat(),
+        )
 
 
 class DocumentVersionStore(BaseStore):
     """Document version history store"""
 
+    indexes = ("document_id",)
+
     def find_by_document(self, doc_id: str) -> List[Dict]:
-        versions = [v for v in self._data if v.get("document_id") == doc_id]
+        versions = self.find_all({"document_id": doc_id})
         versions.sort(key=lambda x: x.get("version_number", 0), reverse=True)
         return versions
 
@@ -189,14 +179,16 @@ class DocumentVersionStore(BaseStore):
 class DocumentShareStore(BaseStore):
     """Document sharing store"""
 
+    indexes = ("document_id", "share_token", "shared_with_user_id")
+
     def find_by_document(self, doc_id: str) -> List[Dict]:
-        return [s for s in self._data if s.get("document_id") == doc_id]
+        return self.find_all({"document_id": doc_id})
 
     def find_by_token(self, token: str) -> Optional[Dict]:
-        return next((s for s in self._data if s.get("share_token") == token), None)
+        return self.find_one_by("share_token", token)
 
     def find_by_user(self, user_id: str) -> List[Dict]:
-        return [s for s in self._data if s.get("shared_with_user_id") == user_id]
+        return self.find_all({"shared_with_user_id": user_id})
 
     def is_expired(self, share: Dict) -> bool:
         if not share.get("expires_at"):
@@ -207,8 +199,11 @@ class DocumentShareStore(BaseStore):
     def record_access(self, share_id: str):
         share = self.find_by_id(share_id)
         if share:
-            share["last_accessed_at"] = utc_now().isoformat()
-            share["access_count"] = share.get("access_count", 0) + 1
+            self.set_fields(
+                share_id,
+                last_accessed_at=utc_now().isoformat(),
+                access_count=share.get("access_count", 0) + 1,
+            )
 
     def create_link_share(
         self,
@@ -243,16 +238,19 @@ class DocumentShareStore(BaseStore):
         can_share: bool = False
     ) -> Dict:
         # Check if already shared
-        existing = next((s for s in self._data
-                        if s.get("document_id") == document_id and
-                        s.get("shared_with_user_id") == shared_with_user_id), None)
+        existing = next(iter(self.find_all({
+            "document_id": document_id,
+            "shared_with_user_id": shared_with_user_id,
+        })), None)
 
         if existing:
-            existing["permission"] = permission
-            existing["can_download"] = can_download
-            existing["can_share"] = can_share
-            existing["updated_at"] = utc_now().isoformat()
-            return existing
+            return self.set_fields(
+                existing["id"],
+                permission=permission,
+                can_download=can_download,
+                can_share=can_share,
+                updated_at=utc_now().isoformat(),
+            )
 
         return self.create({
             "document_id": document_id,
@@ -269,43 +267,47 @@ class DocumentShareStore(BaseStore):
 class DocumentCommentStore(BaseStore):
     """Document comments and annotations store"""
 
+    indexes = ("document_id",)
+
     def find_by_document(self, doc_id: str, include_resolved: bool = True) -> List[Dict]:
-        comments = [c for c in self._data if c.get("document_id") == doc_id]
+        comments = self.find_all({"document_id": doc_id})
 
         if not include_resolved:
             comments = [c for c in comments if not c.get("is_resolved")]
 
-        # Get top-level comments first
-        top_level = [c for c in comments if not c.get("parent_id")]
-
-        # Add replies
-        for comment in top_level:
-            comment["replies"] = [c for c in comments if c.get("parent_id") == comment["id"]]
-            comment["replies"].sort(key=lambda x: x.get("created_at", ""))
+        # Get top-level comments first, with their replies attached to copies
+        # so the stored records are left as they are
+        top_level = []
+        for comment in comments:
+            if not comment.get("parent_id"):
+                replies = [c for c in comments if c.get("parent_id") == comment["id"]]
+                replies.sort(key=lambda x: x.get("created_at", ""))
+                top_level.append({**comment, "replies": replies})
 
         top_level.sort(key=lambda x: x.get("created_at", ""), reverse=True)
         return top_level
 
     def resolve(self, comment_id: str, resolved_by: str) -> Optional[Dict]:
-        comment = self.find_by_id(comment_id)
-        if comment:
-            comment["is_resolved"] = True
-            comment["resolved_by"] = resolved_by
-            comment["resolved_at"] = utc_now().isoformat()
-            return comment
-        return None
+        return self.set_fields(
+            comment_id,
+            is_resolved=True,
+            resolved_by=resolved_by,
+            resolved_at=utc_now().isoformat(),
+        )
 
 
 class DocumentActivityStore(BaseStore):
     """Document activity log store"""
 
+    indexes = ("document_id", "user_id")
+
     def find_by_document(self, doc_id: str, limit: int = 50) -> List[Dict]:
-        logs = [l for l in self._data if l.get("document_id") == doc_id]
+        logs = self.find_all({"document_id": doc_id})
         logs.sort(key=lambda x: x.get("created_at", ""), reverse=True)
         return logs[:limit]
 
     def find_by_user(self, user_id: str, limit: int = 50) -> List[Dict]:
-        logs = [l for l in self._data if l.get("user_id") == user_id]
+        logs = self.find_all({"user_id": user_id})
         logs.sort(key=lambda x: x.get("created_at", ""), reverse=True)
         return logs[:limit]
 
@@ -331,35 +333,37 @@ class DocumentActivityStore(BaseStore):
 class SignatureRequestStore(BaseStore):
     """E-signature request store"""
 
+    indexes = ("organization_id", "document_id", "status")
+
     def find_by_organization(self, org_id: str) -> List[Dict]:
-        return [r for r in self._data if r.get("organization_id") == org_id]
+        return self.find_all({"organization_id": org_id})
 
     def find_by_document(self, doc_id: str) -> List[Dict]:
-        return [r for r in self._data if r.get("document_id") == doc_id]
+        return self.find_all({"document_id": doc_id})
 
     def find_pending_by_user(self, email: str) -> List[Dict]:
-        return [r for r in self._data
-                if r.get("status") in ["pending", "in_progress"] and
-                any(rec.get("email") == email and rec.get("status") in ["pending", "sent"]
-                    for rec in r.get("recipients", []))]
+        open_requests = self.find_all({"status": "pending"}) + self.find_all({"status": "in_progress"})
+        return [r for r in open_requests
+                if any(rec.get("email") == email and rec.get("status") in ["pending", "sent"]
+                       for rec in r.get("recipients", []))]
 
 
 class SignatureRecipientStore(BaseStore):
     """Signature recipient store"""
 
+    indexes = ("request_id", "access_token")
+
     def find_by_request(self, request_id: str) -> List[Dict]:
-        recipients = [r for r in self._data if r.get("request_id") == request_id]
+        recipients = self.find_all({"request_id": request_id})
         recipients.sort(key=lambda x: x.get("signing_order", 0))
         return recipients
 
     def find_by_token(self, token: str) -> Optional[Dict]:
-        return next((r for r in self._data if r.get("access_token") == token), None)
+        return self.find_one_by("access_token", token)
 
     def find_pending_by_order(self, request_id: str, order: int) -> List[Dict]:
-        return [r for r in self._data
-                if r.get("request_id") == request_id and
-                r.get("signing_order") == order and
-                r.get("status") == "pending"]
+        return [r for r in self.find_all({"request_id": request_id, "status": "pending"})
+                if r.get("signing_order") == order]
 
 
 # Document database instance
@@ -409,4 +413,4 @@ def init_document_database():
     for tag in default_tags:
         doc_db.tags.create(tag)
 
-    logger.info("Document database initialized: %d categories, %d tags", len(doc_db.categories._data), len(doc_db.tags._data))
+    logger.info("Document database initialized: %d categories, %d tags", len(doc_db.categories), len(doc_db.tags))
@@ -0,0 +1,427 @@
+"""
+Snapshot + write-ahead log persistence for the in-memory Database
+
+Every mutation that goes through a ``BaseStore`` (put, set_fields, delete,
+clear) is appended to a write-ahead log. Periodically the whole database is
+written to a compact binary snapshot and the log restarts. On startup the
+snapshot is memory-mapped and decoded frame by frame, then the remaining log
+is replayed, so restarts no longer re-run the seed code.
+
+Files in ``directory``:
+    snapshot.bin      latest snapshot, tagged with the log generation after it
+    wal-<gen>.log     log segments; segments older than the snapshot are removed
+
+Both files are sequences of frames: ``<length:u32><crc32:u32><payload>``. A
+torn or corrupt trailing log frame (crash mid-write) ends replay at the last
+good frame. Snapshots are written to a temporary file and renamed into place,
+so one that does not read back completely is damaged: ``load`` raises
+``CorruptSnapshotError`` rather than start from partial data.
+
+Payloads are msgpack when available, JSON otherwise. Datetimes, dates, times,
+timedeltas, Decimals, UUIDs and sets are written tagged (msgpack ext types, or
+``{"__persisted_type__": ..., "value": ...}`` objects in JSON) and come back
+as the same types.
+
+Several databases can share one log: each is attached with a name prefix
+(the document database uses ``documents.``), so stores with the same
+attribute name stay apart.
+
+When ``snapshot_every`` log entries have been written, the writer only rolls
+over to a new log segment; the snapshot itself is written by a background
+thread. The snapshot is taken after the roll-over, so it may already contain
+some of the new segment's writes. Replaying them again on load is harmless
+because every logged operation sets absolute values.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct("<II")
+SNAPSHOT_FILE = "snapshot.bin"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_CHUNK = 5000
+DEFAULT_SNAPSHOT_EVERY = 50_000
+
+
+def _timedelta_text(value: timedelta) -> str:
+    return f"{value.days}:{value.seconds}:{value.microseconds}"
+
+
+def _parse_timedelta(text: str) -> timedelta:
+    days, seconds, microseconds = (int(part) for part in text.split(":"))
+    return timedelta(days=days, seconds=seconds, microseconds=microseconds)
+
+
+# (msgpack ext code, JSON tag, type, to text, from text); datetime precedes
+# date because it is a subclass
+TAGGED_TYPES: Tuple[Tuple[int, str, type, Callable[[Any], str], Callable[[str], Any]], ...] = (
+    (1, "datetime", datetime, datetime.isoformat, datetime.fromisoformat),
+    (2, "date", date, date.isoformat, date.fromisoformat),
+    (3, "time", time, time.isoformat, time.fromisoformat),
+    (4, "timedelta", timedelta, _timedelta_text, _parse_timedelta),
+    (5, "decimal", Decimal, str, Decimal),
+    (6, "uuid", UUID, str, UUID),
+)
+SET_EXT_CODE = 7
+JSON_TAG = "__persisted_type__"
+
+_FROM_CODE = {code: from_text for code, _, _, _, from_text in TAGGED_TYPES}
+_FROM_TAG = {tag: from_text for _, tag, _, _, from_text in TAGGED_TYPES}
+
+
+def _pack_default(value: Any) -> Any:
+    for code, _, kind, to_text, _ in TAGGED_TYPES:
+        if isinstance(value, kind):
+            return msgpack.ExtType(code, to_text(value).encode())
+    if isinstance(value, (set, frozenset)):
+        return msgpack.ExtType(SET_EXT_CODE, _encode(list(value)))
+    return str(value)
+
+
+def _unpack_ext(code: int, data: bytes) -> Any:
+    if code == SET_EXT_CODE:
+        return set(_decode(data))
+    from_text = _FROM_CODE.get(code)
+    if from_text is None:
+        return msgpack.ExtType(code, data)
+    return from_text(data.decode())
+
+
+def _json_default(value: Any) -> Any:
+    for _, tag, kind, to_text, _ in TAGGED_TYPES:
+        if isinstance(value, kind):
+            return {JSON_TAG: tag, "value": to_text(value)}
+    if isinstance(value, (set, frozenset)):
+        return {JSON_TAG: "set", "value": list(value)}
+    return str(value)
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    tag = obj.get(JSON_TAG)
+    if tag is None or len(obj) != 2 or "value" not in obj:
+        return obj
+    if tag == "set":
+        return set(obj["value"])
+    from_text = _FROM_TAG.get(tag)
+    return from_text(obj["value"]) if from_text else obj
+
+
+class CorruptSnapshotError(RuntimeError):
+    """The snapshot file cannot be read completely"""
+
+
+def _encode(obj: Any) -> bytes:
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(obj, use_bin_type=True, default=_pack_default)
+    return json.dumps(obj, default=_json_default, separators=(",", ":")).encode()
+
+
+def _decode(payload) -> Any:
+    if MSGPACK_AVAILABLE:
+        return msgpack.unpackb(payload, raw=False, ext_hook=_unpack_ext)
+    return json.loads(bytes(payload), object_hook=_json_object_hook)
+
+
+def _frame(obj: Any) -> bytes:
+    payload = _encode(obj)
+    return FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _read_frames(buffer) -> Iterator[tuple]:
+    """Yield ``(end_offset, obj)`` for each intact frame in ``buffer``"""
+    offset, size = 0, len(buffer)
+    while offset + FRAME_HEADER.size <= size:
+        length, crc = FRAME_HEADER.unpack_from(buffer, offset)
+        start, end = offset + FRAME_HEADER.size, offset + FRAME_HEADER.size + length
+        if end > size:
+            return
+        payload = buffer[start:end]
+        if zlib.crc32(payload) != crc:
+            return
+        yield end, _decode(payload)
+        offset = end
+
+
+def _record_list(store) -> List[Dict[str, Any]]:
+    """The store's records, copied without blocking its writers"""
+    # Writers do not take the persistence lock, so a copy that races an
+    # insert into a compact store is retried; a plain dict copies atomically
+    for _ in range(10):
+        try:
+            return list(store._records.values())
+        except RuntimeError:
+            continue
+    return list(store._records.values())
+
+
+def _map_file(path: Path) -> Optional[mmap.mmap]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class StorePersistence:
+    """Write-ahead log and snapshots for the ``BaseStore`` members of a Database"""
+
+    def __init__(self, directory: str, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY, fsync: bool = False):
+        self.directory = Path(directory)
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._stores: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        # Held while a snapshot is written, so only one is written at a time
+        self._snapshot_lock = threading.Lock()
+        self._generation = 0
+        self._wal = None
+        self._wal_entries = 0
+        self._replaying = False
+
+        self._checkpointer: Optional[threading.Thread] = None
+        self._checkpoint_due = threading.Event()
+        self._snapshot_pending = False
+        self._stopping = False
+
+    @classmethod
+    def from_env(cls) -> Optional["StorePersistence"]:
+        """Persistence configured by ``STORE_DATA_DIR``, or None when unset"""
+        directory = os.getenv("STORE_DATA_DIR")
+        if not directory:
+            return None
+        return cls(
+            directory,
+            snapshot_every=int(os.getenv("STORE_SNAPSHOT_EVERY", DEFAULT_SNAPSHOT_EVERY)),
+            fsync=os.getenv("STORE_WAL_FSYNC", "false").lower() == "true",
+        )
+
+    def attach(self, database, prefix: str = "") -> None:
+        """Journal every BaseStore attribute of ``database`` under ``prefix`` + its name"""
+        from app.models.store import BaseStore
+
+        for name, store in vars(database).items():
+            if isinstance(store, BaseStore):
+                name = prefix + name
+                self._stores[name] = store
+                store._journal = self._journal_for(name)
+
+    def _journal_for(self, name: str):
+        def journal(op: str, item_id: Optional[str] = None, data: Any = None) -> None:
+            self.append(name, op, item_id, data)
+        return journal
+
+    # -- write-ahead log --------------------------------------------------
+
+    def _wal_path(self, generation: int) -> Path:
+        return self.directory / f"wal-{generation:08d}.log"
+
+    def _open_wal(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._wal = open(self._wal_path(self._generation), "ab")
+
+    def append(self, store: str, op: str, item_id: Optional[str], data: Any) -> None:
+        if self._replaying:
+            return
+        with self._lock:
+            if self._wal is None:
+                self._open_wal()
+            self._wal.write(_frame([store, op, item_id, data]))
+            self._wal.flush()
+            if self.fsync:
+                os.fsync(self._wal.fileno())
+            self._wal_entries += 1
+            if self.snapshot_every and self._wal_entries >= self.snapshot_every:
+                self._rotate()
+                self._schedule_snapshot()
+
+    def _rotate(self) -> None:
+        """Close the current log segment and open the next generation's"""
+        with self._lock:
+            if self._wal is not None:
+                self._wal.close()
+                self._wal = None
+            self._generation += 1
+            self._wal_entries = 0
+            self._open_wal()
+
+    def _apply(self, store_name: str, op: str, item_id: Optional[str], data: Any) -> None:
+        store = self._stores.get(store_name)
+        if store is None:
+            return
+        if op == "put":
+            store.put(data)
+        elif op == "set":
+            store.set_fields(item_id, **data)
+        elif op == "delete":
+            store.delete(item_id)
+        elif op == "clear":
+            store.clear()
+
+    def _replay(self, path: Path) -> int:
+        buffer = _map_file(path)
+        if buffer is None:
+            return 0
+        applied, good_end = 0, 0
+        try:
+            for good_end, (store, op, item_id, data) in _read_frames(buffer):
+                self._apply(store, op, item_id, data)
+                applied += 1
+            size = len(buffer)
+        finally:
+            buffer.close()
+        if good_end < size:
+            logger.warning("Truncating torn tail of %s at byte %d", path.name, good_end)
+            with open(path, "r+b") as f:
+                f.truncate(good_end)
+        return applied
+
+    # -- snapshots --------------------------------------------------------
+
+    def checkpoint(self) -> None:
+        """Start a new log segment and write a snapshot of every attached store"""
+        self._rotate()
+        self._write_snapshot()
+
+    def _schedule_snapshot(self) -> None:
+        """Have the background thread write a snapshot (lock held)"""
+        self._snapshot_pending = True
+        if self._checkpointer is None or not self._checkpointer.is_alive():
+            self._checkpointer = threading.Thread(
+                target=self._checkpoint_loop, name="store-checkpoint", daemon=True
+            )
+            self._checkpointer.start()
+        self._checkpoint_due.set()
+
+    def _checkpoint_loop(self) -> None:
+        while True:
+            self._checkpoint_due.wait()
+            self._checkpoint_due.clear()
+            with self._lock:
+                pending, self._snapshot_pending = self._snapshot_pending, False
+            if pending:
+                try:
+                    self._write_snapshot()
+                except Exception as e:
+                    logger.error(f"Store snapshot failed: {e}")
+            if self._stopping:
+                return
+
+    def _write_snapshot(self) -> None:
+        """Snapshot the stores as of the current log generation"""
+        with self._snapshot_lock:
+            with self._lock:
+                generation = self._generation
+                stores = {name: _record_list(store) for name, store in self._stores.items()}
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.directory / (SNAPSHOT_FILE + ".tmp")
+            with open(tmp, "wb") as f:
+                f.write(_frame({
+                    "version": SNAPSHOT_VERSION,
+                    "generation": generation,
+                    "stores": list(stores),
+                }))
+                for name, records in stores.items():
+                    for start in range(0, len(records), SNAPSHOT_CHUNK):
+                        # dict() copies each record in one step, so writers
+                        # updating it in place cannot break the encoding
+                        chunk = [dict(record) for record in records[start:start + SNAPSHOT_CHUNK]]
+                        f.write(_frame([name, chunk]))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.directory / SNAPSHOT_FILE)
+
+            for path in self.directory.glob("wal-*.log"):
+                if int(path.stem.split("-")[1]) < generation:
+                    path.unlink()
+
+    def load(self) -> bool:
+        """Restore attached stores from disk; False when nothing was persisted"""
+        snapshot = self.directory / SNAPSHOT_FILE
+        segments = sorted(self.directory.glob("wal-*.log")) if self.directory.exists() else []
+        if not snapshot.exists() and not segments:
+            return False
+
+        self._replaying = True
+        try:
+            for store in self._stores.values():
+                store.clear()
+            loaded = 0
+            if snapshot.exists():
+                loaded = self._load_snapshot(snapshot)
+
+            replayed = 0
+            for path in segments:
+                generation = int(path.stem.split("-")[1])
+                if generation >= self._generation:
+                    replayed += self._replay(path)
+                    self._generation = generation
+        finally:
+            self._replaying = False
+
+        self._wal_entries = replayed
+        logger.info("Restored %d snapshot records and %d log entries (generation %d)",
+                    loaded, replayed, self._generation)
+        return True
+
+    def _load_snapshot(self, path: Path) -> int:
+        """Put every snapshot record into its store and adopt the snapshot's generation
+
+        Log segments older than the snapshot are already gone, so a snapshot
+        that cannot be read to its last byte raises CorruptSnapshotError
+        instead of restoring a partial database.
+        """
+        buffer = _map_file(path)
+        if buffer is None:
+            raise CorruptSnapshotError(f"{path.name} is empty")
+        loaded, good_end, header = 0, 0, None
+        try:
+            for good_end, frame in _read_frames(buffer):
+                if header is None:
+                    header = frame
+                    continue
+                name, records = frame
+                store = self._stores.get(name)
+                if store is not None:
+                    for record in records:
+                        store.put(record)
+                    loaded += len(records)
+            size = len(buffer)
+        finally:
+            buffer.close()
+
+        if header is None or good_end < size:
+            logger.error("Snapshot %s is corrupt at byte %d of %d", path.name, good_end, size)
+            raise CorruptSnapshotError(f"{path.name} is corrupt at byte {good_end} of {size}")
+        self._generation = header["generation"]
+        return loaded
+
+    def close(self) -> None:
+        """Finish any pending snapshot and close the log"""
+        checkpointer = self._checkpointer
+        if checkpointer is not None and checkpointer.is_alive():
+            self._stopping = True
+            self._checkpoint_due.set()
+            checkpointer.join()
+            self._stopping = False
+        with self._lock:
+            if self._wal is not None:
+                self._wal.close()
+                self._wal = None
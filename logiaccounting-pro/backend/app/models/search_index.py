@@ -0,0 +1,208 @@
+"""
+In-process text search index for the in-memory stores
+
+Keeps one lowercased, pre-joined copy of a few text fields per record, a
+trigram -> record id posting map for substring queries, and sorted field and
+word-start terms for prefix queries, so the search box no longer lowercases
+every record on every keystroke.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+GRAM = 3
+# Scan instead of intersecting when the rarest query trigram is this common
+SCAN_RATIO = 8
+# Pending terms merged by insort up to this many, by re-sorting beyond
+INSORT_LIMIT = 32
+FIELD_SEP = "\x00"
+WORD_SEPARATORS = frozenset(" -_/.,()")
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def word_starts(text: str) -> Iterator[int]:
+    """Offsets (after the first) where a new word begins in ``text``"""
+    for i in range(1, len(text)):
+        if text[i - 1] in WORD_SEPARATORS and text[i] not in WORD_SEPARATORS:
+            yield i
+
+
+class SortedTerms:
+    """Sorted (term, id) pairs for prefix range scans, merged lazily"""
+
+    def __init__(self):
+        self._items: List[Tuple[str, str]] = []
+        self._pending: Set[Tuple[str, str]] = set()
+
+    def add(self, term: str, item_id: str) -> None:
+        self._pending.add((term, item_id))
+
+    def remove(self, term: str, item_id: str) -> None:
+        entry = (term, item_id)
+        pos = bisect_left(self._items, entry)
+        if pos < len(self._items) and self._items[pos] == entry:
+            del self._items[pos]
+        else:
+            self._pending.discard(entry)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._pending.clear()
+
+    def _merge(self) -> None:
+        if len(self._pending) <= INSORT_LIMIT:
+            for entry in self._pending:
+                insort(self._items, entry)
+        else:
+            self._items.extend(self._pending)
+            self._items.sort()
+        self._pending.clear()
+
+    def prefixed(self, prefix: str) -> Iterator[Tuple[str, str]]:
+        """Entries whose term starts with ``prefix``, in term order"""
+        if self._pending:
+            self._merge()
+        items = self._items
+        i = bisect_left(items, (prefix,))
+        while i < len(items) and items[i][0].startswith(prefix):
+            yield items[i]
+            i += 1
+
+
+class TrigramIndex:
+    """Prefix and substring index over ``fields`` of store records
+
+    Matches rank exact field match, field prefix, word prefix, then plain
+    substring. Prefix levels are ordered by the matched text, substring
+    matches by insertion order.
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = tuple(fields)
+        # "\0ref\0name\0", so one ``in`` test checks every field
+        self._padded: Dict[str, str] = {}
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        self._postings: Dict[str, Set[str]] = {}
+        self._field_terms = SortedTerms()
+        self._word_terms = SortedTerms()
+
+    def __len__(self) -> int:
+        return len(self._padded)
+
+    def _text(self, record: Dict) -> str:
+        return FIELD_SEP + FIELD_SEP.join(
+            str(record.get(field) or "").lower() for field in self.fields
+        ) + FIELD_SEP
+
+    def _terms(self, padded: str) -> Iterator[Tuple[SortedTerms, str]]:
+        for text in padded.split(FIELD_SEP):
+            if text:
+                yield self._field_terms, text
+                for i in word_starts(text):
+                    yield self._word_terms, text[i:]
+
+    def _post(self, item_id: str, padded: str) -> None:
+        self._padded[item_id] = padded
+        postings = self._postings
+        for gram in trigrams(padded):
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = {item_id}
+            else:
+                ids.add(item_id)
+        for terms, term in self._terms(padded):
+            terms.add(term, item_id)
+
+    def _unpost(self, item_id: str, padded: str) -> None:
+        for gram in trigrams(padded):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(item_id)
+                if not ids:
+                    del self._postings[gram]
+        for terms, term in self._terms(padded):
+            terms.remove(term, item_id)
+
+    def add(self, item_id: str, record: Dict) -> None:
+        if item_id in self._padded:
+            self._unpost(item_id, self._padded[item_id])
+        else:
+            self._order[item_id] = self._next_order
+            self._next_order += 1
+        self._post(item_id, self._text(record))
+
+    def remove(self, item_id: str) -> None:
+        padded = self._padded.pop(item_id, None)
+        if padded is None:
+            return
+        del self._order[item_id]
+        self._unpost(item_id, padded)
+
+    def update(self, item_id: str, old: Dict, new: Dict) -> None:
+        if any(old.get(field) != new.get(field) for field in self.fields):
+            self.add(item_id, new)
+
+    def clear(self) -> None:
+        self._padded.clear()
+        self._order.clear()
+        self._postings.clear()
+        self._field_terms.clear()
+        self._word_terms.clear()
+
+    def _matches(self, query: str) -> List[str]:
+        """Ids whose text contains ``query``, in insertion order"""
+        padded = self._padded
+        postings = []
+        if len(query) >= GRAM:
+            for gram in trigrams(query):
+                ids = self._postings.get(gram)
+                if not ids:
+                    return []
+                postings.append(ids)
+            postings.sort(key=len)
+        if not postings or len(postings[0]) > len(padded) // SCAN_RATIO:
+            # unselective query: a straight scan beats intersect-and-sort
+            return [item_id for item_id, text in padded.items() if query in text]
+        result = set(postings[0])
+        for ids in postings[1:]:
+            result &= ids
+            if not result:
+                return []
+        return sorted(
+            (item_id for item_id in result if query in padded[item_id]),
+            key=self._order.__getitem__
+        )
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Ids of records containing ``query`` in any field, best match first"""
+        query = query.lower()
+        if not query:
+            ids = list(self._padded)
+            return ids if limit is None else ids[:limit]
+        if FIELD_SEP in query:
+            return []
+
+        ranked: List[str] = []
+        seen: Set[str] = set()
+        # exact terms sort ahead of longer ones, so the field range yields
+        # exact matches first and prefix matches after them
+        for terms in (self._field_terms, self._word_terms):
+            for _, item_id in terms.prefixed(query):
+                if item_id not in seen:
+                    seen.add(item_id)
+                    ranked.append(item_id)
+                    if limit is not None and len(ranked) >= limit:
+                        return ranked
+
+        if limit is None:
+            ranked += [item_id for item_id in self._matches(query) if item_id not in seen]
+            return ranked
+        for item_id in self._matches(query):
+            if item_id not in seen:
+                ranked.append(item_id)
+                if len(ranked) >= limit:
+                    break
+        return ranked
@@ -3,34 +3,136 @@ In-memory data store for LogiAccounting Pro
 Ready for PostgreSQL/SQLAlchemy migration
 """
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+import heapq
+from bisect import bisect_left, insort
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from app.utils.datetime_utils import utc_now
+from itertools import count, islice
+from typing import Optional, List, Dict, Any, Callable, Iterable, Iterator, Sequence, Tuple, ValuesView
+from app.utils.datetime_utils import utc_now, parse_iso
 from uuid import uuid4
 from passlib.context import CryptContext
+from app.models.compact_records import CompactRecords
+from app.models.persistence import StorePersistence
+from app.models.search_index import TrigramIndex
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__truncate_error=False)
 
 class BaseStore:
-    """Base class for data stores"""
-    
-    def __init__(self):
-        self._data: List[Dict[str, Any]] = []
-    
+    """Base class for data stores
+
+    Records are kept in an ordered id -> record map, so lookups by id are O(1).
+    Subclasses (or callers, via ``indexes=``) can declare fields to keep
+    secondary equality indexes on; ``find_all`` uses the most selective
+    indexed filter to narrow candidates before applying the rest.
+
+    Setting ``schema`` switches storage to compact slotted rows (see
+    ``CompactRecords``); reads then return copies, so such stores must write
+    through ``update``/``set_fields`` rather than mutating returned dicts.
+    """
+
+    indexes: Tuple[str, ...] = ()
+    schema: Optional[Tuple[str, ...]] = None
+    interned: Tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        indexes: Sequence[str] = (),
+        schema: Optional[Sequence[str]] = None,
+        interned: Sequence[str] = ()
+    ):
+        schema = schema or self.schema
+        if schema:
+            self._records = CompactRecords(
+                schema, (*self.interned, *interned), name=f"{type(self).__name__}Row"
+            )
+        else:
+            self._records: Dict[str, Dict[str, Any]] = {}
+        self._index_fields: Tuple[str, ...] = tuple(dict.fromkeys((*self.indexes, *indexes)))
+        # set by StorePersistence.attach: journal(op, item_id, data)
+        self._journal: Optional[Callable[..., None]] = None
+        self._indexes: Dict[str, Dict[Any, Dict[str, None]]] = {
+            field: {} for field in self._index_fields
+        }
+
+    @property
+    def _data(self) -> ValuesView:
+        """Live read-only view of the records; write through put/update/set_fields/delete"""
+        return self._records.values()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _bucket_add(self, field: str, value: Any, item_id: str) -> None:
+        try:
+            self._indexes[field].setdefault(value, {})[item_id] = None
+        except TypeError:
+            pass  # unhashable values are only reachable through a scan
+
+    def _bucket_remove(self, field: str, value: Any, item_id: str) -> None:
+        try:
+            bucket = self._indexes[field].get(value)
+        except TypeError:
+            return
+        if bucket is not None:
+            bucket.pop(item_id, None)
+            if not bucket:
+                del self._indexes[field][value]
+
+    def _index_add(self, item: Dict) -> None:
+        for field in self._index_fields:
+            self._bucket_add(field, item.get(field), item["id"])
+
+    def _index_remove(self, item: Dict) -> None:
+        for field in self._index_fields:
+            self._bucket_remove(field, item.get(field), item["id"])
+
+    def _index_update(self, old: Dict, new: Dict) -> None:
+        """Move a record between buckets only for fields whose value changed"""
+        for field in self._index_fields:
+            if old.get(field) != new.get(field):
+                self._bucket_remove(field, old.get(field), old["id"])
+                self._bucket_add(field, new.get(field), new["id"])
+
+    def _candidates(self, filters: Dict) -> Iterable[Dict]:
+        """Records in the smallest index bucket matching a filter, or every record"""
+        best = None
+        for key, value in filters.items():
+            if key not in self._indexes:
+                continue
+            try:
+                bucket = self._indexes[key].get(value, {})
+            except TypeError:
+                continue
+            if best is None or len(bucket) < len(best):
+                best = bucket
+        if best is None:
+            return self._records.values()
+        records = self._records
+        return (records[item_id] for item_id in best)
+
     def find_all(self, filters: Optional[Dict] = None) -> List[Dict]:
-        results = self._data.copy()
-        if filters:
-            for key, value in filters.items():
-                if value is not None:
-                    results = [item for item in results if item.get(key) == value]
-        return results
-    
+        active = {k: v for k, v in (filters or {}).items() if v is not None}
+        if not active:
+            return list(self._records.values())
+        return [
+            item for item in self._candidates(active)
+            if all(item.get(key) == value for key, value in active.items())
+        ]
+
     def find_by_id(self, item_id: str) -> Optional[Dict]:
-        return next((item for item in self._data if item["id"] == item_id), None)
-    
+        return self._records.get(item_id)
+
+    def find_one_by(self, field: str, value: Any) -> Optional[Dict]:
+        """First record whose ``field`` equals ``value``"""
+        if field in self._indexes:
+            bucket = self._indexes[field].get(value)
+            return self._records[next(iter(bucket))] if bucket else None
+        return next((item for item in self._records.values() if item.get(field) == value), None)
+
     def create(self, data: Dict) -> Dict:
         item = {
             "id": str(uuid4()),
@@ -38,32 +140,66 @@ class BaseStore:
             "created_at": utc_now().isoformat(),
             "updated_at": utc_now().isoformat()
         }
-        self._data.append(item)
+        return self.put(item)
+
+    def put(self, item: Dict) -> Dict:
+        """Insert or replace a complete record (keyed by its ``id``)"""
+        existing = self._records.get(item["id"])
+        self._records[item["id"]] = item
+        if existing is None:
+            self._index_add(item)
+        else:
+            self._index_update(existing, item)
+        if self._journal is not None:
+            self._journal("put", item["id"], item)
         return item
-    
+
     def update(self, item_id: str, data: Dict) -> Optional[Dict]:
-        for i, item in enumerate(self._data):
-            if item["id"] == item_id:
-                self._data[i] = {**item, **data, "updated_at": utc_now().isoformat()}
-                return self._data[i]
-        return None
-    
+        item = self._records.get(item_id)
+        if item is None:
+            return None
+        return self.put({**item, **data, "updated_at": utc_now().isoformat()})
+
+    def set_fields(self, item_id: str, **fields) -> Optional[Dict]:
+        """Update fields of a record in place, keeping indexes consistent"""
+        item = self._records.get(item_id)
+        if item is None:
+            return None
+        old = dict(item)
+        item.update(fields)
+        self._records[item_id] = item
+        self._index_update(old, item)
+        if self._journal is not None:
+            self._journal("set", item_id, fields)
+        return item
+
     def delete(self, item_id: str) -> bool:
-        for i, item in enumerate(self._data):
-            if item["id"] == item_id:
-                self._data.pop(i)
-                return True
-        return False
+        item = self._records.pop(item_id, None)
+        if item is None:
+            return False
+        self._index_remove(item)
+        if self._journal is not None:
+            self._journal("delete", item_id)
+        return True
+
+    def clear(self) -> None:
+        self._records.clear()
+        for index in self._indexes.values():
+            index.clear()
+        if self._journal is not None:
+            self._journal("clear")
 
 
 class UserStore(BaseStore):
     """User data store with password handling"""
+
+    indexes = ("email", "role")
     
     def find_by_email(self, email: str) -> Optional[Dict]:
-        return next((u for u in self._data if u["email"] == email), None)
+        return self.find_one_by("email", email)
     
     def find_all_safe(self) -> List[Dict]:
-        return [{k: v for k, v in u.items() if k != "password"} for u in self._data]
+        return [{k: v for k, v in u.items() if k != "password"} for u in self._records.values()]
     
     def create(self, data: Dict) -> Dict:
         user = super().create({
@@ -73,109 +209,311 @@ class UserStore(BaseStore):
         return {k: v for k, v in user.items() if k != "password"}
     
     def update_password(self, user_id: str, hashed_password: str) -> bool:
-        for user in self._data:
-            if user["id"] == user_id:
-                user["password"] = hashed_password
-                user["updated_at"] = utc_now().isoformat()
-                return True
-        return False
+        return self.set_fields(
+            user_id, password=hashed_password, updated_at=utc_now().isoformat()
+        ) is not None
 
 
 class MaterialStore(BaseStore):
-    """Material/inventory store with advanced filtering"""
+    """Material/inventory store with advanced filtering
+
+    ``search`` filters go through a trigram index over name and reference;
+    matches are ranked exact, prefix, word prefix, then plain substring.
+    """
+
+    indexes = ("reference", "category_id", "location_id", "state")
+
+    def __init__(self, *args, **kwargs):
+        self._text_index = TrigramIndex(("reference", "name"))
+        super().__init__(*args, **kwargs)
+
+    def _index_add(self, item: Dict) -> None:
+        super()._index_add(item)
+        self._text_index.add(item["id"], item)
+
+    def _index_remove(self, item: Dict) -> None:
+        super()._index_remove(item)
+        self._text_index.remove(item["id"])
+
+    def _index_update(self, old: Dict, new: Dict) -> None:
+        super()._index_update(old, new)
+        self._text_index.update(new["id"], old, new)
+
+    def clear(self) -> None:
+        super().clear()
+        self._text_index.clear()
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """Materials whose name or reference contains ``query``, best match first"""
+        records = self._records
+        return [records[item_id] for item_id in self._text_index.search(query, limit)]
     
     def find_all(self, filters: Optional[Dict] = None) -> List[Dict]:
-        results = self._data.copy()
-        if filters:
-            if filters.get("category_id"):
-                results = [m for m in results if m.get("category_id") == filters["category_id"]]
-            if filters.get("location_id"):
-                results = [m for m in results if m.get("location_id") == filters["location_id"]]
-            if filters.get("state"):
-                results = [m for m in results if m.get("state") == filters["state"]]
-            if filters.get("low_stock"):
-                results = [m for m in results if m["quantity"] <= m.get("min_stock", 0)]
-            if filters.get("search"):
-                search = filters["search"].lower()
-                results = [m for m in results if search in m["name"].lower() or search in m.get("reference", "").lower()]
-        return results
+        if not filters:
+            return super().find_all()
+        equal = {key: filters[key] for key in ("category_id", "location_id", "state") if filters.get(key)}
+        limit = filters.get("limit")
+        if filters.get("search"):
+            post_filtered = bool(equal or filters.get("low_stock"))
+            results = self.search(filters["search"], None if post_filtered else limit)
+            if equal:
+                results = [m for m in results if all(m.get(key) == value for key, value in equal.items())]
+        else:
+            results = super().find_all(equal)
+        if filters.get("low_stock"):
+            results = [m for m in results if m["quantity"] <= m.get("min_stock", 0)]
+        return results if limit is None else results[:limit]
     
     def find_by_reference(self, reference: str) -> Optional[Dict]:
-        return next((m for m in self._data if m.get("reference") == reference), None)
+        return self.find_one_by("reference", reference)
     
     def update_quantity(self, material_id: str, delta: float) -> Optional[Dict]:
-        for m in self._data:
-            if m["id"] == material_id:
-                m["quantity"] += delta
-                m["updated_at"] = utc_now().isoformat()
-                return m
-        return None
+        m = self._records.get(material_id)
+        if m is None:
+            return None
+        return self.set_fields(
+            material_id, quantity=m["quantity"] + delta, updated_at=utc_now().isoformat()
+        )
 
 
 class PaymentStore(BaseStore):
-    """Payment store with overdue detection"""
-    
+    """Payment store with overdue detection
+
+    Payments are kept in a due-date ordered index for listings, and unpaid
+    ones in a min-heap of due dates so each overdue sweep only pops the
+    payments that fell due since the previous one.
+    """
+
+    indexes = ("status", "type", "client_id", "supplier_id")
+
+    def __init__(self, *args, **kwargs):
+        self._by_due: List[Tuple[str, int, str]] = []
+        self._due_keys: Dict[str, Tuple[str, int, str]] = {}
+        self._seq: Dict[str, int] = {}
+        self._next_seq = count()
+        self._due_heap: List[Tuple[datetime, str, str]] = []
+        self._scheduled: Dict[str, str] = {}
+        super().__init__(*args, **kwargs)
+
+    def _schedule(self, item: Dict) -> None:
+        """Queue an unpaid payment for the overdue sweep at its due date"""
+        item_id, due = item["id"], item.get("due_date")
+        if item.get("status") in ("paid", "overdue") or not due or self._scheduled.get(item_id) == due:
+            return
+        try:
+            heapq.heappush(self._due_heap, (parse_iso(due), due, item_id))
+        except (ValueError, TypeError, AttributeError):
+            return
+        self._scheduled[item_id] = due
+
+    def _due_add(self, item: Dict) -> None:
+        item_id = item["id"]
+        if item_id not in self._seq:
+            self._seq[item_id] = next(self._next_seq)
+        key = (item.get("due_date") or "", self._seq[item_id], item_id)
+        self._due_keys[item_id] = key
+        insort(self._by_due, key)
+
+    def _due_remove(self, item_id: str) -> None:
+        key = self._due_keys.pop(item_id, None)
+        if key is not None:
+            pos = bisect_left(self._by_due, key)
+            if pos < len(self._by_due) and self._by_due[pos] == key:
+                del self._by_due[pos]
+
+    def _index_add(self, item: Dict) -> None:
+        super()._index_add(item)
+        self._due_add(item)
+        self._schedule(item)
+
+    def _index_remove(self, item: Dict) -> None:
+        super()._index_remove(item)
+        self._due_remove(item["id"])
+
+    def _index_update(self, old: Dict, new: Dict) -> None:
+        super()._index_update(old, new)
+        if old.get("due_date") != new.get("due_date"):
+            self._due_remove(old["id"])
+            self._due_add(new)
+        self._schedule(new)
+
+    def delete(self, item_id: str) -> bool:
+        deleted = super().delete(item_id)
+        if deleted:
+            self._seq.pop(item_id, None)
+            self._scheduled.pop(item_id, None)
+        return deleted
+
+    def clear(self) -> None:
+        super().clear()
+        self._by_due.clear()
+        self._due_keys.clear()
+        self._seq.clear()
+        self._due_heap.clear()
+        self._scheduled.clear()
+
+    def mark_overdue(self, now: Optional[datetime] = None) -> int:
+        """Flag unpaid payments that fell due since the last sweep"""
+        now = now or utc_now()
+        heap = self._due_heap
+        marked = 0
+        while heap and heap[0][0] < now:
+            _, due, item_id = heapq.heappop(heap)
+            if self._scheduled.get(item_id) != due:
+                continue  # superseded by a later due date
+            del self._scheduled[item_id]
+            item = self._records.get(item_id)
+            if item is not None and item.get("status") not in ("paid", "overdue"):
+                self.set_fields(item_id, status="overdue")
+                marked += 1
+        return marked
+
     def find_all(self, filters: Optional[Dict] = None) -> List[Dict]:
-        results = sorted(self._data, key=lambda x: x.get("due_date", ""), reverse=False)
-        now = utc_now()
-        
-        for p in results:
-            if p["status"] != "paid":
-                try:
-                    due_date = datetime.fromisoformat(p["due_date"].replace("Z", ""))
-                    if due_date < now:
-                        p["status"] = "overdue"
-                except (ValueError, KeyError):
-                    pass
-        
-        if filters:
-            if filters.get("status"):
-                results = [p for p in results if p["status"] == filters["status"]]
-            if filters.get("type"):
-                results = [p for p in results if p["type"] == filters["type"]]
-            if filters.get("supplier_id"):
-                results = [p for p in results if p.get("supplier_id") == filters["supplier_id"]]
-            if filters.get("client_id"):
-                results = [p for p in results if p.get("client_id") == filters["client_id"]]
-        
-        return results
+        self.mark_overdue()
+
+        active = {
+            key: filters[key] for key in ("status", "type", "supplier_id", "client_id") if filters.get(key)
+        } if filters else {}
+        if not active:
+            records = self._records
+            return [records[item_id] for _, _, item_id in self._by_due]
+
+        seq = self._seq
+        return sorted(
+            super().find_all(active),
+            key=lambda x: (x.get("due_date") or "", seq[x["id"]])
+        )
     
     def mark_as_paid(self, payment_id: str, paid_date: Optional[str] = None) -> Optional[Dict]:
-        for p in self._data:
-            if p["id"] == payment_id:
-                p["status"] = "paid"
-                p["paid_date"] = paid_date or utc_now().isoformat()
-                p["updated_at"] = utc_now().isoformat()
-                return p
-        return None
+        return self.set_fields(
+            payment_id,
+            status="paid",
+            paid_date=paid_date or utc_now().isoformat(),
+            updated_at=utc_now().isoformat()
+        )
 
 
 class NotificationStore(BaseStore):
-    """Notification store with user/role filtering"""
+    """Notification store with user/role filtering
+
+    Notifications are indexed by ``user_id`` and ``target_role`` (buckets
+    keep creation order), and unread ids are tracked per user, per role and
+    per (user, role) pair so the unread badge is a few ``len`` calls.
+    """
+
+    indexes = ("user_id", "target_role")
+
+    def __init__(self, *args, **kwargs):
+        self._seq: Dict[str, int] = {}
+        self._next_seq = count()
+        self._unread_by_user: Dict[str, Dict[str, None]] = {}
+        self._unread_by_role: Dict[str, Dict[str, None]] = {}
+        self._unread_by_pair: Dict[Tuple[str, str], Dict[str, None]] = {}
+        super().__init__(*args, **kwargs)
+
+    def _unread_sets(self, item: Dict) -> List[Dict[str, None]]:
+        user_id, role = item.get("user_id"), item.get("target_role")
+        sets = []
+        if user_id is not None:
+            sets.append(self._unread_by_user.setdefault(user_id, {}))
+        if role is not None:
+            sets.append(self._unread_by_role.setdefault(role, {}))
+        if user_id is not None and role is not None:
+            sets.append(self._unread_by_pair.setdefault((user_id, role), {}))
+        return sets
+
+    def _track_unread(self, item: Dict, unread: bool) -> None:
+        for unread_ids in self._unread_sets(item):
+            if unread:
+                unread_ids[item["id"]] = None
+            else:
+                unread_ids.pop(item["id"], None)
+
+    def _index_add(self, item: Dict) -> None:
+        super()._index_add(item)
+        if item["id"] not in self._seq:
+            self._seq[item["id"]] = next(self._next_seq)
+        if not item.get("read"):
+            self._track_unread(item, True)
+
+    def _index_remove(self, item: Dict) -> None:
+        super()._index_remove(item)
+        self._track_unread(item, False)
+
+    def _index_update(self, old: Dict, new: Dict) -> None:
+        super()._index_update(old, new)
+        self._track_unread(old, False)
+        if not new.get("read"):
+            self._track_unread(new, True)
+
+    def delete(self, item_id: str) -> bool:
+        deleted = super().delete(item_id)
+        if deleted:
+            self._seq.pop(item_id, None)
+        return deleted
+
+    def clear(self) -> None:
+        super().clear()
+        self._seq.clear()
+        self._unread_by_user.clear()
+        self._unread_by_role.clear()
+        self._unread_by_pair.clear()
+
+    def _newest_ids(self, user_id: str, user_role: str) -> Iterator[str]:
+        """Ids addressed to the user or their role, newest first"""
+        seq = self._seq
+        by_user = self._indexes["user_id"].get(user_id, {})
+        by_role = self._indexes["target_role"].get(user_role, {})
+        last = None
+        for item_id in heapq.merge(reversed(by_user), reversed(by_role), key=seq.__getitem__, reverse=True):
+            if item_id != last:
+                yield item_id
+            last = item_id
     
-    def find_by_user(self, user_id: str, user_role: str) -> List[Dict]:
-        return sorted(
-            [n for n in self._data if n.get("user_id") == user_id or n.get("target_role") == user_role],
-            key=lambda x: x["created_at"],
-            reverse=True
-        )
+    def find_by_user(
+        self,
+        user_id: str,
+        user_role: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        unread_only: bool = False
+    ) -> List[Dict]:
+        records = self._records
+        items = (records[item_id] for item_id in self._newest_ids(user_id, user_role))
+        if unread_only:
+            items = (n for n in items if not n.get("read"))
+        stop = None if limit is None else offset + limit
+        return list(islice(items, offset, stop))
     
     def mark_as_read(self, notif_id: str) -> bool:
-        for n in self._data:
-            if n["id"] == notif_id:
-                n["read"] = True
-                return True
-        return False
+        return self.set_fields(notif_id, read=True) is not None
     
     def mark_all_as_read(self, user_id: str, user_role: str) -> bool:
-        for n in self._data:
-            if n.get("user_id") == user_id or n.get("target_role") == user_role:
-                n["read"] = True
+        unread = {
+            **self._unread_by_user.get(user_id, {}),
+            **self._unread_by_role.get(user_role, {})
+        }
+        for notif_id in unread:
+            self.set_fields(notif_id, read=True)
         return True
     
     def get_unread_count(self, user_id: str, user_role: str) -> int:
-        return len([n for n in self._data 
-                   if (n.get("user_id") == user_id or n.get("target_role") == user_role) and not n.get("read")])
+        return (
+            len(self._unread_by_user.get(user_id, ()))
+            + len(self._unread_by_role.get(user_role, ()))
+            - len(self._unread_by_pair.get((user_id, user_role), ()))
+        )
+
+
+# Fixed schemas for the high-volume stores, kept in compact rows when
+# STORE_COMPACT_ROWS is set: less memory per record, but every read rebuilds
+# a dict (see scripts/benchmark_store_memory.py for both figures)
+MOVEMENT_SCHEMA = ("type", "material_id", "quantity", "project_id", "notes", "created_by")
+TRANSACTION_SCHEMA = (
+    "type", "category_id", "project_id", "amount", "tax_amount", "description", "date",
+    "invoice_number", "created_by", "client_id", "supplier_id", "vendor_name", "reconciled"
+)
+TRANSACTION_INTERNED = ("type", "category_id", "project_id", "created_by", "client_id", "supplier_id")
 
 
 class Database:
@@ -183,12 +521,21 @@ class Database:
 
     def __init__(self):
         self.users = UserStore()
-        self.categories = BaseStore()
+        self.categories = BaseStore(indexes=("type",))
         self.locations = BaseStore()
         self.materials = MaterialStore()
-        self.projects = BaseStore()
-        self.movements = BaseStore()
-        self.transactions = BaseStore()
+        self.projects = BaseStore(indexes=("status", "client_id"))
+        compact = os.getenv("STORE_COMPACT_ROWS", "false").lower() == "true"
+        self.movements = BaseStore(
+            indexes=("type", "material_id", "project_id"),
+            schema=MOVEMENT_SCHEMA if compact else None,
+            interned=("type", "material_id", "project_id", "created_by")
+        )
+        self.transactions = BaseStore(
+            indexes=("type", "category_id", "project_id", "client_id", "supplier_id"),
+            schema=TRANSACTION_SCHEMA if compact else None,
+            interned=TRANSACTION_INTERNED
+        )
         self.payments = PaymentStore()
         self.notifications = NotificationStore()
 
@@ -202,13 +549,42 @@ class Database:
         self.external_identities = UserExternalIdentityStore()
         self.scim_logs = SCIMSyncLogStore()
 
+        # Snapshot + write-ahead log, when STORE_DATA_DIR is configured
+        self.persistence: Optional[StorePersistence] = None
+
 
 # Global database instance
 db = Database()
 
 
 def init_database():
-    """Initialize database with demo data"""
+    """Initialize database, restoring persisted state or seeding demo data"""
+    # Phase 13 Document Database
+    from app.models.document_store import doc_db, init_document_database
+
+    persistence = StorePersistence.from_env()
+    if persistence is not None:
+        persistence.attach(db)
+        persistence.attach(doc_db, prefix="documents.")
+        db.persistence = persistence
+        if persistence.load():
+            logger.info("Database restored from %s: Users=%d, Materials=%d, Transactions=%d, Documents=%d",
+                        persistence.directory, len(db.users), len(db.materials), len(db.transactions),
+                        len(doc_db.documents))
+            # Data persisted before the document stores were journaled
+            if not len(doc_db.categories):
+                init_document_database()
+            return
+
+    _seed_demo_data()
+    init_document_database()
+
+    if persistence is not None:
+        persistence.checkpoint()
+
+
+def _seed_demo_data():
+    """Populate the stores with demo data"""
     
     # Demo users
     db.users.create({
@@ -254,8 +630,7 @@ def init_database():
         {"name": "Labor Costs", "type": "expense"},
         {"name": "Utilities", "type": "expense"},
     ]
-    for cat in categories:
-        db.categories.create(cat)
+    categories = [db.categories.create(cat) for cat in categories]
     
     # Locations
     locations = [
@@ -263,17 +638,16 @@ def init_database():
         {"name": "Secondary Warehouse", "code": "WH-002", "address": "456 Storage Blvd"},
         {"name": "Office Storage", "code": "OF-001", "address": "789 Corporate Dr"},
     ]
-    for loc in locations:
-        db.locations.create(loc)
+    locations = [db.locations.create(loc) for loc in locations]
     
     # Sample materials
     materials = [
-        {"reference": "RM-001", "name": "Steel Sheets", "category_id": db.categories._data[0]["id"], 
-         "location_id": db.locations._data[0]["id"], "quantity": 500, "min_stock": 100, "unit": "sheets", "unit_cost": 45.00, "state": "available"},
-        {"reference": "RM-002", "name": "Aluminum Bars", "category_id": db.categories._data[0]["id"],
-         "location_id": db.locations._data[0]["id"], "quantity": 250, "min_stock": 50, "unit": "bars", "unit_cost": 32.50, "state": "available"},
-        {"reference": "FG-001", "name": "Assembled Module A", "category_id": db.categories._data[1]["id"],
-         "location_id": db.locations._data[1]["id"], "quantity": 75, "min_stock": 20, "unit": "units", "unit_cost": 150.00, "state": "available"},
+        {"reference": "RM-001", "name": "Steel Sheets", "category_id": categories[0]["id"], 
+         "location_id": locations[0]["id"], "quantity": 500, "min_stock": 100, "unit": "sheets", "unit_cost": 45.00, "state": "available"},
+        {"reference": "RM-002", "name": "Aluminum Bars", "category_id": categories[0]["id"],
+         "location_id": locations[0]["id"], "quantity": 250, "min_stock": 50, "unit": "bars", "unit_cost": 32.50, "state": "available"},
+        {"reference": "FG-001", "name": "Assembled Module A", "category_id": categories[1]["id"],
+         "location_id": locations[1]["id"], "quantity": 75, "min_stock": 20, "unit": "units", "unit_cost": 150.00, "state": "available"},
     ]
     for mat in materials:
         db.materials.create(mat)
@@ -283,7 +657,7 @@ def init_database():
         "code": "PRJ-2024-001",
         "name": "Warehouse Automation",
         "client": "TechCorp Industries",
-        "client_id": db.users._data[1]["id"],
+        "client_id": db.users.find_by_email("client@logiaccounting.demo")["id"],
         "description": "Automated inventory management system",
         "budget": 150000,
         "status": "active",
@@ -291,8 +665,4 @@ def init_database():
     })
     
     logger.info("Database initialized with demo data: Users=%d, Categories=%d, Locations=%d",
-                len(db.users._data), len(db.categories._data), len(db.locations._data))
-
-    # Initialize Phase 13 Document Database
-    from app.models.document_store import init_document_database
-    init_document_database()
+                len(db.users), len(db.categories), len(db.locations))
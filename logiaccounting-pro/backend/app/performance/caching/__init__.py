@@ -4,16 +4,18 @@ Caching Module - Multi-layer caching with Redis cluster support.
 Components:
 - redis_client: Redis connection manager with Sentinel support
 - cache_manager: Unified cache interface with L1/L2 caching
+- local_cache: In-process byte-bounded LRU used as the L1 tier
 - cache_keys: Key generation and pattern management
-- decorators: @cached and @invalidate_cache decorators
+- decorators: @cached and @invalidate_cache decorators with single-flight loading
 - invalidation: Event-driven cache invalidation
 - warmup: Cache warming service
 """
 
 from app.performance.caching.redis_client import RedisManager, redis_manager
-from app.performance.caching.cache_manager import CacheManager, cache_manager
+from app.performance.caching.cache_manager import CacheManager, cache_manager, CacheStats
+from app.performance.caching.local_cache import LocalCache
 from app.performance.caching.cache_keys import CacheKeyBuilder, cache_keys, CacheTags, CacheTTL, CacheNamespace
-from app.performance.caching.decorators import cached, invalidate_cache, cache_aside
+from app.performance.caching.decorators import cached, invalidate_cache, cache_aside, SingleFlight
 from app.performance.caching.invalidation import invalidation_service, invalidate_entity
 from app.performance.caching.invalidation import invalidation_service as cache_invalidation_service
 from app.performance.caching.warmup import warmup_service
@@ -24,6 +26,8 @@ __all__ = [
     "redis_manager",
     "CacheManager",
     "cache_manager",
+    "CacheStats",
+    "LocalCache",
     "CacheKeyBuilder",
     "cache_keys",
     "CacheTags",
@@ -31,6 +35,7 @@ __all__ = [
     "cached",
     "invalidate_cache",
     "cache_aside",
+    "SingleFlight",
     "invalidation_service",
     "invalidate_entity",
     "warmup_service",
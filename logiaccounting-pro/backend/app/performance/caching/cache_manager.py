@@ -5,21 +5,34 @@ import asyncio
 import hashlib
 import json
 import logging
-from typing import Any, Optional, Union, List, Callable, TypeVar
-from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Union, List, Callable, TypeVar
+from datetime import datetime
 from functools import wraps
 import pickle
 
 from pydantic import BaseModel
 
+from app.performance.config import settings
 from app.performance.caching.redis_client import redis_manager, RedisConfig
 from app.performance.caching.cache_keys import CacheKeyBuilder
+from app.performance.caching.local_cache import LocalCache, namespace_of
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
 
+class NamespaceStats(BaseModel):
+    """Per-namespace cache statistics."""
+    hits: int = 0
+    misses: int = 0
+    hit_rate: float = 0.0
+    local_hits: int = 0
+    local_misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
 class CacheStats(BaseModel):
     """Cache statistics model."""
     hits: int = 0
@@ -29,6 +42,12 @@ class CacheStats(BaseModel):
     errors: int = 0
     hit_rate: float = 0.0
     avg_latency_ms: float = 0.0
+    local_entries: int = 0
+    local_bytes: int = 0
+    local_max_bytes: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    namespaces: Dict[str, NamespaceStats] = {}
 
 
 class CacheEntry(BaseModel):
@@ -45,7 +64,7 @@ class CacheManager:
     Unified cache manager supporting multiple cache layers and strategies.
 
     Features:
-    - Multi-layer caching (L1: local, L2: Redis)
+    - Multi-layer caching (L1: local byte-bounded LRU, L2: Redis)
     - Tag-based invalidation
     - Cache versioning
     - Statistics tracking
@@ -53,24 +72,26 @@ class CacheManager:
     """
 
     _instance: Optional['CacheManager'] = None
-    _local_cache: dict = {}
-    _local_cache_ttl: dict = {}
+    _local_cache: LocalCache = None
     _stats: CacheStats = None
+    _namespace_hits: Dict[str, List[int]] = {}
     _latencies: List[float] = []
 
     def __new__(cls) -> 'CacheManager':
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._stats = CacheStats()
-            cls._instance._local_cache = {}
-            cls._instance._local_cache_ttl = {}
+            cls._instance._local_cache = LocalCache(
+                max_bytes=settings.CACHE_LOCAL_MAX_BYTES,
+                sweep_interval=settings.CACHE_LOCAL_SWEEP_INTERVAL,
+            )
+            cls._instance._namespace_hits = {}
             cls._instance._latencies = []
         return cls._instance
 
     def __init__(self):
         self.key_builder = CacheKeyBuilder()
-        self._max_local_cache_size = 1000
-        self._local_ttl = 60
+        self._local_ttl = settings.CACHE_LOCAL_TTL
 
     async def get(
         self,
@@ -95,26 +116,26 @@ class CacheManager:
             if use_local:
                 local_value = self._get_local(key)
                 if local_value is not None:
-                    self._record_hit(start_time)
+                    self._record_hit(start_time, key)
                     return local_value
 
             if not redis_manager.is_available:
-                self._record_miss()
+                self._record_miss(key)
                 return default
 
             redis_client = redis_manager.replica
             raw_value = await redis_client.get(key)
 
             if raw_value is None:
-                self._record_miss()
+                self._record_miss(key)
                 return default
 
             value = self._deserialize(raw_value)
 
             if use_local:
-                self._set_local(key, value)
+                self._set_local(key, value, self._local_ttl, size=len(raw_value))
 
-            self._record_hit(start_time)
+            self._record_hit(start_time, key)
             return value
 
         except Exception as e:
@@ -156,7 +177,7 @@ class CacheManager:
                     await self._register_tags(key, tags, ttl)
 
             if use_local:
-                self._set_local(key, value, min(ttl, self._local_ttl))
+                self._set_local(key, value, min(ttl, self._local_ttl), size=len(serialized))
 
             self._stats.sets += 1
             return True
@@ -310,9 +331,9 @@ class CacheManager:
             for key, value in zip(keys, values):
                 if value is not None:
                     result[key] = self._deserialize(value)
-                    self._record_hit(asyncio.get_event_loop().time())
+                    self._record_hit(asyncio.get_event_loop().time(), key)
                 else:
-                    self._record_miss()
+                    self._record_miss(key)
 
             return result
 
@@ -346,7 +367,7 @@ class CacheManager:
             for key, value in mapping.items():
                 serialized = self._serialize(value)
                 pipe.setex(key, ttl, serialized)
-                self._set_local(key, value)
+                self._set_local(key, value, min(ttl, self._local_ttl), size=len(serialized))
 
             await pipe.execute()
             self._stats.sets += len(mapping)
@@ -357,45 +378,26 @@ class CacheManager:
             return False
 
     def _get_local(self, key: str) -> Optional[Any]:
-        """Get from local cache."""
-        if key not in self._local_cache:
-            return None
-
-        if key in self._local_cache_ttl:
-            if datetime.now() > self._local_cache_ttl[key]:
-                del self._local_cache[key]
-                del self._local_cache_ttl[key]
-                return None
-
-        return self._local_cache[key]
+        """Get from local cache, marking the entry most recently used."""
+        return self._local_cache.get(key)
 
     def _set_local(
         self,
         key: str,
         value: Any,
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        size: Optional[int] = None
     ) -> None:
-        """Set in local cache with LRU eviction."""
-        if len(self._local_cache) >= self._max_local_cache_size:
-            keys_to_remove = list(self._local_cache.keys())[:100]
-            for k in keys_to_remove:
-                self._local_cache.pop(k, None)
-                self._local_cache_ttl.pop(k, None)
-
-        self._local_cache[key] = value
-
-        if ttl:
-            self._local_cache_ttl[key] = datetime.now() + timedelta(seconds=ttl)
+        """Set in local cache, evicting least recently used entries to fit."""
+        self._local_cache.set(key, value, ttl=ttl, size=size)
 
     def _delete_local(self, key: str) -> None:
         """Delete from local cache."""
-        self._local_cache.pop(key, None)
-        self._local_cache_ttl.pop(key, None)
+        self._local_cache.delete(key)
 
     def clear_local_cache(self) -> None:
         """Clear entire local cache."""
         self._local_cache.clear()
-        self._local_cache_ttl.clear()
 
     def _serialize(self, value: Any) -> str:
         """Serialize value for Redis storage."""
@@ -440,20 +442,32 @@ class CacheManager:
         except json.JSONDecodeError:
             return raw
 
-    def _record_hit(self, start_time: float) -> None:
+    def _record_hit(self, start_time: float, key: Optional[str] = None) -> None:
         """Record cache hit."""
         self._stats.hits += 1
+        if key is not None:
+            self._namespace_counts(key)[0] += 1
         latency = (asyncio.get_event_loop().time() - start_time) * 1000
         self._latencies.append(latency)
         if len(self._latencies) > 1000:
             self._latencies = self._latencies[-1000:]
         self._update_stats()
 
-    def _record_miss(self) -> None:
+    def _record_miss(self, key: Optional[str] = None) -> None:
         """Record cache miss."""
         self._stats.misses += 1
+        if key is not None:
+            self._namespace_counts(key)[1] += 1
         self._update_stats()
 
+    def _namespace_counts(self, key: str) -> List[int]:
+        """[hits, misses] of the key's namespace."""
+        namespace = namespace_of(key)
+        counts = self._namespace_hits.get(namespace)
+        if counts is None:
+            counts = self._namespace_hits[namespace] = [0, 0]
+        return counts
+
     def _update_stats(self) -> None:
         """Update calculated statistics."""
         total = self._stats.hits + self._stats.misses
@@ -464,12 +478,37 @@ class CacheManager:
             self._stats.avg_latency_ms = sum(self._latencies) / len(self._latencies)
 
     def get_stats(self) -> CacheStats:
-        """Get cache statistics."""
-        return self._stats.model_copy()
+        """Get cache statistics, with L1 usage and per-namespace counters."""
+        local = self._local_cache
+        counters = local.namespace_counters()
+        namespaces = {}
+        for namespace in self._namespace_hits.keys() | counters.keys():
+            hits, misses = self._namespace_hits.get(namespace, (0, 0))
+            local_counts = counters.get(namespace)
+            namespaces[namespace] = NamespaceStats(
+                hits=hits,
+                misses=misses,
+                hit_rate=hits / (hits + misses) if hits + misses else 0.0,
+                local_hits=local_counts.hits if local_counts else 0,
+                local_misses=local_counts.misses if local_counts else 0,
+                evictions=local_counts.evictions if local_counts else 0,
+                expirations=local_counts.expirations if local_counts else 0,
+            )
+
+        return self._stats.model_copy(update={
+            "local_entries": len(local),
+            "local_bytes": local.bytes_used,
+            "local_max_bytes": local.max_bytes,
+            "evictions": sum(c.evictions for c in counters.values()),
+            "expirations": sum(c.expirations for c in counters.values()),
+            "namespaces": namespaces,
+        })
 
     def reset_stats(self) -> None:
         """Reset cache statistics."""
         self._stats = CacheStats()
+        self._namespace_hits = {}
+        self._local_cache.reset_counters()
         self._latencies = []
 
 
@@ -1,13 +1,33 @@
 """
 Cache decorators for automatic caching and invalidation.
+
+Concurrent misses on the same key share one computation (single-flight)
+instead of each recomputing it. Two options serve cached values while a
+refresh runs in the background:
+
+- ``stale_ttl``: once the ``ttl`` has passed the value is kept for this many
+  more seconds, and requests in that window get the stale value while one
+  refresh runs (stale-while-revalidate).
+- ``early_expiry_beta``: each request may start that refresh before the ``ttl``
+  is up, with a probability that grows as expiry nears and with how long
+  the value took to compute (probabilistic early expiration). 1.0 is the
+  usual setting; higher refreshes earlier.
+
+With either option set, the value is cached inside an envelope that records
+when it goes stale and how long it took to compute.
 """
 import asyncio
 import functools
 import inspect
 import logging
-from typing import Any, Callable, List, Optional, Union, TypeVar
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Union, TypeVar
 from datetime import datetime
 
+from pydantic import BaseModel
+
 from app.performance.caching.cache_manager import cache_manager
 from app.performance.caching.cache_keys import (
     CacheKeyBuilder,
@@ -20,6 +40,132 @@ logger = logging.getLogger(__name__)
 
 F = TypeVar('F', bound=Callable[..., Any])
 
+ENVELOPE_MARKER = "_revalidate"
+
+
+class SingleFlight:
+    """
+    One in-flight call per key; concurrent callers await the same result.
+
+    The call runs in its own task, so a caller that gives up (cancelled or
+    timed out) does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._background: Set[asyncio.Future] = set()
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    def _start(self, key: str, fn: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+
+            def _done(f: asyncio.Future) -> None:
+                if self._calls.get(key) is f:
+                    del self._calls[key]
+
+            future.add_done_callback(_done)
+        return future
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn for key, or join the run already in progress."""
+        return await asyncio.shield(self._start(key, fn))
+
+    def refresh(self, key: str, fn: Callable[[], Awaitable[Any]]) -> None:
+        """Start fn for key in the background unless it is already running."""
+        if key in self._calls:
+            return
+        future = self._start(key, fn)
+        self._background.add(future)
+
+        def _log(f: asyncio.Future) -> None:
+            self._background.discard(f)
+            if not f.cancelled() and f.exception() is not None:
+                logger.warning(f"Background cache refresh failed for {key}: {f.exception()}")
+
+        future.add_done_callback(_log)
+
+
+cache_flights = SingleFlight()
+
+
+def _envelope(value: Any, ttl: int, compute_seconds: float) -> dict:
+    """Cached form of a value that may be served stale or refreshed early."""
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+    return {
+        ENVELOPE_MARKER: True,
+        "value": value,
+        "fresh_until": time.time() + ttl,
+        "compute_seconds": compute_seconds,
+    }
+
+
+def _needs_refresh(entry: dict, early_expiry_beta: float) -> bool:
+    """Past its TTL, or picked for early refresh by XFetch."""
+    remaining = entry["fresh_until"] - time.time()
+    if remaining <= 0:
+        return True
+    if early_expiry_beta <= 0:
+        return False
+    # -log(U) is Exp(1): usually small, occasionally large, so a refresh
+    # becomes likely only within a few compute times of expiry
+    early = entry["compute_seconds"] * early_expiry_beta * -math.log(1.0 - random.random())
+    return early >= remaining
+
+
+async def _read_through(
+    cache_key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl: int,
+    tags: Optional[List[str]] = None,
+    use_local: bool = True,
+    cache_none: bool = True,
+    use_single_flight: bool = True,
+    stale_ttl: int = 0,
+    early_expiry_beta: float = 0.0
+) -> Any:
+    """Cached value for a key, computing and storing it on a miss."""
+    revalidate = stale_ttl > 0 or early_expiry_beta > 0
+
+    async def load() -> Any:
+        started = time.monotonic()
+        result = await compute()
+        if result is not None or cache_none:
+            if revalidate:
+                await cache_manager.set(
+                    cache_key,
+                    _envelope(result, ttl, time.monotonic() - started),
+                    ttl=ttl + stale_ttl,
+                    tags=tags,
+                    use_local=use_local
+                )
+            else:
+                await cache_manager.set(cache_key, result, ttl=ttl, tags=tags, use_local=use_local)
+        return result
+
+    cached_value = await cache_manager.get(cache_key, use_local=use_local)
+    if cached_value is not None:
+        if not revalidate:
+            logger.debug(f"Cache HIT: {cache_key}")
+            return cached_value
+        if isinstance(cached_value, dict) and cached_value.get(ENVELOPE_MARKER):
+            if _needs_refresh(cached_value, early_expiry_beta):
+                logger.debug(f"Cache REVALIDATE: {cache_key}")
+                cache_flights.refresh(cache_key, load)
+            else:
+                logger.debug(f"Cache HIT: {cache_key}")
+            return cached_value["value"]
+
+    logger.debug(f"Cache MISS: {cache_key}")
+    if use_single_flight:
+        return await cache_flights.do(cache_key, load)
+    return await load()
+
 
 def cached(
     namespace: CacheNamespace = CacheNamespace.API,
@@ -29,7 +175,10 @@ def cached(
     skip_cache_if: Optional[Callable[..., bool]] = None,
     use_local: bool = True,
     tenant_from: str = "tenant_id",
-    prefix: Optional[str] = None
+    prefix: Optional[str] = None,
+    single_flight: bool = True,
+    stale_ttl: int = 0,
+    early_expiry_beta: float = 0.0
 ) -> Callable[[F], F]:
     """
     Decorator for automatic caching of function results.
@@ -43,6 +192,9 @@ def cached(
         use_local: Use local L1 cache
         tenant_from: Parameter name for tenant_id
         prefix: Custom key prefix
+        single_flight: Concurrent misses on a key share one call
+        stale_ttl: Seconds past ttl a value is served while it refreshes
+        early_expiry_beta: Probabilistic early refresh factor (0 disables)
 
     Usage:
         @cached(namespace=CacheNamespace.API, ttl=300)
@@ -55,8 +207,13 @@ def cached(
         )
         async def get_invoice(tenant_id: str, invoice_id: str):
             ...
+
+        @cached(namespace=CacheNamespace.DASHBOARD, ttl=300, stale_ttl=60, early_expiry_beta=1.0)
+        async def get_dashboard(tenant_id: str):
+            ...
     """
     cache_key_builder = CacheKeyBuilder()
+    use_single_flight = single_flight
 
     def decorator(func: F) -> F:
         @functools.wraps(func)
@@ -87,29 +244,21 @@ def cached(
                     params=hashable_params
                 )
 
-            cached_value = await cache_manager.get(cache_key, use_local=use_local)
-            if cached_value is not None:
-                logger.debug(f"Cache HIT: {cache_key}")
-                return cached_value
-
-            logger.debug(f"Cache MISS: {cache_key}")
-
-            result = await func(*args, **kwargs)
-
             tags = []
             if tags_builder:
                 tags = tags_builder(**params)
 
-            await cache_manager.set(
+            return await _read_through(
                 cache_key,
-                result,
+                lambda: func(*args, **kwargs),
                 ttl=ttl,
                 tags=tags,
-                use_local=use_local
+                use_local=use_local,
+                use_single_flight=use_single_flight,
+                stale_ttl=stale_ttl,
+                early_expiry_beta=early_expiry_beta
             )
 
-            return result
-
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs) -> Any:
             return asyncio.get_event_loop().run_until_complete(
@@ -204,7 +353,10 @@ def invalidate_cache(
 def cache_aside(
     key_builder: Callable[..., str],
     ttl: int = CacheTTL.MEDIUM,
-    loader: Optional[Callable[..., Any]] = None
+    loader: Optional[Callable[..., Any]] = None,
+    single_flight: bool = True,
+    stale_ttl: int = 0,
+    early_expiry_beta: float = 0.0
 ) -> Callable[[F], F]:
     """
     Cache-aside pattern decorator.
@@ -214,6 +366,8 @@ def cache_aside(
     3. Store in cache
     4. Return result
 
+    single_flight, stale_ttl and early_expiry_beta work as in ``cached``.
+
     Usage:
         @cache_aside(
             key_builder=lambda user_id: f"user:{user_id}:profile",
@@ -222,6 +376,8 @@ def cache_aside(
         async def get_user_profile(user_id: str):
             ...
     """
+    use_single_flight = single_flight
+
     def decorator(func: F) -> F:
         @functools.wraps(func)
         async def async_wrapper(*args, **kwargs) -> Any:
@@ -232,19 +388,20 @@ def cache_aside(
 
             cache_key = key_builder(**params)
 
-            cached_value = await cache_manager.get(cache_key)
-            if cached_value is not None:
-                return cached_value
-
-            if loader:
-                result = await loader(**params) if asyncio.iscoroutinefunction(loader) else loader(**params)
-            else:
-                result = await func(*args, **kwargs)
-
-            if result is not None:
-                await cache_manager.set(cache_key, result, ttl=ttl)
+            async def compute() -> Any:
+                if loader:
+                    return await loader(**params) if asyncio.iscoroutinefunction(loader) else loader(**params)
+                return await func(*args, **kwargs)
 
-            return result
+            return await _read_through(
+                cache_key,
+                compute,
+                ttl=ttl,
+                cache_none=False,
+                use_single_flight=use_single_flight,
+                stale_ttl=stale_ttl,
+                early_expiry_beta=early_expiry_beta
+            )
 
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
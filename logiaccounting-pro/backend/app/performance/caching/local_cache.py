@@ -0,0 +1,213 @@
+"""
+In-process L1 cache used by the cache manager.
+
+Entries live in an OrderedDict kept in recency order, so a hit and an
+eviction are both O(1). The size limit is counted in bytes: each entry is
+charged its serialized size (the Redis payload when there is one), and the
+least recently used entries are evicted until a new entry fits. Expiry
+times are kept in a min-heap that a background task sweeps, so expired
+entries are released without waiting for a read.
+
+Hits, misses, evictions and expirations are counted per key namespace
+(``CacheNamespace`` for keys built by ``CacheKeyBuilder``).
+"""
+import asyncio
+import heapq
+import logging
+import pickle
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "logiaccounting"
+
+
+def namespace_of(key: str) -> str:
+    """Namespace segment of a cache key."""
+    parts = key.split(":", 2)
+    if parts[0] == KEY_PREFIX and len(parts) > 1:
+        return parts[1]
+    return parts[0] if len(parts) > 1 else "default"
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate bytes held by a value, by its pickled length."""
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class LocalCacheEntry:
+    """A cached value with its charge and expiry."""
+
+    __slots__ = ("value", "size", "expires_at", "namespace")
+
+    def __init__(self, value: Any, size: int, expires_at: Optional[float], namespace: str):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.namespace = namespace
+
+
+class NamespaceCounters:
+    """Hit/miss/eviction counts of one namespace."""
+
+    __slots__ = ("hits", "misses", "evictions", "expirations")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
+class LocalCache:
+    """Byte-bounded LRU cache with heap-driven TTL expiry."""
+
+    # Entry overhead charged on top of the value: key, slots object, dict slot
+    ENTRY_OVERHEAD = 128
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval: float = 1.0
+    ):
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+
+        self._entries: "OrderedDict[str, LocalCacheEntry]" = OrderedDict()
+        self._bytes = 0
+        # (expires_at, key); entries replaced or removed since stay until popped
+        self._expiry: List[Tuple[float, str]] = []
+        self._counters: Dict[str, NamespaceCounters] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry, time.monotonic())
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    def _count(self, namespace: str) -> NamespaceCounters:
+        counters = self._counters.get(namespace)
+        if counters is None:
+            counters = self._counters[namespace] = NamespaceCounters()
+        return counters
+
+    @staticmethod
+    def _expired(entry: LocalCacheEntry, now: float) -> bool:
+        return entry.expires_at is not None and entry.expires_at <= now
+
+    def get(self, key: str) -> Optional[Any]:
+        """Value for a key, or None when absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._count(namespace_of(key)).misses += 1
+            return None
+
+        if self._expired(entry, time.monotonic()):
+            self._remove(key)
+            counters = self._count(entry.namespace)
+            counters.expirations += 1
+            counters.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._count(entry.namespace).hits += 1
+        return entry.value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        size: Optional[int] = None
+    ) -> bool:
+        """Store a value; False when it alone is larger than the cache."""
+        charge = (size if size is not None else estimate_size(value)) + self.ENTRY_OVERHEAD
+        if charge > self.max_bytes:
+            self.delete(key)
+            return False
+
+        self.delete(key)
+        while self._bytes + charge > self.max_bytes:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._count(evicted.namespace).evictions += 1
+
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[key] = LocalCacheEntry(value, charge, expires_at, namespace_of(key))
+        self._bytes += charge
+        if expires_at is not None:
+            heapq.heappush(self._expiry, (expires_at, key))
+            self._ensure_sweeper()
+        return True
+
+    def delete(self, key: str) -> bool:
+        return self._remove(key) is not None
+
+    def _remove(self, key: str) -> Optional[LocalCacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._expiry.clear()
+        self._bytes = 0
+
+    def sweep(self) -> int:
+        """Drop every expired entry; returns how many were removed."""
+        now = time.monotonic()
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._entries.get(key)
+            # Skip heap records of entries since replaced or deleted
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self._count(entry.namespace).expirations += 1
+                removed += 1
+
+        # Stale records pile up when keys are rewritten before expiring
+        if len(self._expiry) > 2 * len(self._entries) + 1024:
+            self._expiry = [
+                (entry.expires_at, key) for key, entry in self._entries.items()
+                if entry.expires_at is not None
+            ]
+            heapq.heapify(self._expiry)
+        return removed
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is not None and not self._sweeper.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside a loop expired entries still go on read or on the next sweep
+            return
+        self._sweeper = loop.create_task(self._sweep_loop(), name="local-cache-sweeper")
+
+    async def _sweep_loop(self) -> None:
+        while self._expiry:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Local cache sweep failed: {e}")
+
+    def namespace_counters(self) -> Dict[str, NamespaceCounters]:
+        return self._counters
+
+    def reset_counters(self) -> None:
+        self._counters = {}
@@ -43,6 +43,11 @@ class PerformanceConfig(BaseSettings):
     CACHE_SHORT_TTL: int = int(os.getenv("CACHE_SHORT_TTL", "60"))
     CACHE_LONG_TTL: int = int(os.getenv("CACHE_LONG_TTL", "3600"))
 
+    # In-process L1 cache
+    CACHE_LOCAL_MAX_BYTES: int = int(os.getenv("CACHE_LOCAL_MAX_BYTES", str(64 * 1024 * 1024)))
+    CACHE_LOCAL_TTL: int = int(os.getenv("CACHE_LOCAL_TTL", "60"))
+    CACHE_LOCAL_SWEEP_INTERVAL: float = float(os.getenv("CACHE_LOCAL_SWEEP_INTERVAL", "1.0"))
+
     # Tracing
     TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
     JAEGER_AGENT_HOST: str = os.getenv("JAEGER_AGENT_HOST", "localhost")
@@ -264,7 +264,7 @@ async def check_cache() -> Dict[str, Any]:
     try:
         from app.performance.caching.cache_manager import cache_manager
 
-        stats = await cache_manager.get_stats()
+        stats = cache_manager.get_stats().model_dump()
 
         return {
             "success": True,
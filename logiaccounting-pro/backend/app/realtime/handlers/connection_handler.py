@@ -9,6 +9,7 @@ from app.realtime.managers.connection_manager import get_connection_manager
 from app.realtime.managers.presence_manager import get_presence_manager
 from app.realtime.managers.room_manager import get_room_manager
 from app.realtime.managers.cursor_manager import get_cursor_manager
+from app.realtime.managers.tick_manager import get_tick_manager
 from app.realtime.utils.message_types import MessageType
 
 logger = logging.getLogger(__name__)
@@ -99,11 +100,7 @@ def register_connection_handlers(sio):
             cursor_manager = get_cursor_manager()
             for room_id in left_rooms:
                 cursor_manager.remove_cursor(room_id, connection.user_id)
-                await sio.emit(
-                    MessageType.CURSOR_REMOVE.value,
-                    {'user_id': connection.user_id},
-                    room=room_id,
-                )
+                get_tick_manager().queue_cursor_remove(room_id, connection.user_id)
                 await sio.emit(
                     MessageType.ROOM_USER_LEFT.value,
                     {
@@ -7,6 +7,7 @@ import logging
 
 from app.realtime.managers.connection_manager import get_connection_manager
 from app.realtime.managers.cursor_manager import get_cursor_manager
+from app.realtime.managers.tick_manager import get_tick_manager
 from app.realtime.utils.message_types import MessageType
 
 logger = logging.getLogger(__name__)
@@ -44,12 +45,7 @@ def register_cursor_handlers(sio):
             selection_end=selection_end,
         )
 
-        await sio.emit(
-            MessageType.CURSOR_MOVE.value,
-            cursor.to_dict(),
-            room=room_id,
-            skip_sid=sid,
-        )
+        get_tick_manager().queue_cursor(room_id, cursor)
 
     @sio.on(MessageType.CURSOR_SYNC.value)
     async def handle_cursor_sync_request(sid, data):
@@ -101,9 +97,4 @@ def register_cursor_handlers(sio):
         cursor_manager = get_cursor_manager()
         cursor_manager.remove_cursor(room_id, connection.user_id)
 
-        await sio.emit(
-            MessageType.CURSOR_REMOVE.value,
-            {'user_id': connection.user_id},
-            room=room_id,
-            skip_sid=sid,
-        )
+        get_tick_manager().queue_cursor_remove(room_id, connection.user_id)
@@ -7,6 +7,7 @@ import logging
 
 from app.realtime.managers.connection_manager import get_connection_manager
 from app.realtime.managers.presence_manager import get_presence_manager
+from app.realtime.managers.tick_manager import get_tick_manager
 from app.realtime.utils.message_types import MessageType
 
 logger = logging.getLogger(__name__)
@@ -60,19 +61,14 @@ def register_presence_handlers(sio):
             )
 
         if presence:
-            tenant_room = f"tenant:{connection.tenant_id}"
-            await sio.emit(
-                MessageType.PRESENCE_UPDATE.value,
-                {
-                    'user_id': connection.user_id,
-                    'user_name': connection.user_name,
-                    'status': presence.status.value,
-                    'current_page': presence.current_page,
-                    'current_entity_type': presence.current_entity_type,
-                    'current_entity_id': presence.current_entity_id,
-                },
-                room=tenant_room,
-            )
+            get_tick_manager().queue_presence(connection.tenant_id, {
+                'user_id': connection.user_id,
+                'user_name': connection.user_name,
+                'status': presence.status.value,
+                'current_page': presence.current_page,
+                'current_entity_type': presence.current_entity_type,
+                'current_entity_id': presence.current_entity_id,
+            })
 
     @sio.on(MessageType.PRESENCE_LIST.value)
     async def handle_presence_list_request(sid, data=None):
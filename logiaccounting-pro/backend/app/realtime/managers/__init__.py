@@ -7,6 +7,7 @@ from .presence_manager import PresenceManager, get_presence_manager
 from .room_manager import RoomManager, get_room_manager
 from .cursor_manager import CursorManager, get_cursor_manager
 from .broadcast_manager import BroadcastManager, get_broadcast_manager
+from .tick_manager import TickManager, get_tick_manager
 
 __all__ = [
     'ConnectionManager', 'get_connection_manager',
@@ -14,4 +15,5 @@ __all__ = [
     'RoomManager', 'get_room_manager',
     'CursorManager', 'get_cursor_manager',
     'BroadcastManager', 'get_broadcast_manager',
+    'TickManager', 'get_tick_manager',
 ]
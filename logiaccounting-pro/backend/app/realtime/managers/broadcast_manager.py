@@ -8,6 +8,7 @@ from typing import Optional, List
 
 from app.realtime.server import get_socketio
 from app.realtime.managers.connection_manager import get_connection_manager
+from app.realtime.managers.tick_manager import get_tick_manager
 from app.realtime.utils.message_types import MessageType
 
 logger = logging.getLogger(__name__)
@@ -26,11 +27,15 @@ class BroadcastManager:
         conn_manager = get_connection_manager()
         sids = conn_manager.get_user_sids(user_id)
 
-        for sid in sids:
-            try:
-                await sio.emit(event, data, room=sid)
-            except Exception as e:
-                logger.error(f"Failed to emit to user {user_id}: {e}")
+        if not sids:
+            return
+
+        # One emit addressed to every sid: the packet is encoded once and
+        # handed to each socket's own engine.io send queue concurrently
+        try:
+            await sio.emit(event, data, room=sids)
+        except Exception as e:
+            logger.error(f"Failed to emit to user {user_id}: {e}")
 
     async def emit_to_tenant(self, tenant_id: str, event: str, data: dict, skip_sid: str = None):
         """Emit event to all users in a tenant"""
@@ -59,13 +64,8 @@ class BroadcastManager:
             logger.error(f"Failed to emit to room {room_id}: {e}")
 
     async def broadcast_presence_update(self, tenant_id: str, presence_data: dict, skip_sid: str = None):
-        """Broadcast presence update to tenant"""
-        await self.emit_to_tenant(
-            tenant_id,
-            MessageType.PRESENCE_UPDATE.value,
-            presence_data,
-            skip_sid=skip_sid
-        )
+        """Queue presence update for the tenant's next broadcast tick"""
+        get_tick_manager().queue_presence(tenant_id, presence_data)
 
     async def broadcast_user_joined(self, tenant_id: str, user_data: dict, skip_sid: str = None):
         """Broadcast user joined event"""
@@ -102,22 +102,12 @@ class BroadcastManager:
         )
 
     async def broadcast_cursor_move(self, room_id: str, cursor_data: dict, skip_sid: str = None):
-        """Broadcast cursor move to room"""
-        await self.emit_to_room(
-            room_id,
-            MessageType.CURSOR_MOVE.value,
-            cursor_data,
-            skip_sid=skip_sid
-        )
+        """Queue cursor move for the room's next broadcast tick"""
+        get_tick_manager().queue_cursor(room_id, cursor_data)
 
     async def broadcast_cursor_remove(self, room_id: str, user_id: str, skip_sid: str = None):
-        """Broadcast cursor removal"""
-        await self.emit_to_room(
-            room_id,
-            MessageType.CURSOR_REMOVE.value,
-            {'user_id': user_id},
-            skip_sid=skip_sid
-        )
+        """Queue cursor removal for the room's next broadcast tick"""
+        get_tick_manager().queue_cursor_remove(room_id, user_id)
 
     async def send_notification(self, user_id: str, notification: dict):
         """Send notification to user"""
@@ -30,6 +30,11 @@ CURSOR_COLORS = [
 class CursorPosition:
     """Represents a cursor position"""
 
+    __slots__ = (
+        'user_id', 'user_name', 'color', 'line', 'column',
+        'selection_start', 'selection_end', 'last_update',
+    )
+
     def __init__(
         self,
         user_id: str,
@@ -69,11 +74,15 @@ class CursorManager:
 
     def __init__(self):
         self.cursors: Dict[str, Dict[str, CursorPosition]] = {}
+        self._colors: Dict[str, str] = {}
 
     def get_user_color(self, user_id: str) -> str:
         """Get consistent color for a user"""
-        hash_val = int(hashlib.md5(user_id.encode()).hexdigest(), 16)
-        return CURSOR_COLORS[hash_val % len(CURSOR_COLORS)]
+        color = self._colors.get(user_id)
+        if color is None:
+            hash_val = int(hashlib.md5(user_id.encode()).hexdigest(), 16)
+            color = self._colors[user_id] = CURSOR_COLORS[hash_val % len(CURSOR_COLORS)]
+        return color
 
     def update_cursor(
         self,
@@ -85,24 +94,30 @@ class CursorManager:
         selection_start: dict = None,
         selection_end: dict = None,
     ) -> CursorPosition:
-        """Update cursor position"""
-        color = self.get_user_color(user_id)
-
-        cursor = CursorPosition(
-            user_id=user_id,
-            user_name=user_name,
-            color=color,
-            line=line,
-            column=column,
-            selection_start=selection_start,
-            selection_end=selection_end,
-        )
-
-        if room_id not in self.cursors:
-            self.cursors[room_id] = {}
-
-        self.cursors[room_id][user_id] = cursor
-
+        """Update cursor position, in place when the user already has one"""
+        room_cursors = self.cursors.get(room_id)
+        if room_cursors is None:
+            room_cursors = self.cursors[room_id] = {}
+
+        cursor = room_cursors.get(user_id)
+        if cursor is None:
+            room_cursors[user_id] = CursorPosition(
+                user_id=user_id,
+                user_name=user_name,
+                color=self.get_user_color(user_id),
+                line=line,
+                column=column,
+                selection_start=selection_start,
+                selection_end=selection_end,
+            )
+            return room_cursors[user_id]
+
+        cursor.user_name = user_name
+        cursor.line = line
+        cursor.column = column
+        cursor.selection_start = selection_start
+        cursor.selection_end = selection_end
+        cursor.last_update = utc_now()
         return cursor
 
     def get_cursor(self, room_id: str, user_id: str) -> Optional[CursorPosition]:
@@ -0,0 +1,241 @@
+"""
+Tick Manager
+Coalesces cursor and presence updates into per-room broadcast ticks
+
+Cursor moves and presence changes are not emitted as they arrive. The latest
+state per user is kept per room, and on each tick every room with pending
+changes gets one batched delta message. An update replaced before the tick
+is never sent, so a room's outgoing rate is capped at the tick rate however
+many editors are moving their cursors.
+
+Batches go to the whole room, sender included; clients skip their own
+user_id.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Union
+
+from app.realtime.server import get_socketio
+from app.realtime.managers.cursor_manager import CursorPosition
+from app.realtime.utils.message_types import MessageType
+
+logger = logging.getLogger(__name__)
+
+TICK_HZ = float(os.getenv('REALTIME_TICK_HZ', '20'))
+
+# Seconds of per-room counts kept for the rate figures
+RATE_WINDOW = 10
+
+
+class RoomTickStats:
+    """Update and message counts of one room"""
+
+    __slots__ = ('updates', 'superseded', 'messages', 'last_active', '_updates', '_messages')
+
+    def __init__(self):
+        self.updates = 0
+        self.superseded = 0
+        self.messages = 0
+        self.last_active = 0.0
+        self._updates: Deque[List[int]] = deque(maxlen=RATE_WINDOW)
+        self._messages: Deque[List[int]] = deque(maxlen=RATE_WINDOW)
+
+    @staticmethod
+    def _count(buckets: Deque[List[int]], second: int, amount: int = 1):
+        if buckets and buckets[-1][0] == second:
+            buckets[-1][1] += amount
+        else:
+            buckets.append([second, amount])
+
+    @staticmethod
+    def _rate(buckets: Deque[List[int]], now: int) -> float:
+        # The current second is still filling, so average the complete ones
+        recent = sum(count for second, count in buckets if 0 < now - second <= RATE_WINDOW)
+        return round(recent / RATE_WINDOW, 2)
+
+    def record_update(self, superseded: bool):
+        self.last_active = time.monotonic()
+        self.updates += 1
+        self.superseded += superseded
+        self._count(self._updates, int(self.last_active))
+
+    def record_message(self):
+        self.last_active = time.monotonic()
+        self.messages += 1
+        self._count(self._messages, int(self.last_active))
+
+    def to_dict(self) -> dict:
+        now = int(time.monotonic())
+        return {
+            'updates': self.updates,
+            'superseded': self.superseded,
+            'messages': self.messages,
+            'updates_per_second': self._rate(self._updates, now),
+            'messages_per_second': self._rate(self._messages, now),
+        }
+
+
+class TickManager:
+    """Per-room latest-state buffers flushed at a fixed tick rate"""
+
+    def __init__(self, tick_hz: float = None):
+        self.interval = 1.0 / (tick_hz or TICK_HZ)
+
+        # room -> user_id -> latest state, replaced until the next tick
+        self._cursors: Dict[str, Dict[str, Union[CursorPosition, dict]]] = {}
+        self._removed: Dict[str, Set[str]] = {}
+        self._presence: Dict[str, Dict[str, dict]] = {}
+
+        self._stats: Dict[str, RoomTickStats] = {}
+        self._ticks = 0
+        self._dirty: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def queue_cursor(self, room_id: str, cursor: Union[CursorPosition, dict]):
+        """Queue a user's cursor for the room's next tick"""
+        user_id = cursor['user_id'] if isinstance(cursor, dict) else cursor.user_id
+        pending = self._cursors.setdefault(room_id, {})
+        superseded = user_id in pending
+        pending[user_id] = cursor
+
+        removed = self._removed.get(room_id)
+        if removed:
+            removed.discard(user_id)
+
+        self._stats_for(room_id).record_update(superseded)
+        self._mark_dirty()
+
+    def queue_cursor_remove(self, room_id: str, user_id: str):
+        """Queue a cursor removal, dropping any move still pending for it"""
+        pending = self._cursors.get(room_id)
+        superseded = bool(pending) and pending.pop(user_id, None) is not None
+        self._removed.setdefault(room_id, set()).add(user_id)
+
+        self._stats_for(room_id).record_update(superseded)
+        self._mark_dirty()
+
+    def queue_presence(self, tenant_id: str, presence: dict):
+        """Queue a user's presence for the tenant room's next tick"""
+        room = f"tenant:{tenant_id}"
+        pending = self._presence.setdefault(room, {})
+        superseded = presence['user_id'] in pending
+        pending[presence['user_id']] = presence
+
+        self._stats_for(room).record_update(superseded)
+        self._mark_dirty()
+
+    def _stats_for(self, room: str) -> RoomTickStats:
+        stats = self._stats.get(room)
+        if stats is None:
+            stats = self._stats[room] = RoomTickStats()
+        return stats
+
+    def _mark_dirty(self):
+        if self._task is None or self._task.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No loop yet; the pending state goes out with the first flush
+                return
+            self._dirty = asyncio.Event()
+            self._task = loop.create_task(self._run(), name='realtime-tick')
+        self._dirty.set()
+
+    async def _run(self):
+        """Sleep while idle; once something is queued, flush one tick later"""
+        while True:
+            await self._dirty.wait()
+            await asyncio.sleep(self.interval)
+            self._dirty.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Realtime tick failed: {e}")
+
+    async def flush(self):
+        """Emit one batched delta per room with pending changes"""
+        cursors, self._cursors = self._cursors, {}
+        removed, self._removed = self._removed, {}
+        presence, self._presence = self._presence, {}
+        if not (cursors or removed or presence):
+            return
+
+        sio = get_socketio()
+        if not sio:
+            logger.warning("Socket.IO not initialized")
+            return
+
+        self._ticks += 1
+        sends = []
+        for room_id in cursors.keys() | removed.keys():
+            pending = cursors.get(room_id, {})
+            sends.append(self._emit(sio, room_id, MessageType.CURSOR_BATCH.value, {
+                'room_id': room_id,
+                'cursors': [
+                    cursor if isinstance(cursor, dict) else cursor.to_dict()
+                    for cursor in pending.values()
+                ],
+                'removed': list(removed.get(room_id, ())),
+            }))
+        for room, pending in presence.items():
+            sends.append(self._emit(sio, room, MessageType.PRESENCE_BATCH.value, {
+                'users': list(pending.values()),
+            }))
+
+        await asyncio.gather(*sends)
+        self._prune()
+
+    async def _emit(self, sio, room: str, event: str, data: dict):
+        try:
+            await sio.emit(event, data, room=room)
+            self._stats_for(room).record_message()
+        except Exception as e:
+            logger.error(f"Failed to emit {event} to room {room}: {e}")
+
+    def _prune(self):
+        """Forget the stats of rooms idle for a full rate window"""
+        cutoff = time.monotonic() - RATE_WINDOW
+        for room in [r for r, s in self._stats.items() if s.last_active < cutoff]:
+            del self._stats[room]
+
+    def get_room_metrics(self, room: str) -> Optional[dict]:
+        """Update and message rates of one room"""
+        stats = self._stats.get(room)
+        return stats.to_dict() if stats else None
+
+    def get_metrics(self) -> dict:
+        """Tick rate, pending updates and per-room rates"""
+        self._prune()
+        return {
+            'tick_hz': round(1.0 / self.interval, 2),
+            'ticks': self._ticks,
+            'pending': (
+                sum(len(p) for p in self._cursors.values())
+                + sum(len(r) for r in self._removed.values())
+                + sum(len(p) for p in self._presence.values())
+            ),
+            'rooms': {room: stats.to_dict() for room, stats in self._stats.items()},
+        }
+
+    async def stop(self):
+        """Cancel the tick task and flush what is pending"""
+        task, self._task = self._task, None
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+
+
+_tick_manager: Optional[TickManager] = None
+
+
+def get_tick_manager() -> TickManager:
+    """Get tick manager singleton"""
+    global _tick_manager
+    if _tick_manager is None:
+        _tick_manager = TickManager()
+    return _tick_manager
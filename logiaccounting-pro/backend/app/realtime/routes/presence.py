@@ -7,6 +7,7 @@ from typing import Optional
 
 from app.realtime.managers.presence_manager import get_presence_manager
 from app.realtime.managers.connection_manager import get_connection_manager
+from app.realtime.managers.tick_manager import get_tick_manager
 
 router = APIRouter(prefix="/api/v1/presence", tags=["Presence"])
 
@@ -98,6 +99,15 @@ async def get_online_count(current_user: dict = Depends(get_current_user)):
     }
 
 
+@router.get("/stats/broadcast")
+async def get_broadcast_stats(current_user: dict = Depends(get_current_user)):
+    """Get cursor/presence tick rate and per-room message rates"""
+    return {
+        'success': True,
+        'metrics': get_tick_manager().get_metrics(),
+    }
+
+
 @router.get("/entity/{entity_type}/{entity_id}")
 async def get_users_viewing_entity(
     entity_type: str,
@@ -20,6 +20,7 @@ class MessageType(str, Enum):
     PRESENCE_LIST = 'presence:list'
     PRESENCE_USER_JOINED = 'presence:user_joined'
     PRESENCE_USER_LEFT = 'presence:user_left'
+    PRESENCE_BATCH = 'presence:batch'
 
     ROOM_JOIN = 'room:join'
     ROOM_LEAVE = 'room:leave'
@@ -30,6 +31,7 @@ class MessageType(str, Enum):
     CURSOR_MOVE = 'cursor:move'
     CURSOR_SYNC = 'cursor:sync'
     CURSOR_REMOVE = 'cursor:remove'
+    CURSOR_BATCH = 'cursor:batch'
 
     DOC_EDIT = 'doc:edit'
     DOC_SYNC = 'doc:sync'
@@ -10,6 +10,9 @@ from app.schemas.schemas import MaterialCreate, MaterialUpdate, CategoryCreate,
 
 router = APIRouter()
 
+# Search results returned when the client asks for no limit
+SEARCH_LIMIT = 50
+
 
 @router.get("/materials")
 async def get_materials(
@@ -18,15 +21,19 @@ async def get_materials(
     state: Optional[str] = None,
     low_stock: bool = False,
     search: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all materials with optional filters"""
+    """Get all materials with optional filters (search results best match first)"""
+    if search and limit is None:
+        limit = SEARCH_LIMIT
     filters = {
         "category_id": category_id,
         "location_id": location_id,
         "state": state,
         "low_stock": low_stock if low_stock else None,
-        "search": search
+        "search": search,
+        "limit": limit
     }
     filters = {k: v for k, v in filters.items() if v}
     
@@ -101,9 +108,7 @@ async def get_categories(
     current_user: dict = Depends(get_current_user)
 ):
     """Get all categories"""
-    if type:
-        return [c for c in db.categories._data if c.get("type") == type]
-    return db.categories._data
+    return db.categories.find_all({"type": type})
 
 
 @router.post("/categories", status_code=status.HTTP_201_CREATED)
@@ -118,7 +123,7 @@ async def create_category(
 @router.get("/locations")
 async def get_locations(current_user: dict = Depends(get_current_user)):
     """Get all locations"""
-    return db.locations._data
+    return db.locations.find_all()
 
 
 @router.post("/locations", status_code=status.HTTP_201_CREATED)
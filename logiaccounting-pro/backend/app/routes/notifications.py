@@ -12,18 +12,20 @@ router = APIRouter()
 @router.get("")
 async def get_notifications(
     unread: bool = False,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get notifications for current user"""
-    notifications = db.notifications.find_by_user(current_user["id"], current_user["role"])
-    
-    if unread:
-        notifications = [n for n in notifications if not n.get("read")]
+    """Get notifications for current user, newest first"""
+    notifications = db.notifications.find_by_user(
+        current_user["id"], current_user["role"],
+        limit=limit, offset=offset, unread_only=unread
+    )
     
     unread_count = db.notifications.get_unread_count(current_user["id"], current_user["role"])
     
     return {
-        "notifications": notifications[:50],
+        "notifications": notifications,
         "unread_count": unread_count
     }
 
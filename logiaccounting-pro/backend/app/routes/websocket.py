@@ -38,10 +38,10 @@ async def websocket_endpoint(
 
                 # Handle ping/pong for keepalive
                 if message.get("type") == "ping":
-                    await websocket.send_json({"type": "pong"})
+                    await ws_manager.send_to_user(user_id, {"type": "pong"})
 
             except json.JSONDecodeError:
                 pass
 
     except WebSocketDisconnect:
-        ws_manager.disconnect(user_id)
+        ws_manager.disconnect(user_id, websocket)
@@ -1,11 +1,20 @@
 """
 Rate Limiting Middleware
 Implements request rate limiting to protect against abuse and DoS attacks.
+
+Counters live in a pluggable backend. The local backend keeps them in
+process memory, so each worker enforces the limit on its own. The Redis
+backend runs each algorithm as a Lua script in one round-trip, so every
+worker shares one counter per key. When Redis cannot be reached it falls
+back to the local backend, which then limits per worker, until a retry
+succeeds.
 """
 
+import logging
+import os
 import time
 import hashlib
-from typing import Optional, Dict, List, Callable, Tuple
+from typing import Any, Optional, Dict, List, Callable, Tuple
 from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum
@@ -13,6 +22,13 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response, JSONResponse
 
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
 
 class RateLimitAlgorithm(str, Enum):
     """Rate limiting algorithms."""
@@ -217,7 +233,7 @@ class RateLimiter:
             entry.tokens = max(0.0, entry.tokens - elapsed * leak_rate)
             entry.last_update = current_time
 
-        is_allowed = entry.tokens < float(limit)
+        is_allowed = entry.tokens + 1.0 <= float(limit)
         if is_allowed:
             entry.tokens += 1.0
 
@@ -230,6 +246,215 @@ class RateLimiter:
         return is_allowed, remaining, reset_time
 
 
+class LocalRateLimitBackend:
+    """Process-local counters, one RateLimiter per algorithm over a shared store."""
+
+    def __init__(self, store: Optional[RateLimitStore] = None):
+        self.store = store or RateLimitStore()
+        self._limiters: Dict[RateLimitAlgorithm, RateLimiter] = {}
+
+    def limiter(self, algorithm: RateLimitAlgorithm) -> RateLimiter:
+        limiter = self._limiters.get(algorithm)
+        if limiter is None:
+            limiter = self._limiters[algorithm] = RateLimiter(algorithm, self.store)
+        return limiter
+
+    async def check_limit(
+        self,
+        algorithm: RateLimitAlgorithm,
+        key: str,
+        limit: int,
+        window_seconds: int,
+    ) -> Tuple[bool, int, int]:
+        result = self.limiter(algorithm).check_limit(key, limit, window_seconds)
+        self.store.cleanup()
+        return result
+
+
+# Each script takes KEYS[1] and ARGV = limit, window seconds, now (seconds,
+# from the caller so every algorithm sees the same clock), and returns
+# {allowed, remaining, reset seconds}. Semantics match RateLimiter: the two
+# window algorithms count rejected requests too, the buckets do not.
+
+FIXED_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local window_end = (math.floor(now / window) + 1) * window
+
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('PEXPIREAT', KEYS[1], math.ceil(window_end * 1000))
+end
+
+local allowed = 0
+if count <= limit then allowed = 1 end
+return {allowed, math.max(0, limit - count), math.floor(window_end - now)}
+"""
+
+# Two-window approximation: the previous window's count weighted by how much
+# of it still overlaps the sliding window, plus the current window's count
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local index = math.floor(now / window)
+
+local state = redis.call('HMGET', KEYS[1], 'index', 'current', 'previous')
+local last = tonumber(state[1])
+local current = tonumber(state[2]) or 0
+local previous = tonumber(state[3]) or 0
+if last == nil or last < index - 1 then
+    current, previous = 0, 0
+elseif last == index - 1 then
+    current, previous = 0, current
+end
+
+current = current + 1
+redis.call('HSET', KEYS[1], 'index', index, 'current', current, 'previous', previous)
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 2000))
+
+local elapsed = (now - index * window) / window
+local count = math.floor(previous * (1 - elapsed)) + current
+local allowed = 0
+if count <= limit then allowed = 1 end
+return {allowed, math.max(0, limit - count), math.floor((index + 1) * window - now)}
+"""
+
+TOKEN_BUCKET_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local rate = limit / window
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1])
+if tokens == nil then
+    tokens = limit
+else
+    tokens = math.min(limit, tokens + math.max(0, now - tonumber(state[2])) * rate)
+end
+
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 1000))
+
+local reset = 0
+if tokens < 1 then reset = math.floor((1 - tokens) / rate) end
+return {allowed, math.floor(tokens), reset}
+"""
+
+LEAKY_BUCKET_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local rate = limit / window
+
+local state = redis.call('HMGET', KEYS[1], 'level', 'updated')
+local level = tonumber(state[1])
+if level == nil then
+    level = 0
+else
+    level = math.max(0, level - math.max(0, now - tonumber(state[2])) * rate)
+end
+
+local allowed = 0
+if level + 1 <= limit then
+    level = level + 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'level', level, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 1000))
+
+local reset = 0
+if level > limit then reset = math.floor((level - limit) / rate) end
+return {allowed, math.max(0, math.floor(limit - level)), reset}
+"""
+
+LUA_SCRIPTS = {
+    RateLimitAlgorithm.FIXED_WINDOW: FIXED_WINDOW_SCRIPT,
+    RateLimitAlgorithm.SLIDING_WINDOW: SLIDING_WINDOW_SCRIPT,
+    RateLimitAlgorithm.TOKEN_BUCKET: TOKEN_BUCKET_SCRIPT,
+    RateLimitAlgorithm.LEAKY_BUCKET: LEAKY_BUCKET_SCRIPT,
+}
+
+
+class RedisRateLimitBackend:
+    """
+    Counters shared by all workers, checked atomically in Redis.
+
+    Each check is one EVALSHA of the algorithm's script; the key carries the
+    algorithm so switching algorithms never reads another's state. On a
+    Redis error the check is answered by the local backend, and Redis is
+    not tried again for ``retry_seconds``.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        fallback: Optional[LocalRateLimitBackend] = None,
+        retry_seconds: float = 5.0,
+    ):
+        self.client = client
+        self.fallback = fallback or LocalRateLimitBackend()
+        self.retry_seconds = retry_seconds
+        self._scripts = {
+            algorithm: client.register_script(script)
+            for algorithm, script in LUA_SCRIPTS.items()
+        }
+        self._retry_at = 0.0
+        self.fallback_checks = 0
+
+    @property
+    def degraded(self) -> bool:
+        """Whether checks are currently answered locally."""
+        return time.time() < self._retry_at
+
+    async def check_limit(
+        self,
+        algorithm: RateLimitAlgorithm,
+        key: str,
+        limit: int,
+        window_seconds: int,
+    ) -> Tuple[bool, int, int]:
+        now = time.time()
+        if now >= self._retry_at:
+            try:
+                allowed, remaining, reset = await self._scripts[algorithm](
+                    keys=[f"{key}:{algorithm.value}"],
+                    args=[limit, window_seconds, repr(now)],
+                )
+                return bool(allowed), int(remaining), int(reset)
+            except Exception as e:
+                if not self.degraded:
+                    logger.warning(f"Redis rate limiting unavailable, using local counters: {e}")
+                self._retry_at = now + self.retry_seconds
+
+        self.fallback_checks += 1
+        return await self.fallback.check_limit(algorithm, key, limit, window_seconds)
+
+
+def create_rate_limit_backend(redis_url: Optional[str] = None):
+    """Redis backend when a URL is configured and redis is installed, else local."""
+    redis_url = redis_url or os.getenv("REDIS_URL")
+    if not redis_url:
+        return LocalRateLimitBackend()
+    if redis_asyncio is None:
+        logger.warning("REDIS_URL is set but the redis package is not installed; rate limits are per worker")
+        return LocalRateLimitBackend()
+
+    client = redis_asyncio.from_url(
+        redis_url,
+        socket_timeout=float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", "0.25")),
+        socket_connect_timeout=float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", "0.25")),
+    )
+    return RedisRateLimitBackend(client)
+
+
 def get_client_ip(request: Request) -> str:
     """Extract client IP from request, considering proxies."""
     forwarded = request.headers.get("X-Forwarded-For")
@@ -259,6 +484,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
     Features:
     - Multiple rate limiting algorithms
+    - Local or Redis-shared counters (see ``create_rate_limit_backend``)
     - Per-IP and per-user limiting
     - Configurable rules for different endpoints
     - Rate limit headers in responses
@@ -275,6 +501,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         key_prefix: str = "ratelimit",
         enable_headers: bool = True,
         store: Optional[RateLimitStore] = None,
+        backend: Optional[Any] = None,
     ):
         super().__init__(app)
         self.default_limit = default_limit
@@ -284,7 +511,10 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         self.excluded_paths = excluded_paths or ["/health", "/metrics", "/docs", "/openapi.json"]
         self.key_prefix = key_prefix
         self.enable_headers = enable_headers
-        self.limiter = RateLimiter(algorithm, store or RateLimitStore())
+        self.backend = backend or LocalRateLimitBackend(store)
+        self.limiter = (
+            self.backend.fallback if isinstance(self.backend, RedisRateLimitBackend) else self.backend
+        ).limiter(algorithm)
 
     def _get_rule_for_request(self, request: Request) -> Optional[RateLimitRule]:
         """Find matching rule for the request."""
@@ -350,9 +580,9 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         window = rule.window_seconds if rule else self.default_window
 
         key = self._get_rate_limit_key(request, rule)
-        is_allowed, remaining, reset = self.limiter.check_limit(key, limit, window)
-
-        self.limiter.store.cleanup()
+        is_allowed, remaining, reset = await self.backend.check_limit(
+            self.algorithm, key, limit, window
+        )
 
         if not is_allowed:
             response = JSONResponse(
@@ -7,7 +7,6 @@ import asyncio
 from typing import Optional, Dict, List, Tuple, Any
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from collections import defaultdict
 from enum import Enum
 import threading
 
@@ -63,63 +62,156 @@ class RateLimitResult:
 
 
 class SlidingWindowCounter:
-    """Sliding window counter implementation."""
-
-    def __init__(self, window_seconds: int, max_requests: int):
+    """
+    Sliding window counter over fixed sub-window buckets.
+
+    Each key holds ``sub_windows + 1`` bucket counts in a ring indexed by
+    absolute bucket number, plus their total. The window count is that total
+    less the share of the oldest bucket that has already slid out of the
+    window, so a check costs the same however many requests the key has
+    seen. Keys are spread over independently locked shards, and a background
+    thread drops keys that have had no requests for a whole window.
+    """
+
+    SHARDS = 64
+    EVICT_INTERVAL_SECONDS = 30
+
+    # Key state layout: [last bucket number, total, ring counts...]
+    _LAST = 0
+    _TOTAL = 1
+    _RING = 2
+
+    def __init__(
+        self,
+        window_seconds: int,
+        max_requests: int,
+        sub_windows: int = 10,
+        shards: int = SHARDS,
+    ):
         self._window_seconds = window_seconds
         self._max_requests = max_requests
-        self._buckets: Dict[str, List[Tuple[float, int]]] = defaultdict(list)
-        self._lock = threading.Lock()
-
-    def _cleanup_old_entries(self, key: str, current_time: float) -> None:
-        """Remove entries older than the window."""
-        cutoff = current_time - self._window_seconds
-        self._buckets[key] = [
-            (ts, count) for ts, count in self._buckets[key]
-            if ts > cutoff
+        self._bucket_seconds = window_seconds / sub_windows
+        self._ring_size = sub_windows + 1
+        self._shards: List[Tuple[Dict[str, List[int]], threading.Lock]] = [
+            ({}, threading.Lock()) for _ in range(shards)
         ]
+        self._stop = threading.Event()
+        self._evictor: Optional[threading.Thread] = None
+        # First writes on different shards race to start the evictor
+        self._evictor_lock = threading.Lock()
+
+    def _shard(self, key: str) -> Tuple[Dict[str, List[int]], threading.Lock]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _advance(self, state: List[int], bucket: int) -> None:
+        """Zero the buckets that came round again since the key's last update."""
+        last = state[self._LAST]
+        if bucket <= last:
+            return
+        if bucket - last >= self._ring_size:
+            for i in range(self._RING, self._RING + self._ring_size):
+                state[i] = 0
+            state[self._TOTAL] = 0
+        else:
+            for b in range(last + 1, bucket + 1):
+                i = self._RING + b % self._ring_size
+                state[self._TOTAL] -= state[i]
+                state[i] = 0
+        state[self._LAST] = bucket
+
+    def _count(self, state: List[int], current_time: float) -> int:
+        """Requests in the window ending now; state must be locked."""
+        position = current_time / self._bucket_seconds
+        bucket = int(position)
+        self._advance(state, bucket)
+        oldest = state[self._RING + (bucket + 1) % self._ring_size]
+        return state[self._TOTAL] - int(oldest * (position - bucket))
 
     def increment(self, key: str, amount: int = 1) -> Tuple[bool, int, int]:
         """Increment counter and check if within limit."""
         current_time = time.time()
+        keys, lock = self._shard(key)
 
-        with self._lock:
-            self._cleanup_old_entries(key, current_time)
+        with lock:
+            state = keys.get(key)
+            if state is None:
+                state = [int(current_time / self._bucket_seconds), 0] + [0] * self._ring_size
+                keys[key] = state
+                if self._evictor is None:
+                    self._start_evictor()
 
-            current_count = sum(count for _, count in self._buckets[key])
+            current_count = self._count(state, current_time)
 
             if current_count + amount > self._max_requests:
                 return False, current_count, self._max_requests - current_count
 
-            self._buckets[key].append((current_time, amount))
+            state[self._RING + state[self._LAST] % self._ring_size] += amount
+            state[self._TOTAL] += amount
             return True, current_count + amount, self._max_requests - current_count - amount
 
     def get_count(self, key: str) -> int:
         """Get current count for a key."""
         current_time = time.time()
+        keys, lock = self._shard(key)
 
-        with self._lock:
-            self._cleanup_old_entries(key, current_time)
-            return sum(count for _, count in self._buckets[key])
+        with lock:
+            state = keys.get(key)
+            return self._count(state, current_time) if state is not None else 0
 
     def reset(self, key: str) -> None:
         """Reset counter for a key."""
-        with self._lock:
-            self._buckets[key] = []
+        keys, lock = self._shard(key)
+        with lock:
+            keys.pop(key, None)
 
     def get_reset_time(self, key: str) -> datetime:
-        """Get when the oldest entry will expire."""
+        """Get when the oldest counted bucket will have slid out of the window."""
         current_time = time.time()
+        keys, lock = self._shard(key)
 
-        with self._lock:
-            self._cleanup_old_entries(key, current_time)
-
-            if not self._buckets[key]:
+        with lock:
+            state = keys.get(key)
+            if state is None:
                 return utc_now()
 
-            oldest = min(ts for ts, _ in self._buckets[key])
-            reset_time = oldest + self._window_seconds
-            return datetime.fromtimestamp(reset_time, tz=None)
+            self._count(state, current_time)
+            bucket = state[self._LAST]
+            for b in range(bucket - self._ring_size + 1, bucket + 1):
+                if state[self._RING + b % self._ring_size]:
+                    reset_time = (b + self._ring_size) * self._bucket_seconds
+                    return datetime.fromtimestamp(reset_time, tz=None)
+            return utc_now()
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys, _ in self._shards)
+
+    def evict_idle(self) -> int:
+        """Drop keys with no requests in the current window."""
+        cutoff = int(time.time() / self._bucket_seconds) - self._ring_size
+        evicted = 0
+        for keys, lock in self._shards:
+            with lock:
+                idle = [key for key, state in keys.items() if state[self._LAST] <= cutoff]
+                for key in idle:
+                    del keys[key]
+            evicted += len(idle)
+        return evicted
+
+    def _start_evictor(self) -> None:
+        """Start the background eviction thread, once."""
+        with self._evictor_lock:
+            if self._evictor is not None:
+                return
+            self._evictor = threading.Thread(target=self._evict_loop, daemon=True)
+            self._evictor.start()
+
+    def _evict_loop(self) -> None:
+        while not self._stop.wait(self.EVICT_INTERVAL_SECONDS):
+            self.evict_idle()
+
+    def close(self) -> None:
+        """Stop the eviction thread."""
+        self._stop.set()
 
 
 class TokenBucket:
@@ -18,6 +18,7 @@ from .permissions import (
     Permission,
     PermissionGroup,
     PermissionRegistry,
+    PermissionMatcher,
     permission_registry,
 )
 
@@ -59,6 +60,7 @@ __all__ = [
     "Permission",
     "PermissionGroup",
     "PermissionRegistry",
+    "PermissionMatcher",
     "permission_registry",
     "PolicyEffect",
     "PolicyPriority",
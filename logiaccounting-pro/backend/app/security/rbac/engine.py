@@ -1,15 +1,19 @@
 """
 RBAC Engine combining roles, permissions, and policies for LogiAccounting Pro.
+
+Each user's effective permissions are compiled once into a
+``PermissionMatcher`` and cached per user and organization. The cache has
+no expiry: the engine listens to its ``RoleManager`` and drops a user's
+entry when their roles change, and every entry when a role definition does.
 """
 
 from dataclasses import dataclass, field
 from typing import Optional, Set, Dict, List, Any, Tuple
-from datetime import datetime
 from enum import Enum
 
 from app.utils.datetime_utils import utc_now
 from .roles import RoleManager, role_manager, SystemRole
-from .permissions import PermissionRegistry, permission_registry, Scope
+from .permissions import PermissionRegistry, PermissionMatcher, permission_registry, Scope
 from .policies import PolicyEngine, policy_engine, PolicyEffect
 
 
@@ -66,8 +70,8 @@ class RBACEngine:
         self._role_manager = role_manager or RoleManager()
         self._permission_registry = permission_registry or PermissionRegistry()
         self._policy_engine = policy_engine or PolicyEngine()
-        self._user_permissions_cache: Dict[str, Tuple[Set[str], datetime]] = {}
-        self._cache_ttl_seconds: int = 300
+        self._user_permissions_cache: Dict[str, PermissionMatcher] = {}
+        self._role_manager.add_listener(self._on_roles_changed)
 
     def check_access(self, request: AccessRequest) -> AccessResult:
         """Evaluate access request and return decision."""
@@ -124,22 +128,22 @@ class RBACEngine:
         )
         primary_role = list(user_roles)[0] if user_roles else None
 
-        policy_result = self._policy_engine.evaluate_with_details(
+        policy_effect, deciding_policy = self._policy_engine.evaluate_with_policy(
             request.resource,
             request.action,
             context,
             primary_role,
         )
 
-        if policy_result["effect"] == PolicyEffect.DENY.value:
+        if policy_effect == PolicyEffect.DENY:
             return AccessResult(
                 decision=AccessDecision.DENY,
                 allowed=False,
                 reason="Access denied by policy",
                 evaluated_permissions=[required_permission],
                 matched_permission=matched,
-                policy_effect=policy_result["effect"],
-                deciding_policy=policy_result["deciding_policy"],
+                policy_effect=policy_effect.value,
+                deciding_policy=deciding_policy,
                 audit_data=self._create_audit_data(request, "policy_denied"),
             )
 
@@ -149,8 +153,8 @@ class RBACEngine:
             reason="Access granted",
             evaluated_permissions=[required_permission],
             matched_permission=matched,
-            policy_effect=policy_result["effect"],
-            deciding_policy=policy_result.get("deciding_policy"),
+            policy_effect=policy_effect.value,
+            deciding_policy=deciding_policy,
             audit_data=self._create_audit_data(request, "granted"),
         )
 
@@ -173,35 +177,40 @@ class RBACEngine:
         self,
         user_id: str,
         organization_id: Optional[str] = None,
-    ) -> Set[str]:
-        """Get user permissions with caching."""
+    ) -> PermissionMatcher:
+        """Get the user's compiled permissions, cached until their roles change."""
         cache_key = f"{user_id}:{organization_id}"
-        cached = self._user_permissions_cache.get(cache_key)
-
-        if cached:
-            permissions, cached_at = cached
-            elapsed = (utc_now() - cached_at).total_seconds()
-            if elapsed < self._cache_ttl_seconds:
-                return permissions
-
-        permissions = self._role_manager.get_effective_permissions(
-            user_id,
-            organization_id,
-        )
-
-        self._user_permissions_cache[cache_key] = (permissions, utc_now())
-        return permissions
+        matcher = self._user_permissions_cache.get(cache_key)
+
+        if matcher is None:
+            matcher = PermissionMatcher(
+                self._role_manager.get_effective_permissions(
+                    user_id,
+                    organization_id,
+                )
+            )
+            self._user_permissions_cache[cache_key] = matcher
+        return matcher
 
     def _check_permission(
         self,
         required: str,
-        granted: Set[str],
+        granted: PermissionMatcher,
     ) -> Tuple[bool, Optional[str]]:
         """Check if required permission is granted."""
-        for perm in granted:
-            if self._permission_registry.matches_permission(required, perm):
-                return True, perm
-        return False, None
+        matched = granted.match(required)
+        return matched is not None, matched
+
+    def _on_roles_changed(
+        self,
+        user_id: Optional[str],
+        organization_id: Optional[str],
+    ) -> None:
+        """Role manager callback dropping the cache entries a change affects."""
+        if user_id is None:
+            self.invalidate_all_cache()
+        else:
+            self.invalidate_user_cache(user_id, organization_id)
 
     def _check_ownership(
         self,
@@ -273,7 +282,6 @@ class RBACEngine:
         )
 
         if success:
-            self.invalidate_user_cache(user_id, organization_id)
             return True, f"Role '{role}' assigned successfully"
 
         return False, "Failed to assign role"
@@ -297,7 +305,6 @@ class RBACEngine:
         )
 
         if success:
-            self.invalidate_user_cache(user_id, organization_id)
             return True, f"Role '{role}' revoked successfully"
 
         return False, "Failed to revoke role"
@@ -316,7 +323,7 @@ class RBACEngine:
         organization_id: Optional[str] = None,
     ) -> Set[str]:
         """Get all effective permissions for a user."""
-        return self._get_user_permissions(user_id, organization_id)
+        return set(self._get_user_permissions(user_id, organization_id).permissions)
 
     def has_permission(
         self,
@@ -387,7 +394,7 @@ class RBACEngine:
         permissions = self._get_user_permissions(user_id, organization_id)
         accessible = []
 
-        for perm in permissions:
+        for perm in permissions.permissions:
             parts = perm.split(":")
             if len(parts) >= 2:
                 resource, perm_action = parts[0], parts[1]
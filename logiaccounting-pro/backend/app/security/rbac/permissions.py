@@ -4,8 +4,9 @@ Permission definitions and registry for LogiAccounting Pro RBAC system.
 
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Optional, Set, Dict, List, Any, Callable
+from typing import Optional, Set, Dict, List, Any, Callable, Iterable, FrozenSet, Tuple
 from datetime import datetime
+from functools import lru_cache
 import re
 
 
@@ -441,4 +442,62 @@ class PermissionRegistry:
         }
 
 
+# Trie key of the granted permission ending at a node; never a segment
+_GRANTED = None
+
+
+@lru_cache(maxsize=4096)
+def _split_permission(name: str) -> Tuple[str, ...]:
+    return tuple(name.split(":"))
+
+
+class PermissionMatcher:
+    """
+    A permission set compiled into a segment trie.
+
+    Matches exactly as ``PermissionRegistry.matches_permission`` against each
+    granted permission: a grant covers a required permission when every one
+    of its segments is ``*`` or equal to the required segment at the same
+    position, so a grant also covers anything it is a prefix of. A check walks
+    the required segments, following the literal and ``*`` children, instead
+    of splitting and comparing every grant.
+    """
+
+    __slots__ = ("permissions", "_root")
+
+    def __init__(self, permissions: Iterable[str]):
+        self.permissions: FrozenSet[str] = frozenset(permissions)
+        self._root: Dict[Optional[str], Any] = {}
+        for permission in self.permissions:
+            node = self._root
+            for part in _split_permission(permission):
+                node = node.setdefault(part, {})
+            node[_GRANTED] = permission
+
+    def __len__(self) -> int:
+        return len(self.permissions)
+
+    def match(self, required: str) -> Optional[str]:
+        """A granted permission covering the required one, or None."""
+        return self._match(self._root, _split_permission(required), 0)
+
+    def _match(self, node: Dict[Optional[str], Any], parts: Tuple[str, ...], depth: int) -> Optional[str]:
+        granted = node.get(_GRANTED)
+        if granted is not None:
+            return granted
+        if depth == len(parts):
+            return None
+
+        child = node.get(parts[depth])
+        if child is not None:
+            granted = self._match(child, parts, depth + 1)
+            if granted is not None:
+                return granted
+
+        wildcard = node.get("*")
+        if wildcard is not None and wildcard is not child:
+            return self._match(wildcard, parts, depth + 1)
+        return None
+
+
 permission_registry = PermissionRegistry()
@@ -1,17 +1,75 @@
 """
 Policy engine for conditional access control in LogiAccounting Pro.
+
+Policies are indexed when added: by exact resource, and by prefix for
+patterns ending in ``*`` (a policy without resources is indexed under the
+empty prefix). Every index bucket is kept in evaluation order, priority
+first and insertion order among equal priorities, so the policies that
+apply to a resource, action and role are found by merging a few buckets.
+That list is memoized until the policy set changes.
+
+Decisions are cached for a few seconds, keyed by the request and by the
+context values the applicable policies' conditions read: condition fields,
+the client IP, ownership fields, and the outcome of any time window. Other
+context keys do not affect the key. Edit a policy by adding it again:
+changes made in place are only picked up as cached decisions expire, and
+changes to its resources, actions, roles or priority not at all.
 """
 
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Any, Callable, Union
+from typing import Optional, Dict, List, Any, Callable, Union, Tuple, Hashable
 from datetime import datetime, time
+from collections import OrderedDict
 from ipaddress import ip_address, ip_network
+import bisect
+import heapq
+import os
 import re
+import time as monotonic_clock
 
 from app.utils.datetime_utils import utc_now
 
 
+POLICY_DECISION_TTL = float(os.getenv("POLICY_DECISION_TTL", "5"))
+POLICY_DECISION_CACHE_SIZE = int(os.getenv("POLICY_DECISION_CACHE_SIZE", "10000"))
+
+# Memoized (resource, action, role) lookups kept before the memo is reset
+APPLICABLE_CACHE_SIZE = 4096
+
+ContextReader = Callable[[Dict[str, Any]], Any]
+
+
+def read_context_path(context: Dict[str, Any], field_path: str) -> Any:
+    """Get value from context using dot notation."""
+    value = context
+    for part in field_path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part)
+        else:
+            return None
+    return value
+
+
+def _path_reader(field_path: str) -> ContextReader:
+    return lambda context: read_context_path(context, field_path)
+
+
+def _client_ip(context: Dict[str, Any]) -> Any:
+    return context.get("ip_address") or context.get("client_ip")
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable, type-tagged form of a context value for a cache key."""
+    if isinstance(value, dict):
+        return dict, tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return type(value), frozenset(value)
+    return type(value), value
+
+
 class PolicyEffect(str, Enum):
     """Policy evaluation result."""
 
@@ -66,14 +124,7 @@ class PolicyCondition:
 
     def _get_field_value(self, context: Dict[str, Any], field_path: str) -> Any:
         """Get value from context using dot notation."""
-        parts = field_path.split(".")
-        value = context
-        for part in parts:
-            if isinstance(value, dict):
-                value = value.get(part)
-            else:
-                return None
-        return value
+        return read_context_path(context, field_path)
 
     def _evaluate_operator(self, field_value: Any) -> bool:
         """Evaluate the operator against field value."""
@@ -260,9 +311,15 @@ class Policy:
         role: Optional[str] = None,
     ) -> bool:
         """Check if policy applies to the request."""
-        if not self.is_active:
-            return False
+        return self.is_active and self.applies_to(resource, action, role)
 
+    def applies_to(
+        self,
+        resource: str,
+        action: str,
+        role: Optional[str] = None,
+    ) -> bool:
+        """Check the policy's resources, actions and roles, ignoring is_active."""
         if self.resources and resource not in self.resources:
             if not any(self._matches_pattern(resource, r) for r in self.resources):
                 return False
@@ -304,38 +361,183 @@ class Policy:
 
         return self.effect
 
+    def context_readers(self) -> Dict[Hashable, ContextReader]:
+        """Readers of the context values this policy's evaluation depends on."""
+        readers: Dict[Hashable, ContextReader] = {}
+        for condition in self.conditions:
+            readers[("field", condition.field)] = _path_reader(condition.field)
+
+        if self.time_condition:
+            window = self.time_condition
+            # Only the window's outcome matters, not the exact current_time
+            readers[(
+                "time", window.start_time, window.end_time, tuple(window.days_of_week),
+            )] = window.evaluate
+
+        if self.ip_condition:
+            readers[("ip",)] = _client_ip
+
+        if self.ownership_condition:
+            ownership = self.ownership_condition
+            for path in (
+                "user_id",
+                "organization_id",
+                f"resource.{ownership.resource_user_field}",
+                f"resource.{ownership.resource_org_field}",
+            ):
+                readers[("field", path)] = _path_reader(path)
+
+        return readers
+
+
+# Evaluation order of a policy: higher priority first, then insertion order
+OrderKey = Tuple[int, int]
+
+
+class ApplicablePolicies:
+    """Policies matching one resource, action and role, in evaluation order."""
+
+    __slots__ = ("policies", "readers")
+
+    def __init__(self, policies: List[Policy]):
+        self.policies = policies
+        readers: Dict[Hashable, ContextReader] = {}
+        for policy in policies:
+            readers.update(policy.context_readers())
+        self.readers: Tuple[ContextReader, ...] = tuple(readers.values())
+
+
+class PolicyDecision:
+    """A cached evaluation outcome."""
+
+    __slots__ = ("expires_at", "effect", "deciding_policy", "policy_results")
+
+    def __init__(
+        self,
+        effect: PolicyEffect,
+        deciding_policy: Optional[str],
+        policy_results: Optional[Tuple[Dict[str, Any], ...]] = None,
+    ):
+        self.expires_at = 0.0
+        self.effect = effect
+        self.deciding_policy = deciding_policy
+        # Only filled when a detailed evaluation ran every applicable policy
+        self.policy_results = policy_results
+
 
 class PolicyEngine:
     """Engine for evaluating access control policies."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        decision_ttl: float = POLICY_DECISION_TTL,
+        decision_cache_size: int = POLICY_DECISION_CACHE_SIZE,
+    ):
         self._policies: Dict[str, Policy] = {}
-        self._policy_cache: Dict[str, PolicyEffect] = {}
-        self._cache_ttl: int = 300
+        self._order: Dict[str, OrderKey] = {}
+        self._sequence = 0
+
+        # Index buckets of (order key, policy), sorted at insert
+        self._ordered: List[Tuple[OrderKey, Policy]] = []
+        self._by_resource: Dict[str, List[Tuple[OrderKey, Policy]]] = {}
+        self._by_prefix: Dict[str, List[Tuple[OrderKey, Policy]]] = {}
+        # policy id -> (index, key) of the buckets it was put in
+        self._index_keys: Dict[str, List[Tuple[Dict[str, List], str]]] = {}
+        self._applicable: Dict[Tuple[str, str, Optional[str]], ApplicablePolicies] = {}
+
+        self._policy_cache: "OrderedDict[Tuple, PolicyDecision]" = OrderedDict()
+        self._cache_ttl = decision_ttl
+        self._cache_size = decision_cache_size
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        self._uncacheable = 0
 
     def add_policy(self, policy: Policy) -> None:
-        """Add a policy to the engine."""
+        """Add a policy to the engine, replacing any with the same ID."""
+        order = self._order.get(policy.id)
+        if order is None:
+            self._sequence += 1
+            sequence = self._sequence
+        else:
+            # A replaced policy keeps its place among equal priorities
+            sequence = order[1]
+            self._unindex(self._policies[policy.id])
+
         self._policies[policy.id] = policy
+        self._order[policy.id] = (-policy.priority, sequence)
+        self._index(policy)
         self._invalidate_cache()
 
     def remove_policy(self, policy_id: str) -> bool:
         """Remove a policy from the engine."""
         if policy_id in self._policies:
-            del self._policies[policy_id]
+            self._unindex(self._policies.pop(policy_id))
+            del self._order[policy_id]
             self._invalidate_cache()
             return True
         return False
 
+    def _index(self, policy: Policy) -> None:
+        order = self._order[policy.id]
+        keys = []
+        for pattern in set(policy.resources or ["*"]):
+            if pattern.endswith("*"):
+                keys.append((self._by_prefix, pattern[:-1]))
+            else:
+                keys.append((self._by_resource, pattern))
+        self._index_keys[policy.id] = keys
+
+        buckets = [self._ordered] + [index.setdefault(key, []) for index, key in keys]
+        for bucket in buckets:
+            bucket.insert(bisect.bisect_left(bucket, (order,)), (order, policy))
+
+    def _unindex(self, policy: Policy) -> None:
+        order = self._order[policy.id]
+        for index, key in [(None, None)] + self._index_keys.pop(policy.id):
+            bucket = self._ordered if index is None else index[key]
+            position = bisect.bisect_left(bucket, (order,))
+            if position < len(bucket) and bucket[position][0] == order:
+                del bucket[position]
+            if index is not None and not bucket:
+                del index[key]
+
+    def _applicable_policies(
+        self,
+        resource: str,
+        action: str,
+        role: Optional[str],
+    ) -> ApplicablePolicies:
+        """Policies for a request, merged from the resource's index buckets."""
+        key = (resource, action, role)
+        applicable = self._applicable.get(key)
+        if applicable is not None:
+            return applicable
+
+        buckets = [self._by_resource.get(resource)]
+        buckets.extend(self._by_prefix.get(resource[:i]) for i in range(len(resource) + 1))
+
+        policies = []
+        last_order = None
+        for order, policy in heapq.merge(*(b for b in buckets if b)):
+            # A policy in several matching buckets comes up once per bucket
+            if order != last_order and policy.applies_to(resource, action, role):
+                policies.append(policy)
+            last_order = order
+
+        if len(self._applicable) >= APPLICABLE_CACHE_SIZE:
+            self._applicable.clear()
+        applicable = self._applicable[key] = ApplicablePolicies(policies)
+        return applicable
+
     def get_policy(self, policy_id: str) -> Optional[Policy]:
         """Get a policy by ID."""
         return self._policies.get(policy_id)
 
     def get_all_policies(self, active_only: bool = True) -> List[Policy]:
         """Get all policies, optionally filtered by active status."""
-        policies = list(self._policies.values())
-        if active_only:
-            policies = [p for p in policies if p.is_active]
-        return sorted(policies, key=lambda p: p.priority, reverse=True)
+        return [p for _, p in self._ordered if p.is_active or not active_only]
 
     def evaluate(
         self,
@@ -345,21 +547,18 @@ class PolicyEngine:
         role: Optional[str] = None,
     ) -> PolicyEffect:
         """Evaluate all applicable policies and determine access."""
-        applicable_policies = [
-            p for p in self._policies.values()
-            if p.matches_request(resource, action, role)
-        ]
-
-        applicable_policies.sort(key=lambda p: p.priority, reverse=True)
+        return self._decide(resource, action, context, role, details=False).effect
 
-        for policy in applicable_policies:
-            result = policy.evaluate(context)
-            if result == PolicyEffect.DENY:
-                return PolicyEffect.DENY
-            if result == PolicyEffect.ALLOW:
-                return PolicyEffect.ALLOW
-
-        return PolicyEffect.ABSTAIN
+    def evaluate_with_policy(
+        self,
+        resource: str,
+        action: str,
+        context: Dict[str, Any],
+        role: Optional[str] = None,
+    ) -> Tuple[PolicyEffect, Optional[str]]:
+        """Evaluate policies and return the effect with the deciding policy ID."""
+        decision = self._decide(resource, action, context, role, details=False)
+        return decision.effect, decision.deciding_policy
 
     def evaluate_with_details(
         self,
@@ -369,42 +568,123 @@ class PolicyEngine:
         role: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Evaluate policies and return detailed results."""
-        applicable_policies = [
-            p for p in self._policies.values()
-            if p.matches_request(resource, action, role)
-        ]
-
-        applicable_policies.sort(key=lambda p: p.priority, reverse=True)
+        decision = self._decide(resource, action, context, role, details=True)
+        return {
+            "effect": decision.effect.value,
+            "deciding_policy": decision.deciding_policy,
+            "evaluated_policies": len(decision.policy_results),
+            "policy_results": [dict(result) for result in decision.policy_results],
+        }
 
+    def _decide(
+        self,
+        resource: str,
+        action: str,
+        context: Dict[str, Any],
+        role: Optional[str],
+        details: bool,
+    ) -> PolicyDecision:
+        """Cached evaluation of the policies applicable to a request."""
+        applicable = self._applicable_policies(resource, action, role)
+        if not applicable.policies:
+            return PolicyDecision(PolicyEffect.ABSTAIN, None, ())
+
+        key = None
+        if self._cache_ttl > 0:
+            try:
+                key = (resource, action, role, tuple(_freeze(read(context)) for read in applicable.readers))
+                hash(key)
+            except TypeError:
+                key = None
+                self._uncacheable += 1
+
+        now = monotonic_clock.monotonic()
+        if key is not None:
+            decision = self._policy_cache.get(key)
+            if decision is not None:
+                if decision.expires_at <= now:
+                    del self._policy_cache[key]
+                    self._expired += 1
+                elif decision.policy_results is not None or not details:
+                    self._policy_cache.move_to_end(key)
+                    self._hits += 1
+                    return decision
+            self._misses += 1
+
+        decision = self._evaluate_policies(applicable.policies, context, details)
+        if key is not None:
+            decision.expires_at = now + self._cache_ttl
+            self._policy_cache[key] = decision
+            self._policy_cache.move_to_end(key)
+            while len(self._policy_cache) > self._cache_size:
+                self._policy_cache.popitem(last=False)
+                self._evictions += 1
+        return decision
+
+    def _evaluate_policies(
+        self,
+        policies: List[Policy],
+        context: Dict[str, Any],
+        details: bool,
+    ) -> PolicyDecision:
+        """Run policies in order; without details, stop at the first decision."""
         evaluation_results = []
         final_effect = PolicyEffect.ABSTAIN
         deciding_policy = None
 
-        for policy in applicable_policies:
+        for policy in policies:
+            if not policy.is_active:
+                continue
             result = policy.evaluate(context)
-            evaluation_results.append({
-                "policy_id": policy.id,
-                "policy_name": policy.name,
-                "priority": policy.priority,
-                "effect": result.value,
-            })
+            if details:
+                evaluation_results.append({
+                    "policy_id": policy.id,
+                    "policy_name": policy.name,
+                    "priority": policy.priority,
+                    "effect": result.value,
+                })
 
             if final_effect == PolicyEffect.ABSTAIN:
                 if result in (PolicyEffect.ALLOW, PolicyEffect.DENY):
                     final_effect = result
                     deciding_policy = policy.id
+                    if not details:
+                        break
 
-        return {
-            "effect": final_effect.value,
-            "deciding_policy": deciding_policy,
-            "evaluated_policies": len(evaluation_results),
-            "policy_results": evaluation_results,
-        }
+        return PolicyDecision(
+            final_effect,
+            deciding_policy,
+            tuple(evaluation_results) if details else None,
+        )
 
     def _invalidate_cache(self) -> None:
         """Invalidate the policy evaluation cache."""
+        self._applicable.clear()
         self._policy_cache.clear()
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Decision cache size and hit rate, and index sizes."""
+        lookups = self._hits + self._misses
+        return {
+            "policies": len(self._policies),
+            "indexed_resources": len(self._by_resource),
+            "indexed_prefixes": len(self._by_prefix),
+            "applicable_sets": len(self._applicable),
+            "decisions": len(self._policy_cache),
+            "max_decisions": self._cache_size,
+            "ttl_seconds": self._cache_ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "expired": self._expired,
+            "evictions": self._evictions,
+            "uncacheable": self._uncacheable,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def reset_cache_stats(self) -> None:
+        """Zero the decision cache counters."""
+        self._hits = self._misses = self._expired = self._evictions = self._uncacheable = 0
+
     def create_time_policy(
         self,
         policy_id: str,
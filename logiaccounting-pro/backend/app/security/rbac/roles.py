@@ -4,7 +4,7 @@ Role definitions and management for LogiAccounting Pro RBAC system.
 
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Optional, Set, Dict, List, Any
+from typing import Optional, Set, Dict, List, Any, Callable
 from datetime import datetime
 
 from app.utils.datetime_utils import utc_now
@@ -185,6 +185,11 @@ DEFAULT_ROLE_DEFINITIONS: Dict[str, RoleDefinition] = {
 }
 
 
+# Called with (user_id, organization_id) after a user's roles change, and with
+# (None, None) after a role definition changes, which may affect any user
+RoleChangeListener = Callable[[Optional[str], Optional[str]], None]
+
+
 class RoleManager:
     """Manages role definitions, assignments, and hierarchy operations."""
 
@@ -192,8 +197,22 @@ class RoleManager:
         self._roles: Dict[str, RoleDefinition] = {}
         self._custom_roles: Dict[str, RoleDefinition] = {}
         self._role_assignments: Dict[str, Set[str]] = {}
+        self._listeners: List[RoleChangeListener] = []
         self._load_default_roles()
 
+    def add_listener(self, listener: RoleChangeListener) -> None:
+        """Register a callback run after role assignments or definitions change."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: RoleChangeListener) -> None:
+        """Unregister a change callback."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, user_id: Optional[str] = None, organization_id: Optional[str] = None) -> None:
+        for listener in self._listeners:
+            listener(user_id, organization_id)
+
     def _load_default_roles(self) -> None:
         """Load system-defined roles."""
         for role_name, role_def in DEFAULT_ROLE_DEFINITIONS.items():
@@ -258,6 +277,7 @@ class RoleManager:
         )
 
         self._custom_roles[name] = role
+        self._notify()
         return role
 
     def update_custom_role(
@@ -280,12 +300,14 @@ class RoleManager:
             role.permissions = permissions
         role.updated_at = utc_now()
 
+        self._notify()
         return role
 
     def delete_custom_role(self, name: str) -> bool:
         """Delete a custom role."""
         if name in self._custom_roles:
             del self._custom_roles[name]
+            self._notify()
             return True
         return False
 
@@ -336,6 +358,7 @@ class RoleManager:
             self._role_assignments[key] = set()
 
         self._role_assignments[key].add(role_name)
+        self._notify(user_id, organization_id)
         return True
 
     def revoke_role_from_user(
@@ -348,6 +371,7 @@ class RoleManager:
         key = f"{user_id}:{organization_id}" if organization_id else user_id
         if key in self._role_assignments:
             self._role_assignments[key].discard(role_name)
+            self._notify(user_id, organization_id)
             return True
         return False
 
@@ -153,7 +153,7 @@ class BackupService:
                     continue
 
                 if mode == "replace":
-                    store._data = {}
+                    store.clear()
 
                 for record in records:
                     try:
@@ -162,9 +162,9 @@ class BackupService:
                             if existing:
                                 store.update(record["id"], record)
                             else:
-                                store._data[record["id"]] = record
+                                store.put(record)
                         else:
-                            store._data[record["id"]] = record
+                            store.put(record)
                         restored_count += 1
                     except Exception as e:
                         results["errors"].append(f"Error restoring {entity}: {str(e)}")
@@ -75,11 +75,11 @@ class PortalPaymentService:
         db.payments.create(payment)
 
         current_paid = invoice.get("amount_paid", 0) + pay_amount
+        changes = {"amount_paid": current_paid}
         if current_paid >= invoice.get("total", 0):
-            invoice["status"] = "paid"
-            invoice["paid_at"] = utc_now().isoformat()
-        invoice["amount_paid"] = current_paid
-        db.invoices.update(invoice_id, invoice)
+            changes["status"] = "paid"
+            changes["paid_at"] = utc_now().isoformat()
+        db.invoices.update(invoice_id, changes)
 
         return {"payment_id": payment["id"], "status": payment["status"], "amount": pay_amount, "transaction_id": payment["transaction_id"]}
 
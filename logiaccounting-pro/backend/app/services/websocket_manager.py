@@ -1,56 +1,169 @@
 """
 WebSocket Connection Manager
 Real-time notifications
+
+Each connection gets a bounded send queue drained by its own writer task.
+A broadcast serializes the message once and enqueues the text for every
+recipient without awaiting any socket, so one slow client cannot hold up
+the others. When a client's queue is full the slow-consumer policy applies:
+``drop_oldest`` discards its oldest queued message, ``disconnect`` closes it.
 """
 
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from fastapi import WebSocket
+import asyncio
 import json
+import os
 from datetime import datetime
 from app.utils.datetime_utils import utc_now
 
 
+SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DISCONNECT = "disconnect"
+
+
+def encode_message(message: dict) -> str:
+    """Serialize a message the way WebSocket.send_json does"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+class ClientConnection:
+    """A connected user's socket with its send queue and writer task"""
+
+    __slots__ = ("websocket", "user_id", "role", "queue", "writer", "dropped")
+
+    def __init__(self, websocket: WebSocket, user_id: str, role: str, queue_size: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.role = role
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+
 class WebSocketManager:
     """Manages WebSocket connections and broadcasting"""
 
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}  # user_id -> websocket
-        self.user_roles: Dict[str, str] = {}  # user_id -> role
+    def __init__(
+        self,
+        queue_size: int = SEND_QUEUE_SIZE,
+        send_timeout: float = SEND_TIMEOUT_SECONDS,
+        slow_consumer_policy: str = SLOW_CONSUMER_POLICY
+    ):
+        if slow_consumer_policy not in (POLICY_DROP_OLDEST, POLICY_DISCONNECT):
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.slow_consumer_policy = slow_consumer_policy
+
+        self.connections: Dict[str, ClientConnection] = {}  # user_id -> connection
+        self.role_connections: Dict[str, Set[str]] = {}  # role -> user_ids
+
+        self._sent = 0
+        self._dropped = 0
+        self._slow_disconnects = 0
+
+    @property
+    def active_connections(self) -> Dict[str, WebSocket]:
+        """user_id -> websocket"""
+        return {user_id: conn.websocket for user_id, conn in self.connections.items()}
+
+    @property
+    def user_roles(self) -> Dict[str, str]:
+        """user_id -> role"""
+        return {user_id: conn.role for user_id, conn in self.connections.items()}
 
     async def connect(self, websocket: WebSocket, user_id: str, role: str):
-        """Accept and store connection"""
+        """Accept and store connection, replacing any previous one of the user"""
         await websocket.accept()
-        self.active_connections[user_id] = websocket
-        self.user_roles[user_id] = role
+        self.disconnect(user_id)
+
+        conn = ClientConnection(websocket, user_id, role, self.queue_size)
+        conn.writer = asyncio.create_task(self._write(conn), name=f"ws-writer-{user_id}")
+        self.connections[user_id] = conn
+        self.role_connections.setdefault(role, set()).add(user_id)
         print(f"WebSocket connected: {user_id} ({role})")
 
-    def disconnect(self, user_id: str):
-        """Remove connection"""
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
-        if user_id in self.user_roles:
-            del self.user_roles[user_id]
+    def disconnect(self, user_id: str, websocket: WebSocket = None):
+        """Remove connection; with a websocket, only if it is still the user's current one"""
+        conn = self.connections.get(user_id)
+        if conn is None or (websocket is not None and conn.websocket is not websocket):
+            return
+
+        del self.connections[user_id]
+        users = self.role_connections.get(conn.role)
+        if users is not None:
+            users.discard(user_id)
+            if not users:
+                del self.role_connections[conn.role]
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
         print(f"WebSocket disconnected: {user_id}")
 
+    async def _write(self, conn: ClientConnection):
+        """Drain a connection's queue; a failed or timed-out send drops the client"""
+        try:
+            while True:
+                text = await conn.queue.get()
+                await asyncio.wait_for(conn.websocket.send_text(text), self.send_timeout)
+                self._sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error sending to {conn.user_id}: {e}")
+            self.disconnect(conn.user_id, conn.websocket)
+            await self._close(conn)
+
+    async def _close(self, conn: ClientConnection, code: int = 1000, reason: str = ""):
+        try:
+            await conn.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    def _enqueue(self, conn: ClientConnection, text: str):
+        """Queue text for a connection without waiting, applying the slow-consumer policy"""
+        try:
+            conn.queue.put_nowait(text)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.slow_consumer_policy == POLICY_DISCONNECT:
+            self._slow_disconnects += 1
+            print(f"Disconnecting slow WebSocket consumer: {conn.user_id}")
+            self.disconnect(conn.user_id, conn.websocket)
+            # 1013: try again later
+            asyncio.create_task(self._close(conn, code=1013, reason="Too slow"))
+            return
+
+        conn.queue.get_nowait()
+        conn.queue.put_nowait(text)
+        conn.dropped += 1
+        self._dropped += 1
+
     async def send_to_user(self, user_id: str, message: dict):
         """Send message to specific user"""
-        if user_id in self.active_connections:
-            try:
-                await self.active_connections[user_id].send_json(message)
-            except Exception as e:
-                print(f"Error sending to {user_id}: {e}")
-                self.disconnect(user_id)
+        conn = self.connections.get(user_id)
+        if conn is not None:
+            self._enqueue(conn, encode_message(message))
 
     async def send_to_role(self, role: str, message: dict):
         """Send message to all users with specific role"""
-        for user_id, user_role in self.user_roles.items():
-            if user_role == role:
-                await self.send_to_user(user_id, message)
+        self._send_many(self.role_connections.get(role, ()), encode_message(message))
 
     async def broadcast(self, message: dict):
         """Send message to all connected users"""
-        for user_id in list(self.active_connections.keys()):
-            await self.send_to_user(user_id, message)
+        self._send_many(self.connections, encode_message(message))
+
+    def _send_many(self, user_ids, text: str):
+        for user_id in list(user_ids):
+            conn = self.connections.get(user_id)
+            if conn is not None:
+                self._enqueue(conn, text)
 
     async def notify(
         self,
@@ -66,19 +179,36 @@ class WebSocketManager:
             "data": data,
             "timestamp": utc_now().isoformat()
         }
+        text = encode_message(message)
 
         if target_users:
-            for user_id in target_users:
-                await self.send_to_user(user_id, message)
+            self._send_many(target_users, text)
         elif target_roles:
+            recipients = set()
             for role in target_roles:
-                await self.send_to_role(role, message)
+                recipients.update(self.role_connections.get(role, ()))
+            self._send_many(recipients, text)
         else:
-            await self.broadcast(message)
+            self._send_many(self.connections, text)
 
     def get_connected_users(self) -> List[str]:
         """Get list of connected user IDs"""
-        return list(self.active_connections.keys())
+        return list(self.connections.keys())
+
+    def get_metrics(self) -> dict:
+        """Connection, queue and slow-consumer counts"""
+        queued = [conn.queue.qsize() for conn in self.connections.values()]
+        return {
+            "connections": len(self.connections),
+            "roles": {role: len(users) for role, users in self.role_connections.items()},
+            "queued_messages": sum(queued),
+            "max_queue_depth": max(queued, default=0),
+            "queue_capacity": self.queue_size,
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "sent": self._sent,
+            "dropped": self._dropped,
+            "slow_disconnects": self._slow_disconnects,
+        }
 
 
 ws_manager = WebSocketManager()
@@ -71,11 +71,27 @@ class WorkflowSettings(BaseSettings):
 
     max_execution_time_seconds: int = 3600
     max_concurrent_executions: int = 100
+    execution_workers: int = 20
+    execution_queue_size: int = 10000
     max_nodes_per_workflow: int = 50
     max_retries: int = 3
     retry_delay_seconds: int = 300
 
+    expression_cache_size: int = 4096
+
+    execution_history_limit: int = 200
+    execution_summary_limit: int = 10000
+    execution_log_limit: int = 500
+    history_dir: str = ""
+    history_segment_mb: int = 64
+    history_max_segments: int = 16
+
+    event_batch_window_ms: int = 50
+    event_batch_size: int = 500
+    event_dispatch_concurrency: int = 64
+
     scheduler_interval_seconds: int = 60
+    scheduler_max_concurrency: int = 10
     max_scheduled_workflows: int = 1000
 
     script_timeout_seconds: int = 30
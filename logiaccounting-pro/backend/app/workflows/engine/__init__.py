@@ -3,10 +3,13 @@ Workflow Engine Module.
 """
 from app.workflows.engine.core import WorkflowEngine, workflow_engine
 from app.workflows.engine.executor import WorkflowExecutor, WaitingException
+from app.workflows.engine.pool import ExecutionPool, QueuedExecution
 
 __all__ = [
     'WorkflowEngine',
     'workflow_engine',
     'WorkflowExecutor',
-    'WaitingException'
+    'WaitingException',
+    'ExecutionPool',
+    'QueuedExecution'
 ]
@@ -18,10 +18,20 @@ from app.workflows.config import (
     WorkflowStatus, ExecutionStatus, StepStatus, NodeType, workflow_settings
 )
 from app.workflows.engine.executor import WorkflowExecutor
+from app.workflows.engine.pool import (
+    ExecutionPool, QueuedExecution, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+)
 
 
 logger = logging.getLogger(__name__)
 
+# Queue lane for executions that do not ask for one, by trigger type
+TRIGGER_PRIORITIES = {
+    "manual": PRIORITY_HIGH,
+    "webhook": PRIORITY_HIGH,
+    "schedule": PRIORITY_LOW,
+}
+
 
 class WorkflowEngine:
     """
@@ -32,10 +42,13 @@ class WorkflowEngine:
     def __init__(self):
         self.event_trigger = None
         self._active_executions: Dict[str, asyncio.Task] = {}
+        self._retries: set = set()
+        self.pool = ExecutionPool(self._run_queued)
 
     async def start(self):
         """Start the workflow engine."""
         logger.info("Starting workflow engine")
+        self.pool.start()
         from app.workflows.triggers.event_trigger import EventTrigger
         self.event_trigger = EventTrigger(self)
         await self.event_trigger.start()
@@ -44,7 +57,18 @@ class WorkflowEngine:
         """Stop the workflow engine."""
         logger.info("Stopping workflow engine")
 
-        for task in self._active_executions.values():
+        # executions still queued would otherwise stay pending for good
+        for job in await self.pool.stop():
+            execution = job.execution
+            if execution.status != ExecutionStatus.PENDING:
+                continue
+            execution.status = ExecutionStatus.CANCELLED
+            execution.error = "Workflow engine stopped before the execution started"
+            execution.completed_at = utc_now()
+            workflow_store.save_execution(execution)
+            self._log(execution.id, "warning", "Execution cancelled: engine stopped")
+
+        for task in [*self._active_executions.values(), *self._retries]:
             task.cancel()
 
         if self.event_trigger:
@@ -54,15 +78,20 @@ class WorkflowEngine:
         self,
         workflow_id: str,
         context: ExecutionContext,
-        run_async: bool = True
+        run_async: bool = True,
+        priority: Optional[str] = None
     ) -> WorkflowExecution:
         """
         Trigger a workflow execution.
 
+        Asynchronous executions are queued on the engine's worker pool and
+        this call waits only while the queue is full.
+
         Args:
             workflow_id: ID of the workflow to execute
             context: Execution context with trigger data
             run_async: Whether to run asynchronously
+            priority: Queue lane (high/normal/low); defaults by trigger type
 
         Returns:
             WorkflowExecution record
@@ -74,11 +103,11 @@ class WorkflowEngine:
         if workflow.status != WorkflowStatus.ACTIVE:
             raise ValueError(f"Workflow is not active: {workflow.status}")
 
-        active_count = len([
-            e for e in workflow_store.get_executions_by_workflow(
-                workflow_id, status=ExecutionStatus.RUNNING
-            )
-        ])
+        # queued executions count too, or a burst would all pass the check
+        # before the first of them starts running
+        active_count = workflow_store.count_executions(
+            workflow_id, ExecutionStatus.RUNNING
+        ) + self.pool.queued_for(workflow_id)
 
         if active_count >= workflow_settings.max_concurrent_executions:
             raise ValueError("Maximum concurrent executions reached")
@@ -100,19 +129,34 @@ class WorkflowEngine:
         })
 
         if run_async:
-            task = asyncio.create_task(
-                self._execute_workflow(workflow, execution)
-            )
-            self._active_executions[execution.id] = task
+            priority = priority or TRIGGER_PRIORITIES.get(context.trigger_type, PRIORITY_NORMAL)
+            await self.pool.submit(QueuedExecution(workflow, execution, priority))
         else:
             await self._execute_workflow(workflow, execution)
 
         return execution
 
+    async def _run_queued(self, job: QueuedExecution):
+        """Run a queued execution on a pool worker."""
+        execution = job.execution
+        if execution.status == ExecutionStatus.CANCELLED:
+            return
+
+        # a task of its own, so cancel_execution stops the execution
+        # without taking the worker down with it
+        task = asyncio.create_task(self._execute_workflow(job.workflow, execution, job))
+        self._active_executions[execution.id] = task
+        try:
+            await task
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise
+
     async def _execute_workflow(
         self,
         workflow: Workflow,
-        execution: WorkflowExecution
+        execution: WorkflowExecution,
+        job: Optional[QueuedExecution] = None
     ):
         """Execute a workflow."""
         try:
@@ -149,7 +193,7 @@ class WorkflowEngine:
             logger.error(f"Workflow execution failed: {e}")
             self._log(execution.id, "error", f"Workflow failed: {str(e)}")
 
-            await self._handle_execution_error(workflow, execution, e)
+            await self._handle_execution_error(workflow, execution, e, job)
 
         finally:
             workflow_store.save_execution(execution)
@@ -161,9 +205,15 @@ class WorkflowEngine:
         self,
         workflow: Workflow,
         execution: WorkflowExecution,
-        error: Exception
+        error: Exception,
+        job: Optional[QueuedExecution] = None
     ):
-        """Handle workflow execution error."""
+        """
+        Handle workflow execution error.
+
+        Retries of queued executions wait outside the pool and are queued
+        again, so a retry delay does not hold a worker.
+        """
         error_handler = workflow.error_handler
 
         if execution.retry_count < error_handler.retry_count:
@@ -175,6 +225,14 @@ class WorkflowEngine:
                 {"delay_seconds": error_handler.retry_delay_seconds}
             )
 
+            if job is not None:
+                task = asyncio.create_task(
+                    self._retry_later(job, error_handler.retry_delay_seconds)
+                )
+                self._retries.add(task)
+                task.add_done_callback(self._retries.discard)
+                return
+
             await asyncio.sleep(error_handler.retry_delay_seconds)
 
             execution.status = ExecutionStatus.PENDING
@@ -187,6 +245,23 @@ class WorkflowEngine:
                     workflow, execution, error_handler.on_failure
                 )
 
+    async def _retry_later(self, job: QueuedExecution, delay_seconds: int):
+        """Queue a failed execution again after its retry delay."""
+        await asyncio.sleep(delay_seconds)
+        if job.execution.status == ExecutionStatus.CANCELLED:
+            return
+        job.execution.status = ExecutionStatus.PENDING
+        job.execution.error = None
+        workflow_store.save_execution(job.execution)
+        await self.pool.submit(job)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Execution pool metrics."""
+        return {
+            **self.pool.get_metrics(),
+            "pending_retries": len(self._retries),
+        }
+
     async def _execute_failure_handler(
         self,
         workflow: Workflow,
@@ -216,7 +291,9 @@ class WorkflowEngine:
         if not execution:
             return False
 
-        if execution.status not in [ExecutionStatus.RUNNING, ExecutionStatus.WAITING]:
+        if execution.status not in [
+            ExecutionStatus.PENDING, ExecutionStatus.RUNNING, ExecutionStatus.WAITING
+        ]:
             return False
 
         if execution_id in self._active_executions:
@@ -0,0 +1,229 @@
+"""
+Bounded worker pool for workflow executions.
+
+Triggered executions are queued instead of each getting its own task, and a
+fixed number of workers drain the queue. Queued work is split into priority
+lanes served by weight, so a burst in one lane cannot starve the others, and
+within a lane tenants are served round-robin, so one tenant's bulk import
+does not delay everyone else's executions. ``submit`` waits while the queue
+is full, which pushes back on whatever is emitting the events.
+"""
+from collections import Counter, OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from app.workflows.config import workflow_settings
+
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = "high"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+
+# Turns per lane in each scheduling round, highest priority first
+LANE_WEIGHTS = {
+    PRIORITY_HIGH: 4,
+    PRIORITY_NORMAL: 2,
+    PRIORITY_LOW: 1,
+}
+
+# Seconds of completions kept for the throughput figure
+THROUGHPUT_WINDOW = 60
+
+
+class QueuedExecution:
+    """A workflow execution waiting for a worker."""
+
+    __slots__ = ("workflow", "execution", "tenant_id", "priority", "enqueued_at")
+
+    def __init__(self, workflow: Any, execution: Any, priority: str):
+        self.workflow = workflow
+        self.execution = execution
+        self.tenant_id = execution.tenant_id
+        self.priority = priority
+        self.enqueued_at = 0.0
+
+
+class ExecutionPool:
+    """Priority lanes of per-tenant FIFO queues drained by a fixed set of workers."""
+
+    def __init__(
+        self,
+        handler: Callable[[QueuedExecution], Awaitable[None]],
+        workers: Optional[int] = None,
+        max_queued: Optional[int] = None
+    ):
+        self._handler = handler
+        self.worker_count = workers or workflow_settings.execution_workers
+        self.max_queued = max_queued or workflow_settings.execution_queue_size
+
+        # lane -> tenant -> queued executions; tenants rotate to the back
+        # after each turn
+        self._lanes: Dict[str, "OrderedDict[str, Deque[QueuedExecution]]"] = {
+            lane: OrderedDict() for lane in LANE_WEIGHTS
+        }
+        self._rounds: List[str] = [
+            lane for lane, weight in LANE_WEIGHTS.items() for _ in range(weight)
+        ]
+        self._turn = 0
+        self._queued_by_workflow: Counter = Counter()
+
+        self._items: Optional[asyncio.Semaphore] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._workers: List[asyncio.Task] = []
+
+        self._in_flight = 0
+        self._submitted = 0
+        self._dequeued = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+        self._completions: Deque[List] = deque(maxlen=THROUGHPUT_WINDOW)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        if self._workers:
+            return
+        self._items = asyncio.Semaphore(0)
+        self._slots = asyncio.Semaphore(self.max_queued)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"workflow-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        logger.info(f"Workflow execution pool started with {self.worker_count} workers")
+
+    async def stop(self) -> List[QueuedExecution]:
+        """Cancel the workers and empty the queue; returns the jobs that never ran."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+        dropped = [
+            job for tenants in self._lanes.values()
+            for queue in tenants.values() for job in queue
+        ]
+        for lane in self._lanes.values():
+            lane.clear()
+        self._queued_by_workflow.clear()
+        return dropped
+
+    async def submit(self, job: QueuedExecution) -> None:
+        """Queue an execution, waiting while the queue is full."""
+        if job.priority not in self._lanes:
+            raise ValueError(f"Unknown execution priority: {job.priority}")
+        if not self._workers:
+            self.start()
+
+        await self._slots.acquire()
+        job.enqueued_at = time.monotonic()
+        tenants = self._lanes[job.priority]
+        queue = tenants.get(job.tenant_id)
+        if queue is None:
+            queue = tenants[job.tenant_id] = deque()
+        queue.append(job)
+        self._queued_by_workflow[job.workflow.id] += 1
+        self._submitted += 1
+        self._items.release()
+
+    def queued_for(self, workflow_id: str) -> int:
+        """Executions of a workflow waiting for a worker."""
+        return self._queued_by_workflow.get(workflow_id, 0)
+
+    def depth(self) -> int:
+        return sum(
+            len(queue) for tenants in self._lanes.values() for queue in tenants.values()
+        )
+
+    def _take(self) -> QueuedExecution:
+        """Next job: lanes by weighted round, tenants round-robin within a lane."""
+        for _ in range(len(self._rounds)):
+            lane = self._rounds[self._turn]
+            self._turn = (self._turn + 1) % len(self._rounds)
+            tenants = self._lanes[lane]
+            if not tenants:
+                continue
+            tenant_id, queue = next(iter(tenants.items()))
+            job = queue.popleft()
+            if queue:
+                tenants.move_to_end(tenant_id)
+            else:
+                del tenants[tenant_id]
+            return job
+        raise RuntimeError("Execution pool signalled work but every lane is empty")
+
+    async def _work(self) -> None:
+        while True:
+            await self._items.acquire()
+            job = self._take()
+            self._slots.release()
+
+            workflow_id = job.workflow.id
+            self._queued_by_workflow[workflow_id] -= 1
+            if not self._queued_by_workflow[workflow_id]:
+                del self._queued_by_workflow[workflow_id]
+
+            self._dequeued += 1
+            wait = time.monotonic() - job.enqueued_at
+            self._wait_last = wait
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+            self._in_flight += 1
+            try:
+                await self._handler(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed += 1
+                logger.error(f"Queued execution {job.execution.id} failed: {e}")
+            finally:
+                self._in_flight -= 1
+                self._completed += 1
+                self._record_completion()
+
+    def _record_completion(self) -> None:
+        second = int(time.monotonic())
+        if self._completions and self._completions[-1][0] == second:
+            self._completions[-1][1] += 1
+        else:
+            self._completions.append([second, 1])
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, wait time and throughput figures."""
+        now = int(time.monotonic())
+        recent = sum(
+            count for second, count in self._completions
+            if now - second < THROUGHPUT_WINDOW
+        )
+        return {
+            "workers": len(self._workers),
+            "in_flight": self._in_flight,
+            "queue_depth": self.depth(),
+            "queue_capacity": self.max_queued,
+            "lanes": {
+                lane: sum(len(queue) for queue in tenants.values())
+                for lane, tenants in self._lanes.items()
+            },
+            "queued_tenants": len({
+                tenant_id for tenants in self._lanes.values() for tenant_id in tenants
+            }),
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "wait_seconds": {
+                "last": round(self._wait_last, 3),
+                "avg": round(self._wait_total / self._dequeued, 3) if self._dequeued else 0.0,
+                "max": round(self._wait_max, 3),
+            },
+            "throughput_per_second": round(recent / THROUGHPUT_WINDOW, 2),
+        }
@@ -47,6 +47,30 @@ class WorkflowEventEmitter:
 
         return event
 
+    def emit_batched(self, event_type: str, payload: Dict[str, Any], customer_id: str = None) -> Dict:
+        """
+        Queue an event for batched dispatch, for bulk operations.
+
+        Returns immediately; handlers run with the registry's next batch and
+        repeated events for the same entity are coalesced.
+        """
+        event = {
+            "type": event_type,
+            "payload": payload,
+            "customer_id": customer_id,
+            "timestamp": utc_now().isoformat(),
+            "batched": True,
+        }
+
+        self._event_history.append(event)
+        if len(self._event_history) > self._max_history:
+            self._event_history = self._event_history[-self._max_history:]
+
+        event["triggered_workflows"] = trigger_registry.emit_batched(
+            event_type, payload, customer_id
+        )
+        return event
+
     def get_recent_events(self, limit: int = 50, event_type: str = None) -> list:
         """Get recent events."""
         events = self._event_history
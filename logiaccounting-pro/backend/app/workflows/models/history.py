@@ -0,0 +1,169 @@
+"""
+On-disk archive for workflow execution history.
+
+Executions evicted from the in-memory store are appended, together with
+their logs, as one JSON line to an append-only segment file. The store keeps
+a compact ``ArchivedExecution`` per evicted run pointing at its line, so a
+history page or detail view reads back only the records it shows.
+
+Files in ``directory``:
+    executions-<n>.jsonl    segments; a new one starts past ``segment_bytes``
+
+Only the newest ``max_segments`` segments are kept: starting a new segment
+deletes the oldest, and records that pointed into it can no longer be read.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from app.workflows.models.execution import WorkflowExecution, ExecutionLog, ExecutionSummary
+from app.workflows.config import ExecutionStatus
+
+logger = logging.getLogger(__name__)
+
+# (segment number, byte offset, byte length)
+Location = Tuple[int, int, int]
+
+
+class ArchivedExecution(NamedTuple):
+    """Listing fields of an evicted execution and where its full record is."""
+    id: str
+    workflow_id: str
+    workflow_name: str
+    tenant_id: str
+    status: ExecutionStatus
+    started_at: datetime
+    completed_at: Optional[datetime]
+    duration_ms: Optional[int]
+    trigger_type: str
+    error: Optional[str]
+    location: Optional[Location]
+
+    @classmethod
+    def of(cls, execution: WorkflowExecution, location: Optional[Location]) -> "ArchivedExecution":
+        return cls(
+            execution.id, execution.workflow_id, execution.workflow_name,
+            execution.tenant_id, execution.status, execution.started_at,
+            execution.completed_at, execution.duration_ms,
+            execution.context.trigger_type, execution.error, location,
+        )
+
+    def to_summary(self) -> ExecutionSummary:
+        return ExecutionSummary(
+            id=self.id,
+            workflow_id=self.workflow_id,
+            workflow_name=self.workflow_name,
+            status=self.status,
+            started_at=self.started_at,
+            completed_at=self.completed_at,
+            duration_ms=self.duration_ms,
+            trigger_type=self.trigger_type,
+            error=self.error,
+        )
+
+
+class ExecutionArchive:
+    """Append-only JSON-lines segments of evicted executions and their logs."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        segment_bytes: int = 64 * 1024 * 1024,
+        max_segments: int = 16,
+    ):
+        self._directory = Path(directory) if directory else None
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self._segment = 0
+        # Lowest segment number still on disk
+        self._oldest = 0
+        self._file = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        if self._directory is None:
+            self._directory = Path(tempfile.mkdtemp(prefix="workflow-history-"))
+        return self._directory
+
+    def _path(self, segment: int) -> Path:
+        return self.directory / f"executions-{segment:06d}.jsonl"
+
+    def _open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        existing = sorted(self.directory.glob("executions-*.jsonl"))
+        if existing:
+            self._oldest = int(existing[0].stem.split("-")[1])
+            self._segment = int(existing[-1].stem.split("-")[1])
+        self._file = open(self._path(self._segment), "ab")
+        self._size = self._file.tell()
+        self._prune()
+
+    def _prune(self) -> None:
+        """Delete the oldest segments beyond ``max_segments`` (lock held); 0 keeps all."""
+        while self.max_segments > 0 and self._segment - self._oldest >= self.max_segments:
+            try:
+                self._path(self._oldest).unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"Could not delete history segment {self._oldest}: {e}")
+                return
+            self._oldest += 1
+
+    def append(self, execution: WorkflowExecution, logs: List[ExecutionLog]) -> Optional[Location]:
+        """Write one execution with its logs; None when the write failed."""
+        line = json.dumps(
+            {"execution": execution.dict(), "logs": [log.dict() for log in logs]},
+            default=str, separators=(",", ":"),
+        ).encode() + b"\n"
+
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._open()
+                if self._size and self._size + len(line) > self.segment_bytes:
+                    self._file.close()
+                    self._segment += 1
+                    self._file = open(self._path(self._segment), "ab")
+                    self._size = 0
+                    self._prune()
+                offset = self._size
+                self._file.write(line)
+                self._file.flush()
+                self._size += len(line)
+                return self._segment, offset, len(line)
+            except OSError as e:
+                logger.error(f"Could not archive execution {execution.id}: {e}")
+                return None
+
+    def contains(self, location: Location) -> bool:
+        """Whether the segment holding a record is still retained."""
+        return self._oldest <= location[0] <= self._segment
+
+    def read(self, location: Location) -> Tuple[WorkflowExecution, List[ExecutionLog]]:
+        """Load an archived execution and its logs."""
+        segment, offset, length = location
+        with open(self._path(segment), "rb") as f:
+            f.seek(offset)
+            record = json.loads(f.read(length))
+        return (
+            WorkflowExecution(**record["execution"]),
+            [ExecutionLog(**log) for log in record["logs"]],
+        )
+
+    def size(self) -> int:
+        """Bytes written across segments."""
+        if self._directory is None or not self._directory.exists():
+            return 0
+        return sum(os.path.getsize(p) for p in self._directory.glob("executions-*.jsonl"))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -1,30 +1,110 @@
 """
 In-memory workflow storage.
 For production, replace with PostgreSQL/Redis.
+
+Active workflows and rules are indexed by trigger so event dispatch only
+touches matching definitions, and executions are kept per workflow in
+start-time order. The indexes are maintained by the save/delete methods:
+callers that change a workflow's status or trigger in place must save it
+again, as the routes already do.
+
+Execution history is bounded. Each workflow keeps its most recent
+``execution_history_limit`` finished executions in memory, and each execution
+its last ``execution_log_limit`` log entries. Older finished executions are
+evicted with their logs to an append-only ``ExecutionArchive``. A compact
+``ArchivedExecution`` is kept for each of the last ``execution_summary_limit``
+evicted runs, so history pages and detail lookups read those back from disk on
+demand, until the archive's retention drops the segment holding them. Pending, running and waiting executions are never evicted. An
+evicted execution that is saved again, such as a failed run being retried,
+moves back into memory and its archived record is dropped.
 """
-from typing import Dict, List, Optional
+from bisect import insort
+from collections import deque
+from heapq import merge
+from itertools import count, islice
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
 from copy import deepcopy
 
 from app.utils.datetime_utils import utc_now
 from app.workflows.models.workflow import Workflow, WorkflowVersion
 from app.workflows.models.execution import WorkflowExecution, ExecutionLog
+from app.workflows.models.history import ArchivedExecution, ExecutionArchive
 from app.workflows.models.rule import BusinessRule
-from app.workflows.config import WorkflowStatus, ExecutionStatus
+from app.workflows.config import WorkflowStatus, ExecutionStatus, workflow_settings
+
+# Statuses an execution can be evicted from memory in
+FINISHED_STATUSES = frozenset({
+    ExecutionStatus.COMPLETED, ExecutionStatus.FAILED, ExecutionStatus.CANCELLED,
+})
 
 
 class WorkflowStore:
     """In-memory workflow storage."""
 
-    def __init__(self):
+    def __init__(self, archive: Optional[ExecutionArchive] = None):
         self.workflows: Dict[str, Workflow] = {}
         self.versions: Dict[str, List[WorkflowVersion]] = {}
         self.executions: Dict[str, WorkflowExecution] = {}
-        self.execution_logs: Dict[str, List[ExecutionLog]] = {}
+        self.execution_logs: Dict[str, Deque[ExecutionLog]] = {}
         self.rules: Dict[str, BusinessRule] = {}
 
+        # trigger type -> (entity, event) -> active workflows by id
+        self._workflow_triggers: Dict[str, Dict[Tuple, Dict[str, Workflow]]] = {}
+        self._workflow_keys: Dict[str, Tuple] = {}
+        self._workflow_order: Dict[str, int] = {}
+        self._workflow_seq = count()
+        # trigger type -> scope entity -> active rules by id
+        self._rule_triggers: Dict[str, Dict[Optional[str], Dict[str, BusinessRule]]] = {}
+        self._rule_keys: Dict[str, Tuple] = {}
+        self._rule_order: Dict[str, int] = {}
+        self._rule_seq = count()
+        # workflow id -> executions in start-time order
+        self._workflow_executions: Dict[str, List[WorkflowExecution]] = {}
+        # (workflow id, status) -> execution ids
+        self._execution_status: Dict[Tuple[str, ExecutionStatus], Set[str]] = {}
+        self._indexed_status: Dict[str, ExecutionStatus] = {}
+        # tenant id -> workflows with in-memory or archived executions
+        self._tenant_workflows: Dict[str, Set[str]] = {}
+
+        self.history_limit = workflow_settings.execution_history_limit
+        self.summary_limit = workflow_settings.execution_summary_limit
+        self.log_limit = workflow_settings.execution_log_limit
+        self.archive = archive or ExecutionArchive(
+            workflow_settings.history_dir or None,
+            workflow_settings.history_segment_mb * 1024 * 1024,
+            workflow_settings.history_max_segments,
+        )
+        # workflow id -> evicted executions in start-time order, and by id
+        self._workflow_archive: Dict[str, Deque[ArchivedExecution]] = {}
+        self._archived: Dict[str, ArchivedExecution] = {}
+
+    def _index_workflow(self, workflow: Workflow) -> None:
+        self._unindex_workflow(workflow.id)
+        if workflow.status != WorkflowStatus.ACTIVE:
+            return
+        trigger = workflow.trigger
+        key = (trigger.type.value, trigger.entity, trigger.event)
+        self._workflow_triggers.setdefault(key[0], {}).setdefault(key[1:], {})[workflow.id] = workflow
+        self._workflow_keys[workflow.id] = key
+
+    def _unindex_workflow(self, workflow_id: str) -> None:
+        key = self._workflow_keys.pop(workflow_id, None)
+        if key is None:
+            return
+        by_target = self._workflow_triggers[key[0]]
+        bucket = by_target[key[1:]]
+        del bucket[workflow_id]
+        if not bucket:
+            del by_target[key[1:]]
+            if not by_target:
+                del self._workflow_triggers[key[0]]
+
     def save_workflow(self, workflow: Workflow) -> Workflow:
         """Save a workflow."""
+        if workflow.id not in self.workflows:
+            self._workflow_order[workflow.id] = next(self._workflow_seq)
         self.workflows[workflow.id] = workflow
+        self._index_workflow(workflow)
         return workflow
 
     def get_workflow(self, workflow_id: str) -> Optional[Workflow]:
@@ -58,6 +138,8 @@ class WorkflowStore:
         """Delete a workflow."""
         if workflow_id in self.workflows:
             del self.workflows[workflow_id]
+            self._unindex_workflow(workflow_id)
+            self._workflow_order.pop(workflow_id, None)
             return True
         return False
 
@@ -68,23 +150,21 @@ class WorkflowStore:
         event: Optional[str] = None
     ) -> List[Workflow]:
         """Get active workflows matching trigger criteria."""
-        workflows = []
-
-        for w in self.workflows.values():
-            if w.status != WorkflowStatus.ACTIVE:
-                continue
-
-            if w.trigger.type.value != trigger_type:
-                continue
-
-            if entity and w.trigger.entity != entity:
-                continue
-
-            if event and w.trigger.event != event:
-                continue
-
-            workflows.append(w)
-
+        by_target = self._workflow_triggers.get(trigger_type)
+        if not by_target:
+            return []
+
+        if entity and event:
+            buckets = [by_target.get((entity, event), {})]
+        else:
+            buckets = [
+                bucket for (w_entity, w_event), bucket in by_target.items()
+                if (not entity or w_entity == entity) and (not event or w_event == event)
+            ]
+
+        workflows = [w for bucket in buckets for w in bucket.values()]
+        if len(workflows) > 1:
+            workflows.sort(key=lambda w: self._workflow_order[w.id])
         return workflows
 
     def save_version(self, version: WorkflowVersion) -> WorkflowVersion:
@@ -112,12 +192,105 @@ class WorkflowStore:
 
     def save_execution(self, execution: WorkflowExecution) -> WorkflowExecution:
         """Save an execution."""
+        if execution.id not in self.executions:
+            if execution.id in self._archived:
+                self._unarchive(execution.id)
+            history = self._workflow_executions.setdefault(execution.workflow_id, [])
+            if history and history[-1].started_at > execution.started_at:
+                insort(history, execution, key=lambda e: e.started_at)
+            else:
+                history.append(execution)
+            self._tenant_workflows.setdefault(execution.tenant_id, set()).add(execution.workflow_id)
         self.executions[execution.id] = execution
+
+        previous = self._indexed_status.get(execution.id)
+        if previous != execution.status:
+            if previous is not None:
+                self._execution_status[(execution.workflow_id, previous)].discard(execution.id)
+            self._execution_status.setdefault(
+                (execution.workflow_id, execution.status), set()
+            ).add(execution.id)
+            self._indexed_status[execution.id] = execution.status
+
+        if len(self._workflow_executions[execution.workflow_id]) > self.history_limit:
+            self._trim_history(execution.workflow_id)
         return execution
 
+    def _trim_history(self, workflow_id: str) -> None:
+        """Evict the oldest finished executions beyond the per-workflow limit."""
+        history = self._workflow_executions[workflow_id]
+        excess = len(history) - self.history_limit
+        # By indexed status: the engine changes an execution's status in
+        # place before saving it, and it is only final once saved
+        evicted = list(islice(
+            (e for e in history if self._indexed_status[e.id] in FINISHED_STATUSES), excess
+        ))
+        if not evicted:
+            return
+        evicted_ids = {e.id for e in evicted}
+        history[:] = [e for e in history if e.id not in evicted_ids]
+        for execution in evicted:
+            self._evict(execution)
+
+    def _evict(self, execution: WorkflowExecution) -> None:
+        """Move one execution and its logs from memory to the archive."""
+        del self.executions[execution.id]
+        status = self._indexed_status.pop(execution.id)
+        self._execution_status[(execution.workflow_id, status)].discard(execution.id)
+        logs = self.execution_logs.pop(execution.id, ())
+
+        record = ArchivedExecution.of(execution, self.archive.append(execution, list(logs)))
+        archived = self._workflow_archive.setdefault(execution.workflow_id, deque())
+        if len(archived) >= self.summary_limit:
+            self._archived.pop(archived.popleft().id, None)
+        if archived and archived[-1].started_at > record.started_at:
+            insort(archived, record, key=lambda r: r.started_at)
+        else:
+            archived.append(record)
+        self._archived[record.id] = record
+
+    def _unarchive(self, execution_id: str) -> None:
+        """Drop the archived record of an execution that is back in memory."""
+        record = self._archived.pop(execution_id)
+        archived = self._workflow_archive[record.workflow_id]
+        archived.remove(record)
+        if not archived:
+            del self._workflow_archive[record.workflow_id]
+
+    def _load_archived(self, record: ArchivedExecution) -> Optional[WorkflowExecution]:
+        if record.location is None or not self.archive.contains(record.location):
+            return None
+        return self.archive.read(record.location)[0]
+
     def get_execution(self, execution_id: str) -> Optional[WorkflowExecution]:
-        """Get an execution by ID."""
-        return self.executions.get(execution_id)
+        """Get an execution by ID, reading it back from the archive if evicted."""
+        execution = self.executions.get(execution_id)
+        if execution is None and execution_id in self._archived:
+            execution = self._load_archived(self._archived[execution_id])
+        return execution
+
+    def _page(
+        self,
+        recent: Iterable[WorkflowExecution],
+        archived: Iterable[ArchivedExecution],
+        skip: int,
+        limit: int
+    ) -> List[WorkflowExecution]:
+        """
+        One page of in-memory and archived executions, both newest first,
+        loading only the archived records that fall on the page.
+        """
+        page: List[Union[WorkflowExecution, ArchivedExecution]] = list(islice(
+            merge(recent, archived, key=lambda e: e.started_at, reverse=True),
+            skip, skip + limit
+        ))
+        executions = []
+        for item in page:
+            if isinstance(item, ArchivedExecution):
+                item = self._load_archived(item)
+            if item is not None:
+                executions.append(item)
+        return executions
 
     def get_executions_by_workflow(
         self,
@@ -126,17 +299,31 @@ class WorkflowStore:
         skip: int = 0,
         limit: int = 50
     ) -> List[WorkflowExecution]:
-        """Get executions for a workflow."""
-        executions = [
-            e for e in self.executions.values()
-            if e.workflow_id == workflow_id
-        ]
-
+        """Get executions for a workflow, newest first, including archived history."""
+        archived = reversed(self._workflow_archive.get(workflow_id, ()))
         if status:
-            executions = [e for e in executions if e.status == status]
+            recent = sorted(
+                (self.executions[execution_id]
+                 for execution_id in self._execution_status.get((workflow_id, status), ())),
+                key=lambda e: e.started_at, reverse=True
+            )
+            archived = (r for r in archived if r.status == status)
+        else:
+            recent = reversed(self._workflow_executions.get(workflow_id, []))
+        return self._page(recent, archived, skip, limit)
+
+    def get_execution_summaries(
+        self,
+        workflow_id: str,
+        skip: int = 0,
+        limit: int = 50
+    ) -> List[ArchivedExecution]:
+        """Listing fields of a workflow's archived executions, newest first."""
+        return list(islice(reversed(self._workflow_archive.get(workflow_id, ())), skip, skip + limit))
 
-        executions.sort(key=lambda e: e.started_at, reverse=True)
-        return executions[skip:skip + limit]
+    def count_executions(self, workflow_id: str, status: ExecutionStatus) -> int:
+        """Number of a workflow's in-memory executions currently in a status."""
+        return len(self._execution_status.get((workflow_id, status), ()))
 
     def get_executions_by_tenant(
         self,
@@ -145,42 +332,85 @@ class WorkflowStore:
         skip: int = 0,
         limit: int = 50
     ) -> List[WorkflowExecution]:
-        """Get executions for a tenant."""
-        executions = [
-            e for e in self.executions.values()
-            if e.tenant_id == tenant_id
-        ]
-
+        """Get a tenant's executions, newest first, including archived history."""
+        workflow_ids = self._tenant_workflows.get(tenant_id, ())
+        recent = merge(
+            *(reversed(self._workflow_executions.get(w, [])) for w in workflow_ids),
+            key=lambda e: e.started_at, reverse=True
+        )
+        archived = merge(
+            *(reversed(self._workflow_archive.get(w, ())) for w in workflow_ids),
+            key=lambda r: r.started_at, reverse=True
+        )
         if status:
-            executions = [e for e in executions if e.status == status]
-
-        executions.sort(key=lambda e: e.started_at, reverse=True)
-        return executions[skip:skip + limit]
+            recent = (e for e in recent if e.status == status)
+            archived = (r for r in archived if r.status == status)
+        return self._page(recent, archived, skip, limit)
 
     def get_waiting_executions(self) -> List[WorkflowExecution]:
         """Get executions waiting for resume."""
         now = utc_now()
         return [
-            e for e in self.executions.values()
-            if e.status == ExecutionStatus.WAITING
-            and e.resume_at
-            and e.resume_at <= now
+            self.executions[execution_id]
+            for (_, status), ids in self._execution_status.items()
+            if status == ExecutionStatus.WAITING
+            for execution_id in ids
+            if self.executions[execution_id].resume_at
+            and self.executions[execution_id].resume_at <= now
         ]
 
     def add_log(self, log: ExecutionLog) -> ExecutionLog:
-        """Add an execution log entry."""
-        if log.execution_id not in self.execution_logs:
-            self.execution_logs[log.execution_id] = []
-        self.execution_logs[log.execution_id].append(log)
+        """Add an execution log entry, keeping the latest ``log_limit`` per execution."""
+        logs = self.execution_logs.get(log.execution_id)
+        if logs is None:
+            logs = self.execution_logs[log.execution_id] = deque(maxlen=self.log_limit)
+        logs.append(log)
         return log
 
     def get_logs(self, execution_id: str) -> List[ExecutionLog]:
-        """Get logs for an execution."""
-        return self.execution_logs.get(execution_id, [])
+        """Get logs for an execution, reading them back from the archive if evicted."""
+        if execution_id in self.execution_logs:
+            return list(self.execution_logs[execution_id])
+        record = self._archived.get(execution_id)
+        if record is not None and record.location is not None:
+            return self.archive.read(record.location)[1]
+        return []
+
+    def get_retention_stats(self) -> Dict[str, int]:
+        """Sizes of the in-memory and archived execution history."""
+        return {
+            "executions_in_memory": len(self.executions),
+            "log_entries_in_memory": sum(len(logs) for logs in self.execution_logs.values()),
+            "archived_summaries": len(self._archived),
+            "archive_bytes": self.archive.size(),
+        }
+
+    def _index_rule(self, rule: BusinessRule) -> None:
+        self._unindex_rule(rule.id)
+        if rule.status != "active":
+            return
+        key = (rule.trigger.type.value, rule.scope.entity)
+        self._rule_triggers.setdefault(key[0], {}).setdefault(key[1], {})[rule.id] = rule
+        self._rule_keys[rule.id] = key
+
+    def _unindex_rule(self, rule_id: str) -> None:
+        key = self._rule_keys.pop(rule_id, None)
+        if key is None:
+            return
+        by_entity = self._rule_triggers[key[0]]
+        bucket = by_entity[key[1]]
+        del bucket[rule_id]
+        if not bucket:
+            del by_entity[key[1]]
+            if not by_entity:
+                del self._rule_triggers[key[0]]
 
     def save_rule(self, rule: BusinessRule) -> BusinessRule:
         """Save a business rule."""
+        if rule.id not in self.rules:
+            self._rule_order[rule.id] = next(self._rule_seq)
         self.rules[rule.id] = rule
+        self._index_rule(rule)
         return rule
 
     def get_rule(self, rule_id: str) -> Optional[BusinessRule]:
@@ -210,6 +440,8 @@ class WorkflowStore:
         """Delete a rule."""
         if rule_id in self.rules:
             del self.rules[rule_id]
+            self._unindex_rule(rule_id)
+            self._rule_order.pop(rule_id, None)
             return True
         return False
 
@@ -219,21 +451,16 @@ class WorkflowStore:
         entity: Optional[str] = None
     ) -> List[BusinessRule]:
         """Get active rules matching trigger criteria."""
-        rules = []
-
-        for r in self.rules.values():
-            if r.status != "active":
-                continue
+        by_entity = self._rule_triggers.get(trigger_type)
+        if not by_entity:
+            return []
 
-            if r.trigger.type.value != trigger_type:
-                continue
+        if entity:
+            rules = list(by_entity.get(entity, {}).values())
+        else:
+            rules = [r for bucket in by_entity.values() for r in bucket.values()]
 
-            if entity and r.scope.entity != entity:
-                continue
-
-            rules.append(r)
-
-        rules.sort(key=lambda r: r.priority, reverse=True)
+        rules.sort(key=lambda r: (-r.priority, self._rule_order[r.id]))
         return rules
 
 
@@ -2,17 +2,31 @@
 Expression evaluator for workflow conditions and rules.
 Supports variables, operators, and built-in functions.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from functools import lru_cache
 import re
 import operator
 import logging
 from datetime import datetime, timedelta
 
+from app.workflows.config import workflow_settings
 from app.workflows.rules.functions import BUILTIN_FUNCTIONS
 
 
 logger = logging.getLogger(__name__)
 
+# Compiled expressions/templates kept per distinct source text
+EXPRESSION_CACHE_SIZE = workflow_settings.expression_cache_size
+
+VARIABLE_PATTERN = re.compile(r'\{\{([^}]+)\}\}')
+FUNCTION_PATTERN = re.compile(r'(\w+)\((.+)\)')
+AND_PATTERN = re.compile(r'\s+AND\s+', re.IGNORECASE)
+OR_PATTERN = re.compile(r'\s+OR\s+', re.IGNORECASE)
+IN_PATTERN = re.compile(r'(.+?)\s+IN\s+\[(.+)\]', re.IGNORECASE)
+# {{...}} references are masked as \x00<n>\x00 while the expression is parsed
+PLACEHOLDER_PATTERN = re.compile(r'\x00(\d+)\x00')
+PLACEHOLDER = '\x00{}\x00'
+
 
 class ExpressionEvaluator:
     """
@@ -60,40 +74,7 @@ class ExpressionEvaluator:
             return True
 
         try:
-            interpolated = self.interpolate(expression, variables)
-
-            if ' AND ' in interpolated.upper():
-                parts = re.split(r'\s+AND\s+', interpolated, flags=re.IGNORECASE)
-                return all(self.evaluate(part.strip(), variables) for part in parts)
-
-            if ' OR ' in interpolated.upper():
-                parts = re.split(r'\s+OR\s+', interpolated, flags=re.IGNORECASE)
-                return any(self.evaluate(part.strip(), variables) for part in parts)
-
-            if interpolated.upper().startswith('NOT '):
-                return not self.evaluate(interpolated[4:].strip(), variables)
-
-            for op_str, op_func in self.COMPARISON_OPS.items():
-                if f' {op_str} ' in interpolated or f' {op_str.upper()} ' in interpolated.upper():
-                    pattern = rf'\s+{re.escape(op_str)}\s+'
-                    parts = re.split(pattern, interpolated, maxsplit=1, flags=re.IGNORECASE)
-                    if len(parts) == 2:
-                        left = self._parse_value(parts[0].strip())
-                        right = self._parse_value(parts[1].strip())
-                        return op_func(left, right)
-
-            if ' IN ' in interpolated.upper():
-                match = re.match(r'(.+?)\s+IN\s+\[(.+)\]', interpolated, re.IGNORECASE)
-                if match:
-                    value = self._parse_value(match.group(1).strip())
-                    items = [
-                        self._parse_value(item.strip().strip('"\''))
-                        for item in match.group(2).split(',')
-                    ]
-                    return value in items
-
-            return self._parse_value(interpolated)
-
+            return compile_expression(expression)(variables)
         except Exception as e:
             logger.error(f"Error evaluating expression '{expression}': {e}")
             return False
@@ -110,23 +91,22 @@ class ExpressionEvaluator:
         - {{variable.path}}
         - {{FUNCTION(args)}}
         """
-        def replace_var(match):
-            content = match.group(1).strip()
-
-            func_match = re.match(r'(\w+)\((.+)\)', content)
-            if func_match:
-                func_name = func_match.group(1).upper()
-                args_str = func_match.group(2)
-
-                if func_name in BUILTIN_FUNCTIONS:
-                    args = self._parse_function_args(args_str, variables)
-                    result = BUILTIN_FUNCTIONS[func_name](*args)
-                    return str(result) if result is not None else ''
-
-            value = self._get_nested(variables, content)
-            return str(value) if value is not None else match.group(0)
-
-        return re.sub(r'\{\{([^}]+)\}\}', replace_var, text)
+        if '{{' not in text:
+            return text
+        return compile_template(text)(variables)
+
+    @staticmethod
+    def cache_info():
+        """Hit/miss counters of the compiled expression and template caches."""
+        return {
+            'expressions': compile_expression.cache_info()._asdict(),
+            'templates': compile_template.cache_info()._asdict(),
+        }
+
+    @staticmethod
+    def clear_cache() -> None:
+        compile_expression.cache_clear()
+        compile_template.cache_clear()
 
     def _get_nested(
         self,
@@ -134,10 +114,9 @@ class ExpressionEvaluator:
         path: str
     ) -> Any:
         """Get nested value from object using dot notation."""
-        keys = path.split('.')
         value = obj
 
-        for key in keys:
+        for key in _split_path(path):
             if isinstance(value, dict):
                 value = value.get(key)
             elif hasattr(value, key):
@@ -260,12 +239,13 @@ class RuleEvaluator:
         group_type = group.get('type', 'all')
         rules = group.get('rules', [])
 
-        results = []
-        for rule in rules:
-            if 'type' in rule and rule['type'] in ('all', 'any', 'none'):
-                results.append(self._evaluate_group(rule, entity))
-            else:
-                results.append(self._evaluate_condition(rule, entity))
+        # lazily evaluated so all/any/none stop at the first deciding rule
+        results = (
+            self._evaluate_group(rule, entity)
+            if rule.get('type') in ('all', 'any', 'none')
+            else self._evaluate_condition(rule, entity)
+            for rule in rules
+        )
 
         if group_type == 'all':
             return all(results)
@@ -298,3 +278,190 @@ class RuleEvaluator:
         except Exception as e:
             logger.error(f"Error evaluating condition: {e}")
             return False
+
+
+# -- compilation ---------------------------------------------------------
+#
+# Expressions are parsed once per distinct text into nested closures that
+# take the variables dict. The structure (AND/OR/NOT, comparison, IN) is
+# read from the expression itself with every {{...}} reference masked out,
+# so variable values are looked up and compared directly instead of being
+# rendered into the text and re-split on each call. Operands coerce values
+# the way the text round-trip did: strings are parsed ("100" -> 100,
+# "true" -> True), native bool/int/float are used as they are, and anything
+# else is parsed from its str(). An unresolved reference stays its literal
+# "{{path}}" text.
+
+_EVALUATOR = ExpressionEvaluator()
+_NATIVE_TYPES = (bool, int, float)
+
+Compiled = Callable[[Dict[str, Any]], Any]
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def _split_path(path: str) -> Tuple[str, ...]:
+    return tuple(path.split('.'))
+
+
+def _compile_reference(source: str) -> Tuple[Compiled, str]:
+    """
+    Closure for one {{...}} reference, and the text rendered when it is None:
+    empty for built-in function calls, the reference itself for variables.
+    """
+    content = VARIABLE_PATTERN.fullmatch(source).group(1).strip()
+    func_match = FUNCTION_PATTERN.match(content)
+    if func_match:
+        func_name = func_match.group(1).upper()
+        args_str = func_match.group(2)
+        if func_name in BUILTIN_FUNCTIONS:
+            func = BUILTIN_FUNCTIONS[func_name]
+            parse_args = _EVALUATOR._parse_function_args
+            if '{{' in args_str:
+                return (lambda variables: func(*parse_args(args_str, variables))), ''
+            args = tuple(parse_args(args_str, {}))
+            return (lambda variables: func(*args)), ''
+
+    get_nested = _EVALUATOR._get_nested
+    return (lambda variables: get_nested(variables, content)), source
+
+
+def _compile_segments(text: str, references: List[str]) -> List[Any]:
+    """Split masked text into literal strings and (reference, fallback) pairs."""
+    segments: List[Any] = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append(text[position:match.start()])
+        segments.append(_compile_reference(references[int(match.group(1))]))
+        position = match.end()
+    if position < len(text):
+        segments.append(text[position:])
+    return segments
+
+
+def _render(segments: List[Any], variables: Dict[str, Any]) -> str:
+    parts = []
+    for segment in segments:
+        if segment.__class__ is str:
+            parts.append(segment)
+        else:
+            reference, fallback = segment
+            value = reference(variables)
+            parts.append(fallback if value is None else str(value))
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_template(text: str) -> Callable[[Dict[str, Any]], str]:
+    """Compile text with {{...}} references into a renderer."""
+    references: List[str] = []
+
+    def mask(match):
+        references.append(match.group(0))
+        return PLACEHOLDER.format(len(references) - 1)
+
+    segments = _compile_segments(VARIABLE_PATTERN.sub(mask, text), references)
+    return lambda variables: _render(segments, variables)
+
+
+def _compile_operand(text: str, references: List[str]) -> Compiled:
+    """Closure producing the parsed value of one operand."""
+    parse_value = _EVALUATOR._parse_value
+    text = text.strip()
+    match = PLACEHOLDER_PATTERN.fullmatch(text)
+
+    if match is None:
+        if '\x00' not in text:
+            value = parse_value(text)
+            return lambda variables: value
+        segments = _compile_segments(text, references)
+        return lambda variables: parse_value(_render(segments, variables))
+
+    segments = _compile_segments(text, references)
+    reference, fallback = segments[0]
+
+    def operand(variables):
+        value = reference(variables)
+        if value is None:
+            return parse_value(fallback)
+        if value.__class__ in _NATIVE_TYPES:
+            return value
+        if value.__class__ is str:
+            return parse_value(value)
+        return parse_value(str(value))
+
+    return operand
+
+
+def _source(text: str, references: List[str]) -> str:
+    return PLACEHOLDER_PATTERN.sub(lambda match: references[int(match.group(1))], text)
+
+
+def _guarded(node: Compiled, text: str) -> Compiled:
+    """A failing condition evaluates to False without failing its siblings."""
+    def guarded(variables):
+        try:
+            return node(variables)
+        except Exception as e:
+            logger.error(f"Error evaluating expression '{text}': {e}")
+            return False
+    return guarded
+
+
+def _compile_node(text: str, references: List[str]) -> Compiled:
+    """Compile a masked expression, applying the same precedence as before."""
+    if not text:
+        return lambda variables: True
+
+    upper = text.upper()
+
+    if ' AND ' in upper:
+        parts = tuple(_compile_node(part.strip(), references) for part in AND_PATTERN.split(text))
+        return lambda variables: all(part(variables) for part in parts)
+
+    if ' OR ' in upper:
+        parts = tuple(_compile_node(part.strip(), references) for part in OR_PATTERN.split(text))
+        return lambda variables: any(part(variables) for part in parts)
+
+    if upper.startswith('NOT '):
+        inner = _compile_node(text[4:].strip(), references)
+        return lambda variables: not inner(variables)
+
+    for op_str, op_func in ExpressionEvaluator.COMPARISON_OPS.items():
+        if f' {op_str} ' in text or f' {op_str.upper()} ' in upper:
+            pattern = rf'\s+{re.escape(op_str)}\s+'
+            parts = re.split(pattern, text, maxsplit=1, flags=re.IGNORECASE)
+            if len(parts) == 2:
+                left = _compile_operand(parts[0], references)
+                right = _compile_operand(parts[1], references)
+                return _guarded(
+                    lambda variables: op_func(left(variables), right(variables)),
+                    _source(text, references)
+                )
+
+    if ' IN ' in upper:
+        match = IN_PATTERN.match(text)
+        if match:
+            value = _compile_operand(match.group(1), references)
+            items = tuple(
+                _compile_operand(item.strip().strip('"\''), references)
+                for item in match.group(2).split(',')
+            )
+            return _guarded(
+                lambda variables: value(variables) in [item(variables) for item in items],
+                _source(text, references)
+            )
+
+    return _guarded(_compile_operand(text, references), _source(text, references))
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(expression: str) -> Compiled:
+    """Compile a condition expression into a closure over the variables dict."""
+    references: List[str] = []
+
+    def mask(match):
+        references.append(match.group(0))
+        return PLACEHOLDER.format(len(references) - 1)
+
+    return _compile_node(VARIABLE_PATTERN.sub(mask, expression), references)
@@ -1,18 +1,32 @@
 """
 Workflow Scheduler
 Cron and interval-based workflow scheduling
+
+Jobs are kept in a min-heap keyed by next run time. The loop sleeps until
+the earliest deadline and is woken early when a job is added or changed,
+so an idle scheduler costs nothing regardless of how many jobs it holds and
+jobs fire on time instead of on the next polling tick. Due jobs run
+concurrently up to ``scheduler_max_concurrency``; the rest wait in the heap
+and their start delay is reported as schedule lag.
 """
 
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Set, Tuple
 from datetime import datetime, timedelta
 import asyncio
+import heapq
+import itertools
 import logging
+import threading
 from croniter import croniter
 
 from app.utils.datetime_utils import utc_now
+from app.workflows.config import workflow_settings
 
 logger = logging.getLogger(__name__)
 
+# Longest single sleep, so wall-clock adjustments are picked up
+MAX_SLEEP_SECONDS = 300
+
 
 class ScheduledJob:
     """Represents a scheduled workflow job."""
@@ -31,9 +45,9 @@ class ScheduledJob:
         # Calculate next run time
         self._calculate_next_run()
 
-    def _calculate_next_run(self):
-        """Calculate the next run time."""
-        now = utc_now()
+    def _calculate_next_run(self, now: Optional[datetime] = None):
+        """Calculate the next run time after ``now`` (default: the current time)."""
+        now = now or utc_now()
 
         if self.schedule_type == "cron":
             cron_expr = self.schedule_config.get("cron", "0 * * * *")
@@ -80,11 +94,11 @@ class ScheduledJob:
 
         self._calculate_next_run()
 
-    def is_due(self) -> bool:
+    def is_due(self, now: Optional[datetime] = None) -> bool:
         """Check if job is due for execution."""
         if not self.enabled or not self.next_run:
             return False
-        return utc_now() >= self.next_run
+        return (now or utc_now()) >= self.next_run
 
     def to_dict(self) -> Dict:
         return {
@@ -103,21 +117,74 @@ class ScheduledJob:
 class WorkflowScheduler:
     """Manages scheduled workflow execution."""
 
-    def __init__(self):
+    def __init__(self, max_concurrency: Optional[int] = None):
         self._jobs: Dict[str, ScheduledJob] = {}
         self._running = False
         self._task: Optional[asyncio.Task] = None
-        self._check_interval = 60  # seconds
         self._on_execute: Optional[Callable] = None
+        self.max_concurrency = max_concurrency or workflow_settings.scheduler_max_concurrency
+
+        # (next_run, sequence, workflow_id, generation); entries whose
+        # generation is no longer the job's current one are skipped
+        self._heap: List[Tuple[datetime, int, str, int]] = []
+        self._generations: Dict[str, int] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        self._in_flight: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sleep_until: Optional[datetime] = None
+
+        self._runs = 0
+        self._failures = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._lag_last = 0.0
 
     def set_executor(self, executor: Callable):
         """Set the workflow executor callback."""
         self._on_execute = executor
+        self._wake()
+
+    # -- heap maintenance --------------------------------------------------
+
+    def _schedule(self, job: ScheduledJob):
+        """(Re)queue a job at its next run time, replacing any older entry."""
+        with self._lock:
+            generation = self._generations.get(job.workflow_id, 0) + 1
+            self._generations[job.workflow_id] = generation
+            if not job.enabled or not job.next_run or job.workflow_id in self._in_flight:
+                return
+            heapq.heappush(self._heap, (job.next_run, next(self._sequence), job.workflow_id, generation))
+            wake = self._sleep_until is None or job.next_run < self._sleep_until
+        if wake:
+            self._wake()
+
+    def _is_current(self, entry: Tuple[datetime, int, str, int]) -> bool:
+        return self._generations.get(entry[2]) == entry[3]
+
+    def _wake(self):
+        """Interrupt the loop's sleep so it re-reads the earliest deadline."""
+        if self._wakeup is None or self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # -- job management ----------------------------------------------------
 
     def add_job(self, workflow_id: str, schedule_type: str, schedule_config: Dict) -> ScheduledJob:
         """Add a scheduled job."""
         job = ScheduledJob(workflow_id, schedule_type, schedule_config)
         self._jobs[workflow_id] = job
+        self._schedule(job)
         logger.info(f"Scheduled job added: {workflow_id} ({schedule_type})")
         return job
 
@@ -125,6 +192,8 @@ class WorkflowScheduler:
         """Remove a scheduled job."""
         if workflow_id in self._jobs:
             del self._jobs[workflow_id]
+            with self._lock:
+                self._generations.pop(workflow_id, None)
             logger.info(f"Scheduled job removed: {workflow_id}")
             return True
         return False
@@ -141,6 +210,7 @@ class WorkflowScheduler:
             job.schedule_config = schedule_config
 
         job._calculate_next_run()
+        self._schedule(job)
         return job
 
     def enable_job(self, workflow_id: str) -> bool:
@@ -149,6 +219,7 @@ class WorkflowScheduler:
         if job:
             job.enabled = True
             job._calculate_next_run()
+            self._schedule(job)
             return True
         return False
 
@@ -157,6 +228,7 @@ class WorkflowScheduler:
         job = self._jobs.get(workflow_id)
         if job:
             job.enabled = False
+            self._schedule(job)
             return True
         return False
 
@@ -170,7 +242,47 @@ class WorkflowScheduler:
 
     def get_due_jobs(self) -> List[ScheduledJob]:
         """Get jobs that are due for execution."""
-        return [job for job in self._jobs.values() if job.is_due()]
+        now = utc_now()
+        due = []
+        with self._lock:
+            # walk only the heap's due prefix: children of a future entry are later
+            stack = [0] if self._heap else []
+            while stack:
+                i = stack.pop()
+                entry = self._heap[i]
+                if entry[0] > now:
+                    continue
+                if self._is_current(entry):
+                    due.append(self._jobs[entry[2]])
+                stack.extend(c for c in (2 * i + 1, 2 * i + 2) if c < len(self._heap))
+        due.sort(key=lambda job: job.next_run)
+        return due
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue, concurrency and schedule-lag figures."""
+        with self._lock:
+            next_run = self._peek()
+        return {
+            "jobs": len(self._jobs),
+            "in_flight": len(self._in_flight),
+            "max_concurrency": self.max_concurrency,
+            "next_run": next_run.isoformat() if next_run else None,
+            "runs": self._runs,
+            "failures": self._failures,
+            "lag_seconds": {
+                "last": round(self._lag_last, 3),
+                "avg": round(self._lag_total / self._runs, 3) if self._runs else 0.0,
+                "max": round(self._lag_max, 3),
+            },
+        }
+
+    def _peek(self) -> Optional[datetime]:
+        """Earliest current deadline, discarding stale heap entries. Lock held."""
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    # -- loop --------------------------------------------------------------
 
     async def start(self):
         """Start the scheduler."""
@@ -178,6 +290,8 @@ class WorkflowScheduler:
             return
 
         self._running = True
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
         self._task = asyncio.create_task(self._run_loop())
         logger.info("Workflow scheduler started")
 
@@ -190,37 +304,93 @@ class WorkflowScheduler:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
         logger.info("Workflow scheduler stopped")
 
     async def _run_loop(self):
-        """Main scheduler loop."""
+        """Main scheduler loop: dispatch due jobs, then sleep to the next deadline."""
         while self._running:
             try:
-                await self._check_and_execute()
-                await asyncio.sleep(self._check_interval)
+                self._wakeup.clear()
+                deadline = self._dispatch_due()
+                with self._lock:
+                    self._sleep_until = deadline
+                timeout = MAX_SLEEP_SECONDS
+                if deadline is not None:
+                    timeout = min(max((deadline - utc_now()).total_seconds(), 0), MAX_SLEEP_SECONDS)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Scheduler loop error: {e}")
-                await asyncio.sleep(self._check_interval)
+                await asyncio.sleep(1)
+
+    def _dispatch_due(self) -> Optional[datetime]:
+        """
+        Start due jobs while concurrency allows.
+
+        Returns the next deadline to sleep until, or None when idle. With
+        every slot busy the loop sleeps until a running job finishes and
+        wakes it. Without an executor nothing is started and due jobs stay
+        queued until one is set.
+        """
+        if not self._on_execute:
+            return None
+        now = utc_now()
+        with self._lock:
+            while True:
+                next_run = self._peek()
+                if next_run is None or next_run > now:
+                    return next_run
+                if len(self._in_flight) >= self.max_concurrency:
+                    return None
+                _, _, workflow_id, _ = heapq.heappop(self._heap)
+                self._generations[workflow_id] += 1
+                self._in_flight.add(workflow_id)
+                job = self._jobs[workflow_id]
+                task = asyncio.create_task(self._run_job(job, next_run, now))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _run_job(self, job: ScheduledJob, scheduled_for: datetime, started: datetime):
+        """Execute one due job, record its lag, and requeue it."""
+        lag = (started - scheduled_for).total_seconds()
+        self._runs += 1
+        self._lag_last = lag
+        self._lag_total += lag
+        self._lag_max = max(self._lag_max, lag)
 
-    async def _check_and_execute(self):
-        """Check for due jobs and execute them."""
-        due_jobs = self.get_due_jobs()
+        try:
+            logger.info(f"Executing scheduled workflow: {job.workflow_id}")
+            await self._on_execute(job.workflow_id, {
+                "trigger_type": "schedule",
+                "schedule_type": job.schedule_type,
+                "scheduled_time": scheduled_for.isoformat(),
+            })
+            job.mark_executed(success=True)
+        except Exception as e:
+            logger.error(f"Scheduled execution failed: {job.workflow_id} - {e}")
+            self._failures += 1
+            job.mark_executed(success=False, error=str(e))
+        finally:
+            with self._lock:
+                self._in_flight.discard(job.workflow_id)
+            current = self._jobs.get(job.workflow_id)
+            if current is not None:
+                self._schedule(current)
+            self._wake()
 
-        for job in due_jobs:
-            if self._on_execute:
-                try:
-                    logger.info(f"Executing scheduled workflow: {job.workflow_id}")
-                    await self._on_execute(job.workflow_id, {
-                        "trigger_type": "schedule",
-                        "schedule_type": job.schedule_type,
-                        "scheduled_time": job.next_run.isoformat() if job.next_run else None,
-                    })
-                    job.mark_executed(success=True)
-                except Exception as e:
-                    logger.error(f"Scheduled execution failed: {job.workflow_id} - {e}")
-                    job.mark_executed(success=False, error=str(e))
+    async def _check_and_execute(self):
+        """Start every due job now; kept for callers that poll explicitly."""
+        self._dispatch_due()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
 
     async def run_now(self, workflow_id: str) -> bool:
         """Manually trigger a scheduled workflow."""
@@ -247,7 +417,7 @@ class WorkflowScheduler:
             if temp_job.next_run:
                 times.append(temp_job.next_run)
                 temp_job.last_run = temp_job.next_run
-                temp_job._calculate_next_run()
+                temp_job._calculate_next_run(temp_job.next_run)
             else:
                 break
 
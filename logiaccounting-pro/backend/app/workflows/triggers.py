@@ -1,14 +1,23 @@
 """
 Workflow Triggers
 Event and schedule trigger system
+
+Besides ``emit_event``, which dispatches one event and waits for its
+handlers, the registry has a batching path for bulk operations:
+``emit_batched`` queues the event and returns at once. Events for the same
+entity that arrive within ``event_batch_window_ms`` are coalesced (the
+latest payload wins), and each batch is dispatched to handlers
+concurrently, at most ``event_dispatch_concurrency`` at a time.
 """
 
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from enum import Enum
+from itertools import islice
 import logging
 import asyncio
 
 from app.utils.datetime_utils import utc_now
+from app.workflows.config import workflow_settings
 from app.workflows.models import Workflow, TriggerType
 
 logger = logging.getLogger(__name__)
@@ -163,6 +172,14 @@ class TriggerRegistry:
         self._workflow_triggers: Dict[str, List[str]] = {}  # event -> [workflow_ids]
         self._scheduled_workflows: Dict[str, Dict] = {}  # workflow_id -> schedule_info
 
+        # (event_type, customer_id, entity_id) -> [payload, emits]; insertion
+        # order keeps each entity at the position of its first emit
+        self._pending: Dict[Tuple, List] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._dispatch_limit: Optional[asyncio.Semaphore] = None
+        self._batch_stats = {"queued": 0, "coalesced": 0, "dispatched": 0, "batches": 0}
+
     def register_event_handler(self, event_type: str, handler: Callable):
         """Register a handler for an event type."""
         if event_type not in self._event_handlers:
@@ -205,18 +222,125 @@ class TriggerRegistry:
         # Get subscribed workflows
         workflow_ids = self.get_subscribed_workflows(event_type)
 
-        # Call registered handlers
-        handlers = self._event_handlers.get(event_type, [])
-        for handler in handlers:
+        await self._dispatch(event_type, payload, workflow_ids)
+
+        return workflow_ids
+
+    async def _dispatch(
+        self,
+        event_type: str,
+        payload: Dict[str, Any],
+        workflow_ids: List[str],
+        limit: Optional[asyncio.Semaphore] = None
+    ):
+        """Call every handler of an event; coroutine handlers run concurrently."""
+        pending = []
+        for handler in self._event_handlers.get(event_type, []):
             try:
                 if asyncio.iscoroutinefunction(handler):
-                    await handler(event_type, payload, workflow_ids)
+                    pending.append(self._call(handler, event_type, payload, workflow_ids, limit))
                 else:
                     handler(event_type, payload, workflow_ids)
             except Exception as e:
                 logger.error(f"Event handler error: {e}")
+        if pending:
+            await asyncio.gather(*pending)
 
-        return workflow_ids
+    @staticmethod
+    async def _call(handler: Callable, event_type: str, payload: Dict, workflow_ids: List[str],
+                    limit: Optional[asyncio.Semaphore]):
+        try:
+            if limit is None:
+                await handler(event_type, payload, workflow_ids)
+            else:
+                async with limit:
+                    await handler(event_type, payload, workflow_ids)
+        except Exception as e:
+            logger.error(f"Event handler error: {e}")
+
+    # ==================== Batched Emission ====================
+
+    @staticmethod
+    def _entity_id(event_type: str, payload: Dict[str, Any]) -> Optional[str]:
+        """Id of the entity an event is about: ``<entity>_id`` or ``id`` in the payload."""
+        entity = event_type.split(".", 1)[0]
+        return payload.get(f"{entity}_id") or payload.get("id")
+
+    def emit_batched(
+        self,
+        event_type: str,
+        payload: Dict[str, Any],
+        customer_id: str = None,
+        coalesce_key: Optional[str] = None
+    ) -> List[str]:
+        """
+        Queue an event for batched dispatch and return without waiting.
+
+        Repeated events for the same entity (``coalesce_key``, else the
+        payload's entity id) within one batch window are merged into one
+        dispatch with the latest payload. Events without an entity id are
+        never coalesced. Must be called from the running event loop.
+        """
+        entity_id = coalesce_key or self._entity_id(event_type, payload)
+        key = (event_type, customer_id, entity_id if entity_id is not None else object())
+
+        entry = self._pending.get(key)
+        if entry is None:
+            self._pending[key] = [payload, 1]
+        else:
+            entry[0] = payload
+            entry[1] += 1
+            self._batch_stats["coalesced"] += 1
+        self._batch_stats["queued"] += 1
+
+        if self._flush_task is None or self._flush_task.done():
+            self._batch_full = asyncio.Event()
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+        if len(self._pending) >= workflow_settings.event_batch_size:
+            self._batch_full.set()
+
+        return self.get_subscribed_workflows(event_type)
+
+    async def _flush_loop(self):
+        """Dispatch queued events a window at a time until the queue stays empty."""
+        window = workflow_settings.event_batch_window_ms / 1000
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), window)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+            await self._dispatch_pending()
+
+    async def _dispatch_pending(self):
+        """Dispatch up to one batch of queued events."""
+        size = workflow_settings.event_batch_size
+        # Only the batch's keys are copied, so draining a large backlog stays linear
+        batch = [(key, self._pending.pop(key)) for key in list(islice(self._pending, size))]
+        if not batch:
+            return
+
+        if self._dispatch_limit is None:
+            # shared, so flush() and the background loop stay within one cap
+            self._dispatch_limit = asyncio.Semaphore(workflow_settings.event_dispatch_concurrency)
+        await asyncio.gather(*(
+            self._dispatch(
+                event_type, payload, self.get_subscribed_workflows(event_type), self._dispatch_limit
+            )
+            for (event_type, _, _), (payload, _) in batch
+        ))
+        self._batch_stats["dispatched"] += len(batch)
+        self._batch_stats["batches"] += 1
+        logger.info(f"Dispatched {len(batch)} batched events")
+
+    async def flush(self):
+        """Dispatch every queued event now."""
+        while self._pending:
+            await self._dispatch_pending()
+
+    def get_batch_stats(self) -> Dict[str, int]:
+        """Counters for the batched emission path."""
+        return {**self._batch_stats, "pending": len(self._pending)}
 
     def schedule_workflow(self, workflow_id: str, schedule_info: Dict):
         """Register a workflow for scheduled execution."""
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+AccountBalance backfill for closed fiscal periods.
+
+As-of-date ledger totals read closed periods from their AccountBalance
+snapshot, which is written when a period closes. Run this once to rebuild
+the snapshots of periods closed before that, or whose rows drifted.
+
+Usage:
+    python scripts/backfill_account_balances.py [customer_id ...]
+"""
+
+import sys
+from pathlib import Path
+from uuid import UUID
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import SessionLocal  # noqa: E402
+from app.accounting.ledger.balance_calculator import BalanceCalculator  # noqa: E402
+from app.accounting.periods.models import FiscalPeriod, FiscalYear  # noqa: E402
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        if len(sys.argv) > 1:
+            customer_ids = [UUID(arg) for arg in sys.argv[1:]]
+        else:
+            customer_ids = [
+                row[0] for row in db.query(FiscalYear.customer_id).join(FiscalPeriod).filter(
+                    FiscalPeriod.is_closed == True  # noqa: E712
+                ).distinct()
+            ]
+
+        calculator = BalanceCalculator(db)
+        for customer_id in customer_ids:
+            rebuilt = calculator.rebuild_closed_periods(customer_id)
+            print(f"{customer_id}: rebuilt {rebuilt} closed periods")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Material search latency benchmark.
+
+Loads synthetic materials into a MaterialStore and compares the trigram
+search index against the previous linear lowercase-and-scan filter for
+typical inventory search box queries.
+
+Usage:
+    python scripts/benchmark_material_search.py [material_count]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.store import MaterialStore  # noqa: E402
+
+DEFAULT_COUNT = 100_000
+REPEAT = 20
+
+ADJECTIVES = ["Steel", "Aluminum", "Copper", "Brass", "Plastic", "Rubber", "Carbon", "Stainless", "Galvanized", "Oak"]
+NOUNS = ["Sheets", "Bars", "Wire", "Bolts", "Panels", "Pipes", "Tubes", "Gaskets", "Brackets", "Module"]
+QUERIES = ["s", "st", "ste", "steel", "steel bo", "rm-0012", "gasket", "zzz"]
+
+
+def linear_search(materials: list, query: str) -> list:
+    """The filter MaterialStore.find_all used before the index."""
+    search = query.lower()
+    return [m for m in materials if search in m["name"].lower() or search in m.get("reference", "").lower()]
+
+
+def timed(fn, *args) -> float:
+    """Median latency in milliseconds."""
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main() -> int:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    rng = random.Random(7)
+    store = MaterialStore()
+
+    start = time.perf_counter()
+    for i in range(count):
+        store.create({
+            "reference": f"{rng.choice(['RM', 'FG', 'OF'])}-{i:06d}",
+            "name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.randint(1, 500)}",
+            "quantity": rng.randint(0, 1000),
+            "min_stock": 10,
+            "state": "available",
+        })
+    print(f"Indexed {count:,} materials in {time.perf_counter() - start:.1f}s\n")
+
+    materials = store.find_all()
+    print(f"  {'query':<12} {'matches':>8} {'linear ms':>10} {'index ms':>10} {'top-20 ms':>10}")
+    for query in QUERIES:
+        matches = len(store.find_all({"search": query}))
+        linear = timed(linear_search, materials, query)
+        indexed = timed(store.find_all, {"search": query})
+        top = timed(store.search, query, 20)
+        print(f"  {query!r:<12} {matches:>8,} {linear:>10.2f} {indexed:>10.2f} {top:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Sliding window rate limiter benchmark.
+
+Fills the bucketed SlidingWindowCounter with distinct keys, one request
+each, the way a credential-stuffing run spread over many IPs does, and
+reports per-check latency percentiles at each key-count milestone plus
+memory per key. It then compares a single hot key under a long burst with
+the previous implementation, which stored one (timestamp, count) entry per
+request and rebuilt and summed that list on every check.
+
+Usage:
+    python scripts/benchmark_rate_limiter.py [key_count]
+"""
+
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.security.protection.rate_limiter import SlidingWindowCounter  # noqa: E402
+
+DEFAULT_KEYS = 1_000_000
+SAMPLE = 20_000
+BURST = 10_000
+WINDOW_SECONDS = 60
+
+
+class ListSlidingWindow:
+    """The previous counter: a request log per key under one lock."""
+
+    def __init__(self, window_seconds: int, max_requests: int):
+        self._window_seconds = window_seconds
+        self._max_requests = max_requests
+        self._buckets = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def increment(self, key: str, amount: int = 1):
+        current_time = time.time()
+        with self._lock:
+            cutoff = current_time - self._window_seconds
+            self._buckets[key] = [(ts, c) for ts, c in self._buckets[key] if ts > cutoff]
+            current_count = sum(c for _, c in self._buckets[key])
+            if current_count + amount > self._max_requests:
+                return False, current_count, self._max_requests - current_count
+            self._buckets[key].append((current_time, amount))
+            return True, current_count + amount, self._max_requests - current_count - amount
+
+
+def percentiles(samples: list) -> str:
+    samples.sort()
+    pick = lambda q: samples[min(len(samples) - 1, int(len(samples) * q))] * 1e6  # noqa: E731
+    return f"p50 {pick(0.50):5.2f}us  p99 {pick(0.99):6.2f}us  max {samples[-1] * 1e6:8.1f}us"
+
+
+def fill(key_count: int) -> None:
+    counter = SlidingWindowCounter(WINDOW_SECONDS, 10)
+    counter.EVICT_INTERVAL_SECONDS = 3600
+    milestones = sorted({m for m in (10_000, 100_000, key_count // 2, key_count) if m <= key_count})
+
+    tracemalloc.start()
+    inserted = 0
+    print(f"Distinct keys, one request each (window {WINDOW_SECONDS}s):")
+    for milestone in milestones:
+        while inserted < milestone:
+            counter.increment(f"auth:ip:10.{inserted >> 16 & 255}.{inserted >> 8 & 255}.{inserted & 255}:{inserted}")
+            inserted += 1
+        current, _ = tracemalloc.get_traced_memory()
+
+        timings = []
+        for i in range(SAMPLE):
+            key = f"auth:ip:probe:{milestone}:{i}"
+            start = time.perf_counter()
+            counter.increment(key)
+            timings.append(time.perf_counter() - start)
+        inserted += SAMPLE
+        print(f"  {milestone:>9,} keys  {percentiles(timings)}  {current / milestone:5.0f} B/key")
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    evicted = counter.evict_idle()
+    print(f"  idle eviction scan over {len(counter):,} live keys: {time.perf_counter() - start:.2f}s "
+          f"({evicted} evicted)\n")
+
+
+def burst() -> None:
+    print(f"One key, {BURST:,} requests inside the window:")
+    for name, counter in (
+        ("bucketed", SlidingWindowCounter(WINDOW_SECONDS, BURST * 2)),
+        ("list (previous)", ListSlidingWindow(WINDOW_SECONDS, BURST * 2)),
+    ):
+        timings = []
+        for _ in range(BURST):
+            start = time.perf_counter()
+            counter.increment("auth:ip:203.0.113.9")
+            timings.append(time.perf_counter() - start)
+        last = sorted(timings[-1000:])[500] * 1e6
+        print(f"  {name:<16} total {sum(timings):6.2f}s  {percentiles(timings)}  last-1000 p50 {last:7.2f}us")
+
+
+def main() -> int:
+    key_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_KEYS
+    fill(key_count)
+    burst()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Bank reconciliation auto-match benchmark.
+
+Builds a synthetic statement and a GL cash account with one candidate
+journal line per bank transaction (plus noise), then compares the previous
+per-transaction scan (every line in the +/-7 day window scored for every
+transaction, as the old per-transaction query returned them) with the
+amount-indexed one-to-one assignment used by auto_match_statement.
+
+Both run in memory, so the numbers exclude the two database round-trips
+per transaction the old path also paid.
+
+Usage:
+    python scripts/benchmark_reconciliation_matching.py [transaction_count]
+"""
+
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.accounting.reconciliation.matcher import (  # noqa: E402
+    DATE_TOLERANCE, MIN_CONFIDENCE, TransactionMatcher,
+)
+
+DEFAULT_COUNT = 10_000
+NOISE_RATIO = 0.5
+START = date(2024, 1, 1)
+
+
+def make_data(count: int):
+    """Transactions over a quarter, matching lines shifted by a few days."""
+    rng = random.Random(11)
+    transactions, lines = [], []
+    for i in range(count):
+        amount = Decimal(rng.randint(100, 500_000)) / 100
+        day = START + timedelta(days=rng.randint(0, 89))
+        transactions.append(SimpleNamespace(
+            amount=amount, transaction_date=day, transaction_type="debit",
+            reference=f"REF-{i}" if i % 3 == 0 else None, description=f"Payment {i}",
+        ))
+        entry = SimpleNamespace(entry_date=day + timedelta(days=rng.randint(-2, 2)),
+                                reference=f"REF-{i}" if i % 3 == 0 else None)
+        lines.append(SimpleNamespace(debit_amount=amount, credit_amount=Decimal("0"),
+                                     description=f"Payment {i}", entry=entry))
+    for _ in range(int(count * NOISE_RATIO)):
+        entry = SimpleNamespace(entry_date=START + timedelta(days=rng.randint(0, 89)), reference=None)
+        lines.append(SimpleNamespace(debit_amount=Decimal(rng.randint(100, 500_000)) / 100,
+                                     credit_amount=Decimal("0"), description=None, entry=entry))
+    rng.shuffle(lines)
+    return transactions, lines
+
+
+def scan_match(matcher: TransactionMatcher, transactions: list, lines: list) -> int:
+    """The previous algorithm: window filter and score per transaction, lines may repeat."""
+    matched = 0
+    for trans in transactions:
+        earliest = trans.transaction_date - timedelta(days=DATE_TOLERANCE)
+        latest = trans.transaction_date + timedelta(days=DATE_TOLERANCE)
+        best = 0.0
+        for line in lines:
+            if earliest <= line.entry.entry_date <= latest:
+                score = matcher._calculate_match_score(trans, line)
+                if score > best and score >= MIN_CONFIDENCE:
+                    best = score
+        matched += best > 0
+    return matched
+
+
+def main() -> int:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    transactions, lines = make_data(count)
+    matcher = TransactionMatcher(None)
+    print(f"{count:,} bank transactions, {len(lines):,} candidate journal lines\n")
+
+    start = time.perf_counter()
+    matches = matcher.assign_matches(transactions, lines)
+    indexed = time.perf_counter() - start
+    print(f"  indexed assignment  {indexed:8.2f}s  matched {len(matches):,}")
+
+    sample = transactions[: max(1, count // 20)]
+    start = time.perf_counter()
+    scan_match(matcher, sample, lines)
+    scanned = (time.perf_counter() - start) * len(transactions) / len(sample)
+    print(f"  per-transaction scan{scanned:8.2f}s  (extrapolated from {len(sample):,} transactions)")
+
+    print(f"\nSpeedup: {scanned / indexed:.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
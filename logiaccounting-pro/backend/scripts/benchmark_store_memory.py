@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+In-memory store memory benchmark.
+
+Loads the same synthetic transactions into a dict-backed BaseStore and a
+compact (slotted row) BaseStore and reports traced allocations per record,
+then the time a full ``find_all()`` and a filtered one take on each, since
+compact rows are rebuilt into dicts on every read.
+
+Usage:
+    python scripts/benchmark_store_memory.py [record_count]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.store import BaseStore, TRANSACTION_INTERNED, TRANSACTION_SCHEMA  # noqa: E402
+
+DEFAULT_COUNT = 200_000
+READ_ROUNDS = 5
+
+
+def make_records(count: int) -> list:
+    """Generate transaction-shaped records with realistic value reuse."""
+    rng = random.Random(42)
+    categories = [f"cat-{i}" for i in range(20)]
+    projects = [f"prj-{i}" for i in range(50)]
+    return [
+        {
+            "type": rng.choice(("income", "expense")),
+            "category_id": rng.choice(categories),
+            "project_id": rng.choice(projects),
+            "amount": round(rng.uniform(10, 5000), 2),
+            "tax_amount": 0,
+            "description": f"Transaction {i}",
+            "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "invoice_number": None,
+            "created_by": "user-1",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(store: BaseStore, records: list) -> int:
+    """Bytes allocated while loading records into the store."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for record in records:
+        # fresh strings per record, as they would arrive from request payloads
+        store.create({k: (v.encode().decode() if isinstance(v, str) else v) for k, v in record.items()})
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+
+def time_reads(store: BaseStore, filters=None) -> float:
+    """Best of READ_ROUNDS find_all() calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(READ_ROUNDS):
+        start = time.perf_counter()
+        store.find_all(filters)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> int:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    records = make_records(count)
+
+    print(f"Loading {count:,} transactions...\n")
+    results = {}
+    reads = {}
+    for label, store in (
+        ("dict", BaseStore(indexes=("type",))),
+        ("compact", BaseStore(indexes=("type",), schema=TRANSACTION_SCHEMA, interned=TRANSACTION_INTERNED)),
+    ):
+        size = measure(store, records)
+        results[label] = size
+        reads[label] = (time_reads(store), time_reads(store, {"type": "income"}))
+        print(f"  {label:<8} {size / 1024 / 1024:8.1f} MiB  {size / count:7.0f} B/record")
+
+    print("\nfind_all() latency (best of %d):" % READ_ROUNDS)
+    for label, (full, filtered) in reads.items():
+        print(f"  {label:<8} all {full:8.1f} ms   type=income {filtered:8.1f} ms")
+
+    saved = 1 - results["compact"] / results["dict"]
+    slower = reads["compact"][0] / reads["dict"][0]
+    print(f"\nCompact storage saves {saved:.0%} memory; full reads take {slower:.1f}x as long")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
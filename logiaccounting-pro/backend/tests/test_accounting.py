@@ -1,6 +1,106 @@
 """Tests for the Accounting module - Chart of Accounts, Journal Entries, Ledger."""
+import threading
+import uuid
 import pytest
 from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+from sqlalchemy import Column, Table, create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.accounting.chart_of_accounts.models import Account, AccountType, NormalBalanceEnum, ReportTypeEnum
+from app.accounting.journal.models import JournalEntry, JournalLine, EntryStatusEnum, LEDGER_STATUSES
+from app.accounting.journal.numbering import EntryNumberAllocator, format_entry_number
+from app.accounting.journal.recurring import RecurringEntry  # noqa: F401 - registers recurring_entries
+from app.accounting.journal.schemas import JournalEntryCreate, JournalLineCreate, EntryReversalRequest
+from app.accounting.journal.service import JournalEntryService
+from app.accounting.ledger.aggregates import LedgerAggregates
+from app.accounting.ledger.balance_calculator import BalanceCalculator
+from app.accounting.ledger.general_ledger import GeneralLedgerService
+from app.accounting.ledger.models import AccountBalance
+from app.accounting.ledger.trial_balance import TrialBalanceService
+from app.accounting.periods.models import FiscalPeriod
+from app.accounting.periods.service import PeriodService
+from app.accounting.reconciliation.matcher import TransactionMatcher
+from app.accounting.statements import BalanceSheetGenerator, CashFlowGenerator, IncomeStatementGenerator
+
+
+# The accounting models target PostgreSQL; render its column types on SQLite
+# so the services can run against an in-memory database
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+LEDGER_TABLES = (
+    "customers", "users", "projects", "account_types", "accounts", "fiscal_years",
+    "fiscal_periods", "recurring_entries", "journal_entries", "journal_lines",
+    "journal_sequences", "account_balances",
+)
+
+
+@pytest.fixture
+def ledger():
+    """Accounting services on an in-memory database with cash and sales accounts and FY 2024."""
+    # Tables owned by other modules that accounting rows reference
+    for name in ("customers", "users", "projects"):
+        if name not in Base.metadata.tables:
+            Table(name, Base.metadata, Column("id", UUID(as_uuid=True), primary_key=True))
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables[name] for name in LEDGER_TABLES])
+    db = Session(engine)
+
+    customer_id, user_id = uuid.uuid4(), uuid.uuid4()
+    asset = AccountType(name="asset", display_name="Asset", normal_balance=NormalBalanceEnum.DEBIT,
+                        report_type=ReportTypeEnum.BALANCE_SHEET)
+    revenue = AccountType(name="revenue", display_name="Revenue", normal_balance=NormalBalanceEnum.CREDIT,
+                          report_type=ReportTypeEnum.INCOME_STATEMENT)
+    cash = Account(customer_id=customer_id, code="1000", name="Cash", account_type=asset,
+                   opening_balance=Decimal("0"), current_balance=Decimal("0"))
+    sales = Account(customer_id=customer_id, code="4000", name="Sales", account_type=revenue,
+                    opening_balance=Decimal("0"), current_balance=Decimal("0"))
+    db.add_all([asset, revenue, cash, sales])
+    db.commit()
+    PeriodService(db).create_fiscal_year(customer_id, date(2024, 1, 1))
+    journal = JournalEntryService(db)
+
+    def create(entry_date, amount, approve=True, entry_number=None):
+        entry = journal.create_entry(customer_id, JournalEntryCreate(
+            entry_date=entry_date,
+            description="Cash sale",
+            lines=[
+                JournalLineCreate(account_id=cash.id, debit_amount=Decimal(amount), credit_amount=Decimal("0")),
+                JournalLineCreate(account_id=sales.id, debit_amount=Decimal("0"), credit_amount=Decimal(amount)),
+            ],
+        ), created_by=user_id, entry_number=entry_number)
+        if approve:
+            journal.submit_for_approval(entry.id, user_id)
+            journal.approve_entry(entry.id, user_id)
+        return entry
+
+    def post(entry_date, amount):
+        return journal.post_entry(create(entry_date, amount).id, user_id)
+
+    def period(month):
+        return db.query(FiscalPeriod).filter(FiscalPeriod.period_number == month).one()
+
+    yield SimpleNamespace(
+        db=db, customer_id=customer_id, user_id=user_id, cash=cash, sales=sales,
+        journal=journal, create=create, post=post, period=period,
+    )
+    db.close()
+    engine.dispose()
 
 
 class TestChartOfAccounts:
@@ -175,6 +275,183 @@ class TestJournalEntries:
         assert response.status_code in [400, 422]
 
 
+class TestBatchPost:
+    """Test chunked batch posting of journal entries."""
+
+    def test_entries_are_posted_in_chunks(self, ledger, monkeypatch):
+        """Each chunk of entry ids is validated and committed separately."""
+        entries = [ledger.create(date(2024, 1, day), "10.00") for day in range(1, 6)]
+        ids = [entry.id for entry in entries]
+        chunks = []
+        post_chunk = ledger.journal._post_chunk
+
+        def record_chunk(entry_ids, posted_by, results):
+            chunks.append(len(entry_ids))
+            post_chunk(entry_ids, posted_by, results)
+
+        monkeypatch.setattr(ledger.journal, "_post_chunk", record_chunk)
+
+        ledger.journal.batch_post(ids[:2], ledger.user_id, chunk_size=2)
+        results = ledger.journal.batch_post(ids[2:], ledger.user_id, chunk_size=2)
+
+        assert chunks == [2, 2, 1]
+        assert results["posted"] == [str(entry_id) for entry_id in ids[2:]]
+        assert all(entry.status == EntryStatusEnum.POSTED for entry in entries)
+
+    def test_balance_deltas_are_aggregated(self, ledger):
+        """Account and period balances receive the summed lines of every entry."""
+        entries = [ledger.create(date(2024, 1, 3), amount) for amount in ("10.00", "20.50", "30.25")]
+        entries.append(ledger.create(date(2024, 2, 3), "5.00"))
+
+        ledger.journal.batch_post([e.id for e in entries], ledger.user_id)
+        ledger.db.expire_all()
+
+        assert ledger.cash.current_balance == Decimal("65.75")
+        assert ledger.sales.current_balance == Decimal("65.75")
+        january = ledger.db.query(AccountBalance).filter(
+            AccountBalance.period_id == ledger.period(1).id,
+            AccountBalance.account_id == ledger.cash.id,
+        ).one()
+        assert january.period_debit == Decimal("60.75")
+
+    def test_account_balances_update_in_one_statement_per_chunk(self, ledger):
+        """All account balance changes of a chunk go out as one executemany UPDATE."""
+        entries = [ledger.create(date(2024, 1, day), "10.00") for day in range(1, 5)]
+        updates = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("UPDATE accounts"):
+                updates.append(len(parameters) if executemany else 1)
+
+        engine = ledger.db.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            ledger.journal.batch_post([e.id for e in entries], ledger.user_id, chunk_size=2)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        # Cash and sales in each of the two chunks
+        assert updates == [2, 2]
+        ledger.db.expire_all()
+        assert ledger.cash.current_balance == Decimal("40.00")
+
+    def test_invalid_entries_fail_individually(self, ledger):
+        """Unapproved or unknown entries are reported without blocking the rest."""
+        good = ledger.create(date(2024, 1, 3), "10.00")
+        draft = ledger.create(date(2024, 1, 4), "20.00", approve=False)
+        missing = uuid.uuid4()
+
+        results = ledger.journal.batch_post([good.id, draft.id, missing], ledger.user_id)
+
+        assert results["posted"] == [str(good.id)]
+        assert [failure["id"] for failure in results["failed"]] == [str(draft.id), str(missing)]
+        assert draft.status == EntryStatusEnum.DRAFT
+
+    def test_failed_commit_rolls_back_the_chunk(self, ledger, monkeypatch):
+        """A chunk that cannot be committed reports all its entries and changes nothing."""
+        first = [ledger.create(date(2024, 1, 3), "10.00") for _ in range(2)]
+        second = [ledger.create(date(2024, 2, 3), "7.00") for _ in range(2)]
+        apply_deltas = ledger.journal.balances.apply_deltas
+        february = ledger.period(2).id
+
+        def fail_for_february(period_id, deltas, sign=1):
+            if period_id == february:
+                raise RuntimeError("lock timeout")
+            apply_deltas(period_id, deltas, sign)
+
+        monkeypatch.setattr(ledger.journal.balances, "apply_deltas", fail_for_february)
+
+        results = ledger.journal.batch_post([e.id for e in first + second], ledger.user_id, chunk_size=2)
+        ledger.db.expire_all()
+
+        assert results["posted"] == [str(e.id) for e in first]
+        assert {f["id"] for f in results["failed"]} == {str(e.id) for e in second}
+        assert all(e.status == EntryStatusEnum.APPROVED for e in second)
+        assert ledger.cash.current_balance == Decimal("20.00")
+
+
+class TestEntryNumbering:
+    """Test per-customer, per-year entry number allocation."""
+
+    def test_concurrent_allocation_is_unique(self, ledger):
+        """Threads sharing a sequence never receive the same number."""
+        numbers = []
+
+        def allocate():
+            allocator = EntryNumberAllocator(ledger.db, block_size=3)
+            for _ in range(25):
+                numbers.append(allocator.next_number(ledger.customer_id, date(2024, 5, 1)))
+
+        threads = [threading.Thread(target=allocate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(numbers)) == 200
+        assert sorted(numbers)[0] == "JE-2024-00001"
+
+    def test_sequence_starts_after_existing_numbers(self, ledger):
+        """A new counter row is seeded from the highest number already used."""
+        ledger.create(date(2024, 3, 1), "10.00", entry_number="JE-2024-00041")
+
+        allocator = EntryNumberAllocator(ledger.db)
+
+        assert allocator.next_number(ledger.customer_id, date(2024, 3, 2)) == "JE-2024-00042"
+        # The rest of the first block stays with this process
+        start = 42 + allocator.block_size
+        assert allocator.reserve_block(ledger.customer_id, 2024, 2) == [
+            format_entry_number(2024, start), format_entry_number(2024, start + 1)
+        ]
+
+    def test_new_year_starts_a_new_sequence(self, ledger):
+        """Numbers restart at 1 for each year and the years do not interfere."""
+        allocator = EntryNumberAllocator(ledger.db, block_size=2)
+
+        december = [allocator.next_number(ledger.customer_id, date(2024, 12, 31)) for _ in range(3)]
+        january = allocator.next_number(ledger.customer_id, date(2025, 1, 1))
+
+        assert december == ["JE-2024-00001", "JE-2024-00002", "JE-2024-00003"]
+        assert january == "JE-2025-00001"
+        assert allocator.next_number(ledger.customer_id, date(2024, 12, 31)) == "JE-2024-00004"
+
+    def test_created_entries_are_numbered_per_year(self, ledger):
+        """The journal service takes entry numbers from the yearly sequences."""
+        december = [ledger.create(date(2024, 12, 30), "10.00", approve=False) for _ in range(2)]
+        january = ledger.create(date(2025, 1, 2), "10.00", approve=False)
+
+        assert [e.entry_number for e in december] == ["JE-2024-00001", "JE-2024-00002"]
+        assert january.entry_number == "JE-2025-00001"
+
+    def test_reservation_does_not_block_other_sequences(self, ledger, monkeypatch):
+        """A slow reservation for one year leaves other years free to allocate."""
+        allocator = EntryNumberAllocator(ledger.db)
+        reserve = allocator._reserve
+        started, release = threading.Event(), threading.Event()
+
+        def slow_reserve(customer_id, year, count):
+            if year == 2024:
+                started.set()
+                release.wait(5)
+            return reserve(customer_id, year, count)
+
+        monkeypatch.setattr(allocator, "_reserve", slow_reserve)
+        slow = threading.Thread(target=allocator.next_number, args=(ledger.customer_id, date(2024, 6, 1)))
+        slow.start()
+        started.wait(5)
+
+        other = []
+        fast = threading.Thread(target=lambda: other.append(
+            allocator.next_number(ledger.customer_id, date(2025, 6, 1))
+        ))
+        fast.start()
+        fast.join(2)
+        release.set()
+        slow.join()
+
+        assert other == ["JE-2025-00001"]
+
+
 class TestLedger:
     """Test General Ledger and Trial Balance operations."""
 
@@ -240,3 +517,327 @@ class TestLedger:
                 assert data["is_balanced"] is True
             elif "total_debits" in data and "total_credits" in data:
                 assert abs(data["total_debits"] - data["total_credits"]) < 0.01
+
+
+class TestLedgerSnapshots:
+    """Test period balance maintenance and snapshot-based as-of totals."""
+
+    @staticmethod
+    def _row(ledger, month, account):
+        return ledger.db.query(AccountBalance).filter(
+            AccountBalance.period_id == ledger.period(month).id,
+            AccountBalance.account_id == account.id,
+        ).one()
+
+    @staticmethod
+    def _recompute(ledger, as_of_date):
+        # A start date sends totals() down the plain line query over all history
+        return LedgerAggregates(ledger.db).totals(
+            ledger.customer_id, start_date=date(1900, 1, 1), end_date=as_of_date
+        )
+
+    def test_apply_entry_adds_and_removes_lines(self, ledger):
+        """Posting adds an entry to its period row; sign=-1 takes it out again."""
+        entry = ledger.post(date(2024, 1, 10), "100.00")
+        row = self._row(ledger, 1, ledger.cash)
+        assert (row.period_debit, row.period_credit) == (Decimal("100.00"), Decimal("0"))
+        assert row.closing_debit == Decimal("100.00")
+
+        BalanceCalculator(ledger.db).apply_entry(entry, sign=-1)
+        ledger.db.commit()
+
+        assert (row.period_debit, row.period_credit) == (Decimal("0"), Decimal("0"))
+
+    def test_apply_deltas_creates_missing_rows(self, ledger):
+        """Deltas for an account without a period row create one."""
+        period_id = ledger.period(2).id
+        BalanceCalculator(ledger.db).apply_deltas(period_id, {
+            ledger.sales.id: [Decimal("0"), Decimal("30.00")],
+        })
+        BalanceCalculator(ledger.db).apply_deltas(period_id, {
+            ledger.sales.id: [Decimal("5.00"), Decimal("10.00")],
+        })
+        ledger.db.commit()
+
+        row = self._row(ledger, 2, ledger.sales)
+        assert (row.period_debit, row.period_credit) == (Decimal("5.00"), Decimal("40.00"))
+
+    def test_close_rebuilds_period_balances(self, ledger):
+        """Closing a period rewrites its rows from the ledger, opening and YTD included."""
+        ledger.post(date(2024, 1, 10), "100.00")
+        ledger.post(date(2024, 2, 5), "40.00")
+        # Drift as left by entries posted before rows were maintained
+        self._row(ledger, 2, ledger.cash).period_debit = Decimal("1.00")
+        ledger.db.commit()
+
+        periods = PeriodService(ledger.db)
+        periods.close_period(ledger.period(1).id, ledger.user_id)
+        periods.close_period(ledger.period(2).id, ledger.user_id)
+
+        row = self._row(ledger, 2, ledger.cash)
+        assert (row.opening_debit, row.period_debit, row.ytd_debit) == (
+            Decimal("100.00"), Decimal("40.00"), Decimal("140.00")
+        )
+
+    def test_as_of_totals_match_full_recompute(self, ledger):
+        """Post, reverse and close: snapshot plus open-period lines equal the full history."""
+        ledger.post(date(2024, 1, 10), "100.00")
+        reversed_entry = ledger.post(date(2024, 1, 20), "25.00")
+        ledger.journal.reverse_entry(
+            reversed_entry.id, EntryReversalRequest(reversal_date=date(2024, 1, 25)), ledger.user_id
+        )
+        ledger.post(date(2024, 2, 3), "40.00")
+        ledger.create(date(2024, 2, 4), "999.00", approve=False)
+        PeriodService(ledger.db).close_period(ledger.period(1).id, ledger.user_id)
+        ledger.post(date(2024, 2, 14), "7.50")
+
+        for as_of in (date(2024, 1, 15), date(2024, 1, 31), date(2024, 2, 10), date(2024, 3, 31)):
+            assert LedgerAggregates(ledger.db).totals(ledger.customer_id, end_date=as_of) == \
+                self._recompute(ledger, as_of)
+
+        totals = LedgerAggregates(ledger.db).totals(ledger.customer_id, end_date=date(2024, 3, 31))
+        assert totals[ledger.cash.id] == (Decimal("172.50"), Decimal("25.00"))
+
+    def test_period_closed_without_snapshot_reads_its_lines(self, ledger):
+        """A period closed before snapshots were written still counts, and the backfill builds them."""
+        ledger.post(date(2024, 1, 10), "100.00")
+        ledger.post(date(2024, 2, 3), "40.00")
+        # Closed the old way: flagged, no AccountBalance rows written
+        ledger.db.query(AccountBalance).delete()
+        ledger.period(1).is_closed = True
+        ledger.db.commit()
+
+        as_of = date(2024, 2, 29)
+        assert LedgerAggregates(ledger.db).totals(ledger.customer_id, end_date=as_of) == \
+            self._recompute(ledger, as_of)
+
+        assert BalanceCalculator(ledger.db).rebuild_closed_periods(ledger.customer_id) == 1
+        assert self._row(ledger, 1, ledger.cash).period_debit == Decimal("100.00")
+        assert LedgerAggregates(ledger.db).totals(ledger.customer_id, end_date=as_of)[ledger.cash.id] == \
+            (Decimal("140.00"), Decimal("0"))
+
+    def test_closed_period_is_read_from_its_snapshot(self, ledger):
+        """After close, as-of totals past the period end come from AccountBalance rows."""
+        ledger.post(date(2024, 1, 10), "100.00")
+        PeriodService(ledger.db).close_period(ledger.period(1).id, ledger.user_id)
+        ledger.post(date(2024, 2, 3), "40.00")
+        # Lines of the closed period no longer count once it is snapshotted
+        ledger.db.query(JournalLine).filter(JournalLine.debit_amount == Decimal("100.00")).update(
+            {"debit_amount": Decimal("0")}, synchronize_session=False
+        )
+
+        totals = LedgerAggregates(ledger.db).totals(ledger.customer_id, end_date=date(2024, 2, 29))
+        balance = GeneralLedgerService(ledger.db).get_account_balance(ledger.cash.id, date(2024, 2, 29))
+
+        assert totals[ledger.cash.id] == (Decimal("140.00"), Decimal("0"))
+        assert balance["current_balance"] == 140.0
+        assert balance["transaction_count"] == 2
+
+    def test_general_ledger_counts_reversed_entries(self, ledger):
+        """Reversed entries and their reversals both stay in ledger reports."""
+        entry = ledger.post(date(2024, 1, 10), "60.00")
+        ledger.journal.reverse_entry(
+            entry.id, EntryReversalRequest(reversal_date=date(2024, 1, 11)), ledger.user_id
+        )
+        service = GeneralLedgerService(ledger.db)
+
+        account_ledger = service.get_account_ledger(ledger.cash.id)
+        activity = service.get_period_activity(ledger.customer_id, ledger.period(1).id)
+
+        assert account_ledger["transaction_count"] == 2
+        assert account_ledger["closing_balance"] == 0
+        assert [row["transaction_count"] for row in activity] == [2, 2]
+
+
+class TestFinancialStatements:
+    """Test statement and trial balance totals against per-account sums of the ledger."""
+
+    @pytest.fixture
+    def books(self, ledger):
+        """February 2024 activity over bank, receivable, loan, equity, sales and expense accounts."""
+        asset = ledger.cash.account_type
+        types = {
+            name: AccountType(name=name, display_name=name.title(), normal_balance=normal, report_type=report)
+            for name, normal, report in (
+                ("liability", NormalBalanceEnum.CREDIT, ReportTypeEnum.BALANCE_SHEET),
+                ("equity", NormalBalanceEnum.CREDIT, ReportTypeEnum.BALANCE_SHEET),
+                ("expense", NormalBalanceEnum.DEBIT, ReportTypeEnum.INCOME_STATEMENT),
+            )
+        }
+        accounts = {
+            key: Account(customer_id=ledger.customer_id, code=code, name=key.title(), account_type=account_type,
+                         opening_balance=Decimal("0"), current_balance=Decimal("0"))
+            for key, code, account_type in (
+                ("bank", "1100", asset),
+                ("receivable", "1200", asset),
+                ("depreciation_reserve", "1690", asset),
+                ("loan", "2400", types["liability"]),
+                ("capital", "3000", types["equity"]),
+                ("cogs", "5100", types["expense"]),
+                ("depreciation", "5600", types["expense"]),
+            )
+        }
+        accounts["sales"] = ledger.sales
+        ledger.db.add_all([*types.values(), *accounts.values()])
+        ledger.db.commit()
+
+        def post(entry_date, debit, credit, amount):
+            entry = ledger.journal.create_entry(ledger.customer_id, JournalEntryCreate(
+                entry_date=entry_date,
+                description=f"{debit} / {credit}",
+                lines=[
+                    JournalLineCreate(account_id=accounts[debit].id, debit_amount=Decimal(amount),
+                                      credit_amount=Decimal("0")),
+                    JournalLineCreate(account_id=accounts[credit].id, debit_amount=Decimal("0"),
+                                      credit_amount=Decimal(amount)),
+                ],
+            ), created_by=ledger.user_id)
+            ledger.journal.submit_for_approval(entry.id, ledger.user_id)
+            ledger.journal.approve_entry(entry.id, ledger.user_id)
+            return ledger.journal.post_entry(entry.id, ledger.user_id)
+
+        post(date(2024, 1, 10), "bank", "capital", "1000.00")
+        post(date(2024, 2, 5), "bank", "sales", "300.00")
+        post(date(2024, 2, 6), "receivable", "sales", "200.00")
+        post(date(2024, 2, 8), "cogs", "bank", "120.00")
+        post(date(2024, 2, 9), "bank", "loan", "500.00")
+        post(date(2024, 2, 12), "depreciation", "depreciation_reserve", "50.00")
+        refunded = post(date(2024, 2, 15), "bank", "sales", "80.00")
+        ledger.journal.reverse_entry(
+            refunded.id, EntryReversalRequest(reversal_date=date(2024, 2, 16)), ledger.user_id
+        )
+        # Unposted entries stay out of every report
+        ledger.create(date(2024, 2, 20), "999.00", approve=False)
+
+        return SimpleNamespace(ledger=ledger, accounts=accounts)
+
+    @staticmethod
+    def _direct(books, start_date, end_date):
+        """Normal-side balance per account, summed line by line over ledger entries."""
+        balances = {}
+        lines = books.ledger.db.query(JournalLine).join(JournalEntry).filter(
+            JournalEntry.customer_id == books.ledger.customer_id,
+            JournalEntry.status.in_(LEDGER_STATUSES),
+            JournalEntry.entry_date >= start_date,
+            JournalEntry.entry_date <= end_date,
+        )
+        for line in lines:
+            account = line.account
+            change = line.debit_amount - line.credit_amount
+            if account.account_type.normal_balance == NormalBalanceEnum.CREDIT:
+                change = -change
+            balances[account.code] = balances.get(account.code, Decimal("0")) + change
+        return balances
+
+    @staticmethod
+    def _total(balances, *prefixes):
+        return float(sum(
+            (balance for code, balance in balances.items() if code.startswith(prefixes)), Decimal("0")
+        ))
+
+    def test_trial_balance_matches_account_sums(self, books):
+        """Every closing balance equals the account's line sum, and the totals agree."""
+        trial_balance = TrialBalanceService(books.ledger.db).generate_trial_balance(
+            books.ledger.customer_id, as_of_date=date(2024, 2, 29)
+        )
+        direct = self._direct(books, date(2024, 1, 1), date(2024, 2, 29))
+
+        assert {a["account_code"]: a["closing_balance"] for a in trial_balance["accounts"]} == {
+            code: float(balance) for code, balance in direct.items() if balance
+        }
+        assert trial_balance["is_balanced"] is True
+        assert trial_balance["total_debit"] == trial_balance["total_credit"] == 2050.0
+
+    def test_income_statement_matches_account_sums(self, books):
+        """Revenue, expenses and net income equal the February line sums."""
+        direct = self._direct(books, date(2024, 2, 1), date(2024, 2, 29))
+
+        statement = IncomeStatementGenerator(books.ledger.db).generate(
+            books.ledger.customer_id, date(2024, 2, 1), date(2024, 2, 29)
+        )
+
+        assert statement["revenue"]["total"] == self._total(direct, "4") == 500.0
+        assert statement["expenses"]["total"] == self._total(direct, "5") == 170.0
+        assert statement["cost_of_goods_sold"] == self._total(direct, "51") == 120.0
+        assert statement["net_income"] == 330.0
+
+    def test_balance_sheet_matches_account_sums(self, books):
+        """Section totals equal the line sums, with year-to-date earnings in equity."""
+        direct = self._direct(books, date(2024, 1, 1), date(2024, 2, 29))
+
+        sheet = BalanceSheetGenerator(books.ledger.db).generate(
+            books.ledger.customer_id, as_of_date=date(2024, 2, 29), comparative_date=date(2024, 1, 31)
+        )
+
+        earnings = self._total(direct, "4") - self._total(direct, "5")
+        assert sheet["assets"]["total"] == self._total(direct, "1") == 1830.0
+        assert sheet["liabilities"]["total"] == self._total(direct, "2") == 500.0
+        assert sheet["equity"]["current_year_earnings"] == earnings == 330.0
+        assert sheet["equity"]["total"] == self._total(direct, "3") + earnings
+        assert sheet["is_balanced"] is True
+        assert sheet["comparative"]["assets"]["total"] == 1000.0
+
+    def test_cash_flow_reconciles_to_cash_accounts(self, books):
+        """Operating, investing and financing flows add up to the change in cash."""
+        opening = self._direct(books, date(2024, 1, 1), date(2024, 2, 1))
+        closing = self._direct(books, date(2024, 1, 1), date(2024, 2, 29))
+
+        cash_flow = CashFlowGenerator(books.ledger.db).generate(
+            books.ledger.customer_id, date(2024, 2, 1), date(2024, 2, 29)
+        )
+
+        operating = {item["name"]: item["amount"] for item in cash_flow["operating_activities"]["items"]}
+        assert operating == {
+            "Net Income": 330.0,
+            "Depreciation & Amortization": 50.0,
+            "Change in Accounts Receivable": -200.0,
+        }
+        assert cash_flow["financing_activities"]["total"] == self._total(closing, "24") == 500.0
+        assert cash_flow["beginning_cash"] == self._total(opening, "11") == 1000.0
+        assert cash_flow["ending_cash"] == self._total(closing, "11") == 1680.0
+        assert cash_flow["net_change_in_cash"] == 680.0
+
+
+class TestReconciliationMatching:
+    """Test one-to-one auto-matching of bank transactions."""
+
+    @staticmethod
+    def _line(amount, day, reference=None):
+        entry = SimpleNamespace(entry_date=date(2024, 3, day), reference=reference)
+        return SimpleNamespace(debit_amount=Decimal(amount), credit_amount=Decimal("0"), description=None, entry=entry)
+
+    @staticmethod
+    def _transaction(amount, day, reference=None):
+        return SimpleNamespace(
+            amount=Decimal(amount), transaction_date=date(2024, 3, day),
+            transaction_type="debit", reference=reference, description=None,
+        )
+
+    def test_each_line_is_used_once(self):
+        """Two identical transactions take two different lines."""
+        lines = [self._line("100.00", 10), self._line("100.00", 11)]
+        transactions = [self._transaction("100.00", 10), self._transaction("100.00", 10)]
+
+        matches = TransactionMatcher(None).assign_matches(transactions, lines)
+
+        assert len(matches) == 2
+        assert {id(line) for _, line, _ in matches} == {id(line) for line in lines}
+
+    def test_best_pair_wins_contested_line(self):
+        """A line goes to the transaction it matches best."""
+        lines = [self._line("50.00", 5, reference="INV-7")]
+        weak = self._transaction("50.00", 8)
+        strong = self._transaction("50.00", 5, reference="INV-7")
+
+        matches = TransactionMatcher(None).assign_matches([weak, strong], lines)
+
+        assert [trans for trans, _, _ in matches] == [strong]
+        assert matches[0][2] == pytest.approx(0.95)
+
+    def test_amount_and_date_tolerance(self):
+        """Lines outside the amount band or the date window are ignored."""
+        lines = [self._line("102.00", 10), self._line("100.00", 25)]
+
+        matches = TransactionMatcher(None).assign_matches([self._transaction("100.00", 10)], lines)
+
+        assert matches == []
@@ -1,8 +1,15 @@
 """
 Tests for performance module.
 """
+import asyncio
 import pytest
 from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.performance.caching import local_cache as local_cache_module
+from app.performance.caching.cache_manager import cache_manager
+from app.performance.caching.decorators import cached, cache_aside
+from app.performance.caching.local_cache import LocalCache
 
 
 class TestCachingService:
@@ -74,6 +81,164 @@ class TestCacheInvalidation:
         assert len(patterns) == 2
 
 
+class TestCacheSingleFlight:
+    """Tests for request coalescing in the cache decorators."""
+
+    async def test_concurrent_misses_share_one_call(self):
+        """Test concurrent misses run the function once per key."""
+        cache_manager.clear_local_cache()
+        calls = {}
+
+        @cached(key_builder=lambda report_id: f"test:single-flight:{report_id}", ttl=60)
+        async def build_report(report_id: str):
+            calls[report_id] = calls.get(report_id, 0) + 1
+            await asyncio.sleep(0.05)
+            return {"report": report_id}
+
+        results = await asyncio.gather(*[
+            build_report(f"r{i % 3}") for i in range(60)
+        ])
+
+        assert calls == {"r0": 1, "r1": 1, "r2": 1}
+        assert results[4] == {"report": "r1"}
+
+    async def test_failure_is_shared_and_not_cached(self):
+        """Test waiters get the leader's error and the next call retries."""
+        cache_manager.clear_local_cache()
+        calls = []
+
+        @cache_aside(key_builder=lambda user_id: f"test:single-flight:user:{user_id}")
+        async def load_user(user_id: str):
+            calls.append(user_id)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("backend down")
+
+        results = await asyncio.gather(*[load_user("u1") for _ in range(10)], return_exceptions=True)
+
+        assert len(calls) == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        with pytest.raises(RuntimeError):
+            await load_user("u1")
+        assert len(calls) == 2
+
+    async def test_stale_value_served_during_one_refresh(self):
+        """Test stale-while-revalidate serves the old value and refreshes once."""
+        cache_manager.clear_local_cache()
+        calls = []
+
+        @cached(key_builder=lambda: "test:single-flight:stale", ttl=0, stale_ttl=60)
+        async def dashboard():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        assert await dashboard() == 1
+
+        stale = await asyncio.gather(*[dashboard() for _ in range(20)])
+        await asyncio.sleep(0.05)
+
+        assert stale == [1] * 20
+        assert len(calls) == 2
+        assert await dashboard() == 2
+
+
+class TestLocalCache:
+    """Tests for the byte-bounded LRU local cache tier."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(local_cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+        return now
+
+    @staticmethod
+    def _cache(entries):
+        """Cache holding exactly ``entries`` values charged 100 bytes each."""
+        return LocalCache(max_bytes=entries * (100 + LocalCache.ENTRY_OVERHEAD))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test a hit moves an entry to the end so the oldest untouched one goes."""
+        cache = self._cache(3)
+        for key in ("report:a", "report:b", "report:c"):
+            cache.set(key, key, size=100)
+
+        assert cache.get("report:a") == "report:a"
+        cache.set("user:d", "d", size=100)
+
+        assert list(cache._entries) == ["report:c", "report:a", "user:d"]
+        assert cache.bytes_used == 3 * (100 + LocalCache.ENTRY_OVERHEAD)
+        assert cache.namespace_counters()["report"].evictions == 1
+
+    def test_large_entry_evicts_enough_to_fit(self):
+        """Test eviction is by bytes, and an entry larger than the cache is refused."""
+        cache = self._cache(3)
+        for key in ("a", "b", "c"):
+            cache.set(f"report:{key}", key, size=100)
+
+        assert cache.set("report:big", "big", size=200 + LocalCache.ENTRY_OVERHEAD) is True
+        assert list(cache._entries) == ["report:c", "report:big"]
+
+        assert cache.set("report:huge", "huge", size=cache.max_bytes) is False
+        assert "report:huge" not in cache
+
+    def test_sweep_skips_replaced_entries(self, clock):
+        """Test heap records of rewritten entries do not expire the new value."""
+        cache = self._cache(3)
+        cache.set("session:s1", "old", ttl=10, size=100)
+        cache.set("session:s1", "new", ttl=100, size=100)
+        cache.set("session:s2", "short", ttl=5, size=100)
+
+        clock[0] += 20
+        assert cache.sweep() == 1
+        assert cache.get("session:s1") == "new"
+        assert "session:s2" not in cache
+
+        clock[0] += 100
+        assert cache.sweep() == 1
+        assert len(cache) == 0
+        assert cache.namespace_counters()["session"].expirations == 2
+
+    def test_expired_entry_is_a_miss_on_read(self, clock):
+        """Test reading an expired entry removes it before the sweeper runs."""
+        cache = self._cache(3)
+        cache.set("session:s1", "value", ttl=10, size=100)
+
+        clock[0] += 11
+        assert cache.get("session:s1") is None
+        assert cache.bytes_used == 0
+        counters = cache.namespace_counters()["session"]
+        assert (counters.misses, counters.expirations) == (1, 1)
+
+    def test_stale_heap_records_are_compacted(self, clock):
+        """Test rewriting one key many times does not grow the expiry heap unboundedly."""
+        cache = self._cache(3)
+        for i in range(2000):
+            cache.set("session:s1", i, ttl=60, size=100)
+        assert len(cache._expiry) == 2000
+
+        assert cache.sweep() == 0
+        assert cache._expiry == [(clock[0] + 60, "session:s1")]
+
+    async def test_stats_report_namespaces(self):
+        """Test get_stats breaks hits, misses and local tier counts down by namespace."""
+        cache_manager.clear_local_cache()
+        cache_manager.reset_stats()
+        cache_manager._set_local("logiaccounting:report:1", {"total": 1}, ttl=60, size=10)
+
+        assert await cache_manager.get("logiaccounting:report:1") == {"total": 1}
+        assert await cache_manager.get("logiaccounting:report:2") is None
+
+        stats = cache_manager.get_stats()
+        report = stats.namespaces["report"]
+        assert (report.local_hits, report.local_misses) == (1, 1)
+        assert report.hits == 1
+        assert stats.local_entries == 1
+        assert stats.local_bytes == 10 + LocalCache.ENTRY_OVERHEAD
+        cache_manager.clear_local_cache()
+        cache_manager.reset_stats()
+
+
 class TestWarmupService:
     """Tests for cache warmup."""
 
@@ -1,6 +1,7 @@
 """
 Tests for realtime module.
 """
+import types
 import pytest
 from datetime import datetime, timedelta
 
@@ -198,3 +199,124 @@ class TestActivityService:
         sorted_activities = sorted(activities, key=lambda x: x["timestamp"], reverse=True)
 
         assert sorted_activities[0]["id"] == "2"
+
+
+class FakeSocketIO:
+    """Records emitted events instead of sending them."""
+
+    def __init__(self):
+        self.emitted = []
+
+    async def emit(self, event, data, room=None, **kwargs):
+        self.emitted.append((event, room, data))
+
+
+class TestTickManager:
+    """Tests for coalesced cursor and presence ticks."""
+
+    @pytest.fixture
+    def tick_module(self):
+        # python-socketio imports its Redis manager eagerly
+        pytest.importorskip("redis")
+        from app.realtime.managers import tick_manager
+        return tick_manager
+
+    @pytest.fixture
+    def sio(self, tick_module, monkeypatch):
+        sio = FakeSocketIO()
+        monkeypatch.setattr(tick_module, "get_socketio", lambda: sio)
+        return sio
+
+    @pytest.fixture
+    async def ticks(self, tick_module, sio):
+        # one tick every 100s: only explicit flushes send anything
+        manager = tick_module.TickManager(tick_hz=0.01)
+        yield manager
+        await manager.stop()
+
+    @staticmethod
+    def _cursor(user_id, line):
+        return {"user_id": user_id, "user_name": user_id, "color": "#000", "line": line, "column": 0}
+
+    async def test_moves_are_coalesced_per_user(self, sio, ticks):
+        """Test a room gets one batch holding each user's latest cursor."""
+        for line in (1, 2, 3):
+            ticks.queue_cursor("doc:1", self._cursor("u1", line))
+        ticks.queue_cursor("doc:1", self._cursor("u2", 7))
+        ticks.queue_cursor("doc:2", self._cursor("u3", 1))
+        assert ticks.get_metrics()["pending"] == 3
+
+        await ticks.flush()
+
+        batches = {room: data for _, room, data in sio.emitted}
+        assert {event for event, _, _ in sio.emitted} == {"cursor:batch"}
+        assert sorted(batches) == ["doc:1", "doc:2"]
+        assert [(c["user_id"], c["line"]) for c in batches["doc:1"]["cursors"]] == [("u1", 3), ("u2", 7)]
+        assert batches["doc:1"]["removed"] == []
+
+        metrics = ticks.get_metrics()
+        assert metrics["ticks"] == 1
+        assert metrics["pending"] == 0
+        assert metrics["rooms"]["doc:1"]["updates"] == 4
+        assert metrics["rooms"]["doc:1"]["superseded"] == 2
+        assert metrics["rooms"]["doc:1"]["messages"] == 1
+
+    async def test_flush_without_changes_sends_nothing(self, sio, ticks):
+        """Test an idle tick emits no messages."""
+        await ticks.flush()
+
+        assert sio.emitted == []
+        assert ticks.get_metrics()["ticks"] == 0
+
+    async def test_removal_supersedes_a_pending_move(self, sio, ticks):
+        """Test a removal drops the user's queued move and a later move undoes it."""
+        ticks.queue_cursor("doc:1", self._cursor("u1", 4))
+        ticks.queue_cursor_remove("doc:1", "u1")
+        ticks.queue_cursor_remove("doc:1", "u2")
+        ticks.queue_cursor("doc:1", self._cursor("u2", 9))
+
+        await ticks.flush()
+
+        [(event, room, data)] = sio.emitted
+        assert (event, room) == ("cursor:batch", "doc:1")
+        assert [c["user_id"] for c in data["cursors"]] == ["u2"]
+        assert data["removed"] == ["u1"]
+        assert ticks.get_room_metrics("doc:1")["superseded"] == 1
+
+    async def test_presence_is_batched_per_tenant_room(self, sio, ticks):
+        """Test presence updates go out as one batch per tenant."""
+        ticks.queue_presence("t1", {"user_id": "u1", "status": "away"})
+        ticks.queue_presence("t1", {"user_id": "u1", "status": "online"})
+        ticks.queue_presence("t2", {"user_id": "u2", "status": "busy"})
+
+        await ticks.flush()
+
+        batches = {room: data for event, room, data in sio.emitted if event == "presence:batch"}
+        assert batches == {
+            "tenant:t1": {"users": [{"user_id": "u1", "status": "online"}]},
+            "tenant:t2": {"users": [{"user_id": "u2", "status": "busy"}]},
+        }
+
+    async def test_rates_are_per_room_and_idle_rooms_are_pruned(self, tick_module, ticks, monkeypatch):
+        """Test per-room rates average the complete seconds of the window."""
+        clock = types.SimpleNamespace(now=100.0)
+        monkeypatch.setattr(tick_module, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+
+        for i in range(30):
+            ticks.queue_cursor("doc:busy", self._cursor(f"u{i % 3}", i))
+        ticks.queue_cursor("doc:quiet", self._cursor("u1", 1))
+        await ticks.flush()
+
+        # the current second is still filling and does not count yet
+        assert ticks.get_room_metrics("doc:busy")["updates_per_second"] == 0.0
+
+        clock.now = 101.5
+        busy = ticks.get_room_metrics("doc:busy")
+        quiet = ticks.get_room_metrics("doc:quiet")
+        assert busy["updates_per_second"] == 3.0
+        assert busy["messages_per_second"] == 0.1
+        assert quiet["updates_per_second"] == 0.1
+
+        clock.now = 111.0
+        assert ticks.get_metrics()["rooms"] == {}
+        assert ticks.get_room_metrics("doc:busy") is None
@@ -1,8 +1,28 @@
 """
 Tests for security module.
 """
+import threading
+import time
 import pytest
 from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.security.middleware.rate_limit import (
+    LocalRateLimitBackend,
+    RateLimitAlgorithm,
+    RedisRateLimitBackend,
+)
+from app.security.protection import rate_limiter as rate_limiter_module
+from app.security.protection.rate_limiter import SlidingWindowCounter
+from app.security.rbac import (
+    PermissionMatcher,
+    Policy,
+    PolicyEffect,
+    PolicyEngine,
+    RBACEngine,
+    RoleManager,
+    permission_registry,
+)
 
 
 class TestRBACEngine:
@@ -39,6 +59,79 @@ class TestRBACEngine:
         assert hierarchy["admin"] > hierarchy["manager"]
         assert hierarchy["manager"] > hierarchy["viewer"]
 
+    def test_compiled_matcher_agrees_with_registry(self):
+        """Test the permission trie matches like matches_permission."""
+        granted = {"*:read", "invoice:*", "report:export", "payment:approve:own", "a:*:c"}
+        matcher = PermissionMatcher(granted)
+        required = [
+            "invoice", "invoice:read", "invoice:delete:own", "customer:read",
+            "customer:update", "report:export", "report:export:own",
+            "payment:approve", "payment:approve:own", "a:b:c", "a:b:d", "a:b",
+        ]
+
+        for name in required:
+            expected = [g for g in granted if permission_registry.matches_permission(name, g)]
+            matched = matcher.match(name)
+            assert (matched is not None) == bool(expected), name
+            assert matched is None or matched in expected
+
+    def test_permission_cache_follows_role_changes(self):
+        """Test cached permissions are dropped when roles change."""
+        roles = RoleManager()
+        engine = RBACEngine(role_manager=roles)
+        roles.create_custom_role("auditor", "Auditor", "Reads reports", {"report:read"})
+        roles.assign_role_to_user("u1", "auditor", "org1")
+
+        assert engine.has_permission("u1", "report:read", "org1")
+        assert not engine.has_permission("u1", "report:export", "org1")
+
+        roles.update_custom_role("auditor", permissions={"report:*"})
+        assert engine.has_permission("u1", "report:export", "org1")
+
+        roles.revoke_role_from_user("u1", "auditor", "org1")
+        assert not engine.has_permission("u1", "report:read", "org1")
+
+
+class TestPolicyEngine:
+    """Tests for indexed policy evaluation and the decision cache."""
+
+    def test_indexed_policies_evaluate_in_priority_order(self):
+        """Test prefix-indexed policies are applied highest priority first."""
+        engine = PolicyEngine()
+        engine.add_policy(Policy("any", "Any", "", PolicyEffect.ALLOW, priority=250))
+        engine.add_policy(Policy("inv", "Invoices", "", PolicyEffect.DENY, priority=500,
+                                 resources=["invoice*"], actions=["delete"]))
+        engine.add_policy(Policy("exact", "Exact", "", PolicyEffect.ALLOW, priority=750,
+                                 resources=["invoice_line"], actions=["delete"]))
+
+        assert engine.evaluate_with_policy("invoice", "delete", {}) == (PolicyEffect.DENY, "inv")
+        assert engine.evaluate_with_policy("invoice_line", "delete", {}) == (PolicyEffect.ALLOW, "exact")
+        assert engine.evaluate_with_policy("invoice", "read", {}) == (PolicyEffect.ALLOW, "any")
+        assert [p.id for p in engine.get_all_policies()] == ["exact", "inv", "any"]
+
+        engine.remove_policy("exact")
+        assert engine.evaluate_with_policy("invoice_line", "delete", {}) == (PolicyEffect.DENY, "inv")
+
+    def test_decision_cache_keys_on_attributes_read(self):
+        """Test cached decisions are shared only when read attributes agree."""
+        engine = PolicyEngine(decision_ttl=60)
+        engine.create_conditional_policy(
+            "small-payments", "Small payments", ["payment"], ["approve"],
+            [{"field": "resource.amount", "operator": "lt", "value": 1000}],
+        )
+
+        small = {"resource": {"amount": 10}, "session_id": "a"}
+        assert engine.evaluate("payment", "approve", small) == PolicyEffect.ALLOW
+        assert engine.evaluate("payment", "approve", {**small, "session_id": "b"}) == PolicyEffect.ALLOW
+        assert engine.evaluate("payment", "approve", {"resource": {"amount": 5000}}) == PolicyEffect.ABSTAIN
+
+        stats = engine.get_cache_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+        engine.add_policy(Policy("freeze", "Freeze", "", PolicyEffect.DENY, priority=1000,
+                                 resources=["payment"]))
+        assert engine.evaluate("payment", "approve", small) == PolicyEffect.DENY
+
 
 class TestMFAService:
     """Tests for Multi-Factor Authentication service."""
@@ -152,3 +245,163 @@ class TestEncryptionService:
         decrypted = encrypted[::-1]
 
         assert decrypted == original
+
+
+@pytest.fixture
+def fake_redis():
+    """In-process Redis with Lua support."""
+    pytest.importorskip("lupa")
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeAsyncRedis()
+
+
+class TestSlidingWindowCounter:
+    """Tests for the bucketed sliding window counter."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [1_000_000.0]
+        monkeypatch.setattr(rate_limiter_module, "time", SimpleNamespace(time=lambda: now[0]))
+        return now
+
+    @pytest.fixture
+    def counter(self, clock):
+        counter = SlidingWindowCounter(window_seconds=60, max_requests=10, sub_windows=6)
+        yield counter
+        counter.close()
+
+    def test_limit_boundary(self, counter):
+        """Test exactly max_requests are admitted and the rest are refused."""
+        results = [counter.increment("ip:1") for _ in range(12)]
+
+        assert [allowed for allowed, _, _ in results] == [True] * 10 + [False] * 2
+        assert results[9] == (True, 10, 0)
+        assert results[10] == (False, 10, 0)
+        assert counter.increment("ip:1", amount=0)[0] is True
+        assert counter.get_count("ip:2") == 0
+
+    def test_window_slides_with_partial_oldest_bucket(self, counter, clock):
+        """Test the oldest bucket's count decays as it slides out of the window."""
+        for _ in range(10):
+            counter.increment("ip:1")
+
+        # Six 10s buckets later the burst is the oldest bucket of the ring
+        clock[0] += 60
+        assert counter.get_count("ip:1") == 10
+        clock[0] += 5
+        assert counter.get_count("ip:1") == 5
+        assert counter.increment("ip:1", amount=5)[0] is True
+        assert counter.increment("ip:1")[0] is False
+
+        clock[0] += 5
+        assert counter.get_count("ip:1") == 5
+        clock[0] += 60
+        assert counter.get_count("ip:1") == 0
+
+    def test_reset_time_follows_oldest_counted_bucket(self, counter, clock):
+        """Test the reset time is when the oldest non-empty bucket leaves the window."""
+        start = clock[0]
+        counter.increment("ip:1")
+        clock[0] += 25
+        counter.increment("ip:1")
+
+        assert counter.get_reset_time("ip:1") == datetime.fromtimestamp(start + 70)
+
+        clock[0] += 50
+        assert counter.get_reset_time("ip:1") == datetime.fromtimestamp(start + 90)
+
+    def test_idle_keys_are_evicted(self, counter, clock):
+        """Test keys without requests for a whole window are dropped."""
+        counter.increment("ip:idle")
+        clock[0] += 30
+        counter.increment("ip:active")
+
+        clock[0] += 30
+        assert counter.evict_idle() == 0
+        clock[0] += 30
+        assert counter.evict_idle() == 1
+        assert len(counter) == 1
+        assert counter.get_count("ip:idle") == 0
+
+    def test_evictor_starts_once_under_concurrent_first_writes(self, counter, monkeypatch):
+        """Test first writes racing on different shards start a single evictor thread."""
+        started = []
+        evict_loop = lambda: started.append(True)  # noqa: E731
+        real_thread = threading.Thread
+
+        class SlowEvictorThread(real_thread):
+            def __init__(self, *args, **kwargs):
+                # Widen the gap between the None check and the assignment
+                if kwargs.get("target") is evict_loop:
+                    time.sleep(0.05)
+                super().__init__(*args, **kwargs)
+
+        monkeypatch.setattr(counter, "_evict_loop", evict_loop)
+        monkeypatch.setattr(threading, "Thread", SlowEvictorThread)
+        barrier = threading.Barrier(8)
+
+        def first_write(i):
+            barrier.wait()
+            counter.increment(f"ip:{i}")
+
+        threads = [threading.Thread(target=first_write, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter._evictor.join()
+
+        assert started == [True]
+
+
+class TestRedisRateLimitBackend:
+    """Tests for the shared Redis rate limit backend."""
+
+    @pytest.mark.parametrize("algorithm", list(RateLimitAlgorithm))
+    async def test_limit_enforced(self, fake_redis, algorithm):
+        """Test each algorithm admits exactly the limit within a window."""
+        backend = RedisRateLimitBackend(fake_redis)
+
+        results = [
+            await backend.check_limit(algorithm, "ratelimit:ip:10.0.0.1", 5, 60)
+            for _ in range(7)
+        ]
+
+        assert [allowed for allowed, _, _ in results] == [True] * 5 + [False] * 2
+        assert results[0][1] == 4
+        assert backend.fallback_checks == 0
+
+    async def test_workers_share_counters(self, fake_redis):
+        """Test two middleware instances draw from one counter."""
+        worker_a = RedisRateLimitBackend(fake_redis)
+        worker_b = RedisRateLimitBackend(fake_redis)
+        algorithm = RateLimitAlgorithm.SLIDING_WINDOW
+
+        for _ in range(3):
+            assert (await worker_a.check_limit(algorithm, "ratelimit:user:u1", 5, 60))[0]
+        allowed = [
+            (await worker_b.check_limit(algorithm, "ratelimit:user:u1", 5, 60))[0]
+            for _ in range(3)
+        ]
+
+        assert allowed == [True, True, False]
+
+    async def test_falls_back_when_redis_unreachable(self):
+        """Test checks are answered locally while Redis is down."""
+
+        class UnreachableRedis:
+            def register_script(self, script):
+                async def run(keys, args):
+                    raise ConnectionError("Connection refused")
+                return run
+
+        backend = RedisRateLimitBackend(UnreachableRedis(), fallback=LocalRateLimitBackend())
+
+        results = [
+            await backend.check_limit(RateLimitAlgorithm.FIXED_WINDOW, "ratelimit:ip:10.0.0.2", 2, 60)
+            for _ in range(3)
+        ]
+
+        assert [allowed for allowed, _, _ in results] == [True, True, False]
+        assert backend.degraded
+        assert backend.fallback_checks == 3
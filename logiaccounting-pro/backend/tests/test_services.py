@@ -1,6 +1,8 @@
 """
 Tests for various services module.
 """
+import asyncio
+import json
 import pytest
 from datetime import datetime, timedelta
 
@@ -252,3 +254,142 @@ class TestCustomFieldsService:
         is_valid = field["validation"]["min"] <= value <= field["validation"]["max"]
 
         assert is_valid is True
+
+
+class FakeWebSocket:
+    """Records what is sent; sends wait until ``unblocked`` is set."""
+
+    def __init__(self):
+        self.sent = []
+        self.closed = None
+        self.unblocked = asyncio.Event()
+        self.unblocked.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.unblocked.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000, reason=""):
+        self.closed = (code, reason)
+
+
+class TestWebSocketManager:
+    """Tests for WebSocket send queues, slow consumers and the role index."""
+
+    @pytest.fixture
+    async def make_manager(self):
+        from app.services.websocket_manager import WebSocketManager
+
+        managers = []
+
+        def make(**kwargs):
+            manager = WebSocketManager(**kwargs)
+            managers.append(manager)
+            return manager
+
+        yield make
+        for manager in managers:
+            for user_id in list(manager.connections):
+                manager.disconnect(user_id)
+
+    @staticmethod
+    async def _drain():
+        """Let the writer tasks run."""
+        await asyncio.sleep(0.01)
+
+    async def test_drop_oldest_keeps_the_newest_messages(self, make_manager):
+        """Test a full queue discards its oldest message for a slow client."""
+        manager = make_manager(queue_size=2, slow_consumer_policy="drop_oldest")
+        slow, fast = FakeWebSocket(), FakeWebSocket()
+        slow.unblocked.clear()
+        await manager.connect(slow, "slow", "user")
+        await manager.connect(fast, "fast", "user")
+
+        for i in range(2):
+            await manager.broadcast({"seq": i})
+            await self._drain()
+        # the slow writer is stuck sending seq 0; seq 3 and 4 push out 1 and 2
+        for i in range(2, 5):
+            await manager.broadcast({"seq": i})
+            await self._drain()
+
+        assert [m["seq"] for m in fast.sent] == [0, 1, 2, 3, 4]
+        assert manager.connections["slow"].dropped == 2
+        assert manager.get_metrics()["dropped"] == 2
+
+        slow.unblocked.set()
+        await self._drain()
+        assert [m["seq"] for m in slow.sent] == [0, 3, 4]
+        assert slow.closed is None
+
+    async def test_disconnect_policy_closes_the_slow_client(self, make_manager):
+        """Test a full queue disconnects the client under the disconnect policy."""
+        manager = make_manager(queue_size=1, slow_consumer_policy="disconnect")
+        slow, fast = FakeWebSocket(), FakeWebSocket()
+        slow.unblocked.clear()
+        await manager.connect(slow, "slow", "admin")
+        await manager.connect(fast, "fast", "admin")
+
+        for i in range(3):
+            await manager.send_to_role("admin", {"seq": i})
+            await self._drain()
+
+        assert manager.get_connected_users() == ["fast"]
+        assert manager.role_connections == {"admin": {"fast"}}
+        assert slow.closed == (1013, "Too slow")
+        assert [m["seq"] for m in fast.sent] == [0, 1, 2]
+        assert manager.get_metrics()["slow_disconnects"] == 1
+
+    def test_unknown_policy_is_rejected(self):
+        """Test the slow-consumer policy is validated."""
+        from app.services.websocket_manager import WebSocketManager
+
+        with pytest.raises(ValueError, match="Unknown slow consumer policy"):
+            WebSocketManager(slow_consumer_policy="block")
+
+    async def test_role_index_follows_connections(self, make_manager):
+        """Test role sends reach only that role and the index tracks reconnects."""
+        manager = make_manager()
+        sockets = {user_id: FakeWebSocket() for user_id in ("a1", "a2", "u1")}
+        await manager.connect(sockets["a1"], "a1", "admin")
+        await manager.connect(sockets["a2"], "a2", "admin")
+        await manager.connect(sockets["u1"], "u1", "user")
+
+        await manager.send_to_role("admin", {"event": "admins"})
+        await manager.notify("low_stock", {}, target_roles=["admin", "user"])
+        await self._drain()
+        assert [m.get("event") for m in sockets["a1"].sent] == ["admins", "low_stock"]
+        assert [m.get("event") for m in sockets["u1"].sent] == ["low_stock"]
+
+        await manager.connect(FakeWebSocket(), "a2", "user")
+        assert manager.role_connections == {"admin": {"a1"}, "user": {"a2", "u1"}}
+
+        manager.disconnect("a1")
+        assert manager.role_connections == {"user": {"a2", "u1"}}
+        assert manager.get_metrics()["roles"] == {"user": 2}
+        assert manager.user_roles == {"a2": "user", "u1": "user"}
+
+    async def test_stale_socket_does_not_disconnect_a_reconnected_user(self, make_manager):
+        """Test disconnect with an old websocket leaves the user's new one alone."""
+        manager = make_manager()
+        old, new = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(old, "u1", "user")
+        old_writer = manager.connections["u1"].writer
+        await manager.connect(new, "u1", "user")
+        await self._drain()
+        assert old_writer.cancelled()
+
+        manager.disconnect("u1", old)
+        assert manager.active_connections == {"u1": new}
+
+        await manager.send_to_user("u1", {"event": "hello"})
+        await self._drain()
+        assert new.sent == [{"event": "hello"}]
+        assert old.sent == []
+
+        manager.disconnect("u1", new)
+        assert manager.get_connected_users() == []
+        assert manager.role_connections == {}
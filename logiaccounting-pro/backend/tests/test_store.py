@@ -0,0 +1,512 @@
+"""
+Tests for the in-memory data stores.
+"""
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from app.models.compact_records import CompactRecords
+from app.models.document_store import DocumentCategoryStore, DocumentShareStore
+from app.models import persistence as persistence_module
+from app.models.persistence import CorruptSnapshotError, StorePersistence
+from app.models.search_index import SortedTerms
+from app.models.store import (
+    BaseStore, Database, MaterialStore, NotificationStore, PaymentStore, UserStore
+)
+from app.routes import inventory
+
+
+class TestBaseStoreIndexes:
+    """Tests for primary and secondary store indexes."""
+
+    def test_find_by_id(self):
+        """Test records are reachable by id after create."""
+        store = BaseStore()
+        item = store.create({"name": "A"})
+
+        assert store.find_by_id(item["id"]) is item
+        assert store.find_by_id("missing") is None
+
+    def test_indexed_filter_follows_updates(self):
+        """Test secondary indexes stay consistent on update and delete."""
+        store = BaseStore(indexes=("status",))
+        first = store.create({"status": "draft"})
+        second = store.create({"status": "draft"})
+
+        store.update(first["id"], {"status": "posted"})
+        assert [i["id"] for i in store.find_all({"status": "draft"})] == [second["id"]]
+        assert [i["id"] for i in store.find_all({"status": "posted"})] == [first["id"]]
+
+        store.delete(second["id"])
+        assert store.find_all({"status": "draft"}) == []
+        assert len(store) == 1
+
+    def test_mixed_indexed_and_plain_filters(self):
+        """Test non-indexed filters are applied on top of an index bucket."""
+        store = BaseStore(indexes=("type",))
+        store.create({"type": "expense", "project_id": "p1"})
+        store.create({"type": "expense", "project_id": "p2"})
+        store.create({"type": "income", "project_id": "p1"})
+
+        results = store.find_all({"type": "expense", "project_id": "p1", "category_id": None})
+
+        assert len(results) == 1
+        assert results[0]["project_id"] == "p1"
+
+    def test_data_is_a_read_only_view(self):
+        """Test _data reflects the records but cannot be written through."""
+        store = BaseStore(indexes=("status",))
+        store.create({"status": "old"})
+        view = store._data
+
+        store.put({"id": "r1", "status": "new"})
+        assert [r["status"] for r in view] == ["old", "new"]
+
+        with pytest.raises(AttributeError):
+            view.append({"id": "r2"})
+        with pytest.raises(AttributeError):
+            store._data = []
+
+
+class TestDomainStores:
+    """Tests for store subclasses declaring indexes."""
+
+    def test_user_lookup_by_email(self):
+        """Test user email lookups use the email index."""
+        store = UserStore()
+        user = store.create({"email": "a@example.com", "password": "x", "role": "admin"})
+        store.update(user["id"], {"email": "b@example.com"})
+
+        assert store.find_by_email("a@example.com") is None
+        assert store.find_by_email("b@example.com")["id"] == user["id"]
+
+    def test_material_reference_and_state_filter(self):
+        """Test material lookups by reference and state."""
+        store = MaterialStore()
+        store.create({"reference": "RM-1", "name": "Steel", "quantity": 5, "state": "available"})
+        store.create({"reference": "RM-2", "name": "Iron", "quantity": 5, "state": "reserved"})
+
+        assert store.find_by_reference("RM-2")["name"] == "Iron"
+        assert [m["reference"] for m in store.find_all({"state": "available"})] == ["RM-1"]
+
+    def test_mark_as_paid_moves_status_bucket(self):
+        """Test paying a payment moves it between status filters."""
+        store = PaymentStore()
+        payment = store.create({"type": "payable", "status": "pending", "due_date": "2999-01-01"})
+
+        store.mark_as_paid(payment["id"])
+
+        assert store.find_all({"status": "pending"}) == []
+        assert store.find_all({"status": "paid"})[0]["id"] == payment["id"]
+
+    def test_document_share_and_category_lookups(self):
+        """Test document stores answer lookups from their indexes."""
+        shares = DocumentShareStore()
+        link = shares.create_link_share("doc1", "owner")
+        shares.create_user_share("doc1", "u1", "owner")
+        shares.create_user_share("doc2", "u1", "owner")
+
+        assert shares.find_by_token(link["share_token"])["id"] == link["id"]
+        assert len(shares.find_by_document("doc1")) == 2
+        assert {s["document_id"] for s in shares.find_by_user("u1")} == {"doc1", "doc2"}
+
+        categories = DocumentCategoryStore()
+        root = categories.create({"name": "Invoices", "organization_id": "o1"})
+        child = categories.create({"name": "Invoices", "organization_id": "o1", "parent_id": root["id"]})
+
+        assert categories.find_by_slug("o1", "invoices")["id"] == root["id"]
+        assert categories.find_by_slug("o1", "invoices", root["id"])["id"] == child["id"]
+        assert [c["id"] for c in categories.find_by_parent("o1", None)] == [root["id"]]
+
+
+class TestCompactStorage:
+    """Tests for the compact slotted record backend."""
+
+    def test_round_trip_with_extra_fields(self):
+        """Test records keep schema and non-schema keys."""
+        store = BaseStore(schema=("type", "amount"), interned=("type",))
+        item = store.create({"type": "expense", "amount": 10.0, "vendor_name": "ACME"})
+
+        stored = store.find_by_id(item["id"])
+
+        assert stored == item
+        assert "description" not in stored
+
+    def test_returned_dicts_are_copies(self):
+        """Test mutating a returned record does not change the store."""
+        store = BaseStore(schema=("type", "amount"))
+        item = store.create({"type": "expense", "amount": 10.0})
+
+        store.find_by_id(item["id"])["amount"] = 99.0
+        assert store.find_by_id(item["id"])["amount"] == 10.0
+
+        store.set_fields(item["id"], amount=20.0)
+        assert store.find_by_id(item["id"])["amount"] == 20.0
+
+    def test_update_and_indexed_filters(self):
+        """Test compact stores support the same filter and update API."""
+        store = BaseStore(indexes=("type",), schema=("type", "amount"), interned=("type",))
+        first = store.create({"type": "expense", "amount": 1.0})
+        store.create({"type": "income", "amount": 2.0})
+
+        store.update(first["id"], {"type": "income"})
+
+        assert store.find_all({"type": "expense"}) == []
+        assert len(store.find_all({"type": "income"})) == 2
+        assert store.delete(first["id"]) is True
+        assert store.find_by_id(first["id"]) is None
+
+    @pytest.mark.parametrize("setting, compact", [(None, False), ("true", True)])
+    def test_database_rows_are_compact_only_when_enabled(self, monkeypatch, setting, compact):
+        """Test transactions and movements use compact rows only with STORE_COMPACT_ROWS."""
+        if setting is None:
+            monkeypatch.delenv("STORE_COMPACT_ROWS", raising=False)
+        else:
+            monkeypatch.setenv("STORE_COMPACT_ROWS", setting)
+
+        database = Database()
+
+        assert isinstance(database.transactions._records, CompactRecords) is compact
+        assert isinstance(database.movements._records, CompactRecords) is compact
+
+
+class TestPaymentOverdue:
+    """Tests for lazy overdue evaluation in the payment store."""
+
+    def test_only_past_due_unpaid_payments_become_overdue(self):
+        """Test the sweep flags past-due payments and leaves the rest."""
+        store = PaymentStore()
+        late = store.create({"type": "payable", "status": "pending", "due_date": "2020-01-01"})
+        paid = store.create({"type": "payable", "status": "paid", "due_date": "2020-01-01"})
+        future = store.create({"type": "payable", "status": "pending", "due_date": "2999-01-01"})
+
+        store.find_all()
+
+        assert store.find_by_id(late["id"])["status"] == "overdue"
+        assert store.find_by_id(paid["id"])["status"] == "paid"
+        assert store.find_by_id(future["id"])["status"] == "pending"
+        assert store.mark_overdue() == 0
+
+    def test_rescheduled_payment_uses_new_due_date(self):
+        """Test moving a due date forward cancels the pending sweep."""
+        store = PaymentStore()
+        payment = store.create({"type": "payable", "status": "pending", "due_date": "2020-01-01"})
+        store.update(payment["id"], {"due_date": "2999-01-01"})
+
+        assert store.mark_overdue() == 0
+        assert store.find_by_id(payment["id"])["status"] == "pending"
+
+    def test_listing_is_ordered_by_due_date(self):
+        """Test listings follow due date, then insertion order."""
+        store = PaymentStore()
+        store.create({"type": "payable", "status": "paid", "due_date": "2024-03-01", "reference": "c"})
+        store.create({"type": "receivable", "status": "paid", "due_date": "2024-01-01", "reference": "a"})
+        store.create({"type": "payable", "status": "paid", "due_date": "2024-01-01", "reference": "b"})
+
+        assert [p["reference"] for p in store.find_all()] == ["a", "b", "c"]
+        assert [p["reference"] for p in store.find_all({"type": "payable"})] == ["b", "c"]
+
+
+class TestNotificationIndex:
+    """Tests for per-user notification lists and unread counters."""
+
+    def test_unread_count_counts_user_and_role_once(self):
+        """Test a notification addressed to both user and role counts once."""
+        store = NotificationStore()
+        store.create({"user_id": "u1", "read": False})
+        store.create({"target_role": "admin", "read": False})
+        store.create({"user_id": "u1", "target_role": "admin", "read": False})
+        store.create({"user_id": "u2", "read": False})
+
+        assert store.get_unread_count("u1", "admin") == 3
+        assert store.get_unread_count("u1", "client") == 2
+        assert store.get_unread_count("u2", "admin") == 3
+
+    def test_mark_read_updates_counters(self):
+        """Test marking notifications read keeps the counters in sync."""
+        store = NotificationStore()
+        first = store.create({"user_id": "u1", "read": False})
+        store.create({"target_role": "admin", "read": False})
+        store.create({"user_id": "u2", "read": False})
+
+        store.mark_as_read(first["id"])
+        assert store.get_unread_count("u1", "admin") == 1
+
+        store.mark_all_as_read("u1", "admin")
+        assert store.get_unread_count("u1", "admin") == 0
+        assert store.get_unread_count("u2", "client") == 1
+
+    def test_find_by_user_is_newest_first_and_paginated(self):
+        """Test listings merge user and role notifications newest first."""
+        store = NotificationStore()
+        for i in range(5):
+            store.create({"user_id": "u1", "title": f"user-{i}", "read": False})
+            store.create({"target_role": "admin", "title": f"role-{i}", "read": i % 2 == 0})
+
+        page = store.find_by_user("u1", "admin", limit=3, offset=1)
+        unread = store.find_by_user("u1", "admin", unread_only=True)
+
+        assert [n["title"] for n in page] == ["user-4", "role-3", "user-3"]
+        assert len(unread) == 7
+
+
+class TestMaterialSearch:
+    """Tests for the material text search index."""
+
+    @pytest.fixture
+    def store(self):
+        store = MaterialStore()
+        for reference, name in (
+            ("RM-001", "Steel Sheets"),
+            ("RM-002", "Stainless Steel Bars"),
+            ("FG-001", "Assembled Module A"),
+            ("ST-100", "Copper Wire"),
+        ):
+            store.create({"reference": reference, "name": name, "quantity": 10, "state": "available"})
+        return store
+
+    def test_substring_and_prefix_ranking(self, store):
+        """Test prefix matches rank ahead of word and substring matches."""
+        results = store.find_all({"search": "steel"})
+
+        assert [m["name"] for m in results] == ["Steel Sheets", "Stainless Steel Bars"]
+
+    def test_reference_and_short_queries(self, store):
+        """Test reference matches and queries shorter than a trigram."""
+        assert [m["reference"] for m in store.find_all({"search": "rm-00"})] == ["RM-001", "RM-002"]
+        assert {m["reference"] for m in store.find_all({"search": "st"})} == {"RM-001", "RM-002", "ST-100"}
+
+    def test_index_follows_updates_and_deletes(self, store):
+        """Test renamed and deleted materials leave the index."""
+        copper = store.find_by_reference("ST-100")
+        store.update(copper["id"], {"name": "Brass Wire"})
+        assert store.find_all({"search": "copper"}) == []
+        assert store.find_all({"search": "brass"})[0]["id"] == copper["id"]
+
+        store.delete(copper["id"])
+        assert store.find_all({"search": "wire"}) == []
+
+    def test_limited_search_returns_best_matches(self, store):
+        """Test a result limit keeps the best ranked matches."""
+        results = store.find_all({"search": "steel", "limit": 1})
+
+        assert [m["name"] for m in results] == ["Steel Sheets"]
+
+    def test_removed_pending_terms_are_not_merged(self):
+        """Test terms removed before a search never reach the sorted range."""
+        terms = SortedTerms()
+        terms.add("steel", "m1")
+        terms.add("steel bars", "m2")
+        terms.remove("steel", "m1")
+
+        assert list(terms.prefixed("steel")) == [("steel bars", "m2")]
+
+    async def test_route_caps_unlimited_searches(self, store, monkeypatch):
+        """Test the materials route bounds searches sent without a limit."""
+        for n in range(inventory.SEARCH_LIMIT + 10):
+            store.create({"reference": f"ST-{n:03}", "name": "Bolt", "quantity": 1})
+        monkeypatch.setattr(inventory.db, "materials", store)
+
+        params = {"category_id": None, "location_id": None, "state": None, "low_stock": False, "limit": None}
+        searched = await inventory.get_materials(search="st", current_user={}, **params)
+        listed = await inventory.get_materials(search=None, current_user={}, **params)
+
+        assert len(searched["materials"]) == inventory.SEARCH_LIMIT
+        assert len(listed["materials"]) == len(store.find_all())
+
+
+class TestStorePersistence:
+    """Tests for snapshot and write-ahead log persistence."""
+
+    @staticmethod
+    def _database():
+        class Database:
+            def __init__(self):
+                self.users = UserStore()
+                self.payments = BaseStore(indexes=("status",), schema=("status", "amount"))
+        return Database()
+
+    def _open(self, directory, **kwargs):
+        db = self._database()
+        persistence = StorePersistence(str(directory), **kwargs)
+        persistence.attach(db)
+        return db, persistence
+
+    def test_log_replay_restores_mutations(self, tmp_path):
+        """Test puts, field updates and deletes survive a restart."""
+        db, persistence = self._open(tmp_path)
+        user = db.users.create({"email": "a@example.com", "role": "admin"})
+        gone = db.users.create({"email": "b@example.com", "role": "client"})
+        payment = db.payments.create({"status": "pending", "amount": 5.0})
+        db.users.update(user["id"], {"email": "c@example.com"})
+        db.payments.set_fields(payment["id"], status="paid")
+        db.users.delete(gone["id"])
+        persistence.close()
+
+        restored, reopened = self._open(tmp_path)
+
+        assert reopened.load() is True
+        assert restored.users.find_by_email("c@example.com")["id"] == user["id"]
+        assert restored.users.find_by_id(gone["id"]) is None
+        assert restored.payments.find_all({"status": "paid"})[0]["amount"] == 5.0
+
+    def test_snapshot_plus_log(self, tmp_path):
+        """Test a checkpoint drops old log segments and later writes replay on top."""
+        db, persistence = self._open(tmp_path, snapshot_every=3)
+        for i in range(7):
+            db.users.create({"email": f"u{i}@example.com", "role": "client"})
+        persistence.close()
+
+        assert (tmp_path / "snapshot.bin").exists()
+        assert len(list(tmp_path.glob("wal-*.log"))) == 1
+
+        restored, reopened = self._open(tmp_path)
+        reopened.load()
+
+        assert [u["email"] for u in restored.users.find_all()] == [f"u{i}@example.com" for i in range(7)]
+
+    def test_torn_log_tail_is_discarded(self, tmp_path):
+        """Test a partially written last entry is dropped on load."""
+        db, persistence = self._open(tmp_path)
+        kept = db.users.create({"email": "kept@example.com", "role": "client"})
+        db.users.create({"email": "torn@example.com", "role": "client"})
+        persistence.close()
+        log = next(tmp_path.glob("wal-*.log"))
+        log.write_bytes(log.read_bytes()[:-5])
+
+        restored, reopened = self._open(tmp_path)
+        reopened.load()
+
+        assert [u["id"] for u in restored.users.find_all()] == [kept["id"]]
+        restored.users.create({"email": "next@example.com", "role": "client"})
+        reopened.close()
+        again, final = self._open(tmp_path)
+        final.load()
+        assert len(again.users) == 2
+
+    @pytest.mark.parametrize("use_msgpack", [True, False])
+    def test_typed_values_round_trip(self, tmp_path, monkeypatch, use_msgpack):
+        """Test datetimes, Decimals, UUIDs and sets come back as the same types."""
+        if use_msgpack and not persistence_module.MSGPACK_AVAILABLE:
+            pytest.skip("msgpack not installed")
+        monkeypatch.setattr(persistence_module, "MSGPACK_AVAILABLE", use_msgpack)
+        values = {
+            "email": "typed@example.com",
+            "joined": datetime(2024, 3, 1, 9, 30, 15, 250, tzinfo=timezone.utc),
+            "birthday": date(1990, 5, 17),
+            "grace": timedelta(days=3, seconds=5, microseconds=7),
+            "credit": Decimal("1234.5678"),
+            "token": uuid4(),
+            "tags": {"vip", "net30"},
+            "nested": {"amount": Decimal("0.10"), "value": "plain"},
+        }
+        db, persistence = self._open(tmp_path, snapshot_every=0)
+        user = db.users.create(dict(values))
+        persistence.checkpoint()
+        db.users.set_fields(user["id"], credit=Decimal("99.01"))
+        persistence.close()
+
+        restored, reopened = self._open(tmp_path)
+        reopened.load()
+        loaded = restored.users.find_by_id(user["id"])
+
+        assert {key: loaded[key] for key in values} == {**values, "credit": Decimal("99.01")}
+        assert type(loaded["joined"]) is datetime and type(loaded["birthday"]) is date
+
+    def test_append_leaves_snapshot_to_background_thread(self, tmp_path, monkeypatch):
+        """Test reaching snapshot_every rotates the log without snapshotting inline."""
+        db, persistence = self._open(tmp_path, snapshot_every=2)
+        written = []
+        monkeypatch.setattr(persistence, "_schedule_snapshot", lambda: written.append(True))
+        for i in range(4):
+            db.users.create({"email": f"u{i}@example.com", "role": "client"})
+
+        assert written == [True, True]
+        assert not (tmp_path / "snapshot.bin").exists()
+        assert len(list(tmp_path.glob("wal-*.log"))) == 3
+
+        monkeypatch.undo()
+        db.users.create({"email": "u4@example.com", "role": "client"})
+        db.users.create({"email": "u5@example.com", "role": "client"})
+        persistence.close()
+
+        assert (tmp_path / "snapshot.bin").exists()
+        restored, reopened = self._open(tmp_path)
+        reopened.load()
+        assert len(restored.users) == 6
+
+    def test_document_edits_survive_restart(self, tmp_path):
+        """Test document store state changes are journaled through set_fields."""
+        class Database:
+            def __init__(self):
+                self.shares = DocumentShareStore()
+
+        db = Database()
+        persistence = StorePersistence(str(tmp_path))
+        persistence.attach(db)
+        db.shares.create_user_share("doc1", "u1", permission="view", shared_by="owner")
+        share = db.shares.create_user_share("doc1", "u1", permission="edit", shared_by="owner")
+        persistence.close()
+
+        restored = Database()
+        reopened = StorePersistence(str(tmp_path))
+        reopened.attach(restored)
+        reopened.load()
+
+        assert restored.shares.find_by_id(share["id"])["permission"] == "edit"
+
+    def test_prefixed_databases_share_a_log(self, tmp_path):
+        """Test stores with the same name in two attached databases restore apart."""
+        class Documents:
+            def __init__(self):
+                self.payments = DocumentCategoryStore()
+
+        def open_both():
+            db, docs = self._database(), Documents()
+            persistence = StorePersistence(str(tmp_path))
+            persistence.attach(db)
+            persistence.attach(docs, prefix="documents.")
+            return db, docs, persistence
+
+        db, docs, persistence = open_both()
+        db.payments.create({"status": "pending", "amount": 5.0})
+        persistence.checkpoint()
+        docs.payments.create({"name": "Invoices", "organization_id": "default"})
+        persistence.close()
+
+        db, docs, reopened = open_both()
+        assert reopened.load() is True
+        assert [p["amount"] for p in db.payments.find_all()] == [5.0]
+        assert [c["name"] for c in docs.payments.find_all()] == ["Invoices"]
+
+    @pytest.mark.parametrize("damage", ["header", "chunk", "truncated"])
+    def test_corrupt_snapshot_refuses_to_load(self, tmp_path, damage):
+        """Test a snapshot that cannot be read completely raises instead of loading partially."""
+        db, persistence = self._open(tmp_path, snapshot_every=0)
+        for i in range(3):
+            db.users.create({"email": f"u{i}@example.com", "role": "client"})
+        persistence.checkpoint()
+        persistence.close()
+        snapshot = tmp_path / "snapshot.bin"
+        data = bytearray(snapshot.read_bytes())
+        if damage == "header":
+            data[persistence_module.FRAME_HEADER.size] ^= 0xFF
+        elif damage == "chunk":
+            data[-1] ^= 0xFF
+        else:
+            del data[-5:]
+        snapshot.write_bytes(bytes(data))
+
+        restored, reopened = self._open(tmp_path)
+
+        with pytest.raises(CorruptSnapshotError):
+            reopened.load()
+        assert len(restored.users) == 0
+
+    def test_load_without_files(self, tmp_path):
+        """Test loading an empty directory reports nothing persisted."""
+        _, persistence = self._open(tmp_path / "empty")
+
+        assert persistence.load() is False
@@ -1,8 +1,41 @@
 """
 Tests for workflows module.
 """
+import asyncio
+import importlib
+import importlib.util
+import sys
+import types
 import pytest
 from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def load_workflow_module(name: str) -> types.ModuleType:
+    """
+    Import an app.workflows submodule without running the package __init__
+    modules: app/workflows/__init__.py eagerly imports the legacy workflow
+    model names, which the models package no longer provides.
+    """
+    parts = name.split(".")
+    for depth in range(2, len(parts)):
+        package_name = ".".join(parts[:depth])
+        if package_name not in sys.modules:
+            package = types.ModuleType(package_name)
+            package.__path__ = [str(BACKEND.joinpath(*parts[:depth]))]
+            sys.modules[package_name] = package
+    return importlib.import_module(name)
+
+
+async def wait_until(condition, timeout: float = 2.0) -> None:
+    """Yield to the event loop until ``condition()`` holds."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
 
 
 class TestWorkflowEngine:
@@ -106,6 +139,311 @@ class TestWorkflowConditions:
         assert result is True
 
 
+class TestCompiledExpressions:
+    """Tests for compiled condition expressions and templates."""
+
+    @pytest.fixture
+    def evaluator(self):
+        return load_workflow_module("app.workflows.rules.evaluator")
+
+    @pytest.fixture
+    def variables(self):
+        return {
+            "invoice": {"amount": 1500, "status": "pending", "total": "2500.50"},
+            "customer": {"tier": "gold", "name": "Acme Corp"},
+        }
+
+    @pytest.mark.parametrize("expression, expected", [
+        ("{{invoice.amount}} > 1000", True),
+        ("{{invoice.amount}} <= 1000", False),
+        ("{{invoice.amount}} == 1500", True),
+        ("{{invoice.status}} != 'paid'", True),
+        ("{{invoice.status}} equals pending", True),
+        ("{{invoice.total}} greater_than 2500", True),
+        ("{{invoice.missing}} == '{{invoice.missing}}'", True),
+    ])
+    def test_comparisons(self, evaluator, variables, expression, expected):
+        """Test comparison operators, with string values parsed like literals."""
+        assert evaluator.compile_expression(expression)(variables) is expected
+
+    @pytest.mark.parametrize("expression, expected", [
+        ("{{invoice.amount}} > 1000 AND {{invoice.status}} == 'pending'", True),
+        ("{{invoice.amount}} > 1000 AND {{invoice.status}} == 'paid'", False),
+        ("{{invoice.amount}} > 5000 OR {{customer.tier}} == gold", True),
+        ("{{invoice.amount}} > 5000 OR {{customer.tier}} == silver", False),
+        ("NOT {{invoice.status}} == paid", True),
+        ("NOT {{invoice.amount}} > 1000", False),
+    ])
+    def test_logical_operators(self, evaluator, variables, expression, expected):
+        """Test AND, OR and NOT combine their operands."""
+        assert evaluator.compile_expression(expression)(variables) is expected
+
+    def test_in_list(self, evaluator, variables):
+        """Test IN matches against the listed values."""
+        expression = evaluator.compile_expression("{{customer.tier}} IN [gold, platinum]")
+
+        assert expression(variables) is True
+        assert expression({"customer": {"tier": "bronze"}}) is False
+
+    def test_failing_condition_is_false_without_failing_siblings(self, evaluator, variables):
+        """Test a comparison that raises evaluates to False inside an OR."""
+        variables["invoice"]["status"] = ["not", "comparable"]
+
+        failing = evaluator.compile_expression("{{invoice.status}} > 10")
+        combined = evaluator.compile_expression("{{invoice.status}} > 10 OR {{invoice.amount}} > 1000")
+
+        assert failing(variables) is False
+        assert combined(variables) is True
+
+    def test_compiled_expression_is_cached(self, evaluator):
+        """Test the same text compiles once."""
+        text = "{{order.count}} >= 3 AND {{order.open}} == true"
+
+        assert evaluator.compile_expression(text) is evaluator.compile_expression(text)
+        assert evaluator.compile_expression(text)({"order": {"count": 3, "open": True}}) is True
+
+    def test_template_rendering(self, evaluator, variables):
+        """Test templates render variables, functions and unresolved references."""
+        template = evaluator.compile_template(
+            "Invoice for {{customer.name}}: {{invoice.amount}} ({{UPPER(pending)}}) {{invoice.owner}}"
+        )
+
+        assert template(variables) == "Invoice for Acme Corp: 1500 (PENDING) {{invoice.owner}}"
+        assert evaluator.compile_template("no references")({}) == "no references"
+
+
+class TestWorkflowStoreTriggerIndex:
+    """Tests for the trigger indexes of active workflows and rules."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store_module = load_workflow_module("app.workflows.models.store")
+        history = load_workflow_module("app.workflows.models.history")
+        return store_module.WorkflowStore(archive=history.ExecutionArchive(str(tmp_path)))
+
+    @staticmethod
+    def _workflow(event="created", entity="invoice", status="active", trigger_type="entity_event"):
+        models = load_workflow_module("app.workflows.models.workflow")
+        return models.Workflow(
+            name=f"On {entity} {event}",
+            status=status,
+            tenant_id="t1",
+            trigger=models.TriggerConfig(type=trigger_type, entity=entity, event=event),
+            nodes=[],
+            metadata=models.WorkflowMetadata(created_by="u1"),
+        )
+
+    @staticmethod
+    def _rule(entity="invoice", priority=100, status="active", trigger_type="entity_event"):
+        models = load_workflow_module("app.workflows.models.rule")
+        return models.BusinessRule(
+            name=f"{entity} rule",
+            status=status,
+            priority=priority,
+            tenant_id="t1",
+            trigger=models.RuleTrigger(type=trigger_type),
+            scope=models.RuleScope(entity=entity),
+            actions=[],
+            created_by="u1",
+        )
+
+    def test_only_active_workflows_are_indexed(self, store):
+        """Test saving adds active workflows under their trigger."""
+        created = store.save_workflow(self._workflow())
+        store.save_workflow(self._workflow(status="draft"))
+        paid = store.save_workflow(self._workflow(event="paid"))
+
+        assert store.get_active_workflows_by_trigger("entity_event", "invoice", "created") == [created]
+        assert store.get_active_workflows_by_trigger("entity_event", "invoice") == [created, paid]
+        assert store.get_active_workflows_by_trigger("entity_event", event="paid") == [paid]
+        assert store.get_active_workflows_by_trigger("schedule") == []
+
+    def test_saving_again_moves_or_drops_the_entry(self, store):
+        """Test status and trigger changes take effect when the workflow is saved."""
+        workflow = store.save_workflow(self._workflow())
+        other = store.save_workflow(self._workflow())
+
+        workflow.trigger.event = "paid"
+        store.save_workflow(workflow)
+        assert store.get_active_workflows_by_trigger("entity_event", "invoice", "paid") == [workflow]
+        assert store.get_active_workflows_by_trigger("entity_event", "invoice", "created") == [other]
+
+        other.status = "paused"
+        store.save_workflow(other)
+        assert store.get_active_workflows_by_trigger("entity_event", "invoice", "created") == []
+
+        other.status = "active"
+        store.save_workflow(other)
+        # Reactivated workflows keep their original position
+        assert store.get_active_workflows_by_trigger("entity_event", "invoice") == [workflow, other]
+
+    def test_delete_removes_workflow_and_empty_buckets(self, store):
+        """Test deleting leaves no trace in the index."""
+        workflow = store.save_workflow(self._workflow())
+
+        assert store.delete_workflow(workflow.id) is True
+        assert store.get_active_workflows_by_trigger("entity_event", "invoice", "created") == []
+        assert store._workflow_triggers == {}
+        assert store.delete_workflow(workflow.id) is False
+
+    def test_rules_by_trigger_follow_priority_and_changes(self, store):
+        """Test rule lookups order by priority, then insertion, and track updates."""
+        low = store.save_rule(self._rule(priority=10))
+        high = store.save_rule(self._rule(priority=90))
+        tie = store.save_rule(self._rule(priority=90))
+        customer = store.save_rule(self._rule(entity="customer"))
+        store.save_rule(self._rule(status="inactive"))
+
+        assert store.get_active_rules_by_trigger("entity_event", "invoice") == [high, tie, low]
+        assert store.get_active_rules_by_trigger("entity_event") == [customer, high, tie, low]
+
+        high.scope.entity = "customer"
+        store.save_rule(high)
+        low.status = "inactive"
+        store.save_rule(low)
+        store.delete_rule(tie.id)
+
+        assert store.get_active_rules_by_trigger("entity_event", "invoice") == []
+        assert store.get_active_rules_by_trigger("entity_event", "customer") == [customer, high]
+
+    def test_saved_after_a_delete_sort_last(self, store):
+        """Test a delete does not hand its position to the next workflow or rule."""
+        gone, first, second = (store.save_workflow(self._workflow()) for _ in range(3))
+        store.delete_workflow(gone.id)
+        third = store.save_workflow(self._workflow())
+        second.status = "paused"
+        store.save_workflow(second)
+        second.status = "active"
+        store.save_workflow(second)
+
+        assert store.get_active_workflows_by_trigger("entity_event", "invoice") == [first, second, third]
+
+        gone, first, second = (store.save_rule(self._rule()) for _ in range(3))
+        store.delete_rule(gone.id)
+        third = store.save_rule(self._rule())
+        second.status = "inactive"
+        store.save_rule(second)
+        second.status = "active"
+        store.save_rule(second)
+
+        assert store.get_active_rules_by_trigger("entity_event", "invoice") == [first, second, third]
+
+
+class TestWorkflowStoreHistory:
+    """Tests for bounded execution history and its archive."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store_module = load_workflow_module("app.workflows.models.store")
+        history = load_workflow_module("app.workflows.models.history")
+        store = store_module.WorkflowStore(archive=history.ExecutionArchive(str(tmp_path)))
+        store.history_limit = 2
+        return store
+
+    @staticmethod
+    def _execution(minute, workflow_id="wf-1", tenant_id="t1", status="completed"):
+        models = load_workflow_module("app.workflows.models.execution")
+        return models.WorkflowExecution(
+            id=f"{workflow_id}-{minute}",
+            workflow_id=workflow_id,
+            workflow_name=workflow_id,
+            workflow_version=1,
+            tenant_id=tenant_id,
+            status=status,
+            context=models.ExecutionContext(trigger_type="manual", tenant_id=tenant_id),
+            started_at=datetime(2024, 1, 15, 10, minute),
+        )
+
+    @staticmethod
+    def _ids(executions):
+        return [e.id for e in executions]
+
+    def test_oldest_finished_executions_are_archived(self, store):
+        """Test eviction keeps unfinished runs and reads archived ones back."""
+        store.save_execution(self._execution(0, status="running"))
+        for minute in (1, 2, 3):
+            store.save_execution(self._execution(minute))
+
+        assert sorted(store.executions) == ["wf-1-0", "wf-1-3"]
+        assert self._ids(store.get_execution_summaries("wf-1")) == ["wf-1-2", "wf-1-1"]
+        assert store.get_execution("wf-1-1").started_at == datetime(2024, 1, 15, 10, 1)
+        assert self._ids(store.get_executions_by_workflow("wf-1")) == [
+            "wf-1-3", "wf-1-2", "wf-1-1", "wf-1-0",
+        ]
+
+    def test_retried_execution_is_listed_once(self, store):
+        """Test saving an evicted execution again replaces its archived record."""
+        failed = self._execution(0, status="failed")
+        store.save_execution(failed)
+        store.save_execution(self._execution(1))
+        store.save_execution(self._execution(2))
+        assert "wf-1-0" not in store.executions
+
+        failed.status = "pending"
+        failed.retry_count = 1
+        store.save_execution(failed)
+
+        listed = store.get_executions_by_workflow("wf-1")
+        assert self._ids(listed) == ["wf-1-2", "wf-1-1", "wf-1-0"]
+        assert listed[-1] is failed
+        assert self._ids(store.get_executions_by_tenant("t1")) == ["wf-1-2", "wf-1-1", "wf-1-0"]
+        # the retry pushed the next oldest finished run out instead
+        assert self._ids(store.get_execution_summaries("wf-1")) == ["wf-1-1"]
+        assert store.get_retention_stats()["archived_summaries"] == 1
+
+    def test_status_changed_in_place_is_evicted_by_indexed_status(self, store):
+        """Test an unsaved status change neither evicts the run nor unbalances the index."""
+        running = self._execution(0, status="running")
+        store.save_execution(running)
+        store.save_execution(self._execution(1))
+        # The engine marks a run failed before it saves it again
+        running.status = "failed"
+        store.save_execution(self._execution(2))
+        store.save_execution(self._execution(3))
+
+        assert sorted(store.executions) == ["wf-1-0", "wf-1-3"]
+        assert store.count_executions("wf-1", "running") == 1
+        assert self._ids(store.get_executions_by_workflow("wf-1", status="running")) == ["wf-1-0"]
+
+        store.save_execution(running)
+        assert store.count_executions("wf-1", "running") == 0
+        assert self._ids(store.get_executions_by_workflow("wf-1", status="failed")) == ["wf-1-0"]
+
+    def test_archive_keeps_only_the_newest_segments(self, tmp_path):
+        """Test old archive segments are deleted and their records no longer load."""
+        store_module = load_workflow_module("app.workflows.models.store")
+        history = load_workflow_module("app.workflows.models.history")
+        # Every record starts a segment of its own
+        archive = history.ExecutionArchive(str(tmp_path), segment_bytes=1, max_segments=2)
+        store = store_module.WorkflowStore(archive=archive)
+        store.history_limit = 1
+        for minute in range(5):
+            store.save_execution(self._execution(minute))
+
+        assert len(list(tmp_path.glob("executions-*.jsonl"))) == 2
+        assert store.get_execution("wf-1-0") is None
+        assert store.get_execution("wf-1-3").started_at == datetime(2024, 1, 15, 10, 3)
+        assert self._ids(store.get_executions_by_workflow("wf-1")) == ["wf-1-4", "wf-1-3", "wf-1-2"]
+
+    def test_tenant_listing_includes_archived_history(self, store):
+        """Test a tenant's executions merge every workflow's memory and archive."""
+        for minute in range(4):
+            store.save_execution(self._execution(minute, status="failed" if minute == 1 else "completed"))
+        for minute in (5, 6, 7):
+            store.save_execution(self._execution(minute, workflow_id="wf-2"))
+        store.save_execution(self._execution(8, workflow_id="wf-3", tenant_id="t2"))
+
+        assert self._ids(store.get_executions_by_tenant("t1")) == [
+            "wf-2-7", "wf-2-6", "wf-2-5", "wf-1-3", "wf-1-2", "wf-1-1", "wf-1-0",
+        ]
+        assert self._ids(store.get_executions_by_tenant("t1", skip=2, limit=3)) == [
+            "wf-2-5", "wf-1-3", "wf-1-2",
+        ]
+        assert self._ids(store.get_executions_by_tenant("t1", status="failed")) == ["wf-1-1"]
+        assert self._ids(store.get_executions_by_tenant("t2")) == ["wf-3-8"]
+        assert store.get_executions_by_tenant("t3") == []
+
+
 class TestWorkflowActions:
     """Tests for workflow actions."""
 
@@ -192,3 +530,435 @@ class TestWorkflowScheduler:
 
         sorted_queue = sorted(queue, key=lambda x: x["run_at"])
         assert sorted_queue[0]["workflow_id"] == "wf-001"
+
+
+class TestWorkflowSchedulerDispatch:
+    """Tests for heap dispatch and the scheduler concurrency cap."""
+
+    @pytest.fixture
+    def scheduler_module(self):
+        pytest.importorskip("croniter")
+        return load_workflow_module("app.workflows.scheduler")
+
+    @staticmethod
+    def _due(scheduler, workflow_id, seconds_ago):
+        """Add an hourly interval job whose next run is already past."""
+        job = scheduler.add_job(workflow_id, "interval", {"interval_seconds": 3600})
+        job.next_run -= timedelta(seconds=3600 + seconds_ago)
+        scheduler._schedule(job)
+        return job
+
+    async def test_due_jobs_run_in_next_run_order(self, scheduler_module):
+        """Test the earliest due job is dispatched first."""
+        scheduler = scheduler_module.WorkflowScheduler(max_concurrency=1)
+        self._due(scheduler, "wf-late", 10)
+        self._due(scheduler, "wf-early", 30)
+        self._due(scheduler, "wf-middle", 20)
+        scheduler.add_job("wf-future", "interval", {"interval_seconds": 3600})
+
+        assert [job.workflow_id for job in scheduler.get_due_jobs()] == ["wf-early", "wf-middle", "wf-late"]
+
+        ran = []
+
+        async def execute(workflow_id, context):
+            ran.append(workflow_id)
+
+        scheduler.set_executor(execute)
+        await scheduler.start()
+        try:
+            await wait_until(lambda: len(ran) == 3)
+        finally:
+            await scheduler.stop()
+
+        assert ran == ["wf-early", "wf-middle", "wf-late"]
+        assert scheduler.get_due_jobs() == []
+        assert scheduler.get_metrics()["runs"] == 3
+        assert scheduler.get_job("wf-early").run_count == 1
+
+    async def test_concurrency_cap_holds_due_jobs_back(self, scheduler_module):
+        """Test no more than max_concurrency jobs run at once."""
+        scheduler = scheduler_module.WorkflowScheduler(max_concurrency=2)
+        for i in range(4):
+            self._due(scheduler, f"wf-{i}", 40 - i)
+
+        release = asyncio.Event()
+        started = []
+
+        async def execute(workflow_id, context):
+            started.append(workflow_id)
+            await release.wait()
+
+        scheduler.set_executor(execute)
+        await scheduler.start()
+        try:
+            await wait_until(lambda: len(started) == 2)
+            await asyncio.sleep(0.05)
+            assert started == ["wf-0", "wf-1"]
+            assert scheduler.get_metrics()["in_flight"] == 2
+            assert [job.workflow_id for job in scheduler.get_due_jobs()] == ["wf-2", "wf-3"]
+
+            release.set()
+            await wait_until(lambda: len(started) == 4)
+            await wait_until(lambda: scheduler.get_metrics()["in_flight"] == 0)
+        finally:
+            await scheduler.stop()
+
+        assert started == ["wf-0", "wf-1", "wf-2", "wf-3"]
+        assert scheduler.get_metrics()["lag_seconds"]["max"] >= 37
+
+    async def test_job_removed_while_running_is_not_requeued(self, scheduler_module):
+        """Test a job removed mid-run is dropped once it finishes."""
+        scheduler = scheduler_module.WorkflowScheduler(max_concurrency=1)
+        self._due(scheduler, "wf-1", 5)
+
+        running = asyncio.Event()
+        release = asyncio.Event()
+
+        async def execute(workflow_id, context):
+            running.set()
+            await release.wait()
+
+        scheduler.set_executor(execute)
+        await scheduler.start()
+        try:
+            await asyncio.wait_for(running.wait(), 2)
+            assert scheduler.remove_job("wf-1") is True
+            release.set()
+            await wait_until(lambda: scheduler.get_metrics()["in_flight"] == 0)
+        finally:
+            await scheduler.stop()
+
+        metrics = scheduler.get_metrics()
+        assert metrics["jobs"] == 0
+        assert metrics["next_run"] is None
+        assert scheduler.get_job("wf-1") is None
+
+    async def test_job_replaced_while_running_is_scheduled(self, scheduler_module):
+        """Test a job re-added mid-run is queued once the old run finishes."""
+        scheduler = scheduler_module.WorkflowScheduler(max_concurrency=1)
+        self._due(scheduler, "wf-1", 5)
+
+        running = asyncio.Event()
+        release = asyncio.Event()
+        ran = []
+
+        async def execute(workflow_id, context):
+            ran.append(workflow_id)
+            running.set()
+            await release.wait()
+
+        scheduler.set_executor(execute)
+        await scheduler.start()
+        try:
+            await asyncio.wait_for(running.wait(), 2)
+            replacement = scheduler.add_job("wf-1", "interval", {"interval_seconds": 60})
+            assert scheduler.get_metrics()["next_run"] is None
+
+            release.set()
+            await wait_until(lambda: scheduler.get_metrics()["in_flight"] == 0)
+        finally:
+            await scheduler.stop()
+
+        assert ran == ["wf-1"]
+        assert scheduler.get_job("wf-1") is replacement
+        assert scheduler.get_metrics()["next_run"] == replacement.next_run.isoformat()
+        assert scheduler.get_due_jobs() == []
+
+
+class TestExecutionPool:
+    """Tests for the workflow execution pool lanes and tenant fairness."""
+
+    @pytest.fixture
+    def pool_module(self):
+        return load_workflow_module("app.workflows.engine.pool")
+
+    @staticmethod
+    def _job(pool_module, tenant_id, priority, name):
+        workflow = types.SimpleNamespace(id=f"wf-{tenant_id}")
+        execution = types.SimpleNamespace(id=name, tenant_id=tenant_id)
+        return pool_module.QueuedExecution(workflow, execution, priority)
+
+    async def _drain(self, pool_module, jobs):
+        """Queue every job before the single worker runs; return the run order."""
+        ran = []
+
+        async def handler(job):
+            ran.append(job.execution.id)
+
+        pool = pool_module.ExecutionPool(handler, workers=1, max_queued=100)
+        for job in jobs:
+            await pool.submit(job)
+        try:
+            await wait_until(lambda: len(ran) == len(jobs))
+        finally:
+            await pool.stop()
+        return ran
+
+    async def test_lanes_are_served_by_weight(self, pool_module):
+        """Test each round gives high, normal and low lanes 4, 2 and 1 turns."""
+        jobs = [
+            self._job(pool_module, "t1", priority, f"{priority[0]}{i}")
+            for priority in ("low", "normal", "high")
+            for i in range(6)
+        ]
+        ran = await self._drain(pool_module, jobs)
+
+        assert ran[:7] == ["h0", "h1", "h2", "h3", "n0", "n1", "l0"]
+        assert ran[7:11] == ["h4", "h5", "n2", "n3"]
+        assert ran[-3:] == ["l3", "l4", "l5"]
+
+    async def test_tenants_take_turns_within_a_lane(self, pool_module):
+        """Test a tenant's backlog does not hold other tenants back."""
+        jobs = [self._job(pool_module, "bulk", "normal", f"bulk{i}") for i in range(4)]
+        jobs += [
+            self._job(pool_module, "t2", "normal", "t2-0"),
+            self._job(pool_module, "t3", "normal", "t3-0"),
+            self._job(pool_module, "t2", "normal", "t2-1"),
+        ]
+        ran = await self._drain(pool_module, jobs)
+
+        assert ran == ["bulk0", "t2-0", "t3-0", "bulk1", "t2-1", "bulk2", "bulk3"]
+
+    async def test_queued_for_and_metrics_follow_the_queue(self, pool_module):
+        """Test queued counts drop as workers take executions."""
+        release = asyncio.Event()
+
+        async def handler(job):
+            await release.wait()
+
+        pool = pool_module.ExecutionPool(handler, workers=1, max_queued=10)
+        try:
+            for i in range(3):
+                await pool.submit(self._job(pool_module, "t1", "normal", f"e{i}"))
+            assert pool.queued_for("wf-t1") == 3
+
+            await wait_until(lambda: pool.get_metrics()["in_flight"] == 1)
+            metrics = pool.get_metrics()
+            assert pool.queued_for("wf-t1") == 2
+            assert metrics["queue_depth"] == 2
+            assert metrics["lanes"]["normal"] == 2
+            assert metrics["queued_tenants"] == 1
+
+            release.set()
+            await wait_until(lambda: pool.get_metrics()["completed"] == 3)
+            assert pool.queued_for("wf-t1") == 0
+        finally:
+            await pool.stop()
+
+    async def test_unknown_priority_is_rejected(self, pool_module):
+        """Test submitting to a lane that does not exist."""
+        pool = pool_module.ExecutionPool(lambda job: None, workers=1)
+        with pytest.raises(ValueError, match="Unknown execution priority"):
+            await pool.submit(self._job(pool_module, "t1", "urgent", "e0"))
+
+
+class TestWorkflowEngineQueue:
+    """Tests for queued workflow executions in the engine."""
+
+    @pytest.fixture
+    def core(self, tmp_path, monkeypatch):
+        core = load_workflow_module("app.workflows.engine.core")
+        store_module = load_workflow_module("app.workflows.models.store")
+        history = load_workflow_module("app.workflows.models.history")
+        store = store_module.WorkflowStore(archive=history.ExecutionArchive(str(tmp_path)))
+        monkeypatch.setattr(core, "workflow_store", store)
+        return core
+
+    @pytest.fixture
+    async def engine(self, core):
+        engine = core.WorkflowEngine()
+        yield engine
+        await engine.stop()
+
+    @staticmethod
+    def _context():
+        execution_models = load_workflow_module("app.workflows.models.execution")
+        return execution_models.ExecutionContext(trigger_type="entity_event", tenant_id="t1")
+
+    def _save_workflow(self, core, **error_handler):
+        workflow = TestWorkflowStoreTriggerIndex._workflow()
+        for field, value in error_handler.items():
+            setattr(workflow.error_handler, field, value)
+        core.workflow_store.save_workflow(workflow)
+        return workflow
+
+    async def test_queued_executions_count_toward_the_limit(self, core, engine, monkeypatch):
+        """Test executions waiting in the pool count as active."""
+        monkeypatch.setattr(core.workflow_settings, "max_concurrent_executions", 2)
+        workflow = self._save_workflow(core)
+
+        # nothing yields between the triggers, so both are still queued
+        await engine.trigger_workflow(workflow.id, self._context())
+        await engine.trigger_workflow(workflow.id, self._context())
+        assert engine.pool.queued_for(workflow.id) == 2
+
+        with pytest.raises(ValueError, match="Maximum concurrent executions"):
+            await engine.trigger_workflow(workflow.id, self._context())
+
+    async def test_cancelled_queued_execution_never_runs(self, core, engine, monkeypatch):
+        """Test a queued execution cancelled before a worker takes it is skipped."""
+        started = []
+
+        async def execute(workflow, execution, job=None):
+            started.append(execution.id)
+
+        monkeypatch.setattr(engine, "_execute_workflow", execute)
+        workflow = self._save_workflow(core)
+
+        execution = await engine.trigger_workflow(workflow.id, self._context())
+        assert await engine.cancel_execution(execution.id) is True
+
+        await wait_until(lambda: engine.get_metrics()["completed"] == 1)
+        assert started == []
+        assert core.workflow_store.get_execution(execution.id).status == core.ExecutionStatus.CANCELLED
+
+    async def test_stop_cancels_executions_still_queued(self, core, engine):
+        """Test stopping the engine does not leave queued executions pending."""
+        workflow = self._save_workflow(core)
+        queued = [await engine.trigger_workflow(workflow.id, self._context()) for _ in range(2)]
+
+        await engine.stop()
+
+        assert engine.pool.depth() == 0
+        for execution in queued:
+            stored = core.workflow_store.get_execution(execution.id)
+            assert stored.status == core.ExecutionStatus.CANCELLED
+            assert stored.completed_at is not None
+
+    async def test_failed_execution_is_queued_again_for_retry(self, core, engine, monkeypatch):
+        """Test a retry goes back through the pool instead of holding a worker."""
+        attempts = []
+
+        class FailingExecutor:
+            def __init__(self, workflow, execution, engine):
+                self.execution = execution
+
+            async def execute(self):
+                attempts.append(self.execution.retry_count)
+                raise RuntimeError("step failed")
+
+        monkeypatch.setattr(core, "WorkflowExecutor", FailingExecutor)
+        workflow = self._save_workflow(core, retry_count=1, retry_delay_seconds=0)
+
+        execution = await engine.trigger_workflow(workflow.id, self._context())
+        await wait_until(lambda: engine.get_metrics()["completed"] == 2)
+        await wait_until(lambda: engine.get_metrics()["pending_retries"] == 0)
+
+        metrics = engine.get_metrics()
+        assert attempts == [0, 1]
+        assert metrics["submitted"] == 2
+        assert metrics["queue_depth"] == 0
+        saved = core.workflow_store.get_execution(execution.id)
+        assert saved.status == core.ExecutionStatus.FAILED
+        assert saved.retry_count == 1
+        assert saved.error == "step failed"
+
+
+class TestTriggerRegistryBatching:
+    """Tests for batched, coalescing event emission."""
+
+    @pytest.fixture
+    def triggers(self, monkeypatch):
+        """
+        Load app/workflows/triggers.py from its file: the triggers and models
+        packages shadow the flat triggers.py and models.py modules, so the
+        flat models module stands in for app.workflows.models while it loads.
+        """
+        load_workflow_module("app.workflows.config")
+        workflows_dir = BACKEND / "app" / "workflows"
+
+        def load(name, filename):
+            spec = importlib.util.spec_from_file_location(name, workflows_dir / filename)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+
+        monkeypatch.setitem(sys.modules, "app.workflows.models", load("app.workflows.models", "models.py"))
+        return load("app.workflows.trigger_registry", "triggers.py")
+
+    @pytest.fixture
+    async def registry(self, triggers):
+        registry = triggers.TriggerRegistry()
+        yield registry
+        if registry._flush_task is not None:
+            registry._flush_task.cancel()
+            await asyncio.gather(registry._flush_task, return_exceptions=True)
+
+    @staticmethod
+    def _recorder(registry, event_type, dispatched):
+        async def handler(event, payload, workflow_ids):
+            dispatched.append((event, payload))
+
+        registry.register_event_handler(event_type, handler)
+
+    async def test_events_for_one_entity_are_coalesced(self, registry):
+        """Test repeated events for an entity dispatch once with the latest payload."""
+        dispatched = []
+        self._recorder(registry, "invoice.paid", dispatched)
+        registry.subscribe_workflow("wf-1", "invoice.paid")
+
+        assert registry.emit_batched("invoice.paid", {"invoice_id": "i1", "amount": 1}) == ["wf-1"]
+        registry.emit_batched("invoice.paid", {"invoice_id": "i2", "amount": 5})
+        registry.emit_batched("invoice.paid", {"invoice_id": "i1", "amount": 2})
+        registry.emit_batched("invoice.paid", {"invoice_id": "i1", "amount": 3}, customer_id="c2")
+        registry.emit_batched("invoice.paid", {"amount": 7})
+        registry.emit_batched("invoice.paid", {"amount": 7})
+        registry.emit_batched("invoice.paid", {"ref": "a", "amount": 8}, coalesce_key="batch-1")
+        registry.emit_batched("invoice.paid", {"ref": "b", "amount": 9}, coalesce_key="batch-1")
+
+        await registry.flush()
+
+        assert [payload["amount"] for _, payload in dispatched] == [2, 5, 3, 7, 7, 9]
+        assert registry.get_batch_stats() == {
+            "queued": 8, "coalesced": 2, "dispatched": 6, "batches": 1, "pending": 0,
+        }
+
+    async def test_background_flush_dispatches_after_the_window(self, registry):
+        """Test queued events go out without an explicit flush."""
+        dispatched = []
+        self._recorder(registry, "customer.created", dispatched)
+
+        registry.emit_batched("customer.created", {"customer_id": "c1"})
+        assert dispatched == []
+        assert registry.get_batch_stats()["pending"] == 1
+
+        await wait_until(lambda: len(dispatched) == 1)
+        assert registry.get_batch_stats()["pending"] == 0
+
+    async def test_full_batch_dispatches_before_the_window(self, triggers, registry, monkeypatch):
+        """Test reaching the batch size wakes the flush loop and later events wait."""
+        monkeypatch.setattr(triggers.workflow_settings, "event_batch_size", 2)
+        monkeypatch.setattr(triggers.workflow_settings, "event_batch_window_ms", 60_000)
+        dispatched = []
+        self._recorder(registry, "ticket.created", dispatched)
+
+        for i in range(5):
+            registry.emit_batched("ticket.created", {"ticket_id": f"t{i}"})
+
+        await wait_until(lambda: len(dispatched) == 2)
+        assert registry.get_batch_stats()["pending"] == 3
+
+        await registry.flush()
+        assert [payload["ticket_id"] for _, payload in dispatched] == [f"t{i}" for i in range(5)]
+        assert registry.get_batch_stats()["batches"] == 3
+
+    async def test_dispatch_concurrency_is_capped(self, triggers, registry, monkeypatch):
+        """Test a batch runs at most event_dispatch_concurrency handlers at once."""
+        monkeypatch.setattr(triggers.workflow_settings, "event_dispatch_concurrency", 3)
+        active = 0
+        peak = 0
+
+        async def handler(event, payload, workflow_ids):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        registry.register_event_handler("payment.received", handler)
+        for i in range(12):
+            registry.emit_batched("payment.received", {"payment_id": f"p{i}"})
+
+        await registry.flush()
+        assert peak == 3
+        assert registry.get_batch_stats()["dispatched"] == 12
@@ -87,6 +87,15 @@ export function RealtimeProvider({ children }) {
       );
     });
 
+    socketInstance.on('presence:batch', (data) => {
+      const updates = new Map((data.users || []).map(u => [u.user_id, u]));
+      setOnlineUsers(prev =>
+        prev.map(u =>
+          updates.has(u.user_id) ? { ...u, ...updates.get(u.user_id) } : u
+        )
+      );
+    });
+
     setSocket(socketInstance);
 
     return () => {